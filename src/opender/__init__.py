@@ -6,6 +6,8 @@ from .op_cond_proc import DERInputs
 from .der import DER
 from .der_pv import DER_PV
 from .der_bess import DER_BESS
+from .operation_status.status_codes import DERStatus, RTControl
+from .fleet import DERFleet, MultiRateScheduler, ShardedFleetRunner, load_ders, load_fleet
 
 # from .setting_execution_delay import SettingExecutionDelay
 
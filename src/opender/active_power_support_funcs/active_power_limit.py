@@ -22,11 +22,11 @@ class ActivePowerLimit:
     EPRI Report Reference: Section 3.7.1.2 in Report #3002030962: IEEE 1547-2018 OpenDER Model
     """
 
-    def __init__(self, der_file, exec_delay):
+    def __init__(self, der_file, exec_delay, der_obj=None):
         self.der_file = der_file
         self.exec_delay = exec_delay
-        self.ap_limit_ramping = Ramping()
-        self.ap_limit_delay = TimeDelay()
+        self.ap_limit_ramping = Ramping(der_obj)
+        self.ap_limit_delay = TimeDelay(der_obj)
 
         self.ap_limit_pu = None     # Active power limit in per unit based on NP_P_MAX
         self.ap_limit_rt = None     # Actual active power limit for active power limit function, considering possible
@@ -11,7 +11,10 @@
 #   to endorse or promote products derived from this software without specific
 #   prior written permission.
 
+import math
+from opender.auxiliary_funcs.accumulation import steps_to_reach
 from opender.auxiliary_funcs.ramping import Ramping
+from opender.operation_status.status_codes import TRIP, ENTERING_SERVICE
 
 
 class EnterServicePerformance:
@@ -26,7 +29,7 @@ class EnterServicePerformance:
         self.der_file = der_obj.der_file
         self.exec_delay = der_obj.exec_delay
 
-        self.rrl = Ramping()
+        self.rrl = Ramping(der_obj)
         self.p_es_pu = None         # DER enter service ramp reference
 
     def es_performance(self):
@@ -41,7 +44,7 @@ class EnterServicePerformance:
         :param p_es_pu:	DER enter service ramp reference
         """
 
-        if self.der_obj.der_status == "Trip":
+        if self.der_obj.der_status_code == TRIP:
             self.reset()
         else:
             # Eq 3.7.1-10, if DER is entering service, enter service ramp reference linearly ramp to a value slightly
@@ -50,6 +53,19 @@ class EnterServicePerformance:
 
         return self.p_es_pu
 
+    def steps_to_event(self):
+        """
+        Number of time steps until the DER status changes from Entering Service to Continuous Operation, i.e. the time
+        step after the enter service ramp reference exceeds 1. math.inf if the DER is not entering service.
+        """
+        if self.p_es_pu is None or self.der_obj.der_status_code != ENTERING_SERVICE:
+            return math.inf
+        if self.p_es_pu > 1 or not self.rrl.ramp_up_time:
+            return 1
+        # Reference is ramped by repeated additions as in Ramping.ramp(), so that the number of time steps is
+        # identical. The status changes in the time step after it exceeds 1, i.e. reaches the next float 1 + 2 ** -52.
+        return steps_to_reach(self.p_es_pu, self.der_obj.t_s / self.rrl.ramp_up_time, 1 + 2 ** -52) + 1
+
     def reset(self):
         # Eq 3.7.1-9, if DER is tripped, the reference should be reset to 0
         self.p_es_pu = self.rrl.ramp(0, 0, 0)
\ No newline at end of file
@@ -15,6 +15,7 @@
 from opender.auxiliary_funcs import low_pass_filter
 from opender.auxiliary_funcs.flipflop import FlipFlop
 from opender.auxiliary_funcs.time_delay import TimeDelay
+from opender.operation_status.status_codes import ENTERING_SERVICE
 
 
 class FreqDroop:
@@ -53,8 +54,8 @@ class FreqDroop:
 
         self.pf_uf_active_ff = FlipFlop(0)
         self.pf_of_active_ff = FlipFlop(0)
-        self.pf_lpf = low_pass_filter.LowPassFilter()
-        self.pf_delay = TimeDelay()
+        self.pf_lpf = low_pass_filter.LowPassFilter(der_obj)
+        self.pf_delay = TimeDelay(der_obj)
 
     def calculate_p_pf_pu(self, p_out_w, ap_limit_rt, p_pv_limit_pu):
         
@@ -168,7 +169,7 @@ class FreqDroop:
     def p_pf_normal_pu(self):
         # Eq. 3.7.1-14, if DER is entering service, the pre-disturbance power is obtained from the DER output power
         # in the previous simulation time step.
-        if self.der_obj.der_status == 'Entering Service':
+        if self.der_obj.der_status_code == ENTERING_SERVICE:
             return self.der_obj.p_out_w/self.der_file.NP_P_MAX
         else:
             return self.der_input.p_avl_pu
@@ -16,6 +16,7 @@ from opender.auxiliary_funcs import low_pass_filter
 from opender.auxiliary_funcs.flipflop import FlipFlop
 from opender.auxiliary_funcs.time_delay import TimeDelay
 from .frequency_droop import FreqDroop
+from opender.operation_status.status_codes import ENTERING_SERVICE
 
 
 class FreqDroopBESS(FreqDroop):
@@ -30,7 +31,7 @@ class FreqDroopBESS(FreqDroop):
     def p_pf_normal_pu(self):
         # Eq 3.7.3-1, frequency-droop active power if no grid-support functions (freq-droop, volt-watt and active power
         # limit) are enabled is determined by the active power demand, rather than available active power
-        if self.der_obj.der_status == 'Entering Service':
+        if self.der_obj.der_status_code == ENTERING_SERVICE:
             return self.der_obj.p_out_w/self.der_file.NP_P_MAX
         else:
             return self.der_input.p_dem_pu
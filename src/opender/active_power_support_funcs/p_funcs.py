@@ -13,6 +13,7 @@
 
 
 from opender.active_power_support_funcs import active_power_limit, frequency_droop, volt_watt, es_perf
+from opender.operation_status.status_codes import TRIP
 
 
 class DesiredActivePower:
@@ -41,8 +42,8 @@ class DesiredActivePower:
             self.es_completed = False
         self.p_desired_pu = None        # Desired active power from all active power support functions
 
-        self.aplimit = active_power_limit.ActivePowerLimit(self.der_file, self.exec_delay)
-        self.voltwatt = volt_watt.VoltWatt(self.der_file, self.exec_delay, self.der_input)
+        self.aplimit = active_power_limit.ActivePowerLimit(self.der_file, self.exec_delay, self.der_obj)
+        self.voltwatt = volt_watt.VoltWatt(self.der_file, self.exec_delay, self.der_input, self.der_obj)
         self.freqdroop = frequency_droop.FreqDroop(self.der_obj)
         self.enterserviceperf = es_perf.EnterServicePerformance(der_obj)
 
@@ -54,7 +55,7 @@ class DesiredActivePower:
         :param p_desired_pu:	Desired output active power from active power support functions in per unit
         """
 
-        if self.der_obj.der_status != 'Trip':
+        if self.der_obj.der_status_code != TRIP:
 
             # Active power limit function
             self.ap_limit_rt = self.aplimit.calculate_ap_limit_rt()
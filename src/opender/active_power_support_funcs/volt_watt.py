@@ -26,12 +26,12 @@ class VoltWatt:
     EPRI Report Reference: Section 3.7.1.1 in Report #3002030962: IEEE 1547-2018 OpenDER Model
     """
 
-    def __init__(self, der_file, exec_delay, der_input):
+    def __init__(self, der_file, exec_delay, der_input, der_obj=None):
         self.der_file = der_file
         self.exec_delay = exec_delay
         self.der_input = der_input
-        self.pv_lpf = low_pass_filter.LowPassFilter()
-        self.pv_delay = TimeDelay()
+        self.pv_lpf = low_pass_filter.LowPassFilter(der_obj)
+        self.pv_delay = TimeDelay(der_obj)
 
         self.pv_curve_p1_w = None       # Volt-watt Curve Point P1 Setting in W
         self.pv_curve_p2_w = None       # Volt-watt Curve Point P2 Setting in W
@@ -0,0 +1,104 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+"""
+Closed form of timers and ramps integrated by repeated floating point additions (x = x + c in each time step).
+
+The result of n repeated additions generally differs from x + n * c by rounding, so event times computed by division
+can be one time step off. Within a binade (floats of the same exponent), the floats are evenly spaced, and adding c
+adds the same number of spacings in each time step, c rounded to the spacing. The additions are therefore computed in
+integer multiples of the spacing, binade by binade, with the same result as the additions one by one.
+"""
+
+import math
+import sys
+from fractions import Fraction
+
+_MANTISSA = 2 ** 52
+
+
+def _add(x: float, c: float, n, target: float):
+    # Repeat x = x + c (c > 0) n times, or until x >= target. Returns x and the number of additions, which is math.inf
+    # if x no longer changes before reaching the target.
+    k = 0
+    while k < n and not x >= target:
+        if sys.float_info.min <= abs(x) < math.inf:
+            # Spacing of the floats in the binade of x, and x and c in multiples of it
+            spacing = math.ldexp(1., math.frexp(x)[1] - 53)
+            ratio = c / spacing
+            if ratio < _MANTISSA:
+                q = int(x / spacing)
+                inc = math.floor(ratio)
+                tie = ratio - inc == 0.5
+                if ratio - inc > 0.5 or (tie and inc % 2):
+                    inc = inc + 1
+                if inc == 0:
+                    return x, math.inf
+                if not tie or q % 2 == 0:
+                    # Additions staying within the binade. For ties, rounding to even keeps q even with an even inc.
+                    if q > 0:
+                        limit = (2 * _MANTISSA - 1 - q) // inc
+                    else:
+                        limit = (-_MANTISSA - 1 - q) // inc
+                    steps = min(n - k, limit)
+                    if target < math.inf:
+                        steps = min(steps, max(math.ceil((Fraction(float(target)) / Fraction(spacing) - q) / inc), 0))
+                    if steps > 0:
+                        x = float(q + steps * inc) * spacing
+                        k = k + steps
+                        continue
+        # Additions leaving the binade, or ties to an odd multiple, are done one by one
+        x_next = x + c
+        if x_next == x:
+            return x, math.inf
+        x = x_next
+        k = k + 1
+    return x, k
+
+
+def repeated_sum(x: float, c: float, n: int) -> float:
+    """
+    Value of x after n time steps of x = x + c, identical to the additions one by one
+
+    :param x: Initial value
+    :param c: Value added in each time step
+    :param n: Number of time steps
+    """
+    # Settings read from files may be NumPy numbers, converted so that the exact arithmetic uses Python integers
+    x, c = float(x), float(c)
+    if c > 0:
+        return _add(x, c, n, math.inf)[0]
+    if c < 0:
+        return -_add(-x, -c, n, math.inf)[0]
+    return x
+
+
+def steps_to_reach(x: float, c: float, target: float):
+    """
+    Number of time steps of x = x + c until x reaches target (x >= target if c > 0, x <= target if c < 0), identical to
+    counting the additions one by one
+
+    :param x: Initial value
+    :param c: Value added in each time step
+    :param target: Target value
+    :return: Number of time steps, at least 1, or math.inf if the target is not reached
+    """
+    # Settings read from files may be NumPy numbers, converted so that the exact arithmetic uses Python integers
+    x, c, target = float(x), float(c), float(target)
+    if c > 0:
+        steps = _add(x + c, c, math.inf, target)[1]
+    elif c < 0:
+        steps = _add(-(x + c), -c, math.inf, -target)[1]
+    else:
+        return math.inf
+    return steps + 1
@@ -11,20 +11,23 @@
 #   to endorse or promote products derived from this software without specific
 #   prior written permission.
 
-from opender import der
+from opender.auxiliary_funcs.time_step import TimeStep
+from opender.auxiliary_funcs.accumulation import steps_to_reach
 import math
 
 
-class ConditionalDelay:
+class ConditionalDelay(TimeStep):
     """
     Conditional Delayed Enable can also be referred as On Delay.
     Output is true only when input stays true for a time period
     EPRI Report Reference: Section 3.12.4 in Report #3002030962: IEEE 1547-2018 OpenDER Model
     """
 
-    def __init__(self):
+    def __init__(self, der_obj=None):
+        self.der_obj = der_obj     # DER object providing the simulation time step
         self.con_del_enable_int = math.inf  # initialize timer
         self.con_del_enable_out = 0  # initialize output
+        self.con_del_enable_time = 0  # Conditional delay time of the last time step
 
     def con_del_enable(self, con_del_enable_in, con_del_enable_time):
         """
@@ -44,15 +47,27 @@ class ConditionalDelay:
         :param con_del_enable_out: Conditional Delayed Enable Output
         """
 
+        self.con_del_enable_time = con_del_enable_time
         if con_del_enable_in == 0:
             # Eq. 3.12.4-2 If input is False, output is False, and elapsed time does not integrate
             self.con_del_enable_int = 0
             self.con_del_enable_out = 0
         else:
             # Eq. 3.12.4-3 If input is True, elapsed time adds simulation time step in each time step
-            self.con_del_enable_int = min(con_del_enable_time, self.con_del_enable_int + der.DER.t_s)
+            self.con_del_enable_int = min(con_del_enable_time, self.con_del_enable_int + self.t_s)
             if self.con_del_enable_int >= con_del_enable_time:
                 # Eq. 3.12.4-4 If elapsed time passed the conditional delay time, the output turns True
                 self.con_del_enable_out = 1
 
         return self.con_del_enable_out
+
+    def steps_to_event(self):
+        """
+        Number of time steps until the output turns True, if the input stays True. math.inf if the input is False or
+        the output is already True.
+        """
+        if self.con_del_enable_out or not 0 < self.con_del_enable_int < self.con_del_enable_time:
+            return math.inf
+        # Elapsed time is integrated by repeated additions as in con_del_enable(), so that the number of time steps is
+        # identical
+        return steps_to_reach(self.con_del_enable_int, self.t_s, self.con_del_enable_time)
@@ -12,19 +12,20 @@
 #   prior written permission.
 
 
-from opender import der
+from opender.auxiliary_funcs.time_step import TimeStep
 
 
-class LowPassFilter:
+class LowPassFilter(TimeStep):
     """
     |  Low pass filter for modeling DER open loop response behavior and other related responses
     |  EPRI Report Reference: Section 3.12.1 in Report #3002030962: IEEE 1547-2018 OpenDER Model
     """
     
-    def __init__(self):
+    def __init__(self, der_obj=None):
+        self.der_obj = der_obj     # DER object providing the simulation time step
         self.lpf_in_prev = None
         self.lpf_out_prev = None
-    
+
     def low_pass_filter(self, lpf_in, t_olrt):
         """
         Calculate low pass filtered result of lpt_in with Open Loop Response Time of t_olrt
@@ -45,13 +46,14 @@ class LowPassFilter:
         if self.lpf_out_prev is None:
             self.lpf_out_prev = lpf_in
 
-        if(t_olrt < (1.15 * der.DER.t_s)):
+        t_s = self.t_s
+        if(t_olrt < (1.15 * t_s)):
             lpf_out = lpf_in
         else:
             # Eq. 3.12.1-2, apply first order lag
             t_olrt_t = t_olrt/1.15
-            lpf_out = ((der.DER.t_s / (der.DER.t_s + t_olrt_t)) * (lpf_in + self.lpf_in_prev)) + ((t_olrt_t - der.DER.t_s) / (
-                        der.DER.t_s + t_olrt_t) * self.lpf_out_prev)
+            lpf_out = ((t_s / (t_s + t_olrt_t)) * (lpf_in + self.lpf_in_prev)) + ((t_olrt_t - t_s) / (
+                        t_s + t_olrt_t) * self.lpf_out_prev)
 
         self.lpf_in_prev = lpf_in
         self.lpf_out_prev = lpf_out
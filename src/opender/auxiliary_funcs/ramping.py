@@ -16,16 +16,24 @@
 @author: Jithendar Anandan
 @email: janandan@epri.com
 """
-from opender import der
-class Ramping:
+import math
+from opender.auxiliary_funcs.time_step import TimeStep
+from opender.auxiliary_funcs.accumulation import steps_to_reach
+
+
+class Ramping(TimeStep):
     """
     |  Ramp rate limit function
     |  EPRI Report Reference: Section 3.12.2 in Report #3002030962: IEEE 1547-2018 OpenDER Model
     """
     
-    def __init__(self):
+    def __init__(self, der_obj=None):
+        self.der_obj = der_obj     # DER object providing the simulation time step
         self.ramp_out_prev = None
-        
+        self.ramp_in = None             # Input of the last time step
+        self.ramp_up_time = None        # Ramp up time of the last time step
+        self.ramp_down_time = None      # Ramp down time of the last time step
+
     def ramp(self, ramp_in, ramp_up_time, ramp_down_time):
         """
         Calculate ramp rate limit with ramp-up and ramp-down time settings
@@ -43,15 +51,18 @@ class Ramping:
         if(self.ramp_out_prev is None):
             self.ramp_out_prev = ramp_in
         ramp_out = None
+        self.ramp_in = ramp_in
+        self.ramp_up_time = ramp_up_time
+        self.ramp_down_time = ramp_down_time
 
         # Eq. 3.12.2-2 and -3, apply ramp rate limit
         if(ramp_up_time != 0):
-            ramp_up_limit = der.DER.t_s / ramp_up_time
+            ramp_up_limit = self.t_s / ramp_up_time
             if ((self.ramp_out_prev + ramp_up_limit) < ramp_in):
                 ramp_out = self.ramp_out_prev + ramp_up_limit
 
         if(ramp_down_time != 0):
-            ramp_down_limit = der.DER.t_s / ramp_down_time
+            ramp_down_limit = self.t_s / ramp_down_time
             if ((self.ramp_out_prev - ramp_down_limit) > ramp_in):
                 ramp_out = self.ramp_out_prev - ramp_down_limit
 
@@ -61,5 +72,21 @@ class Ramping:
         self.ramp_out_prev = ramp_out
 
         return ramp_out
+
+    def steps_to_event(self):
+        """
+        Number of time steps until the output reaches the input, if the input stays the same. math.inf if the output
+        is not ramp rate limited.
+        """
+        if self.ramp_in is None or self.ramp_out_prev == self.ramp_in:
+            return math.inf
+        # Output is ramped by repeated additions as in ramp(), so that the number of time steps is identical
+        if self.ramp_in > self.ramp_out_prev:
+            if self.ramp_up_time == 0:
+                return math.inf
+            return steps_to_reach(self.ramp_out_prev, self.t_s / self.ramp_up_time, self.ramp_in)
+        if self.ramp_down_time == 0:
+            return math.inf
+        return steps_to_reach(self.ramp_out_prev, -(self.t_s / self.ramp_down_time), self.ramp_in)
         
         
@@ -12,21 +12,59 @@
 #   prior written permission.
 
 
-from opender import der
+from collections import deque
+from functools import lru_cache
+import math
+from opender.auxiliary_funcs.time_step import TimeStep
 
 
-class TimeDelay:
+@lru_cache(maxsize=256)
+def _delay_steps(tdelay_time, t_s):
+    # Number of time steps until a change recorded with delay time tdelay_time is released, i.e. the number of times
+    # t_s is subtracted from tdelay_time until it is no longer positive. The subtraction is repeated, rather than
+    # divided, so that the release step is identical to the one of the remaining time countdown.
+    remaining = tdelay_time - t_s
+    steps = 1
+    while remaining > 0:
+        remaining = remaining - t_s
+        steps = steps + 1
+    return steps
+
+
+def _remaining_time(tdelay_time, steps, t_s):
+    # Remaining time of a change recorded with delay time tdelay_time, after the given number of time steps
+    for _ in range(steps):
+        tdelay_time = tdelay_time - t_s
+    return tdelay_time
+
+
+class TimeDelay(TimeStep):
     """
     |  Time delay function
     |  EPRI Report Reference: Section 3.12.3 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+
+    Changes of input are kept in a queue ordered by release time step, so each time step only checks the oldest pending
+    change. If the pending changes are not released in the order they were recorded (e.g. the delay time was reduced
+    while changes were pending) or the time step changes, the queue is converted to lists of values and remaining
+    times (tdelay_in_value, tdelay_in_time), which are processed as in the original countdown until they are empty.
     """
     
-    def __init__(self):
+    def __init__(self, der_obj=None, max_pending=None):
+        """
+        :param der_obj: DER object providing the simulation time step
+        :param max_pending: Maximum number of pending changes. If exceeded, every other pending change is dropped,
+                            so the output is updated less often but with the same delay. Default is no limit.
+        """
+        self.der_obj = der_obj     # DER object providing the simulation time step
+        self.max_pending = max_pending
         self.tdelay_in_prev = None
         self.tdelay_out_hold = None
         self.tdelay_in_value = []
         self.tdelay_in_time = []
-    
+        self.step = 0               # Time step counter of the pending queue
+        self.pending = deque()      # Pending changes, as (release step, value, delay time, recorded step)
+        self.pending_t_s = None     # Time step used to calculate the release steps of the pending changes
+
     def tdelay(self,tdelay_in, tdelay_time):
         """
         Time delay function
@@ -45,16 +83,25 @@ class TimeDelay:
         if self.tdelay_out_hold is None:
             self.tdelay_out_hold = tdelay_in
 
-        if tdelay_time < der.DER.t_s:
-            tdelay_out = tdelay_in
+        t_s = self.t_s
+        if tdelay_time < t_s:
             self.tdelay_out_hold = tdelay_in
             self.tdelay_in_value = []
             self.tdelay_in_time = []
+            self.pending.clear()
 
-        elif tdelay_time > 0 and tdelay_time >= der.DER.t_s:
+        elif tdelay_time > 0 and tdelay_time >= t_s:
+            self.step = self.step + 1
+            if self.pending and t_s != self.pending_t_s:
+                self._pending_to_list(self.step - 1)
 
-            if self.tdelay_in_time:
-                self.tdelay_in_time = [item - der.DER.t_s for item in self.tdelay_in_time]
+            if self.pending:
+                # Release the oldest pending change if its delay has passed
+                if self.pending[0][0] <= self.step:
+                    self.tdelay_out_hold = self.pending.popleft()[1]
+
+            elif self.tdelay_in_time:
+                self.tdelay_in_time = [item - t_s for item in self.tdelay_in_time]
 
                 # If there is an element in the time array tdelay_in_time is less than 0,
                 # it indicates the time delay has passed
@@ -68,15 +115,50 @@ class TimeDelay:
             
         if tdelay_in is not None:
             if tdelay_in != self.tdelay_in_prev:
-                self.tdelay_in_value.append(tdelay_in)
-                self.tdelay_in_time.append(tdelay_time)
+                self._record(tdelay_in, tdelay_time, t_s)
                 self.tdelay_in_prev = tdelay_in
             
         tdelay_out = self.tdelay_out_hold
         
         return tdelay_out
-    
 
-                
-        
-        
\ No newline at end of file
+    def steps_to_event(self):
+        """
+        Number of time steps until the next pending input change is released to the output, whatever the input. math.inf
+        if no change is pending.
+        """
+        if self.pending:
+            if self.pending[0][2] < self.pending_t_s:
+                # Recorded with a delay time shorter than the time step, the output follows the input
+                return math.inf
+            return max(self.pending[0][0] - self.step, 1)
+        if self.tdelay_in_time:
+            return min(_delay_steps(tdelay_time, self.t_s) for tdelay_time in self.tdelay_in_time)
+        return math.inf
+
+    def _record(self, tdelay_in, tdelay_time, t_s):
+        # Record an input change, in the pending queue if it is released after all pending changes
+        if not self.tdelay_in_time and tdelay_time == tdelay_time and t_s > 0:
+            release = self.step + _delay_steps(tdelay_time, t_s)
+            if not self.pending or release > self.pending[-1][0]:
+                self.pending.append((release, tdelay_in, tdelay_time, self.step))
+                self.pending_t_s = t_s
+                if self.max_pending is not None and len(self.pending) > self.max_pending:
+                    self._compact()
+                return
+        if self.pending:
+            self._pending_to_list(self.step)
+
+        self.tdelay_in_value.append(tdelay_in)
+        self.tdelay_in_time.append(tdelay_time)
+
+    def _pending_to_list(self, step):
+        # Convert the pending queue to the lists of values and remaining times, counted down until the given step
+        for release, value, tdelay_time, recorded in self.pending:
+            self.tdelay_in_value.append(value)
+            self.tdelay_in_time.append(_remaining_time(tdelay_time, step - recorded, self.pending_t_s))
+        self.pending.clear()
+
+    def _compact(self):
+        # Drop every other pending change, keeping the most recent one
+        self.pending = deque(list(self.pending)[-1::-2][::-1])
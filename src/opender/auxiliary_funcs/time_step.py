@@ -0,0 +1,28 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met: 
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice, 
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used 
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+from opender import der
+
+
+class TimeStep:
+    """
+    Simulation time step of the DER object (or fleet) a function belongs to, given by its der_obj attribute, or the
+    global DER.t_s if not assigned. Functions with a per-instance time step inherit it.
+    """
+
+    der_obj = None
+
+    @property
+    def t_s(self):
+        return der.DER.t_s if self.der_obj is None else self.der_obj.t_s
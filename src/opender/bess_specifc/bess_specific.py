@@ -11,9 +11,9 @@
 #   to endorse or promote products derived from this software without specific
 #   prior written permission.
 
-from opender.der import DER
 from opender.bess_specifc.soc import StateOfCharge
 from opender.auxiliary_funcs.ramping import Ramping
+from opender.operation_status.status_codes import TRIP
 
 class BESSspecific:
     """
@@ -27,14 +27,14 @@ class BESSspecific:
         self.exec_delay = der_obj.exec_delay
         self.der_input = der_obj.der_input
 
-        self.soc_calc = StateOfCharge(self.der_file)
+        self.soc_calc = StateOfCharge(self.der_file, der_obj)
         self.p_dem_ramp_pu = None       # Active power demand considering BESS ramp rate constraint
 
-        self.p_dem_ramp = Ramping()
+        self.p_dem_ramp = Ramping(der_obj)
 
     def run(self):
 
-        if DER.t_s <= 7200 and self.der_file.NP_BESS_CAPACITY is not None:
+        if self.der_obj.t_s <= 7200 and self.der_file.NP_BESS_CAPACITY is not None:
             # For time series simulation
             # Calculate SoC
             self.soc_calc.calculate_soc(self.der_obj.p_out_w)
@@ -46,7 +46,7 @@ class BESSspecific:
             self.soc_calc.snapshot_limits()
 
 
-        if self.der_obj.der_status != 'Trip':
+        if self.der_obj.der_status_code != TRIP:
             # 3.6.2-6, ramp rate limits considering battery operational constraints.
             self.p_dem_ramp_pu = self.p_dem_ramp.ramp(self.der_input.p_dem_pu, self.der_file.NP_BESS_P_RAMP_TIME, self.der_file.NP_BESS_P_RAMP_TIME)
         else:
@@ -11,19 +11,20 @@
 #   to endorse or promote products derived from this software without specific
 #   prior written permission.
 
-from opender.der import DER
-import logging
+from opender.auxiliary_funcs.time_step import TimeStep
+from opender.diagnostics import report
 import numpy as np
 
 
-class StateOfCharge:
+class StateOfCharge(TimeStep):
     """
     State of Charge related Models for Battery Energy Storage System (BESS) DERs
     EPRI Report Reference: Section 3.6 in Report #3002030962: IEEE 1547-2018 OpenDER Model
     """
 
-    def __init__(self, der_file):
+    def __init__(self, der_file, der_obj=None):
         self.der_file = der_file
+        self.der_obj = der_obj              # DER object providing the simulation time step
         self.bess_soc = der_file.SOC_INIT
         self.p_max_charge_pu = 1            # Maximum charge power in per unit
         self.p_max_charge_pu_ts = 1         # Maximum charge power for the current timestep
@@ -63,14 +64,14 @@ class StateOfCharge:
         if self.der_file.NP_BESS_CAPACITY is not None:
             self.bess_soc = self.bess_soc + (((self.der_file.NP_EFFICIENCY * self.p_charge_w - self.p_discharge_w)
                                               / self.der_file.NP_BESS_CAPACITY) - self.der_file.NP_BESS_SELF_DISCHARGE
-                                             - self.der_file.NP_BESS_SELF_DISCHARGE_SOC * self.bess_soc) * DER.t_s/3600
+                                             - self.der_file.NP_BESS_SELF_DISCHARGE_SOC * self.bess_soc) * self.t_s/3600
 
-        # Generate warning if max or min SOC is reached
+        # Report diagnostics if max or min SOC is reached
         if self.bess_soc >= self.der_file.NP_BESS_SOC_MAX:
-            logging.warning('BESS SoC reached max')
+            report(self.der_obj, 'SOC_MAX')
 
         if self.bess_soc <= self.der_file.NP_BESS_SOC_MIN:
-            logging.warning('BESS SoC reached min')
+            report(self.der_obj, 'SOC_MIN')
 
         # Eq. 3.6.1-5, Set SOC to 0 if lower than 0 (it is possible in modeling due to self discharge)
         if self.bess_soc <= 0:
@@ -87,13 +88,13 @@ class StateOfCharge:
                                              self.der_file.NP_BESS_P_MAX_BY_SOC['P_DISCHARGE_MAX_PU'])
 
         # Eq. 3.6.2-2 Calculate P charge limit to avoid over-charging in the next time step
-        self.p_max_charge_pu_ts = min(((self.der_file.NP_BESS_SOC_MAX - self.bess_soc) / DER.t_s * 3600 +
+        self.p_max_charge_pu_ts = min(((self.der_file.NP_BESS_SOC_MAX - self.bess_soc) / self.t_s * 3600 +
                                        self.der_file.NP_BESS_SELF_DISCHARGE_SOC * self.bess_soc +
                                        self.der_file.NP_BESS_SELF_DISCHARGE) * self.der_file.NP_BESS_CAPACITY /
                                       self.der_file.NP_EFFICIENCY / self.der_file.NP_P_MAX_CHARGE, 1)
 
         # Eq. 3.6.2-3 Calculate P discharge limit to avoid over-discharging in the next time step
-        self.p_max_discharge_pu_ts = max(0, min(((self.bess_soc - self.der_file.NP_BESS_SOC_MIN) / DER.t_s * 3600 -
+        self.p_max_discharge_pu_ts = max(0, min(((self.bess_soc - self.der_file.NP_BESS_SOC_MIN) / self.t_s * 3600 -
                                                  self.der_file.NP_BESS_SELF_DISCHARGE_SOC * self.bess_soc -
                                                  self.der_file.NP_BESS_SELF_DISCHARGE) * self.der_file.NP_BESS_CAPACITY
                                                 / self.der_file.NP_P_MAX, 1))
@@ -11,7 +11,10 @@
 #   to endorse or promote products derived from this software without specific
 #   prior written permission.
 
+import math
+from functools import lru_cache
 import numpy as np
+from opender.common_file_format.setting_codes import PRIO_ACTIVE
 
 
 #%%
@@ -19,36 +22,64 @@ def intercep_piecewise_circle(mag, xp, yp, k = 0.9, err = 1.e-3, ):
     """
     Find out the interception point of piece-wise function defined by xp and yp at given magnitude
 
+    The piece-wise function is extended horizontally beyond its end points (same as np.interp), and the interception
+    point is calculated in closed form, segment by segment, as the intersection of a line segment and a circle. If the
+    function intercepts the circle more than once on the requested side, the point farthest from the y axis is used.
+    Results are cached per curve and magnitude.
+
     Input argument:
     
     :param xp: list or array on x axis (increasing from left to right)
     :param yp: list or array on y axis
     :param mag: magnitude of (x, y) that will intercept on the right side of xp and yp
-    :param k: convergence factor (<1 slows convergence with increased robustness)
-    :param err: error threshold
+    :param k: not used, kept for compatibility with the previous iterative search
+    :param err: not used, kept for compatibility with the previous iterative search
 
     Output:
     
     :param x: interception point on x axis
     :param y: interception point on y axis
     """
-    # # step 1: extend the list/array to the right to at least cover the requested mag
-    # xn = max(mag, xp[-1]+mag)
-    # yn = (yp[-1]-yp[-2])/(xp[-1]-xp[-2])*(xn-xp[-2])+yp[-2]
-    # xnew = np.append(xp, xn)
-    # ynew = np.append(yp, yn)
-    # step 2: iterate until an intersection point is found
-    x = mag
-    imax = 500
-    for ii in range(imax):
-        y = np.interp(x, xp, yp)
-        m = np.sign(x) * np.sqrt(x**2+y**2)
-        if abs(m-mag) < err:
-            break
-        else:
-            x = x+k*(mag/m*x-x)
-
-    return x, y
+    return _intercep_piecewise_circle(float(mag), tuple(float(x) for x in xp), tuple(float(y) for y in yp))
+
+
+@lru_cache(maxsize=1024)
+def _intercep_piecewise_circle(mag, xp, yp):
+    r = abs(mag)
+    sign = 1. if mag >= 0 else -1.
+
+    # Extend the piece-wise function horizontally to cover the circle
+    xs = list(xp)
+    ys = list(yp)
+    if xs[0] > -r:
+        xs.insert(0, -r)
+        ys.insert(0, ys[0])
+    if xs[-1] < r:
+        xs.append(r)
+        ys.append(ys[-1])
+
+    # Intersections of each segment (x0 + t*dx, y0 + t*dy), 0 <= t <= 1, with the circle x^2 + y^2 = r^2
+    x_itcp, y_itcp = None, None
+    for i in range(len(xs) - 1):
+        x0, y0 = xs[i], ys[i]
+        dx, dy = xs[i + 1] - x0, ys[i + 1] - y0
+        a = dx * dx + dy * dy
+        b = 2 * (x0 * dx + y0 * dy)
+        c = x0 * x0 + y0 * y0 - r * r
+        disc = b * b - 4 * a * c
+        if a == 0 or disc < 0:
+            continue
+        sq = math.sqrt(disc)
+        for t in ((-b - sq) / (2 * a), (-b + sq) / (2 * a)):
+            if -1.e-12 <= t <= 1 + 1.e-12:
+                x = x0 + t * dx
+                if x * sign >= 0 and (x_itcp is None or x * sign > x_itcp * sign):
+                    x_itcp, y_itcp = x, y0 + t * dy
+
+    if x_itcp is None:
+        # No interception on the requested side, the function is outside of the circle at the y axis
+        return 0., float(np.interp(0, xp, yp))
+    return x_itcp, y_itcp
 
 # def piecewise_intercept(xp1, yp1, xp2, yp2, x, step:float=0.01):
 #     """
@@ -113,6 +144,38 @@ class CapabilityPriority:
         self.q_requirement_abs = (0.25 if self.der_file.NP_NORMAL_OP_CAT == 'CAT_A' else 0.44) * self.der_file.NP_VA_MAX
         self.q_requirement_inj = 0.44 * self.der_file.NP_VA_MAX
 
+        self._qp_curve_key = None   # Settings of the watt-var curve in qp_curve
+        self._qp_curve = None       # Watt-var curve in W and var, as tuples of P and Q
+
+    def get_qp_curve(self):
+        """
+        Watt-var curve in W and var, rebuilt only if the watt-var curve settings or DER ratings change
+        """
+        key = (self.der_file.NP_P_MAX, self.der_file.NP_P_MAX_CHARGE, self.der_file.NP_VA_MAX,
+               self.exec_delay.qp_curve_p1_gen_exec, self.exec_delay.qp_curve_p2_gen_exec,
+               self.exec_delay.qp_curve_p3_gen_exec, self.exec_delay.qp_curve_q1_gen_exec,
+               self.exec_delay.qp_curve_q2_gen_exec, self.exec_delay.qp_curve_q3_gen_exec,
+               self.exec_delay.qp_curve_p1_load_exec, self.exec_delay.qp_curve_p2_load_exec,
+               self.exec_delay.qp_curve_p3_load_exec, self.exec_delay.qp_curve_q1_load_exec,
+               self.exec_delay.qp_curve_q2_load_exec, self.exec_delay.qp_curve_q3_load_exec)
+        if key != self._qp_curve_key:
+            qp_curve_p = (-self.der_file.NP_P_MAX_CHARGE,
+                          self.exec_delay.qp_curve_p3_load_exec * self.der_file.NP_P_MAX_CHARGE,
+                          self.exec_delay.qp_curve_p2_load_exec * self.der_file.NP_P_MAX_CHARGE,
+                          self.exec_delay.qp_curve_p1_load_exec * self.der_file.NP_P_MAX_CHARGE,
+                          self.exec_delay.qp_curve_p1_gen_exec * self.der_file.NP_P_MAX,
+                          self.exec_delay.qp_curve_p2_gen_exec * self.der_file.NP_P_MAX,
+                          self.exec_delay.qp_curve_p3_gen_exec * self.der_file.NP_P_MAX,
+                          self.der_file.NP_P_MAX)
+            qp_curve_q = tuple(qp_curve_q * self.der_file.NP_VA_MAX for qp_curve_q in
+                               [self.exec_delay.qp_curve_q3_load_exec, self.exec_delay.qp_curve_q3_load_exec,
+                                self.exec_delay.qp_curve_q2_load_exec, self.exec_delay.qp_curve_q1_load_exec,
+                                self.exec_delay.qp_curve_q1_gen_exec, self.exec_delay.qp_curve_q2_gen_exec,
+                                self.exec_delay.qp_curve_q3_gen_exec, self.exec_delay.qp_curve_q3_gen_exec])
+            self._qp_curve = (tuple(float(p) for p in qp_curve_p), tuple(float(q) for q in qp_curve_q))
+            self._qp_curve_key = key
+        return self._qp_curve
+
     def calculate_limited_pq(self, p_desired_pu, q_desired_pu):
         """
         Calculate limited DER output P and Q based on DER ratings and priority of responses.
@@ -145,15 +208,14 @@ class CapabilityPriority:
         # Eq. 3.9.1-3 Calculate applicable apparent power rating
         self.np_va_max_appl = self.der_file.NP_VA_MAX if self.p_desired_w >= 0 else self.der_file.NP_APPARENT_POWER_CHARGE_MAX
 
+        # Reactive power capability curves in W and var
+        curves = self.der_file.capability_curves
+
         if self.exec_delay.const_q_mode_enable_exec or self.exec_delay.qv_mode_enable_exec:
             # Constant-Q or Volt-Var
             # Eq. 3.9.1-4, find the range of DER output Q with given desired P
-            self.q_max_inj = self.der_file.NP_VA_MAX * np.interp(p_desired_pu,
-                                                            self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_INJ_PU'],
-                                                            self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_INJ_PU'])
-            self.q_max_abs = self.der_file.NP_VA_MAX * np.interp(p_desired_pu,
-                                                            self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_ABS_PU'],
-                                                            self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_ABS_PU'])
+            self.q_max_inj = curves.q_max_inj(self.p_desired_w)
+            self.q_max_abs = curves.q_max_abs(self.p_desired_w)
 
             # Eq. 3.9.1-5, limit q_desired_var according to limit (+injection / -absorption)
             self.q_limited_by_p_var = min(self.q_max_inj, max(-self.q_max_abs, self.q_desired_var))
@@ -162,7 +224,7 @@ class CapabilityPriority:
                 # Eq. 3.9.1-6, if within DER max apparent power rating, no changes need to be made
                 self.p_limited_w = self.p_desired_w
                 self.q_limited_var = self.q_limited_by_p_var
-            elif self.der_file.NP_PRIO_OUTSIDE_MIN_Q_REQ == 'ACTIVE':
+            elif self.der_file.np_prio_outside_min_q_req_code == PRIO_ACTIVE:
                 # Eq. 3.9.1-7 reserve Q capability to the table 7 requirement and give the rest to P
                 self.q_limited_var = min(self.q_requirement_inj, max(-self.q_requirement_abs, self.q_limited_by_p_var))
                 self.p_limited_w = np.sqrt(self.np_va_max_appl**2-self.q_limited_var**2) * np.sign(self.p_desired_w)
@@ -187,19 +249,13 @@ class CapabilityPriority:
             # Find the intercept point between DER reactive power capability curve and DER apparent power capability
             # circuit, indicated as p_itcp_w and q_itcp_var
             if self.q_limited_pf_var > 0:
-                # Find the capability curve for Q injection
-                xp = [x*self.der_file.NP_P_MAX for x in self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_INJ_PU']]
-                yp = [y*self.der_file.NP_VA_MAX for y in self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_INJ_PU']]
-                # Find the intercept point
-                self.p_itcp_w, self.q_itcp_var = intercep_piecewise_circle(self.np_va_max_appl if self.p_desired_w > 0 else
-                                                                   -self.np_va_max_appl, xp, yp)
+                # Find the intercept point with the capability curve for Q injection
+                self.p_itcp_w, self.q_itcp_var = _intercep_piecewise_circle(self.np_va_max_appl if self.p_desired_w > 0 else
+                                                                    -self.np_va_max_appl, *curves.inj)
             else:
-                # Find the capability curve for Q absorption
-                xp = [x*self.der_file.NP_P_MAX for x in self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_ABS_PU']]
-                yp = [y*self.der_file.NP_VA_MAX for y in self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_ABS_PU']]
-                # Find the intercept point
-                self.p_itcp_w, self.q_itcp_var = intercep_piecewise_circle(self.np_va_max_appl if self.p_desired_w > 0 else
-                                                                   -self.np_va_max_appl, xp, yp)
+                # Find the intercept point with the capability curve for Q absorption
+                self.p_itcp_w, self.q_itcp_var = _intercep_piecewise_circle(self.np_va_max_appl if self.p_desired_w > 0 else
+                                                                    -self.np_va_max_appl, *curves.abs)
 
             # Eq. 3.9.1-11, If DER offer capability to operate with a smaller power factor than 0.9, this model assumes
             # to reduce Q magnitude if outside of DER Q capability range. There could be other behaviors that may be
@@ -211,12 +267,8 @@ class CapabilityPriority:
                 self.p_limited_w = self.p_limited_pf_w
 
             # Find the reactive power capability at P, which is already within the capability
-            self.q_max_inj = self.der_file.NP_VA_MAX * np.interp(self.p_limited_w/self.der_file.NP_P_MAX,
-                                                            self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_INJ_PU'],
-                                                            self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_INJ_PU'])
-            self.q_max_abs = self.der_file.NP_VA_MAX * np.interp(self.p_limited_w/self.der_file.NP_P_MAX,
-                                                            self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_ABS_PU'],
-                                                            self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_ABS_PU'])
+            self.q_max_inj = curves.q_max_inj(self.p_limited_w)
+            self.q_max_abs = curves.q_max_abs(self.p_limited_w)
 
             # Limit Q based on DER output P
             self.q_limited_var = min(self.q_max_inj, max(-self.q_max_abs, self.q_limited_pf_var))
@@ -230,37 +282,21 @@ class CapabilityPriority:
             else:
 
                 # Define watt-var curve
-                qp_curve_p = [-self.der_file.NP_P_MAX_CHARGE,
-                              self.exec_delay.qp_curve_p3_load_exec * self.der_file.NP_P_MAX_CHARGE,
-                              self.exec_delay.qp_curve_p2_load_exec * self.der_file.NP_P_MAX_CHARGE,
-                              self.exec_delay.qp_curve_p1_load_exec * self.der_file.NP_P_MAX_CHARGE,
-                              self.exec_delay.qp_curve_p1_gen_exec * self.der_file.NP_P_MAX,
-                              self.exec_delay.qp_curve_p2_gen_exec * self.der_file.NP_P_MAX,
-                              self.exec_delay.qp_curve_p3_gen_exec * self.der_file.NP_P_MAX,
-                              self.der_file.NP_P_MAX]
-                qp_curve_q = [qp_curve_q * self.der_file.NP_VA_MAX for qp_curve_q in
-                              [self.exec_delay.qp_curve_q3_load_exec, self.exec_delay.qp_curve_q3_load_exec,
-                               self.exec_delay.qp_curve_q2_load_exec, self.exec_delay.qp_curve_q1_load_exec,
-                               self.exec_delay.qp_curve_q1_gen_exec, self.exec_delay.qp_curve_q2_gen_exec,
-                               self.exec_delay.qp_curve_q3_gen_exec, self.exec_delay.qp_curve_q3_gen_exec]]
+                qp_curve_p, qp_curve_q = self.get_qp_curve()
 
                 # Find intercept point of VA limit circle and watt-var curve, and assign
                 # to self.p_limited_w and self.q_limited_qp_var
                 if self.p_desired_w > 0:
-                    self.p_itcp_w, self.q_itcp_var = intercep_piecewise_circle(self.np_va_max_appl, qp_curve_p, qp_curve_q)
+                    self.p_itcp_w, self.q_itcp_var = _intercep_piecewise_circle(self.np_va_max_appl, qp_curve_p, qp_curve_q)
                     self.p_limited_w = min(self.p_itcp_w, self.p_desired_w)
                 else:
-                    self.p_itcp_w, self.q_itcp_var = intercep_piecewise_circle(-self.np_va_max_appl, qp_curve_p, qp_curve_q)
+                    self.p_itcp_w, self.q_itcp_var = _intercep_piecewise_circle(-self.np_va_max_appl, qp_curve_p, qp_curve_q)
                     self.p_limited_w = max(self.p_itcp_w, self.p_desired_w)
                 self.q_limited_qp_var = min(abs(self.q_itcp_var), abs(self.q_desired_var))*np.sign(self.q_desired_var)
 
             # Eq. 3.9.1-13, reduce Q if outside of DER Q capability range
-            self.q_max_inj = self.der_file.NP_VA_MAX * np.interp(self.p_desired_w/self.der_file.NP_P_MAX,
-                                                            self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_INJ_PU'],
-                                                            self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_INJ_PU'])
-            self.q_max_abs = self.der_file.NP_VA_MAX * np.interp(self.p_desired_w/self.der_file.NP_P_MAX,
-                                                            self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_ABS_PU'],
-                                                            self.der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_ABS_PU'])
+            self.q_max_inj = curves.q_max_inj(self.p_desired_w)
+            self.q_max_abs = curves.q_max_abs(self.p_desired_w)
             self.q_limited_var = min(self.q_max_inj, max(-self.q_max_abs, self.q_limited_qp_var))
 
         else:
@@ -1,2 +1,4 @@
 from .common_file_format import DERCommonFileFormat
-from .common_file_format_BESS import DERCommonFileFormatBESS
\ No newline at end of file
+from .common_file_format_BESS import DERCommonFileFormatBESS
+from .settings_cache import SettingsCache, settings_cache
+from .setting_codes import Phase, VMeasUnbalance, PFExcitation, AbnormalOpCat, PriorityOutsideMinQReq
@@ -0,0 +1,70 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+from bisect import bisect_right
+import numpy as np
+
+
+def interp_scalar(x, xp, yp):
+    """
+    Scalar version of np.interp, for a float x and increasing xp, without array conversion
+
+    :param x: x coordinate at which to evaluate the piecewise linear function
+    :param xp: list or tuple of x coordinates (increasing)
+    :param yp: list or tuple of y coordinates
+    """
+    if x != x:
+        # NaN input, same as np.interp
+        return x
+    if x <= xp[0]:
+        return yp[0]
+    if x >= xp[-1]:
+        return yp[-1]
+    j = bisect_right(xp, x) - 1
+    slope = (yp[j + 1] - yp[j]) / (xp[j + 1] - xp[j])
+    return slope * (x - xp[j]) + yp[j]
+
+
+class CapabilityCurves:
+    """
+    DER reactive power capability curves (NP_Q_CAPABILITY_BY_P_CURVE), pre-scaled to W and var.
+    Created by DERCommonFileFormat.capability_curves, and rebuilt only after NP_P_MAX, NP_VA_MAX or
+    NP_Q_CAPABILITY_BY_P_CURVE change.
+    """
+
+    def __init__(self, der_file):
+        curve = der_file.NP_Q_CAPABILITY_BY_P_CURVE
+        p_max = der_file.NP_P_MAX
+        va_max = der_file.NP_VA_MAX
+
+        # Capability curves in W and var as NumPy arrays
+        self.p_inj_w = np.array(curve['P_Q_INJ_PU'], dtype=float) * p_max
+        self.q_max_inj_var = np.array(curve['Q_MAX_INJ_PU'], dtype=float) * va_max
+        self.p_abs_w = np.array(curve['P_Q_ABS_PU'], dtype=float) * p_max
+        self.q_max_abs_var = np.array(curve['Q_MAX_ABS_PU'], dtype=float) * va_max
+
+        # Same curves as tuples of floats, for scalar evaluation and as keys of the interception point cache
+        self.inj = (tuple(self.p_inj_w.tolist()), tuple(self.q_max_inj_var.tolist()))
+        self.abs = (tuple(self.p_abs_w.tolist()), tuple(self.q_max_abs_var.tolist()))
+
+    def q_max_inj(self, p_w):
+        """
+        Maximum reactive power injection in var at active power p_w in W
+        """
+        return interp_scalar(p_w, *self.inj)
+
+    def q_max_abs(self, p_w):
+        """
+        Maximum reactive power absorption in var at active power p_w in W
+        """
+        return interp_scalar(p_w, *self.abs)
@@ -19,11 +19,37 @@
 # @File    : common_file_format.py
 # @Software: PyCharm
 
-import pandas as pd
+from contextlib import contextmanager
+from functools import lru_cache
+import operator
 import numpy as np
 import pathlib
 import os
 import logging
+from .capability_curves import CapabilityCurves
+from .settings_loader import read_settings, ParameterInputs
+from .settings_cache import settings_cache
+from .setting_codes import SETTING_CODES, Phase, VMeasUnbalance, PFExcitation, AbnormalOpCat, \
+    PriorityOutsideMinQReq
+
+
+@lru_cache(maxsize=None)
+def _slot_names(cls) -> tuple:
+    # Names of the slots of a settings class and its base classes
+    return tuple(name for base in cls.__mro__ for name in getattr(base, '__slots__', ()))
+
+
+@lru_cache(maxsize=None)
+def _parameter_names(cls) -> frozenset:
+    # Names of the parameters of a settings class
+    return frozenset(cls.parameters_list)
+
+
+@lru_cache(maxsize=None)
+def _slot_copier(cls):
+    # Getter of all slot values, and setters of the slot descriptors, used to copy settings objects quickly
+    names = _slot_names(cls)
+    return operator.attrgetter(*names), [getattr(cls, name).__set__ for name in names]
 
 
 class DERCommonFileFormat:
@@ -70,7 +96,13 @@ class DERCommonFileFormat:
                        ]
 
     # Creating object slots, so incorrect usage of variable names are rejected.
-    __slots__ = tuple(['_' + param for param in parameters_list]) + tuple(['param_inputs'])
+    __slots__ = tuple(['_' + param for param in parameters_list]) + tuple(['param_inputs', '_capability_curves', '_version',
+                                                                           '_checked_version', '_pending', '_deferred']) \
+        + tuple(code for code, codes in SETTING_CODES.values())
+
+    # Parameters used by nameplate_value_validity_check()
+    nameplate_check_list = ['NP_VA_MAX', 'NP_AC_V_NOM', 'NP_P_MAX', 'NP_Q_MAX_INJ', 'NP_Q_MAX_ABS', 'NP_P_MAX_CHARGE',
+                            'NP_APPARENT_POWER_CHARGE_MAX', 'NP_NORMAL_OP_CAT']
 
     def __init__(self,
                  as_file_path=pathlib.Path(os.path.dirname(__file__)).joinpath("../Parameters", "AS-with std-values.csv"),
@@ -78,36 +110,30 @@ class DERCommonFileFormat:
                  **kwargs):
         """
         Creating a DER common file format object
-        :param as_file_path: File directory address for Common file format Applied Setting file.
-        :param model_file_path: File directory address for Model custom parameter file.
+        :param as_file_path: File directory address for Common file format Applied Setting file, a DataFrame of
+                             the file (indexed by parameter, with a VALUE column), or a dictionary of parameter values.
+        :param model_file_path: File directory address for Model custom parameter file, a DataFrame of the file, or a
+                                dictionary of parameter values.
         """
+        object.__setattr__(self, '_pending', None)  # Parameter values assigned in batch_update()
+        object.__setattr__(self, '_deferred', None)  # Initializations deferred to the end of batch_update()
 
-        # Read DER file and remove suffix
-        df1 = pd.read_csv(as_file_path, index_col=0)
-        df1.index = df1.index.map(lambda s: s.replace("-AS", ''))
-        df1.index = df1.index.map(lambda s: s.replace("-SS", ''))
-
-        # Read Model Parameters file
-        df2 = pd.read_csv(model_file_path, index_col=0)
-
-        frames = [df1, df2]
+        # Settings read from the same files before are copied from the cache, instead of being read and validated again
+        cache_key = settings_cache.key(DERCommonFileFormat, as_file_path, model_file_path) \
+            if type(self) is DERCommonFileFormat else None
+        if self._load_cached_settings(cache_key):
+            self._set_parameters(kwargs)
+            return
 
-        # Filtering dataframe with the parameters present in the parameter_list array
-        df = pd.concat(frames)
-        df = df.reindex(index=self._get_parameter_list())
-
-        def convert_to_numeric(value):
-            try:
-                return pd.to_numeric(value)
-            except ValueError:
-                return value
-
-        df["New Index"] = self._get_parameter_list()
-        self.param_inputs = df.reset_index().set_index("New Index")["VALUE"].apply(convert_to_numeric)
+        # Read DER file (removing suffix) and Model Parameters file, keeping the parameters in the parameter list
+        self.param_inputs = ParameterInputs(self._get_parameter_list(),
+                                            read_settings(as_file_path, strip_suffix=True),
+                                            read_settings(model_file_path))
 
         # Nameplate Variables with default values
         self._NP_NORMAL_OP_CAT = "CAT_B"
         self._NP_ABNORMAL_OP_CAT = "CAT_III"
+        self.np_abnormal_op_cat_code = AbnormalOpCat.CAT_III
         self._NP_EFFICIENCY = 1
         self._NP_P_MAX = None
         self._NP_VA_MAX = None
@@ -121,6 +147,7 @@ class DERCommonFileFormat:
         self._Q_MAX_ABS_PU = None
         self._NP_REACTIVE_SUSCEPTANCE = None
         self._NP_Q_CAPABILITY_BY_P_CURVE = None
+        self._capability_curves = None  # Pre-scaled capability curves, rebuilt after NP_P_MAX, NP_VA_MAX or curve change
         self._NP_Q_CAPABILITY_LOW_P = 'REDUCED'
         self._NP_P_MAX_CHARGE = 0
         self._NP_APPARENT_POWER_CHARGE_MAX = None
@@ -135,8 +162,11 @@ class DERCommonFileFormat:
         self._NP_MODE_TRANSITION_TIME = 15
         self._STATUS_INIT = True
         self._NP_V_MEAS_UNBALANCE = "AVG"
+        self.np_v_meas_unbalance_code = VMeasUnbalance.AVG
         self._NP_PRIO_OUTSIDE_MIN_Q_REQ = 'REACTIVE'
+        self.np_prio_outside_min_q_req_code = PriorityOutsideMinQReq.REACTIVE
         self._NP_PHASE = 'THREE'
+        self.np_phase_code = Phase.THREE
         self._NP_TYPE = None
         self._NP_V_DC = None
         self._NP_RESISTANCE = 0.001
@@ -173,6 +203,7 @@ class DERCommonFileFormat:
         self._CONST_PF_MODE_ENABLE = False
         self._CONST_PF = 1
         self._CONST_PF_EXCITATION = "ABS"
+        self.const_pf_excitation_code = PFExcitation.ABS
 
         self._QV_MODE_ENABLE = False
         self._QV_VREF = 1
@@ -553,12 +584,183 @@ class DERCommonFileFormat:
         if self.isNotNaN(self.param_inputs.PF_OLRT):
             self.PF_OLRT = self.param_inputs.PF_OLRT
 
+        if cache_key is not None:
+            settings_cache.put(cache_key, self._settings_table())
+
+        self._set_parameters(kwargs)
+
+    def _set_parameters(self, kwargs):
+        # Assign the parameters provided as keyword arguments
         for key, value in kwargs.items():
             if key in self._get_parameter_list():
                 setattr(self, key, value)
             else:
                 logging.warning(f"'{key}' is not in the parameter list, please double check")
 
+    def _settings_table(self) -> dict:
+        # Values of all parameters and parameter inputs, as stored in the settings cache
+        return {name: getattr(self, name) for name in _slot_names(type(self))
+                if name not in ('_version', '_capability_curves', '_checked_version', '_pending', '_deferred')
+                and hasattr(self, name)}
+
+    def _load_cached_settings(self, cache_key) -> bool:
+        # Copy the parameter values from the settings cache, returning False if they are not cached
+        table = None if cache_key is None else settings_cache.get(cache_key)
+        if table is None:
+            return False
+        self._load_settings_table(table)
+        return True
+
+    def _load_settings_table(self, table):
+        # Assign the parameter values of a table from _settings_table(), without running the setters
+        object.__setattr__(self, '_pending', None)
+        object.__setattr__(self, '_deferred', None)
+        for name, value in table.items():
+            object.__setattr__(self, name, value)
+        self._capability_curves = None
+
+    def derive(self, **overrides):
+        """
+        Create a settings object from this one used as a template, with some parameters overridden, without reading
+        and validating the settings files again. Parameter values and the pre-scaled capability curves are shared
+        with the template until assigned in either object, and only the overridden parameters are validated by their
+        setters. The nameplate validity check is run again only if nameplate parameters are overridden.
+
+        Shared curves (lists and dictionaries) should be replaced, not modified in place.
+
+        :param overrides: Parameter names and values, as keyword arguments of DERCommonFileFormat
+        """
+        self.capability_curves  # Build the curves once in the template, to be shared by all derived objects
+        derived = type(self).__new__(type(self))
+        getter, setters = _slot_copier(type(self))
+        try:
+            values = getter(self)
+        except AttributeError:
+            # Some slots are not assigned, copying the assigned ones only
+            values = None
+            for name in _slot_names(type(self)):
+                if hasattr(self, name):
+                    object.__setattr__(derived, name, getattr(self, name))
+        if values is not None:
+            for setter, value in zip(setters, values):
+                setter(derived, value)
+        object.__setattr__(derived, '_pending', None)
+        object.__setattr__(derived, '_deferred', None)
+
+        derived._set_parameters(overrides)
+        if self.nameplate_checked and not any(name in self.nameplate_check_list for name in overrides):
+            object.__setattr__(derived, '_checked_version', derived._version)
+        return derived
+
+    @contextmanager
+    def batch_update(self):
+        """
+        Context manager assigning several parameters at once. Parameters assigned in the with block are applied when
+        it ends (reading them in the block returns the previous values): the setters then run with the final values
+        of all other parameters, so that a curve can be changed point by point without false warnings. The
+        reactive power capability curve is initialized once, the nameplate validity check is run once if nameplate
+        parameters changed, and the settings version is incremented once. If the block raises an exception, the
+        assignments are discarded.
+
+        Example::
+
+            with der_file.batch_update():
+                der_file.QV_CURVE_V1 = 0.97
+                der_file.QV_CURVE_V2 = 1
+        """
+        if self._pending is not None:
+            # Nested batch, applied with the outer one
+            yield self
+            return
+
+        object.__setattr__(self, '_pending', {})
+        try:
+            yield self
+            pending = self._pending
+        finally:
+            object.__setattr__(self, '_pending', None)
+        self._apply_batch(pending)
+
+    def update(self, **values):
+        """
+        Assign several parameters at once, with the checks run once with the final values (see batch_update)
+
+        :param values: Parameter names and values
+        """
+        with self.batch_update():
+            self._set_parameters(values)
+
+    def _apply_batch(self, pending):
+        if not pending:
+            return
+        # The slots are captured first, to restore them if a check fails, so that the batch is applied completely or
+        # not at all
+        slots = self._slot_values()
+        version = self._version
+        object.__setattr__(self, '_deferred', [])
+        try:
+            # All values are assigned first, so that the checks of each setter see the final values of the others
+            for name, value in pending.items():
+                object.__setattr__(self, '_' + name, value)
+            for name, value in pending.items():
+                setattr(self, name, value)
+            deferred = self._deferred
+            object.__setattr__(self, '_deferred', None)
+
+            for method in dict.fromkeys(deferred):
+                method(self)
+            object.__setattr__(self, '_version', version + 1)
+            if any(name in self.nameplate_check_list for name in pending):
+                self.nameplate_value_validity_check()
+        except BaseException:
+            self._restore_slot_values(slots)
+            raise
+
+    def _slot_values(self) -> dict:
+        # Values of the assigned slots
+        getter, setters = _slot_copier(type(self))
+        names = _slot_names(type(self))
+        try:
+            return dict(zip(names, getter(self)))
+        except AttributeError:
+            return {name: getattr(self, name) for name in names if hasattr(self, name)}
+
+    def _restore_slot_values(self, values: dict):
+        # Write back the slot values captured by _slot_values(), unassigning the slots assigned since
+        for name in _slot_names(type(self)):
+            if name in values:
+                object.__setattr__(self, name, values[name])
+            elif hasattr(self, name):
+                object.__delattr__(self, name)
+
+    @property
+    def nameplate_checked(self) -> bool:
+        """
+        True if nameplate_value_validity_check() was run and no parameter was assigned since
+        """
+        return getattr(self, '_checked_version', None) == self._version
+
+    def __setattr__(self, name, value):
+        # Every assignment (including through the parameter setters) increments the settings version. In
+        # batch_update(), parameters are kept in _pending until the end of the batch.
+        try:
+            pending = self._pending
+        except AttributeError:
+            pending = None
+        if pending is not None and name in _parameter_names(type(self)):
+            pending[name] = value
+            return
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, '_version', getattr(self, '_version', 0) + 1)
+
+    @property
+    def version(self) -> int:
+        """
+        Settings version, monotonically increasing each time a parameter is assigned. Parameters modified in place
+        (e.g. a list in NP_Q_CAPABILITY_BY_P_CURVE) do not change the version.
+        """
+        return self._version
+
     def _get_parameter_list(self):
         return self.__class__.parameters_list
 
@@ -611,6 +813,7 @@ class DERCommonFileFormat:
                 logging.warning("Warning: For category B DER, its nameplate reactive power absorption rating "
                                 "should be greater than 44%, and less than 100% of nameplate apparent power rating.")
 
+        object.__setattr__(self, '_checked_version', self._version)
 
     def check_enabled(self, value):
         """
@@ -643,6 +846,10 @@ class DERCommonFileFormat:
         Initialize nameplate reactive power capability curve using 4 array inputs of P_Q_ABS_PU, Q_MAX_ABS_PU,
         P_Q_INJ_PU, Q_MAX_INJ_PU
         """
+        if getattr(self, '_deferred', None) is not None:
+            # Run once at the end of batch_update()
+            self._deferred.append(DERCommonFileFormat.initialize_NP_Q_CAPABILTY_BY_P_CURVE)
+            return
         if self.isNotNaN(self.P_Q_ABS_PU) and self.isNotNaN(self.P_Q_INJ_PU) \
                 and self.isNotNaN(self.Q_MAX_ABS_PU) and self.isNotNaN(self.Q_MAX_INJ_PU):
             self.NP_Q_CAPABILITY_BY_P_CURVE = {
@@ -716,6 +923,9 @@ class DERCommonFileFormat:
             raise ValueError("ValueError: Check failed for reactive power curve NP_Q_CAPABILITY_BY_P_CURVE, please"
                              "make sure all four arrays have the same length")
 
+        # The curve may have been extended in place above
+        self._capability_curves = None
+
 
 
 
@@ -807,6 +1017,7 @@ class DERCommonFileFormat:
             logging.error("Error: Value of NP_ABNORMAL_OP_CAT should be CAT_I, CAT_II"
                           " or CAT_III, CAT_III is used by default")
             self._NP_ABNORMAL_OP_CAT = 'CAT_III'
+        self.np_abnormal_op_cat_code = AbnormalOpCat[self._NP_ABNORMAL_OP_CAT]
 
         if self._NP_ABNORMAL_OP_CAT == "CAT_I":
             self.OV1_TRIP_T = 2
@@ -839,6 +1050,7 @@ class DERCommonFileFormat:
     @NP_P_MAX.setter
     def NP_P_MAX(self, NP_P_MAX):
         self._NP_P_MAX = NP_P_MAX
+        self._capability_curves = None
         if self._NP_P_MAX <= 0:
             raise ValueError("DER nameplate power NP_P_MAX should be greater than 0")
 
@@ -886,6 +1098,7 @@ class DERCommonFileFormat:
     @NP_VA_MAX.setter
     def NP_VA_MAX(self, NP_VA_MAX):
         self._NP_VA_MAX = NP_VA_MAX
+        self._capability_curves = None
         if self._NP_VA_MAX <= 0:
             raise ValueError("DER nameplate apparent power rating NP_VA_MAX should be greater than 0")
         self.initialize_NP_Q_CAPABILTY_BY_P_CURVE()
@@ -992,6 +1205,7 @@ class DERCommonFileFormat:
                 self._NP_PHASE = 'SINGLE'
             else:
                 self._NP_PHASE = 'THREE'
+        self.np_phase_code = Phase[self._NP_PHASE]
 
     @property
     def NP_TYPE(self):
@@ -1001,11 +1215,11 @@ class DERCommonFileFormat:
     def NP_TYPE(self, NP_TYPE):
         if isinstance(NP_TYPE, str):
             if NP_TYPE.upper() == 'PV' or NP_TYPE.upper() == 'BESS':
-                self._NP_PHASE = NP_TYPE.upper()
+                self._NP_TYPE = NP_TYPE.upper()
             else:
                 raise ValueError("NP_TYPE should be either 'PV' or 'BESS'")
         else:
-            raise ValueError("NP_TYPE should be either 'BESS' or 'BESS'")
+            raise ValueError("NP_TYPE should be either 'PV' or 'BESS'")
 
     @property
     def NP_SET_EXE_TIME(self):
@@ -1209,6 +1423,7 @@ class DERCommonFileFormat:
         if isinstance(CONST_PF_EXCITATION, str):
             if CONST_PF_EXCITATION.upper() == 'INJ' or CONST_PF_EXCITATION.upper() == 'ABS':
                 self._CONST_PF_EXCITATION = CONST_PF_EXCITATION.upper()
+                self.const_pf_excitation_code = PFExcitation[self._CONST_PF_EXCITATION]
             else:
                 logging.error("CONST_PF_EXCITATION should be either 'INJ' or 'ABS'")
         else:
@@ -1363,13 +1578,13 @@ class DERCommonFileFormat:
             logging.warning("Warning: check failed for QV_CURVE_V2. For the piecewise linear curve setting of "
                             "volt-var control, the four corner points should have their voltage settings "
                             "monotonically increasing and within the ranges defined in IEEE 1547-2018 Clause 5.3.3")
-    #TODO: Currently the checks are performed whenever the value of individual setpoint are changed. It is possible to
-    #      trigger a warning when modifying the curve points when all the values are within the allowed range.
-    #      For example: assume previously V1 = 0.92, V2 = 0.98, V3 = 1.02, V4 = 1.08,
-    #                   and the next curve to be confired has V1 = 0.97, V2 = 1, V3 = 1.02, V4 = 1.08,
-    #                   If V1 is changed first while V2 still has the old value (V1 = 0.97, V2 = 0.98),
-    #                   warning will be triggered.
-    #      Need to find a better way to perform the checks!!
+    # NOTE: The checks are performed whenever the value of individual setpoint are changed. It is possible to
+    #       trigger a warning when modifying the curve points when all the values are within the allowed range.
+    #       For example: assume previously V1 = 0.92, V2 = 0.98, V3 = 1.02, V4 = 1.08,
+    #                    and the next curve to be confired has V1 = 0.97, V2 = 1, V3 = 1.02, V4 = 1.08,
+    #                    If V1 is changed first while V2 still has the old value (V1 = 0.97, V2 = 0.98),
+    #                    warning will be triggered.
+    #       Use batch_update() or update() to change several points, so the checks use the final values.
 
     @property
     def QV_CURVE_Q2(self):
@@ -1723,6 +1938,7 @@ class DERCommonFileFormat:
         if isinstance(NP_V_MEAS_UNBALANCE, str):
             if NP_V_MEAS_UNBALANCE.upper() == 'POS' or NP_V_MEAS_UNBALANCE.upper() == 'AVG':
                 self._NP_V_MEAS_UNBALANCE = NP_V_MEAS_UNBALANCE.upper()
+                self.np_v_meas_unbalance_code = VMeasUnbalance[self._NP_V_MEAS_UNBALANCE]
             else:
                 logging.error("NP_V_MEAS_UNBALANCE should be either 'POS' or 'AVG'")
         else:
@@ -1737,6 +1953,7 @@ class DERCommonFileFormat:
         if isinstance(NP_PRIO_OUTSIDE_MIN_Q_REQ, str):
             if NP_PRIO_OUTSIDE_MIN_Q_REQ.upper() == 'ACTIVE' or NP_PRIO_OUTSIDE_MIN_Q_REQ.upper() == 'REACTIVE':
                 self._NP_PRIO_OUTSIDE_MIN_Q_REQ = NP_PRIO_OUTSIDE_MIN_Q_REQ.upper()
+                self.np_prio_outside_min_q_req_code = PriorityOutsideMinQReq[self._NP_PRIO_OUTSIDE_MIN_Q_REQ]
             else:
                 logging.error("NP_PRIO_OUTSIDE_MIN_Q_REQ should be either 'ACTIVE' or 'REACTIVE'")
         else:
@@ -1749,6 +1966,16 @@ class DERCommonFileFormat:
     @NP_Q_CAPABILITY_BY_P_CURVE.setter
     def NP_Q_CAPABILITY_BY_P_CURVE(self, NP_Q_CAPABILITY_BY_P_CURVE):
         self._NP_Q_CAPABILITY_BY_P_CURVE = NP_Q_CAPABILITY_BY_P_CURVE
+        self._capability_curves = None
+
+    @property
+    def capability_curves(self) -> CapabilityCurves:
+        # Reactive power capability curves pre-scaled to W and var, rebuilt only after NP_P_MAX, NP_VA_MAX or
+        # NP_Q_CAPABILITY_BY_P_CURVE are assigned. Assign a new curve instead of modifying it in place.
+        if self._capability_curves is None:
+            # Derived values, not a setting change: the settings version is not incremented
+            object.__setattr__(self, '_capability_curves', CapabilityCurves(self))
+        return self._capability_curves
 
     @property
     def NP_Q_CAPABILITY_LOW_P(self):
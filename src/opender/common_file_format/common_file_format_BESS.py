@@ -12,12 +12,12 @@
 #   prior written permission.
 
 
-import pandas as pd
 import numpy as np
 import pathlib
 import os
 import logging
 from opender.common_file_format.common_file_format import DERCommonFileFormat
+from opender.common_file_format.settings_cache import settings_cache
 
 
 class DERCommonFileFormatBESS(DERCommonFileFormat):
@@ -35,9 +35,18 @@ class DERCommonFileFormatBESS(DERCommonFileFormat):
                  **kwargs):
         """
         Creating a DER common file format object
-        :param as_file_path: File directory address for Common file format Applied Setting file.
-        :param model_file_path: File directory address for Model custom parameter file.
+        :param as_file_path: File directory address for Common file format Applied Setting file, a DataFrame of
+                             the file (indexed by parameter, with a VALUE column), or a dictionary of parameter values.
+        :param model_file_path: File directory address for Model custom parameter file, a DataFrame of the file, or a
+                                dictionary of parameter values.
         """
+        # Settings read from the same files before are copied from the cache, instead of being read and validated again
+        cache_key = settings_cache.key(DERCommonFileFormatBESS, as_file_path, model_file_path) \
+            if type(self) is DERCommonFileFormatBESS else None
+        if self._load_cached_settings(cache_key):
+            self._set_parameters(kwargs)
+            return
+
         super(DERCommonFileFormatBESS, self).__init__(as_file_path, model_file_path)
 
         self._NP_P_MIN_PU = -1
@@ -86,6 +95,13 @@ class DERCommonFileFormatBESS(DERCommonFileFormat):
             self.SOC_INIT = self.param_inputs.SOC_INIT
         self.initialize_NP_BESS_P_MAX_BY_SOC()
 
+        if cache_key is not None:
+            settings_cache.put(cache_key, self._settings_table())
+
+        self._set_parameters(kwargs)
+
+    def _set_parameters(self, kwargs):
+        # Assign the parameters provided as keyword arguments, or convert a DERCommonFileFormat object
         for key, value in kwargs.items():
             if key in self._get_parameter_list():
                 setattr(self, key, value)
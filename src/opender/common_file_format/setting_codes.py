@@ -0,0 +1,79 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+from enum import IntEnum
+
+
+class Phase(IntEnum):
+    """
+    NP_PHASE codes, the number of phases
+    """
+    SINGLE = 1
+    THREE = 3
+
+
+class VMeasUnbalance(IntEnum):
+    """
+    NP_V_MEAS_UNBALANCE codes
+    """
+    AVG = 0
+    POS = 1
+
+
+class PFExcitation(IntEnum):
+    """
+    CONST_PF_EXCITATION codes
+    """
+    INJ = 0
+    ABS = 1
+
+
+class AbnormalOpCat(IntEnum):
+    """
+    NP_ABNORMAL_OP_CAT codes
+    """
+    CAT_I = 1
+    CAT_II = 2
+    CAT_III = 3
+
+
+class PriorityOutsideMinQReq(IntEnum):
+    """
+    NP_PRIO_OUTSIDE_MIN_Q_REQ codes
+    """
+    REACTIVE = 0
+    ACTIVE = 1
+
+
+# Module constants of the codes, for fast comparisons in the model blocks
+SINGLE = Phase.SINGLE
+THREE = Phase.THREE
+AVG = VMeasUnbalance.AVG
+POS = VMeasUnbalance.POS
+INJ = PFExcitation.INJ
+ABS = PFExcitation.ABS
+CAT_I = AbnormalOpCat.CAT_I
+CAT_II = AbnormalOpCat.CAT_II
+CAT_III = AbnormalOpCat.CAT_III
+PRIO_REACTIVE = PriorityOutsideMinQReq.REACTIVE
+PRIO_ACTIVE = PriorityOutsideMinQReq.ACTIVE
+
+# Code attribute of DERCommonFileFormat for each string setting, and the enum of its codes. Code attributes are
+# updated by the parameter setters, and are read-only views of the string settings for the model blocks.
+SETTING_CODES = {
+    'NP_PHASE': ('np_phase_code', Phase),
+    'NP_V_MEAS_UNBALANCE': ('np_v_meas_unbalance_code', VMeasUnbalance),
+    'CONST_PF_EXCITATION': ('const_pf_excitation_code', PFExcitation),
+    'NP_ABNORMAL_OP_CAT': ('np_abnormal_op_cat_code', AbnormalOpCat),
+    'NP_PRIO_OUTSIDE_MIN_Q_REQ': ('np_prio_outside_min_q_req_code', PriorityOutsideMinQReq),
+}
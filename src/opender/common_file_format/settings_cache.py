@@ -0,0 +1,134 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+from collections import OrderedDict
+import copy
+import hashlib
+import logging
+import os
+import pathlib
+import pickle
+from .settings_loader import ParameterInputs
+
+# Version of the cached value tables, to be increased when the parameters or their processing change
+CACHE_FORMAT = 1
+
+
+def copy_table(table: dict) -> dict:
+    """
+    Copy a value table. Parameter values are immutable (numbers, strings), except curves stored as lists and
+    dictionaries, which are copied deeply, and the parameter inputs, which are copied shallowly.
+    """
+    result = {}
+    for name, value in table.items():
+        if isinstance(value, ParameterInputs):
+            value = ParameterInputs.from_dict(value)
+        elif isinstance(value, (list, dict)):
+            value = copy.deepcopy(value)
+        result[name] = value
+    return result
+
+
+class SettingsCache:
+    """
+    Cache of DER common file format settings read from files, keyed by the content hash of the applied settings and
+    model parameter files. Each entry is the table of parameter values after reading and validating the files, so
+    creating another DERCommonFileFormat from the same files only copies the table.
+
+    Entries are kept in memory, in least recently used order, and optionally pickled in cache_dir to be reused by
+    other processes. Only set cache_dir to a directory written by trusted users, since pickle files can execute code
+    when loaded.
+    """
+
+    def __init__(self, maxsize: int = 64, cache_dir=None):
+        """
+        :param maxsize: Maximum number of entries kept in memory. 0 disables the cache.
+        :param cache_dir: Directory of the on-disk cache. Default is no on-disk cache.
+        """
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, cls, as_file_path, model_file_path):
+        """
+        Cache key of a settings class and its files, or None if the settings are not read from files
+        """
+        if self.maxsize == 0 or not all(isinstance(path, (str, os.PathLike)) for path in (as_file_path,
+                                                                                          model_file_path)):
+            return None
+        digest = hashlib.sha256(f"{CACHE_FORMAT}:{cls.__module__}.{cls.__qualname__}".encode())
+        for path in (as_file_path, model_file_path):
+            with open(path, 'rb') as file:
+                digest.update(hashlib.sha256(file.read()).digest())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Copy of the value table of the key, or None if not cached
+        """
+        table = self.entries.get(key)
+        if table is not None:
+            self.entries.move_to_end(key)
+        elif self.cache_dir is not None:
+            try:
+                with open(self._file_path(key), 'rb') as file:
+                    table = pickle.load(file)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logging.warning(f"Warning: Cached settings {self._file_path(key)} could not be read: {e}")
+            if table is not None:
+                self._add(key, table)
+
+        if table is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return copy_table(table)
+
+    def put(self, key, table):
+        """
+        Store a copy of the value table
+        """
+        table = copy_table(table)
+        self._add(key, table)
+        if self.cache_dir is not None:
+            path = self._file_path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(temp_path, 'wb') as file:
+                pickle.dump(table, file)
+            os.replace(temp_path, path)
+
+    def clear(self):
+        """
+        Remove all in-memory entries (the on-disk cache is kept)
+        """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _add(self, key, table):
+        self.entries[key] = table
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def _file_path(self, key):
+        return pathlib.Path(self.cache_dir).joinpath(f"{key}.pkl")
+
+
+# Cache used by DERCommonFileFormat
+settings_cache = SettingsCache()
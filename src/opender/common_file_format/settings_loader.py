@@ -0,0 +1,103 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+from collections.abc import Mapping
+import csv
+import math
+import numpy as np
+
+# Values read as missing, same as the default of pandas.read_csv
+NA_VALUES = {'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>', 'N/A',
+             'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'}
+
+def to_numeric(value):
+    """
+    Convert a setting value read from a file to a NumPy integer or float if it is numeric (same as pandas.to_numeric),
+    otherwise return it unchanged. Empty and missing values (NA_VALUES) are converted to NaN.
+
+    :param value: Setting value
+    """
+    if not isinstance(value, str):
+        return value
+    if value in NA_VALUES:
+        return math.nan
+    try:
+        return np.int64(value)
+    except (ValueError, OverflowError):
+        pass
+    try:
+        return np.float64(value)
+    except ValueError:
+        return value
+
+
+def read_settings(source, strip_suffix=False) -> dict:
+    """
+    Read the parameter names and values of a common file format settings file (columns PARAMETER and VALUE) with the
+    csv module, converting numeric values with to_numeric().
+
+    :param source: File path, a pandas DataFrame indexed by parameter name with a VALUE column, or a dictionary of
+                   parameter names and values
+    :param strip_suffix: Remove the '-AS' and '-SS' suffixes of the parameter names of an applied settings file
+    """
+    if hasattr(source, 'columns'):
+        # DataFrame provided by the user. pandas is only used through the object itself.
+        rows = source['VALUE'].items()
+    elif isinstance(source, Mapping):
+        rows = source.items()
+    else:
+        with open(source, newline='', encoding='utf-8-sig') as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            column = header.index('VALUE') if 'VALUE' in header else 1
+            rows = [(row[0], row[column] if len(row) > column else '') for row in reader if row]
+
+    settings = {}
+    for name, value in rows:
+        if strip_suffix:
+            name = name.replace("-AS", '').replace("-SS", '')
+        settings[name] = to_numeric(value)
+    return settings
+
+
+class ParameterInputs(dict):
+    """
+    Parameter values read from the settings files, for all parameters of the parameter list (NaN if not provided).
+    Values are accessible as items or attributes, e.g. param_inputs.NP_P_MAX.
+    """
+
+    def __init__(self, parameters_list, *settings):
+        """
+        :param parameters_list: Parameter names
+        :param settings: Dictionaries of parameter names and values, later ones taking precedence
+        """
+        super().__init__((param, math.nan) for param in parameters_list)
+        for values in settings:
+            for name, value in values.items():
+                if name in self:
+                    self[name] = value
+
+    @classmethod
+    def from_dict(cls, values):
+        """
+        Parameter inputs with the same parameters and values as the dictionary values
+        """
+        param_inputs = cls.__new__(cls)
+        dict.update(param_inputs, values)
+        return param_inputs
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
@@ -20,33 +20,49 @@ from opender.operation_status.enter_service_crit.es_crit import EnterServiceCrit
 from opender.capability_and_priority import CapabilityPriority
 from opender.op_cond_proc import DERInputs
 from . import setting_execution_delay, rt_perf
-from typing import Union, List, Tuple, Any
+from typing import Union, List, Tuple, Any, Iterable, Iterator, Sequence
+import sys
 import numpy as np
 import cmath
 from .output_options import DEROutputs
 from opender.auxiliary_funcs.sym_component import convert_symm_to_abc
+from opender.operation_status.status_codes import DERStatus, TRIP, CONTINUOUS_OPERATION, status_name
+from opender.common_file_format.setting_codes import SINGLE, THREE
+from opender.diagnostics import Diagnostics
+from opender.quiescence import Quiescence
+from opender.steady_state import solve_steady_state
 
 
 class DER:
     # Global Variables
     t_s = 100000        # Simulation time step, default for snapshot analysis
 
-    def __init__(self, der_file_obj=None, **kwargs):
+    def __init__(self, der_file_obj=None, t_s=None, trusted_inputs=False, **kwargs):
         """
         Creating a DER Object
 
         :param der_file_obj: DER common file format object created from common_file_format.py
+        :param t_s: Simulation time step of this DER object. If not provided, the global time step DER.t_s is used
+        :param trusted_inputs: If True, the operating condition validity check is only performed at the first time
+                               step and when the type of an input changes, instead of every time step
         """
 
+        if t_s is not None:
+            self.t_s = t_s  # Simulation time step of this DER object, overriding the global DER.t_s
+
         self.time = 0       # Elapsed time from start of simulation
         self.name = 'DER1'  # Identification if multiple DERs are defined
         self.bus = None     # Bus which DER is connected to
+        self.diagnostics = Diagnostics(self)  # Counters of model diagnostics, logged once per occurrence
+        self.quiescence = Quiescence(self)  # Settled-state detection used by advance()
+        self.steps_skipped = 0  # Number of time steps skipped by the last advance() call
 
         if der_file_obj is None:
             der_file_obj = self.get_DERCommonFileFormat(**kwargs)
 
         self.der_file = der_file_obj
-        self.der_file.nameplate_value_validity_check()
+        if not self.der_file.nameplate_checked:
+            self.der_file.nameplate_value_validity_check()
 
         # Intermediate variables
         self.p_desired_pu = None
@@ -62,14 +78,13 @@ class DER:
         self.p_out_kw = None
         self.q_out_kvar = None
 
-        if self.der_file.STATUS_INIT:
-            self.der_status = 'Continuous Operation'
-        else:
-            self.der_status = 'Trip'
+        # DER operating status code (DERStatus), with the status name available as der_status
+        self.der_status_code = CONTINUOUS_OPERATION if self.der_file.STATUS_INIT else TRIP
 
         # DER model modules
-        self.der_input = DERInputs(self.der_file)
-        self.exec_delay = setting_execution_delay.SettingExecutionDelay(self.der_file)
+        self.der_input = DERInputs(self.der_file, self)
+        self.der_input.trusted_inputs = trusted_inputs
+        self.exec_delay = setting_execution_delay.SettingExecutionDelay(self.der_file, self)
         self.opstatus = OperatingStatus(self)
         self.activepowerfunc = DesiredActivePower(self)
         self.reactivepowerfunc = DesiredReactivePower(self)
@@ -110,20 +125,20 @@ class DER:
             self.der_input.freq_hz = f
 
         if v is not None:
-            if self.der_file.NP_PHASE == "THREE":
+            if self.der_file.np_phase_code == THREE:
                 if isinstance(v,(int,float,np.floating,np.int_)):
                     v = [v, v, v]
                 self.der_input.v_a = v[0]
                 self.der_input.v_b = v[1]
                 self.der_input.v_c = v[2]
 
-            if self.der_file.NP_PHASE == "SINGLE":
+            if self.der_file.np_phase_code == SINGLE:
                 if isinstance(v_pu,list):
                     v_pu = v_pu[0]
                 self.der_input.v = v
 
         if v_pu is not None:
-            if self.der_file.NP_PHASE == "THREE":
+            if self.der_file.np_phase_code == THREE:
                 v_base = self.der_file.NP_AC_V_NOM / np.sqrt(3)
                 if isinstance(v_pu,(int,float,np.floating,np.int_)):
                     v = [v_pu * v_base, v_pu * v_base, v_pu * v_base]
@@ -134,13 +149,13 @@ class DER:
                 self.der_input.v_b = v[1]
                 self.der_input.v_c = v[2]
 
-            if self.der_file.NP_PHASE == "SINGLE":
+            if self.der_file.np_phase_code == SINGLE:
                 if isinstance(v_pu,list):
                     v_pu = v_pu[0]
                 self.der_input.v = v_pu * self.der_file.NP_AC_V_NOM
 
         if theta is not None:
-            if self.der_file.NP_PHASE == "SINGLE":
+            if self.der_file.np_phase_code == SINGLE:
                 if isinstance(theta,(int,float,np.floating,np.int_)):
                     self.der_input.theta = theta
                 elif isinstance(theta, list):
@@ -151,7 +166,7 @@ class DER:
                 self.der_input.theta_c = theta[2]
 
         if v_symm_pu is not None:
-            if self.der_file.NP_PHASE == "THREE":
+            if self.der_file.np_phase_code == THREE:
                 v_base = self.der_file.NP_AC_V_NOM / np.sqrt(3)
                 v_pos = v_symm_pu[0] * v_base
                 v_neg = v_symm_pu[1] * v_base
@@ -172,6 +187,61 @@ class DER:
                 self.der_input.v = abs(v_symm_pu[0] * self.der_file.NP_AC_V_NOM)
                 self.der_input.theta = np.angle(v_symm_pu[0] * self.der_file.NP_AC_V_NOM)
 
+    @property
+    def trusted_inputs(self) -> bool:
+        """
+        If True, the operating condition validity check is only performed at the first time step and when the type of
+        an input changes (e.g. None or a list instead of a float), instead of every time step
+        """
+        return self.der_input.trusted_inputs
+
+    @trusted_inputs.setter
+    def trusted_inputs(self, trusted_inputs: bool):
+        self.der_input.trusted_inputs = trusted_inputs
+        self.der_input.checked_types = None
+
+    @property
+    def der_status(self) -> str:
+        """
+        DER operating status name, e.g. 'Trip' or 'Continuous Operation'. The status is kept as a code in
+        der_status_code (see operation_status.status_codes.DERStatus).
+        """
+        return status_name(self.der_status_code)
+
+    @der_status.setter
+    def der_status(self, der_status):
+        # For compatibility, a status name, a code, or a boolean (as STATUS_INIT: in service or not) can be assigned
+        if isinstance(der_status, bool):
+            self.der_status_code = CONTINUOUS_OPERATION if der_status else TRIP
+        else:
+            self.der_status_code = DERStatus.from_label(der_status)
+
+    def clone(self, **overrides) -> 'DER':
+        """
+        Create a new DER object of the same type and time step, with the settings of this DER used as a template
+        (see DERCommonFileFormat.derive). The new DER starts from the initial state, with the same name and bus.
+
+        :param overrides: Parameter names and values overriding the template settings
+        """
+        kwargs = {'t_s': self.t_s} if 't_s' in vars(self) else {}
+        der_obj = type(self)(self.der_file.derive(**overrides), trusted_inputs=self.trusted_inputs, **kwargs)
+        der_obj.name = self.name
+        der_obj.bus = self.bus
+        return der_obj
+
+    def schedule_settings(self, t: float, **changes) -> None:
+        """
+        Schedule setting changes commanded at time t. The changes are applied to the DER common file format object
+        after the execution delay NP_SET_EXE_TIME, at the start of the first time step reaching that time. Schedules
+        such as time-of-use AP_LIMIT or volt-var curves can be loaded up front, before the simulation.
+
+        Example: der_obj.schedule_settings(3600, AP_LIMIT=0.5, AP_LIMIT_ENABLE=True)
+
+        :param t: Time when the setting changes are commanded, in seconds from the start of simulation
+        :param changes: Parameter names and values, as in DERCommonFileFormat
+        """
+        self.exec_delay.schedule_settings(t, changes)
+
     def run(self) -> Tuple[float, float]:
         """
         Main calculation loop.
@@ -180,7 +250,12 @@ class DER:
         """
 
         # Elapsed time calculation
-        self.time = self.time + self.__class__.t_s
+        self.time = self.time + self.t_s
+        self.diagnostics.next_step()
+
+        # Apply scheduled setting changes
+        if self.exec_delay.schedule:
+            self.exec_delay.apply_scheduled_settings(self.time, self.t_s)
 
         # Input processing
         self.der_input.operating_condition_input_processing()
@@ -189,7 +264,7 @@ class DER:
         self.exec_delay.mode_and_execution_delay()
 
         # Determine DER operating status
-        self.der_status = self.opstatus.determine_der_status()
+        self.der_status_code = self.opstatus.determine_der_status()
 
         self.bess_specific()
 
@@ -197,13 +272,13 @@ class DER:
         self.p_desired_pu = self.activepowerfunc.calculate_p_funcs(self.p_out_w)
 
         # Calculate desired reactive power
-        self.q_desired_pu = self.reactivepowerfunc.calculate_reactive_funcs(self.p_desired_pu, self.der_status)
+        self.q_desired_pu = self.reactivepowerfunc.calculate_reactive_funcs(self.p_desired_pu, self.der_status_code)
 
         # Limit DER output based on kVA rating and DER capability curve
         self.p_limited_w, self.q_limited_var = self.limited_p_q.calculate_limited_pq(self.p_desired_pu, self.q_desired_pu)
 
         # Calculate DER output positive and negative sequence current based on ride-through performance
-        self.i_pos_pu, self.i_neg_pu = self.ridethroughperf.der_rem_operation(self.p_limited_w, self.q_limited_var, self.der_status)
+        self.i_pos_pu, self.i_neg_pu = self.ridethroughperf.der_rem_operation(self.p_limited_w, self.q_limited_var, self.der_status_code)
 
         # Generate DER model output value
         self.p_out_w, self.q_out_var = self.der_output.calculate_p_q_output(self.i_pos_pu)
@@ -214,12 +289,237 @@ class DER:
 
         return self.p_out_w, self.q_out_var
 
+    def advance(self, n_steps: int, tol: float = 0.0) -> Tuple[float, float]:
+        """
+        Run n_steps time steps with the current inputs, with the same results as calling run() n_steps times. Once the
+        DER is settled (filters at their targets, no pending delays, no timers counting), the remaining time steps are
+        skipped in O(1), moving the simulation time and the time step counters forward. While only conditional delay
+        timers count (e.g. the enter service delay ES_DELAY), the time steps until the next timed transition are
+        skipped as well.
+
+        :param n_steps: Number of time steps
+        :param tol: Tolerance of the change of float state variables in one time step to consider the DER settled.
+                    Default 0 requires an exact fixed point, so the results are identical to running every time step.
+        :return: p_out_w, q_out_var of the last time step
+        """
+        self.quiescence.tol = tol
+        self.steps_skipped = self.quiescence.advance(n_steps)
+        return self.p_out_w, self.q_out_var
+
+    def time_to_next_event(self, assuming_constant_inputs: bool = True) -> float:
+        """
+        Time until the next timed transition of the DER: trip, enter service (ES_DELAY, randomized delay and ramp),
+        return from momentary cessation (MC_RETURN_T), ramp rate limits reaching their targets, and delayed or
+        scheduled setting changes. An event-driven simulation can run advance(round(dt / t_s)) to reach it, instead of
+        stepping through the delays. Transitions triggered by input changes are not predicted.
+
+        :param assuming_constant_inputs: If True (default), the delays conditioned on the current inputs (e.g. trip
+                                         and enter service delays) are included. If False, only the transitions which
+                                         happen whatever the inputs, i.e. delayed and scheduled setting changes and
+                                         pending TimeDelay changes, are included.
+        :return: Time in seconds, a multiple of the time step t_s (the transition happens in the time step ending at
+                 time + the returned time, or earlier in case of rounding), or math.inf if no transition is pending
+        """
+        return self.quiescence.steps_to_next_event(assuming_constant_inputs) * self.t_s
+
+    def solve_steady_state(self, v_pu: float, f: float, p_avail_pu: float) -> Tuple[float, float, complex, DERStatus]:
+        """
+        Steady-state output of the DER for snapshot power flow, computed directly from the settings and the curves of
+        the grid support functions (see steady_state.py). Gives the settled result of run() with a snapshot time step
+        for a DER in service and balanced voltage, without reading or changing the DER state or inputs, so it can be
+        called in each power flow iteration.
+
+        :param v_pu: DER RPA voltage in per unit, applied to all phases of a three phase DER
+        :param f: DER RPA frequency in Hertz
+        :param p_avail_pu: Available DC power in per unit (PV DER), or active power demand in per unit (BESS DER)
+        :return: p_out_w, q_out_var, positive sequence current i_pos_pu in per unit, and DER status code
+        """
+        return solve_steady_state(self.der_file, v_pu, f, p_avail_pu)
+
+    @property
+    def settled(self) -> bool:
+        """
+        True if the DER was settled at the end of the last advance() call
+        """
+        return self.quiescence.increments is not None
+
+    def checkpoint(self) -> tuple:
+        """
+        Capture the dynamic state of the DER (filter, ramp rate limit, flip-flop and delay states, TimeDelay queues,
+        ride-through, trip and enter service timers, SoC, inputs, outputs, simulation time and diagnostics) as a flat
+        list of values, e.g. to evaluate the DER at a trial voltage in a power flow iteration and roll it back with
+        restore(). The settings are only included if setting changes are scheduled.
+
+        :return: Checkpoint to be passed to restore()
+        """
+        return self.quiescence.checkpoint()
+
+    def restore(self, checkpoint: tuple) -> None:
+        """
+        Restore the dynamic state captured by checkpoint(), without creating model objects. A checkpoint can be
+        restored any number of times.
+
+        :param checkpoint: Checkpoint returned by checkpoint() of this DER
+        """
+        self.quiescence.restore(checkpoint)
+
+    def run_series(self, inputs: 'pandas.DataFrame' = None, **kwargs) -> Union[np.ndarray, 'pandas.DataFrame']:
+        """
+        Run the DER model over a time series of inputs in one call, equivalent to calling update_der_input() and run()
+        in each simulation time step.
+
+        :param inputs: DataFrame with one row per time step and columns named after the arguments of
+                       update_der_input(), e.g. 'v_pu', 'f', 'p_dc_pu'. Three phase voltages or angles can be given
+                       as columns with suffix '_a', '_b', '_c', e.g. 'v_pu_a', 'v_pu_b', 'v_pu_c'.
+        :param kwargs: Input time series as arrays, named after the arguments of update_der_input(). Three phase
+                       voltages or angles are arrays of shape (n, 3). Scalars are held constant over the time series.
+        :return: Structured array with one record per time step (DataFrame with the same index if inputs is a
+                 DataFrame), with fields 'time', 'p_out_w', 'q_out_var', 'p_out_pu', 'q_out_pu', 'p_desired_pu',
+                 'q_desired_pu', 'v_meas_pu', 'der_status' (status code, see operation_status.status_codes), and
+                 'bess_soc' for BESS DER.
+        """
+
+        if inputs is not None:
+            kwargs = {**self._series_inputs_from_dataframe(inputs), **kwargs}
+
+        # Split the inputs into time series and constant inputs
+        series = {}
+        constants = {}
+        n = None
+        for key, value in kwargs.items():
+            if value is None:
+                continue
+            value = np.asarray(value)
+            if value.ndim == 0:
+                constants[key] = value.item()
+                continue
+            if n is None:
+                n = len(value)
+            elif len(value) != n:
+                raise ValueError(f"ValueError: Input time series '{key}' has {len(value)} steps, but {n} is expected")
+            series[key] = value
+        if n is None:
+            raise ValueError("ValueError: At least one input should be a time series")
+
+        # Inputs are validated for all time steps at once, with the constant inputs broadcast over the time steps. If
+        # they are valid, the validity check of each time step is skipped, as for trusted inputs.
+        trusted_inputs = self.trusted_inputs
+        if self._series_inputs_valid({**series, **{key: np.broadcast_to(np.asarray(value), n)
+                                                   for key, value in constants.items()}}):
+            self.der_input.trusted_inputs = True
+        series = {key: value.tolist() for key, value in series.items()}
+
+        # Preallocated output array
+        result = np.empty(n, dtype=self._series_dtype())
+        try:
+            for k in range(n):
+                self.update_der_input(**{key: value[k] for key, value in series.items()}, **constants)
+                self.run()
+                result[k] = self._series_record()
+        finally:
+            self.der_input.trusted_inputs = trusted_inputs
+
+        if inputs is not None:
+            import pandas as pd
+            return pd.DataFrame(result, index=inputs.index)
+        return result
+
+    def stream(self, inputs_iter: Iterable, chunk: int = 1000,
+               names: Sequence[str] = None) -> Iterator[Union[np.ndarray, 'pandas.DataFrame']]:
+        """
+        Run the DER model over an input profile of any length, as a generator consuming input chunks and yielding
+        output chunks of run_series(). Only one chunk is held in memory at a time, so the input can be a file reader,
+        e.g. pandas.read_csv(..., chunksize=...), and the outputs can be written to a file as they are yielded.
+
+        :param inputs_iter: Iterable of input chunks, or of single time step inputs. A chunk is a DataFrame or a dict
+                            with NumPy arrays, as accepted by run_series(). A single time step input is a dict of
+                            scalars (or lists for three phase values), or a tuple of values in the order given by names.
+        :param chunk: Number of single time step inputs collected into one chunk
+        :param names: Names of the update_der_input() arguments of the values in single time step tuples
+        """
+        buffer = []
+
+        # pandas objects can only be provided if pandas was imported, so pandas is not imported here
+        pd = sys.modules.get('pandas')
+        frame_types = (pd.DataFrame,) if pd is not None else ()
+        array_types = (np.ndarray, pd.Series) if pd is not None else (np.ndarray,)
+
+        def flush():
+            # Run the collected single time step inputs as one chunk
+            if isinstance(buffer[0], dict):
+                columns = {key: [step[key] for step in buffer] for key in buffer[0]}
+            else:
+                if names is None:
+                    raise ValueError("ValueError: names should be given to stream inputs as tuples")
+                columns = {key: [step[i] for step in buffer] for i, key in enumerate(names)}
+            buffer.clear()
+            return self.run_series(**columns)
+
+        for item in inputs_iter:
+            is_chunk = isinstance(item, frame_types) or \
+                (isinstance(item, dict) and any(isinstance(value, array_types) for value in item.values()))
+            if is_chunk:
+                if buffer:
+                    yield flush()
+                yield self.run_series(item) if isinstance(item, frame_types) else self.run_series(**item)
+            else:
+                buffer.append(item)
+                if len(buffer) >= chunk:
+                    yield flush()
+        if buffer:
+            yield flush()
+
+    @staticmethod
+    def _series_inputs_valid(series: dict) -> bool:
+        """
+        Vectorized validity check of input time series, with NaN and range masks over all time steps. Undefined
+        voltages raise a ValueError listing the time steps. Returns False if other inputs would be corrected by the
+        validity check of the time steps (negative values, undefined frequency or power), so that it is performed.
+        """
+        valid = True
+        for key, value in series.items():
+            if value.dtype.kind not in 'iuf':
+                valid = False
+                continue
+            value = value.reshape(len(value), -1)
+            nan = np.isnan(value).any(axis=1)
+            if key in ('v', 'v_pu'):
+                if nan.any():
+                    steps = np.flatnonzero(nan)
+                    raise ValueError(f"ValueError: V is not defined at time steps {steps[:10].tolist()}"
+                                     f"{' ...' if len(steps) > 10 else ''}")
+                if (value < 0).any():
+                    valid = False
+            elif nan.any() or (key in ('p_dc_w', 'p_dc_kw', 'p_dc_pu') and (value < 0).any()):
+                valid = False
+        return valid
+
+    @staticmethod
+    def _series_inputs_from_dataframe(inputs: 'pandas.DataFrame') -> dict:
+        # Convert DataFrame columns to input time series, combining per phase columns into arrays of shape (n, 3)
+        kwargs = {}
+        for column in inputs.columns:
+            if column[-2:] in ('_a', '_b', '_c') and all(column[:-2] + p in inputs.columns for p in ('_a', '_b', '_c')):
+                kwargs[column[:-2]] = inputs[[column[:-2] + p for p in ('_a', '_b', '_c')]].to_numpy()
+            else:
+                kwargs[column] = inputs[column].to_numpy()
+        return kwargs
+
+    def _series_dtype(self) -> list:
+        # Fields of the output records of run_series()
+        return [('time', float), ('p_out_w', float), ('q_out_var', float), ('p_out_pu', float), ('q_out_pu', float),
+                ('p_desired_pu', float), ('q_desired_pu', float), ('v_meas_pu', float), ('der_status', np.int8)]
+
+    def _series_record(self) -> tuple:
+        return (self.time, self.p_out_w, self.q_out_var, self.p_out_pu, self.q_out_pu, self.p_desired_pu,
+                self.q_desired_pu, self.der_input.v_meas_pu, self.der_status_code)
+
     def reinitialize(self):
         # only used when need to reset DER model
-        self.der_status = self.der_file.STATUS_INIT
+        self.der_status_code = CONTINUOUS_OPERATION if self.der_file.STATUS_INIT else TRIP
         self.time = 0
         # self.der_input = DERInputs(self.der_file)
-        self.exec_delay = setting_execution_delay.SettingExecutionDelay(self.der_file)
+        self.exec_delay = setting_execution_delay.SettingExecutionDelay(self.der_file, self)
         self.enterservicecrit = EnterServiceCrit(self)
         self.opstatus = OperatingStatus(self)
         self.activepowerfunc = DesiredActivePower(self)
@@ -230,6 +530,7 @@ class DER:
 
         self.p_out_w = None
         self.q_out_var = None
+        self.quiescence.reset()
 
     def get_der_output(self, output: str = 'PQ_pu', i_meas = None) -> Union[Tuple[Any, Any], Tuple[List[Any], List[Any]]]:
         """
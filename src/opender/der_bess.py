@@ -68,4 +68,10 @@ class DER_BESS(DER):
         return self.bessspecific.soc_calc.bess_soc
 
     def bess_specific(self):
-        self.bessspecific.run()
\ No newline at end of file
+        self.bessspecific.run()
+
+    def _series_dtype(self) -> list:
+        return super(DER_BESS, self)._series_dtype() + [('bess_soc', float)]
+
+    def _series_record(self) -> tuple:
+        return super(DER_BESS, self)._series_record() + (self.bess_soc,)
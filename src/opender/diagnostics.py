@@ -0,0 +1,231 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+import logging
+import math
+import numpy as np
+
+# Model diagnostics reported during the simulation: code, and logging level and message
+DIAGNOSTICS = {
+    'V_NEGATIVE': (logging.ERROR, "Error: V should be greater than 0, converting it to postive"),
+    'THETA_UNDEFINED': (logging.WARNING, "Error: Theta is not defined. Default to 0"),
+    'F_UNDEFINED': (logging.ERROR, "Error: F is not defined! Assuming 60Hz"),
+    'P_DC_UNDEFINED': (logging.ERROR, "ValueError: p_dc_w is not defined! Assuming 0"),
+    'P_DC_NEGATIVE': (logging.WARNING, "ValueError: p_dc_w is negative. By definition, available DC power should be "
+                                       "positive"),
+    'SOC_MAX': (logging.WARNING, "BESS SoC reached max"),
+    'SOC_MIN': (logging.WARNING, "BESS SoC reached min"),
+}
+
+
+def report(der_obj, code):
+    """
+    Report a diagnostic of a DER object to its collector, or log it directly if the model block is used without a
+    DER object
+
+    :param der_obj: DER object, or None
+    :param code: Diagnostic code in DIAGNOSTICS
+    """
+    diagnostics = getattr(der_obj, 'diagnostics', None)
+    if diagnostics is None:
+        level, message = DIAGNOSTICS[code]
+        logging.log(level, message)
+    else:
+        diagnostics.report(code)
+
+
+class DiagnosticRecord:
+    """
+    Occurrences of one diagnostic code
+    """
+    __slots__ = ('count', 'first_time', 'last_time', 'last_step', 'transitions')
+
+    def __init__(self):
+        self.count = 0              # Number of time steps with the diagnostic
+        self.first_time = None      # Simulation time of the first occurrence
+        self.last_time = None       # Simulation time of the last occurrence
+        self.last_step = None       # Time step of the last occurrence
+        self.transitions = 0        # Number of times the diagnostic started, i.e. log records emitted
+
+    def __repr__(self):
+        return f"DiagnosticRecord(count={self.count}, first_time={self.first_time}, last_time={self.last_time}, " \
+               f"transitions={self.transitions})"
+
+
+class Diagnostics:
+    """
+    Diagnostics collector of a DER object. Model blocks report diagnostics (e.g. BESS SoC at its limit) in each time
+    step they occur. Occurrences are counted with their first and last simulation time per diagnostic code, and one
+    log record is emitted only when a diagnostic starts, i.e. if it did not occur in the previous time step.
+    """
+
+    def __init__(self, der_obj=None):
+        """
+        :param der_obj: DER object providing the simulation time and name
+        """
+        self.der_obj = der_obj
+        self.step = 0               # Number of time steps run
+        self.records = {}           # DiagnosticRecord by code
+
+    def next_step(self):
+        """
+        Start a new time step, called at the beginning of DER.run()
+        """
+        self.step += 1
+
+    def report(self, code):
+        """
+        Report an occurrence of a diagnostic in the current time step
+
+        :param code: Diagnostic code in DIAGNOSTICS
+        """
+        record = self.records.get(code)
+        if record is None:
+            record = self.records[code] = DiagnosticRecord()
+        time = None if self.der_obj is None else self.der_obj.time
+
+        if record.last_step is None or record.last_step < self.step - 1:
+            record.transitions += 1
+            level, message = DIAGNOSTICS[code]
+            name = None if self.der_obj is None else self.der_obj.name
+            logging.log(level, f"{message} ({name}, t={time})")
+        elif record.last_step == self.step:
+            # Reported again in the same time step
+            return
+
+        record.count += 1
+        if record.first_time is None:
+            record.first_time = time
+        record.last_time = time
+        record.last_step = self.step
+
+    @property
+    def counts(self) -> dict:
+        """
+        Number of time steps with each diagnostic code
+        """
+        return {code: record.count for code, record in self.records.items()}
+
+    def active(self, code) -> bool:
+        """
+        True if the diagnostic occurred in the last time step
+        """
+        record = self.records.get(code)
+        return record is not None and record.last_step == self.step
+
+    def fast_forward(self, n_steps):
+        """
+        Skip time steps of a settled DER (see quiescence.Quiescence), called after the simulation time was moved
+        forward. Diagnostics reported in the last time step are counted as reported in each skipped time step.
+
+        :param n_steps: Number of time steps skipped
+        """
+        time = None if self.der_obj is None else self.der_obj.time
+        for record in self.records.values():
+            if record.last_step == self.step:
+                record.count += n_steps
+                record.last_time = time
+                record.last_step = self.step + n_steps
+        self.step += n_steps
+
+    def checkpoint(self) -> tuple:
+        """
+        Capture the time step counter and the records, see DER.checkpoint()
+        """
+        return self.step, [(code, record.count, record.first_time, record.last_time, record.last_step,
+                            record.transitions) for code, record in self.records.items()]
+
+    def restore(self, checkpoint: tuple):
+        """
+        Write back the time step counter and the records captured by checkpoint()
+        """
+        self.step, records = checkpoint
+        if records or self.records:
+            self.records = {}
+            for code, count, first_time, last_time, last_step, transitions in records:
+                record = self.records[code] = DiagnosticRecord()
+                record.count = count
+                record.first_time = first_time
+                record.last_time = last_time
+                record.last_step = last_step
+                record.transitions = transitions
+
+    def reset(self):
+        """
+        Clear all records
+        """
+        self.records = {}
+
+
+class FleetDiagnostics:
+    """
+    Diagnostics collector of a DERFleet, with the same records as Diagnostics kept as arrays with one element per
+    DER. One log record is emitted per time step in which any DER starts a diagnostic, with the number of DERs.
+    """
+
+    def __init__(self, fleet):
+        """
+        :param fleet: DERFleet providing the simulation time and DER names
+        """
+        self.fleet = fleet
+        self.step = 0
+        self.records = {}       # Dictionary of arrays count, first_time, last_time, last_step, transitions by code
+
+    def next_step(self):
+        """
+        Start a new time step, called at the beginning of DERFleet.run()
+        """
+        self.step += 1
+
+    def report(self, code, mask):
+        """
+        Report the occurrences of a diagnostic in the current time step
+
+        :param code: Diagnostic code in DIAGNOSTICS
+        :param mask: Boolean array, True for the DERs with the diagnostic
+        """
+        if not mask.any():
+            return
+        record = self.records.get(code)
+        if record is None:
+            n = self.fleet.n
+            record = self.records[code] = {
+                'count': np.zeros(n, dtype=int), 'first_time': np.full(n, math.nan),
+                'last_time': np.full(n, math.nan), 'last_step': np.full(n, -2), 'transitions': np.zeros(n, dtype=int)}
+
+        starting = mask & (record['last_step'] < self.step - 1)
+        if starting.any():
+            record['transitions'][starting] += 1
+            level, message = DIAGNOSTICS[code]
+            names = [self.fleet.names[i] for i in np.flatnonzero(starting)[:10]]
+            logging.log(level, f"{message} ({starting.sum()} DERs: {', '.join(map(str, names))}"
+                               f"{', ...' if starting.sum() > 10 else ''}, t={self.fleet.time})")
+
+        mask = mask & (record['last_step'] != self.step)
+        record['count'][mask] += 1
+        record['first_time'][mask & np.isnan(record['first_time'])] = self.fleet.time
+        record['last_time'][mask] = self.fleet.time
+        record['last_step'][mask] = self.step
+
+    @property
+    def counts(self) -> dict:
+        """
+        Number of time steps with each diagnostic code, as arrays with one element per DER
+        """
+        return {code: record['count'] for code, record in self.records.items()}
+
+    def reset(self):
+        """
+        Clear all records
+        """
+        self.records = {}
@@ -0,0 +1,319 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+"""
+Array versions of the auxiliary functions in opender.auxiliary_funcs.
+
+Each class holds the state variables of n independent scalar blocks as NumPy arrays, and follows the same equations
+as its scalar counterpart element-wise. All methods accept an optional boolean mask; only the masked elements are
+evaluated and have their state variables updated, which allows the fleet to reproduce the branch structure of the
+scalar model (e.g. a function being reset only when the DER is tripped).
+"""
+
+import numpy as np
+from opender.auxiliary_funcs.time_step import TimeStep
+
+
+def _full(n, value, dtype=float):
+    return np.broadcast_to(np.asarray(value, dtype=dtype), (n,)).copy()
+
+
+def _mask(n, mask):
+    if mask is None:
+        return np.ones(n, dtype=bool)
+    return np.asarray(mask, dtype=bool)
+
+
+def interp_rows(x, xp, yp):
+    """
+    Row-wise linear interpolation, equivalent to calling np.interp(x[i], xp[i], yp[i]) for each row.
+
+    :param x: Array of n points to be evaluated
+    :param xp: Array (n, k) of increasing x coordinates. Curves with fewer points are padded by repeating the last point
+    :param yp: Array (n, k) of y coordinates
+    """
+    x = np.asarray(x, dtype=float)
+    k = xp.shape[1]
+    j = np.clip((xp <= x[:, None]).sum(axis=1) - 1, 0, k - 2)
+    rows = np.arange(len(x))
+    x0, x1 = xp[rows, j], xp[rows, j + 1]
+    y0, y1 = yp[rows, j], yp[rows, j + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (y1 - y0) / (x1 - x0)
+        y = slope * (x - x0) + y0
+    y = np.where(x <= xp[:, 0], yp[:, 0], y)
+    y = np.where(x >= xp[:, -1], yp[:, -1], y)
+    return y
+
+
+class LowPassFilterArray(TimeStep):
+    """
+    |  Low pass filter for an array of signals
+    |  EPRI Report Reference: Section 3.12.1 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+    """
+
+    def __init__(self, n, dtype=float, der_obj=None):
+        self.der_obj = der_obj
+        self.dtype = dtype
+        self.lpf_in_prev = np.zeros(n, dtype=dtype)
+        self.lpf_out_prev = np.zeros(n, dtype=dtype)
+        self.initialized = np.zeros(n, dtype=bool)
+
+    def low_pass_filter(self, lpf_in, t_olrt, mask=None):
+        """
+        Calculate low pass filtered result of lpf_in with Open Loop Response Time of t_olrt
+
+        :param lpf_in:    Input of Low pass filter
+        :param t_olrt:    Open loop response time
+        :param mask:      Elements to be evaluated
+        """
+        n = len(self.initialized)
+        m = _mask(n, mask)
+        lpf_in = _full(n, lpf_in, self.dtype)
+        t_olrt = _full(n, t_olrt)
+        t_s = self.t_s
+
+        in_prev = np.where(self.initialized, self.lpf_in_prev, lpf_in)
+        out_prev = np.where(self.initialized, self.lpf_out_prev, lpf_in)
+
+        # Eq. 3.12.1-2, apply first order lag
+        t_olrt_t = t_olrt / 1.15
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lpf_out = ((t_s / (t_s + t_olrt_t)) * (lpf_in + in_prev)) + ((t_olrt_t - t_s) / (t_s + t_olrt_t) * out_prev)
+        lpf_out = np.where(t_olrt < (1.15 * t_s), lpf_in, lpf_out)
+
+        self.lpf_in_prev[m] = lpf_in[m]
+        self.lpf_out_prev[m] = lpf_out[m]
+        self.initialized[m] = True
+        return self.lpf_out_prev.copy()
+
+    def reset_state(self, mask, value=0):
+        """
+        Force both state variables of the masked elements to value
+        """
+        self.lpf_in_prev[mask] = value
+        self.lpf_out_prev[mask] = value
+        self.initialized[mask] = True
+
+
+class RampingArray(TimeStep):
+    """
+    |  Ramp rate limit function for an array of signals
+    |  EPRI Report Reference: Section 3.12.2 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+    """
+
+    def __init__(self, n, der_obj=None):
+        self.der_obj = der_obj
+        self.ramp_out_prev = np.zeros(n)
+        self.initialized = np.zeros(n, dtype=bool)
+
+    def ramp(self, ramp_in, ramp_up_time, ramp_down_time, mask=None):
+        """
+        Calculate ramp rate limit with ramp-up and ramp-down time settings
+
+        :param ramp_in: Ramp rate limit input
+        :param ramp_up_time: Ramp up time from 0 to 1
+        :param ramp_down_time: Ramp down time from 0 to 1
+        :param mask: Elements to be evaluated
+        """
+        n = len(self.initialized)
+        m = _mask(n, mask)
+        ramp_in = _full(n, ramp_in)
+        ramp_up_time = _full(n, ramp_up_time)
+        ramp_down_time = _full(n, ramp_down_time)
+        t_s = self.t_s
+
+        prev = np.where(self.initialized, self.ramp_out_prev, ramp_in)
+
+        # Eq. 3.12.2-2 and -3, apply ramp rate limit
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ramp_up_limit = t_s / ramp_up_time
+            ramp_down_limit = t_s / ramp_down_time
+        ramp_out = ramp_in.copy()
+        up = (ramp_up_time != 0) & ((prev + ramp_up_limit) < ramp_in)
+        ramp_out = np.where(up, prev + ramp_up_limit, ramp_out)
+        down = (ramp_down_time != 0) & ((prev - ramp_down_limit) > ramp_in)
+        ramp_out = np.where(down, prev - ramp_down_limit, ramp_out)
+
+        self.ramp_out_prev[m] = ramp_out[m]
+        self.initialized[m] = True
+        return self.ramp_out_prev.copy()
+
+    def reset_state(self, mask, value=0):
+        """
+        Force the state variable of the masked elements to value
+        """
+        self.ramp_out_prev[mask] = value
+        self.initialized[mask] = True
+
+
+class ConditionalDelayArray(TimeStep):
+    """
+    |  Conditional Delayed Enable for an array of Booleans
+    |  EPRI Report Reference: Section 3.12.4 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+    """
+
+    def __init__(self, n, der_obj=None):
+        self.der_obj = der_obj
+        self.con_del_enable_int = np.full(n, np.inf)    # initialize timer
+        self.con_del_enable_out = np.zeros(n, dtype=bool)   # initialize output
+
+    def con_del_enable(self, con_del_enable_in, con_del_enable_time, mask=None):
+        """
+        Generate output when con_del_enable_in stays True for a period of con_del_enable_time
+
+        :param con_del_enable_in: Input Conditional Enable Boolean
+        :param con_del_enable_time: Conditional delay time
+        :param mask: Elements to be evaluated
+        """
+        n = len(self.con_del_enable_out)
+        m = _mask(n, mask)
+        con_del_enable_in = _full(n, con_del_enable_in, bool)
+        con_del_enable_time = _full(n, con_del_enable_time)
+
+        # Eq. 3.12.4-2 and -3, integrate elapsed time if input is True, reset if input is False
+        enable_int = np.where(con_del_enable_in,
+                              np.minimum(con_del_enable_time, self.con_del_enable_int + self.t_s), 0)
+        # Eq. 3.12.4-4 If elapsed time passed the conditional delay time, the output turns True
+        enable_out = con_del_enable_in & (self.con_del_enable_out | (enable_int >= con_del_enable_time))
+
+        self.con_del_enable_int[m] = enable_int[m]
+        self.con_del_enable_out[m] = enable_out[m]
+        return self.con_del_enable_out.copy()
+
+
+class FlipFlopArray:
+    """
+    |  Flipflop logic for an array of Booleans
+    |  EPRI Report Reference: Section 3.12.5 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+    """
+
+    def __init__(self, n, ff_init=0):
+        self.ff_out_prev = _full(n, ff_init, bool)
+
+    def flipflop(self, ff_set, ff_reset, mask=None):
+        """
+        Flipflop logic
+
+        :param ff_set: Set input of flipflop logic
+        :param ff_reset: Reset input of flipflop logic
+        :param mask: Elements to be evaluated
+        """
+        n = len(self.ff_out_prev)
+        m = _mask(n, mask)
+        ff_set = _full(n, ff_set, bool)
+        ff_reset = _full(n, ff_reset, bool)
+
+        # Eq. 3.12.5-2 Flipflop logic
+        ff_out = np.where(ff_set & ~ff_reset, True, np.where(~ff_set & ff_reset, False, self.ff_out_prev))
+
+        self.ff_out_prev[m] = ff_out[m]
+        return self.ff_out_prev.copy()
+
+
+class TimeDelayArray(TimeStep):
+    """
+    |  Time delay function for an array of signals
+    |  EPRI Report Reference: Section 3.12.3 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+
+    Changes of input are kept in a per-element queue of pending values and remaining times, stored as (n, capacity)
+    arrays. The queue grows when needed.
+    """
+
+    def __init__(self, n, capacity=4, der_obj=None):
+        self.der_obj = der_obj
+        self.tdelay_in_prev = np.zeros(n)
+        self.tdelay_out_hold = np.zeros(n)
+        self.initialized = np.zeros(n, dtype=bool)
+        self.tdelay_in_value = np.zeros((n, capacity))
+        self.tdelay_in_time = np.zeros((n, capacity))
+        self.count = np.zeros(n, dtype=int)
+
+    def tdelay(self, tdelay_in, tdelay_time, mask=None):
+        """
+        Time delay function
+
+        :param tdelay_in: Value to be time delayed
+        :param tdelay_time: Time delay time
+        :param mask: Elements to be evaluated
+        """
+        n = len(self.initialized)
+        m = _mask(n, mask)
+        tdelay_in = _full(n, tdelay_in)
+        tdelay_time = _full(n, tdelay_time)
+        t_s = self.t_s
+
+        first = m & ~self.initialized
+        self.tdelay_in_prev[first] = tdelay_in[first]
+        self.tdelay_out_hold[first] = tdelay_in[first]
+        self.initialized[first] = True
+
+        # If time delay is smaller than the time step, pass through the input and clear the pending changes
+        bypass = m & (tdelay_time < t_s)
+        self.tdelay_out_hold[bypass] = tdelay_in[bypass]
+        self.count[bypass] = 0
+
+        active = m & ~bypass & (tdelay_time > 0) & (self.count > 0)
+        if active.any():
+            self._release(np.flatnonzero(active), t_s)
+
+        # Record the input change together with its delay time
+        changed = m & (tdelay_in != self.tdelay_in_prev)
+        if changed.any():
+            rows = np.flatnonzero(changed)
+            if self.count[rows].max() >= self.tdelay_in_time.shape[1]:
+                self._grow()
+            self.tdelay_in_value[rows, self.count[rows]] = tdelay_in[rows]
+            self.tdelay_in_time[rows, self.count[rows]] = tdelay_time[rows]
+            self.count[rows] += 1
+            self.tdelay_in_prev[rows] = tdelay_in[rows]
+
+        return self.tdelay_out_hold.copy()
+
+    def _release(self, rows, t_s):
+        capacity = self.tdelay_in_time.shape[1]
+        valid = np.arange(capacity) < self.count[rows, None]
+        times = np.where(valid, self.tdelay_in_time[rows] - t_s, self.tdelay_in_time[rows])
+        self.tdelay_in_time[rows] = times
+        expired = valid & (times <= 0)
+        n_expired = expired.sum(axis=1)
+
+        # Common case: at most the oldest change expires in this time step
+        head = (n_expired == 1) & expired[:, 0]
+        if head.any():
+            r = rows[head]
+            self.tdelay_out_hold[r] = self.tdelay_in_value[r, 0]
+            self.tdelay_in_time[r, :-1] = self.tdelay_in_time[r, 1:]
+            self.tdelay_in_value[r, :-1] = self.tdelay_in_value[r, 1:]
+            self.count[r] -= 1
+
+        # Otherwise (e.g. the delay time was changed while changes were pending), release the changes the same way
+        # as the scalar TimeDelay does
+        for r in rows[(n_expired > 0) & ~head]:
+            c = self.count[r]
+            tdelay_in_time = list(self.tdelay_in_time[r, :c])
+            tdelay_in_value = list(self.tdelay_in_value[r, :c])
+            for x in tdelay_in_time:
+                if x <= 0:
+                    index = tdelay_in_time.index(x)
+                    self.tdelay_out_hold[r] = tdelay_in_value[index]
+                    del tdelay_in_time[index]
+                    del tdelay_in_value[index]
+            self.count[r] = len(tdelay_in_time)
+            self.tdelay_in_time[r, :self.count[r]] = tdelay_in_time
+            self.tdelay_in_value[r, :self.count[r]] = tdelay_in_value
+
+    def _grow(self):
+        capacity = self.tdelay_in_time.shape[1]
+        self.tdelay_in_time = np.pad(self.tdelay_in_time, ((0, 0), (0, capacity)))
+        self.tdelay_in_value = np.pad(self.tdelay_in_value, ((0, 0), (0, capacity)))
@@ -0,0 +1,1529 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+import math
+from typing import List, Union, Tuple
+import numpy as np
+from opender import der
+from opender.setting_execution_delay import SettingExecutionDelay
+from opender.diagnostics import FleetDiagnostics
+from opender.operation_status.status_codes import TRIP, ENTERING_SERVICE, CONTINUOUS_OPERATION, \
+    MANDATORY_OPERATION, PERMISSIVE_OPERATION, MOMENTARY_CESSATION, CEASE_TO_ENERGIZE, NOT_DEFINED, NO_MODE, \
+    STATUS_NAMES, RT_CTRL_TRIP, RT_CTRL_NORMAL, RT_CTRL_DVS, RT_CTRL_CTE, RT_CTRL_NAMES
+from opender.common_file_format.setting_codes import SINGLE, THREE, AVG, POS, INJ, ABS
+from opender.auxiliary_funcs.sym_component import alpha, alpha2
+from opender.fleet.array_funcs import LowPassFilterArray, RampingArray, ConditionalDelayArray, FlipFlopArray, \
+    TimeDelayArray, interp_rows
+
+
+def _owner(fleet, path):
+    # Object (fleet, array function or dictionary) holding the array at the attribute path, and the array name
+    *owners, name = path.split('.')
+    obj = fleet
+    for owner in owners:
+        obj = obj[owner] if isinstance(obj, dict) else getattr(obj, owner)
+    return obj, name
+
+
+def _code_to_name(codes, names):
+    return np.array([names[c] if c >= 0 else None for c in codes], dtype=object)
+
+
+def _pad_curves(curves, k=None):
+    """
+    Stack piecewise curves of different lengths in a 2-D array, by repeating the last point of shorter curves
+    """
+    k = max(len(c) for c in curves) if k is None else k
+    return np.array([list(c) + [c[-1]] * (k - len(c)) for c in curves], dtype=float)
+
+
+def _to_float(value):
+    return np.nan if value is None else float(value)
+
+
+def _rows(value, n, ncol=None):
+    """
+    Broadcast a fleet input to one row per DER (n,) or (n, ncol)
+    """
+    value = np.asarray(value, dtype=float)
+    if ncol is None:
+        return np.broadcast_to(value, (n,)).copy()
+    if value.ndim == 1 and value.shape[0] == n and n != ncol:
+        value = value[:, None]
+    return np.broadcast_to(value, (n, ncol)).copy()
+
+
+def der_input_arrays(s, p_dc_kw=None, v=None, theta=None, v_symm_pu=None, f=None, v_pu=None, p_dc_pu=None,
+                     p_dc_w=None, p_dem_w=None, p_dem_pu=None, p_dem_kw=None) -> dict:
+    """
+    Convert the inputs of DERFleet.update_der_input() to the input arrays of the fleet ('v_abc', 'theta_abc',
+    'freq_hz', 'p_dc_w', 'p_dem_w'), returning only the arrays updated by the given inputs
+
+    :param s: FleetSettings of the fleet
+    """
+    n = s.n
+    inputs = {}
+
+    if p_dc_w is not None:
+        inputs['p_dc_w'] = _rows(p_dc_w, n)
+    if p_dc_kw is not None:
+        inputs['p_dc_w'] = _rows(p_dc_kw, n) * 1000
+    if p_dc_pu is not None:
+        inputs['p_dc_w'] = _rows(p_dc_pu, n) * s.NP_P_MAX
+
+    if p_dem_w is not None:
+        inputs['p_dem_w'] = _rows(p_dem_w, n)
+    if p_dem_kw is not None:
+        inputs['p_dem_w'] = _rows(p_dem_kw, n) * 1000
+    if p_dem_pu is not None:
+        inputs['p_dem_w'] = _rows(p_dem_pu, n) * s.NP_P_MAX
+
+    if f is not None:
+        inputs['freq_hz'] = _rows(f, n)
+
+    if v is not None:
+        inputs['v_abc'] = _rows(v, n, 3)
+
+    if v_pu is not None:
+        v_base = np.where(s.three_phase, s.NP_AC_V_NOM / np.sqrt(3), s.NP_AC_V_NOM)
+        inputs['v_abc'] = _rows(v_pu, n, 3) * v_base[:, None]
+
+    if theta is not None:
+        inputs['theta_abc'] = _rows(theta, n, 3)
+
+    if v_symm_pu is not None:
+        v_symm_pu = np.asarray(v_symm_pu, dtype=complex)
+        if v_symm_pu.ndim == 1:
+            v_symm_pu = np.broadcast_to(v_symm_pu, (n, len(v_symm_pu)))
+        v_pos = v_symm_pu[:, 0]
+        v_neg = v_symm_pu[:, 1] if v_symm_pu.shape[1] > 1 else 0
+        v_zero = v_symm_pu[:, 2] if v_symm_pu.shape[1] > 2 else 0
+        v_base = s.NP_AC_V_NOM / np.sqrt(3)
+        v_abc = np.stack([v_pos + v_neg + v_zero,
+                          alpha2 * v_pos + alpha * v_neg + v_zero,
+                          alpha * v_pos + alpha2 * v_neg + v_zero], axis=1) * v_base[:, None]
+        v_single = v_pos * s.NP_AC_V_NOM
+        v_abc = np.where(s.three_phase[:, None], v_abc, v_single[:, None])
+        inputs['v_abc'] = np.abs(v_abc)
+        inputs['theta_abc'] = np.angle(v_abc)
+
+    return inputs
+
+
+class FleetSettings:
+    """
+    DER settings of all DERs in a fleet, extracted from each DER's common file format object and stored as NumPy
+    arrays (one element per DER) with the same names as in DERCommonFileFormat.
+    String settings are converted to Boolean masks, and the piecewise curves are stacked into 2-D arrays.
+    """
+
+    numeric_list = ['NP_P_MAX', 'NP_VA_MAX', 'NP_P_MAX_CHARGE', 'NP_APPARENT_POWER_CHARGE_MAX', 'NP_AC_V_NOM',
+                    'NP_REACTIVE_SUSCEPTANCE', 'NP_EFFICIENCY', 'NP_P_MIN_PU', 'NP_V_MEAS_DELAY', 'NP_REACT_TIME',
+                    'NP_INV_DELAY', 'NP_CURRENT_PU', 'NP_RT_RAMP_UP_TIME', 'NP_MODE_TRANSITION_TIME',
+                    'NP_CTE_RESP_T', 'MC_RESP_T', 'MC_RETURN_T', 'MC_HVRT_V1', 'MC_LVRT_V1', 'DVS_K', 'AP_RT',
+                    'CONST_PF_RT', 'CONST_Q_RT', 'QP_RT', 'ES_RANDOMIZED_DELAY_ACTUAL',
+                    'NP_BESS_SOC_MAX', 'NP_BESS_SOC_MIN', 'NP_BESS_CAPACITY', 'NP_BESS_SELF_DISCHARGE',
+                    'NP_BESS_SELF_DISCHARGE_SOC', 'NP_BESS_P_RAMP_TIME', 'SOC_INIT']
+
+    flag_list = ['AP_LIMIT_ENABLE', 'ES_PERMIT_SERVICE', 'CONST_PF_MODE_ENABLE', 'CONST_Q_MODE_ENABLE',
+                 'QV_MODE_ENABLE', 'QV_VREF_AUTO_MODE', 'QP_MODE_ENABLE', 'PV_MODE_ENABLE', 'PF_MODE_ENABLE',
+                 'MC_ENABLE', 'DVS_MODE_ENABLE', 'STATUS_INIT']
+
+    def __init__(self, der_files):
+        self.n = len(der_files)
+
+        # Control settings handled by the setting execution delay, and model parameters
+        for param in SettingExecutionDelay.parameters_list + self.numeric_list:
+            if param not in self.flag_list and param != 'CONST_PF_EXCITATION':
+                setattr(self, param, np.array([_to_float(getattr(f, param, None)) for f in der_files]))
+        for param in self.flag_list:
+            setattr(self, param, np.array([bool(getattr(f, param, False)) for f in der_files]))
+
+        # String settings as Boolean masks
+        self.three_phase = np.array([f.np_phase_code == THREE for f in der_files])
+        self.single_phase = np.array([f.np_phase_code == SINGLE for f in der_files])
+        self.v_meas_avg = np.array([f.np_v_meas_unbalance_code == AVG for f in der_files])
+        self.v_meas_pos = np.array([f.np_v_meas_unbalance_code == POS for f in der_files])
+        self.pf_inj = np.array([f.const_pf_excitation_code == INJ for f in der_files])
+        self.pf_abs = np.array([f.const_pf_excitation_code == ABS for f in der_files])
+        self.prio_active = np.array([f.NP_PRIO_OUTSIDE_MIN_Q_REQ == 'ACTIVE' for f in der_files])
+        self.cat_a = np.array([f.NP_NORMAL_OP_CAT == 'CAT_A' for f in der_files])
+        self.abnormal_op_cat = np.array([f.np_abnormal_op_cat_code for f in der_files], dtype=np.int8)
+        self.type_pv = np.array([f.NP_TYPE == 'PV' for f in der_files])
+
+        # Reactive power capability curves
+        curves = [f.NP_Q_CAPABILITY_BY_P_CURVE for f in der_files]
+        k = max(len(c[key]) for c in curves for key in ['P_Q_INJ_PU', 'P_Q_ABS_PU'])
+        self.P_Q_INJ_PU = _pad_curves([c['P_Q_INJ_PU'] for c in curves], k)
+        self.Q_MAX_INJ_PU = _pad_curves([c['Q_MAX_INJ_PU'] for c in curves], k)
+        self.P_Q_ABS_PU = _pad_curves([c['P_Q_ABS_PU'] for c in curves], k)
+        self.Q_MAX_ABS_PU = _pad_curves([c['Q_MAX_ABS_PU'] for c in curves], k)
+
+        # Maximum active power by SoC curves (BESS DERs only)
+        soc_curves = [getattr(f, 'NP_BESS_P_MAX_BY_SOC', None) or
+                      {'P_DISCHARGE_MAX_PU': [1, 1], 'SOC_P_DISCHARGE_MAX': [0, 1],
+                       'P_CHARGE_MAX_PU': [1, 1], 'SOC_P_CHARGE_MAX': [0, 1]} for f in der_files]
+        self.P_DISCHARGE_MAX_PU = _pad_curves([c['P_DISCHARGE_MAX_PU'] for c in soc_curves])
+        self.SOC_P_DISCHARGE_MAX = _pad_curves([c['SOC_P_DISCHARGE_MAX'] for c in soc_curves])
+        self.P_CHARGE_MAX_PU = _pad_curves([c['P_CHARGE_MAX_PU'] for c in soc_curves])
+        self.SOC_P_CHARGE_MAX = _pad_curves([c['SOC_P_CHARGE_MAX'] for c in soc_curves])
+
+        # Eq 3.9.1-2, reactive power injection and absorption capability required by IEEE 1547-2018
+        self.q_requirement_abs = np.where(self.cat_a, 0.25, 0.44) * self.NP_VA_MAX
+        self.q_requirement_inj = 0.44 * self.NP_VA_MAX
+
+    def update_rows(self, rows, der_files):
+        """
+        Re-extract the settings of some DERs of the fleet, e.g. after scheduled setting changes, without extracting
+        the settings of the other DERs again
+
+        :param rows: Indices of the DERs in the fleet
+        :param der_files: Common file format objects of these DERs
+        """
+        subset = FleetSettings(der_files)
+        for name, values in vars(subset).items():
+            if name == 'n':
+                continue
+            array = getattr(self, name)
+            if array.ndim == 2 and values.shape[1] != array.shape[1]:
+                # Curves with more points than the others, all curves are padded by repeating their last point
+                k = max(values.shape[1], array.shape[1])
+                array = np.concatenate([array, np.repeat(array[:, -1:], k - array.shape[1], axis=1)], axis=1)
+                values = np.concatenate([values, np.repeat(values[:, -1:], k - values.shape[1], axis=1)], axis=1)
+                setattr(self, name, array)
+            array[rows] = values
+
+
+def intercep_piecewise_circle_array(mag, xp, yp):
+    """
+    Array version of capability_and_priority.intercep_piecewise_circle, with one curve per element
+
+    :param mag: Array of circle radius (with sign indicating the direction of search)
+    :param xp: Array (n, k) of x coordinates of the piecewise curves
+    :param yp: Array (n, k) of y coordinates of the piecewise curves
+    """
+    r = np.abs(mag)
+    sign = np.where(mag >= 0, 1., -1.)
+
+    # Extend the piecewise curves horizontally to cover the circles. Zero length segments are skipped.
+    xs = np.concatenate([np.minimum(xp[:, :1], -r[:, None]), xp, np.maximum(xp[:, -1:], r[:, None])], axis=1)
+    ys = np.concatenate([yp[:, :1], yp, yp[:, -1:]], axis=1)
+
+    # Intersections of each segment (x0 + t*dx, y0 + t*dy), 0 <= t <= 1, with the circle x^2 + y^2 = r^2
+    x0, y0 = xs[:, :-1], ys[:, :-1]
+    dx, dy = np.diff(xs, axis=1), np.diff(ys, axis=1)
+    a = dx * dx + dy * dy
+    b = 2 * (x0 * dx + y0 * dy)
+    c = x0 * x0 + y0 * y0 - (r * r)[:, None]
+    disc = b * b - 4 * a * c
+    valid = (a != 0) & (disc >= 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sq = np.sqrt(np.where(valid, disc, 0))
+        t = np.stack([(-b - sq) / (2 * a), (-b + sq) / (2 * a)], axis=2)
+    x = x0[:, :, None] + t * dx[:, :, None]
+    y = y0[:, :, None] + t * dy[:, :, None]
+    valid = valid[:, :, None] & (t >= -1.e-12) & (t <= 1 + 1.e-12) & (x * sign[:, None, None] >= 0)
+
+    # The interception point farthest from the y axis, in the same order of search as the scalar version
+    score = np.where(valid, x * sign[:, None, None], -np.inf).reshape(len(r), -1)
+    best = np.argmax(score, axis=1)
+    rows = np.arange(len(r))
+    found = np.isfinite(score[rows, best])
+    x_itcp = np.where(found, x.reshape(len(r), -1)[rows, best], 0.)
+    y_itcp = np.where(found, y.reshape(len(r), -1)[rows, best], interp_rows(np.zeros(len(r)), xp, yp))
+    return x_itcp, y_itcp
+
+
+class DERFleet:
+    """
+    Vectorized engine running a fleet of DER models in one call.
+
+    The fleet stores DER inputs, settings, state variables of the filters, ramps and delays, and DER operating statuses
+    as NumPy arrays with one element per DER. Each call of run() steps all DERs, following the same calculation
+    sequence as DER.run(): input processing, operating status, desired active power, desired reactive power,
+    capability and priority, ride-through performance and outputs.
+
+    DER objects (DER_PV or DER_BESS) are used as the templates of the fleet: their settings, operating status and
+    state of charge are copied into the fleet, and all other state variables start from the initial state of a newly
+    created DER. The DER objects themselves are not stepped.
+    """
+
+    def __init__(self, der_list: List[der.DER], t_s: float = None, seeds: list = None):
+        """
+        Creating a DER fleet
+
+        :param der_list: List of DER objects (DER_PV or DER_BESS)
+        :param t_s: Simulation time step of the fleet. If not provided, the time step assigned to the DER objects is
+                    used, or the global time step DER.t_s if none is assigned.
+        :param seeds: Random seeds (int or numpy SeedSequence) of the DERs, one per DER. If provided, each DER draws its
+                      enter service randomized delay from its own random generator, so that the results do not depend
+                      on the other DERs in the fleet. If not provided, the global numpy random generator is used.
+        """
+        if t_s is None:
+            t_s_der = {d.t_s for d in der_list if 't_s' in vars(d)}
+            if len(t_s_der) > 1:
+                raise ValueError("ValueError: DERs in a fleet should have the same simulation time step t_s")
+            t_s = t_s_der.pop() if t_s_der else None
+        self._t_s = t_s
+
+        self.ders = list(der_list)
+        self.n = len(self.ders)
+        self.names = [d.name for d in self.ders]
+        self.buses = [d.bus for d in self.ders]
+        self.is_bess = np.array([hasattr(d, 'bessspecific') for d in self.ders])
+
+        if seeds is not None and len(seeds) != self.n:
+            raise ValueError("ValueError: Number of seeds should be equal to the number of DERs in the fleet")
+        self.rngs = None if seeds is None else [np.random.default_rng(seed) for seed in seeds]
+
+        self.time = 0
+        self.diagnostics = FleetDiagnostics(self)  # Counters of model diagnostics per DER, logged once per occurrence
+        self.settings = None
+        self.refresh_settings()
+        self._initialize_states()
+
+    def refresh_settings(self):
+        """
+        Re-extract the settings from the DER objects. Call this function after modifying any DER's der_file, or after
+        scheduling setting changes with DER.schedule_settings().
+        """
+        self.settings = FleetSettings([d.der_file for d in self.ders])
+        self._scheduled = [i for i, d in enumerate(self.ders) if d.exec_delay.schedule]  # DERs with scheduled changes
+
+    def update_settings(self, **values):
+        """
+        Assign settings of all DERs in the fleet with DERCommonFileFormat.update(), then re-extract the fleet settings
+        once
+
+        :param values: Parameter names and values, either one value for all DERs or a sequence with one value per DER
+        """
+        per_der = {}
+        for name, value in values.items():
+            if isinstance(value, (str, dict)) or np.ndim(value) == 0:
+                value = [value] * self.n
+            elif len(value) != self.n:
+                raise ValueError(f"ValueError: {name} should have one value per DER in the fleet")
+            per_der[name] = value
+        for i, d in enumerate(self.ders):
+            d.der_file.update(**{name: value[i] for name, value in per_der.items()})
+        self.refresh_settings()
+
+    def apply_scheduled_settings(self):
+        """
+        Apply the setting changes scheduled by DER.schedule_settings() whose execution delay has passed
+        """
+        changed = []
+        for i in self._scheduled:
+            d = self.ders[i]
+            schedule = d.exec_delay.schedule
+            if schedule[0][0] + d.der_file.NP_SET_EXE_TIME <= self.time + 1e-6 * self.t_s:
+                d.exec_delay.apply_scheduled_settings(self.time, self.t_s)
+                changed.append(i)
+        if changed:
+            # Only the settings of the DERs with applied changes are extracted again
+            self.settings.update_rows(changed, [self.ders[i].der_file for i in changed])
+            self._scheduled = [i for i in self._scheduled if self.ders[i].exec_delay.schedule]
+
+    def _initialize_states(self):
+        n = self.n
+        s = self.settings
+
+        # Operating condition inputs
+        self.v_abc = np.full((n, 3), np.nan)     # Phase to ground voltage magnitudes in volts (column 0 for single phase)
+        self.theta_abc = np.full((n, 3), np.nan)  # Phase to ground voltage angles in radians
+        self.freq_hz = np.full(n, np.nan)
+        self.p_dc_w = np.full(n, np.nan)
+        self.p_dem_w = np.full(n, np.nan)
+
+        # Processed inputs
+        self.v_pos_pu = np.zeros(n, dtype=complex)
+        self.v_neg_pu = np.zeros(n, dtype=complex)
+        self.v_zero_pu = np.zeros(n, dtype=complex)
+        self.v_angle = np.zeros(n)
+        self.v_meas_pu = np.full(n, np.nan)
+        self.v_high_pu = np.full(n, np.nan)
+        self.v_low_pu = np.full(n, np.nan)
+        self.p_avl_pu = np.full(n, np.nan)
+        self.p_dem_pu = np.full(n, np.nan)
+        self.v_lpf = LowPassFilterArray(n, der_obj=self)
+
+        # Operating status
+        self.der_status_code = np.array([d.der_status_code for d in self.ders], dtype=np.int8)
+        self.es_vft_delay = ConditionalDelayArray(n, der_obj=self)
+        self.es_rand_delay = TimeDelayArray(n, der_obj=self)
+        self.es_randomized_delay_time = np.zeros(n)
+        self.es_crit = np.zeros(n, dtype=bool)
+        self.trip_delays = {name: ConditionalDelayArray(n, der_obj=self) for name in ['UV1', 'OV1', 'UV2', 'OV2',
+                                                                        'UF1', 'OF1', 'UF2', 'OF2']}
+        self.trip_crit = np.zeros(n, dtype=bool)
+        self.rt_mode_v_code = np.full(n, NO_MODE, dtype=np.int8)
+        self.rt_mode_f_code = np.full(n, NO_MODE, dtype=np.int8)
+        self.rt_pass_time_req = np.zeros(n, dtype=bool)
+        self.rt_time_lv = np.zeros(n)
+        self.rt_time_hv = np.zeros(n)
+        self.rt_time_hf = np.zeros(n)
+        self.rt_time_lf = np.zeros(n)
+
+        # BESS specific
+        self.bess_soc = np.array([d.bessspecific.soc_calc.bess_soc if b else np.nan
+                                  for d, b in zip(self.ders, self.is_bess)], dtype=float)
+        self.p_max_charge_pu = np.ones(n)
+        self.p_max_discharge_pu = np.ones(n)
+        self.p_dem_ramp = RampingArray(n, der_obj=self)
+        self.p_dem_ramp_pu = np.full(n, np.nan)
+
+        # Active power support functions
+        self.ap_limit_ramping = RampingArray(n, der_obj=self)
+        self.ap_limit_delay = TimeDelayArray(n, der_obj=self)
+        self.ap_limit_rt = np.full(n, np.nan)
+        self.pv_lpf = LowPassFilterArray(n, der_obj=self)
+        self.pv_delay = TimeDelayArray(n, der_obj=self)
+        self.p_pv_limit_ref_w = np.full(n, np.nan)
+        self.p_pv_limit_pu = np.full(n, np.nan)
+        self.pf_lpf = LowPassFilterArray(n, der_obj=self)
+        self.pf_delay = TimeDelayArray(n, der_obj=self)
+        self.pf_uf_active_ff = FlipFlopArray(n, 0)
+        self.pf_of_active_ff = FlipFlopArray(n, 0)
+        self.pf_initialized = np.zeros(n, dtype=bool)
+        self.pf_uf_prev = np.zeros(n, dtype=bool)
+        self.pf_of_prev = np.zeros(n, dtype=bool)
+        self.p_pf_pre_pu_prev = np.full(n, np.nan)
+        self.pf_uf_active = np.zeros(n, dtype=bool)
+        self.pf_of_active = np.zeros(n, dtype=bool)
+        self.p_pf_pu = np.zeros(n)
+        self.es_rrl = RampingArray(n, der_obj=self)
+        self.p_es_pu = np.full(n, np.nan)
+        self.es_completed = np.array([bool(d.activepowerfunc.es_completed) for d in self.ders])
+
+        # Reactive power support functions
+        self.const_pf_lpf = LowPassFilterArray(n, der_obj=self)
+        self.const_pf_delay = TimeDelayArray(n, der_obj=self)
+        self.q_const_pf_desired_ref_pu = np.zeros(n)
+        self.const_q_lpf = LowPassFilterArray(n, der_obj=self)
+        self.const_q_delay = TimeDelayArray(n, der_obj=self)
+        self.qv_lpf = LowPassFilterArray(n, der_obj=self)
+        self.qv_delay = TimeDelayArray(n, der_obj=self)
+        self.qv_vref_lpf = LowPassFilterArray(n, der_obj=self)
+        self.q_qv_desired_ref_pu = np.full(n, np.nan)
+        self.qp_lpf = LowPassFilterArray(n, der_obj=self)
+        self.qp_delay = TimeDelayArray(n, der_obj=self)
+        self.q_qp_desired_ref_pu = np.full(n, np.nan)
+        self.q_const_pf_desired_pu = np.zeros(n)
+        self.q_const_q_desired_pu = np.zeros(n)
+        self.q_qv_desired_pu = np.zeros(n)
+        self.q_qp_desired_pu = np.zeros(n)
+        self.q_mode_enable_prev = np.full((n, 4), -1, dtype=np.int8)
+        self.desired_var_ramp = RampingArray(n, der_obj=self)
+        self.desired_var_ff = FlipFlopArray(n, 0)
+        self.q_mode_ramp_flag = np.zeros(n, dtype=bool)
+
+        # Ride-through performance
+        self.rt_ctrl_code = np.full(n, NO_MODE, dtype=np.int8)
+        self.rt_return_from_mc_delay = ConditionalDelayArray(n, der_obj=self)
+        self.rt_cte_cond_delay = ConditionalDelayArray(n, der_obj=self)
+        self.rt_mc_cond_delay = ConditionalDelayArray(n, der_obj=self)
+        self.i_pos_lpf = LowPassFilterArray(n, complex, der_obj=self)
+        self.i_neg_lpf = LowPassFilterArray(n, complex, der_obj=self)
+        self.i_pos_d_rrl = RampingArray(n, der_obj=self)
+        self.i_pos_d_ref_pu = np.zeros(n)
+        self.i_pos_q_ref_pu = np.zeros(n)
+        self.i_neg_ref_pu = np.zeros(n, dtype=complex)
+        self.i_pos_d_rrl_ref_pu = np.zeros(n)
+
+        # Intermediate variables and outputs
+        self.p_desired_pu = np.full(n, np.nan)
+        self.q_desired_pu = np.full(n, np.nan)
+        self.p_limited_w = np.full(n, np.nan)
+        self.q_limited_var = np.full(n, np.nan)
+        self.i_pos_pu = np.zeros(n, dtype=complex)
+        self.i_neg_pu = np.zeros(n, dtype=complex)
+        self.p_out_w = np.full(n, np.nan)
+        self.q_out_var = np.full(n, np.nan)
+        self.p_out_pu = np.zeros(n)
+        self.q_out_pu = np.zeros(n)
+        self.p_out_kw = np.zeros(n)
+        self.q_out_kvar = np.zeros(n)
+
+    def __setattr__(self, name, value):
+        # Arrays bound to external memory (see bind_arrays) are written in place, so that they stay in that memory
+        bound = self.__dict__.get('_bound')
+        if bound and name in bound:
+            self.__dict__[name][...] = value
+        else:
+            object.__setattr__(self, name, value)
+
+    def fleet_arrays(self) -> dict:
+        """
+        Input, state and output arrays of the fleet with one row per DER, including the state arrays of the filters,
+        ramps, delays and flip-flops, by attribute path, e.g. 'p_out_w', 'v_lpf.lpf_out_prev' or
+        'trip_delays.UV1.con_del_enable_int'
+        """
+        arrays = {}
+        stack = [('', self)]
+        while stack:
+            prefix, obj = stack.pop()
+            items = obj.items() if isinstance(obj, dict) else vars(obj).items()
+            for name, value in items:
+                if isinstance(value, np.ndarray):
+                    if value.ndim and value.shape[0] == self.n and value.dtype.kind != 'O':
+                        arrays[prefix + name] = value
+                elif isinstance(value, (dict, LowPassFilterArray, RampingArray, ConditionalDelayArray, FlipFlopArray,
+                                        TimeDelayArray)):
+                    stack.append((prefix + name + '.', value))
+        return arrays
+
+    def bind_arrays(self, arrays: dict) -> None:
+        """
+        Keep the fleet arrays in externally allocated arrays of the same shape, e.g. views of a shared memory block
+        (see SharedFleetArrays). The current values are copied into them, and the fleet then reads and writes them in
+        place. TimeDelayArray queues growing beyond their capacity are reallocated in the process memory.
+
+        :param arrays: Arrays by attribute path, as returned by fleet_arrays()
+        """
+        bound = set()
+        for path, array in arrays.items():
+            obj, name = _owner(self, path)
+            array[...] = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+            if obj is self:
+                bound.add(name)
+                object.__setattr__(self, name, array)
+            elif isinstance(obj, dict):
+                obj[name] = array
+            else:
+                setattr(obj, name, array)
+        self._bound = bound
+
+    def unbind_arrays(self) -> None:
+        """
+        Copy the arrays bound by bind_arrays() back to the process memory, e.g. before the shared memory is released
+        """
+        self._bound = None
+        for path, array in self.fleet_arrays().items():
+            obj, name = _owner(self, path)
+            if isinstance(obj, dict):
+                obj[name] = array.copy()
+            else:
+                setattr(obj, name, array.copy())
+
+    @property
+    def t_s(self) -> float:
+        # Simulation time step of the fleet, or the global DER.t_s if not assigned
+        return der.DER.t_s if self._t_s is None else self._t_s
+
+    @t_s.setter
+    def t_s(self, t_s: float):
+        self._t_s = t_s
+
+    @property
+    def der_status(self) -> np.ndarray:
+        return _code_to_name(self.der_status_code, STATUS_NAMES)
+
+    @property
+    def rt_mode_v(self) -> np.ndarray:
+        return _code_to_name(self.rt_mode_v_code, STATUS_NAMES)
+
+    @property
+    def rt_mode_f(self) -> np.ndarray:
+        return _code_to_name(self.rt_mode_f_code, STATUS_NAMES)
+
+    @property
+    def rt_ctrl(self) -> np.ndarray:
+        return _code_to_name(self.rt_ctrl_code, RT_CTRL_NAMES)
+
+    def update_der_input(self, p_dc_kw=None, v=None, theta=None, v_symm_pu=None, f=None, v_pu=None, p_dc_pu=None,
+                         p_dc_w=None, p_dem_w=None, p_dem_pu=None, p_dem_kw=None) -> None:
+        """
+        Update inputs of all DERs in the fleet. Each argument can be a scalar (applied to all DERs), or an array with
+        one element per DER. Voltage magnitudes and angles can also be an array of shape (n, 3) for three phase DERs.
+
+        :param p_dc_w: Available DC power in W
+        :param p_dc_kw:	Available DC power in kW
+        :param p_dc_pu:	Available DC power in per unit
+        :param p_dem_w: Active power demand in W (BESS DERs)
+        :param p_dem_kw: Active power demand in kW (BESS DERs)
+        :param p_dem_pu: Active power demand in per unit (BESS DERs)
+        :param v: DER RPA voltage in Volt
+        :param v_pu: DER RPA voltage in per unit
+        :param v_symm_pu: Array (n, 2) or (n, 3) of DER RPA voltage in per unit as complex number for positive,
+                          negative, and zero sequences
+        :param theta: DER RPA voltage angles
+        :param f: DER RPA frequency in Hertz
+        """
+        inputs = der_input_arrays(self.settings, p_dc_kw, v, theta, v_symm_pu, f, v_pu, p_dc_pu, p_dc_w, p_dem_w,
+                                  p_dem_pu, p_dem_kw)
+        for name, value in inputs.items():
+            setattr(self, name, value)
+
+    def run(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Main calculation loop. Step all DERs in the fleet by one simulation time step.
+        """
+
+        # Elapsed time calculation
+        self.time = self.time + self.t_s
+        self.diagnostics.next_step()
+
+        # Apply scheduled setting changes, and re-extract the settings if any was applied
+        if self._scheduled:
+            self.apply_scheduled_settings()
+
+        # Input processing
+        self.operating_condition_input_processing()
+
+        # Determine DER operating status
+        self.determine_der_status()
+
+        # BESS DER specific (SoC and ramp rate limit of active power demand)
+        if self.is_bess.any():
+            self.bess_specific()
+
+        # Calculate desired active power
+        self.calculate_p_funcs()
+
+        # Calculate desired reactive power
+        self.calculate_reactive_funcs()
+
+        # Limit DER output based on kVA rating and DER capability curve
+        self.calculate_limited_pq()
+
+        # Calculate DER output positive and negative sequence current based on ride-through performance
+        self.der_rem_operation()
+
+        # Generate DER model output value
+        self.calculate_p_q_output()
+
+        return self.p_out_w, self.q_out_var
+
+    def get_der_output(self, output: str = 'PQ_pu') -> Union[Tuple[np.ndarray, np.ndarray], Tuple[None, None]]:
+        """
+        Get DER model outputs of the fleet.
+
+        :param output: supports 'PQ_VA', 'PQ_kVA', 'PQ_pu', 'Ipn_pu'
+        """
+        if output == 'PQ_VA':
+            return self.p_out_w, self.q_out_var
+        elif output == 'PQ_kVA':
+            return self.p_out_kw, self.q_out_kvar
+        elif output == 'PQ_pu':
+            return self.p_out_pu, self.q_out_pu
+        elif output == 'Ipn_pu':
+            return self.i_pos_pu, self.i_neg_pu
+        else:
+            print("please use 'PQ_VA', 'PQ_kVA', 'PQ_pu', 'Ipn_pu'")
+            return None, None
+
+    def operating_condition_input_processing(self):
+        """
+        Array version of DERInputs.operating_condition_input_processing
+        EPRI Report Reference: Section 3.3 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        three = s.three_phase
+
+        # perform input validity check
+        self.operating_conditions_validity_check()
+
+        with np.errstate(invalid='ignore'):
+            # Eq. 3.3.1-1, calculate per unit value of three phase voltage
+            v_abc_pu = (math.sqrt(3) * self.v_abc) / s.NP_AC_V_NOM[:, None]
+            v_a_pu, v_b_pu, v_c_pu = v_abc_pu[:, 0], v_abc_pu[:, 1], v_abc_pu[:, 2]
+            theta_a, theta_b, theta_c = self.theta_abc[:, 0], self.theta_abc[:, 1], self.theta_abc[:, 2]
+
+            # Eq. 3.3.1-2, calculate symmetrical components and voltage angle from the positive sequence voltage
+            v_zero_pu = (v_a_pu * np.exp(1j * theta_a) + (v_b_pu * np.exp(1j * theta_b))
+                         + (v_c_pu * np.exp(1j * theta_c))) / 3
+            v_pos_pu = (v_a_pu * np.exp(1j * theta_a)
+                        + (v_b_pu * np.exp(1j * ((2 / 3) * math.pi + theta_b)))
+                        + (v_c_pu * np.exp(1j * ((-2 / 3) * math.pi + theta_c)))) / 3
+            v_neg_pu = (v_a_pu * np.exp(1j * theta_a)
+                        + (v_b_pu * np.exp(1j * ((-2 / 3) * math.pi + theta_b)))
+                        + (v_c_pu * np.exp(1j * ((2 / 3) * math.pi + theta_c)))) / 3
+
+            # Eq. 3.3.1-3 and -4, average of three phase RMS value, or positive sequence component
+            v_meas_in = np.where(s.v_meas_pos, np.abs(v_pos_pu), (v_a_pu + v_b_pu + v_c_pu) / 3)
+
+            # Eq. 3.3.1-5, calculate phase-to-phase voltages
+            v_ab_pu = np.abs((v_a_pu - v_b_pu * np.exp((theta_b - theta_a) * 1j)) / math.sqrt(3))
+            v_bc_pu = np.abs((v_b_pu - v_c_pu * np.exp((theta_c - theta_b) * 1j)) / math.sqrt(3))
+            v_ca_pu = np.abs((v_c_pu - v_a_pu * np.exp((theta_a - theta_c) * 1j)) / math.sqrt(3))
+
+            # Eq. 3.3.1-6, calculate maximum and minimum voltages
+            v_all = np.stack([v_a_pu, v_b_pu, v_c_pu, v_ab_pu, v_bc_pu, v_ca_pu])
+            v_low_pu = v_all.min(axis=0)
+            v_high_pu = v_all.max(axis=0)
+
+            # Eq. 3.3.1-7, single phase applicable voltages
+            v_single_pu = self.v_abc[:, 0] / s.NP_AC_V_NOM
+            v_pos_single_pu = v_single_pu * np.exp(1j * theta_a)
+
+        self.v_pos_pu = np.where(three, v_pos_pu, v_pos_single_pu)
+        self.v_neg_pu = np.where(three, v_neg_pu, 0)
+        self.v_zero_pu = np.where(three, v_zero_pu, 0)
+        self.v_low_pu = np.where(three, v_low_pu, v_single_pu)
+        self.v_high_pu = np.where(three, v_high_pu, v_single_pu)
+        self.v_angle = np.angle(self.v_pos_pu)
+        self.v_meas_pu = self.v_lpf.low_pass_filter(np.where(three, v_meas_in, v_single_pu), s.NP_V_MEAS_DELAY)
+
+        # Eq. 3.3.2-1, For PV DER: available power in per unit considering efficiency
+        self.p_avl_pu = self.p_dc_w / s.NP_P_MAX * s.NP_EFFICIENCY
+
+        # For BESS DER: Eq. 3.3.3-1, DER active power demand in per unit, Eq. 3.3.3-2, DER available power is max
+        dem = ~np.isnan(self.p_dem_w)
+        self.p_dem_pu = np.where(dem, self.p_dem_w / s.NP_P_MAX, self.p_dem_pu)
+        self.p_avl_pu = np.where(dem, 1, self.p_avl_pu)
+        if np.any(self.is_bess & ~dem):
+            raise ValueError("ValueError: p_dem_w is not defined for BESS DERs!")
+
+    def operating_conditions_validity_check(self):
+        """
+        Validity Check for DER Model operating conditions
+        Reference: Table 3-5 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        single = s.single_phase
+        three = s.three_phase
+
+        if np.any(single & np.isnan(self.v_abc[:, 0])) or np.any(three & np.isnan(self.v_abc).any(axis=1)):
+            raise ValueError("ValueError: V is not defined!")
+
+        negative = single & (self.v_abc[:, 0] < 0)
+        if negative.any():
+            self.diagnostics.report('V_NEGATIVE', negative)
+            self.v_abc[negative, 0] = -self.v_abc[negative, 0]
+
+        if np.any(three & (self.v_abc < 0).any(axis=1)):
+            raise ValueError("ValueError: check failed for v_a, v_b, v_c")
+
+        no_theta = single & np.isnan(self.theta_abc[:, 0])
+        if no_theta.any():
+            self.diagnostics.report('THETA_UNDEFINED', no_theta)
+            self.theta_abc[no_theta, 0] = 0
+        for phase, theta_default in enumerate([0, -2 * math.pi / 3, 2 * math.pi / 3]):
+            no_theta = three & np.isnan(self.theta_abc[:, phase])
+            self.theta_abc[no_theta, phase] = theta_default
+
+        no_freq = np.isnan(self.freq_hz)
+        if no_freq.any():
+            self.diagnostics.report('F_UNDEFINED', no_freq)
+            self.freq_hz[no_freq] = 60
+
+        no_p_dc = np.isnan(self.p_dc_w)
+        self.diagnostics.report('P_DC_UNDEFINED', no_p_dc & s.type_pv)
+        self.p_dc_w[no_p_dc] = 0
+
+        negative = self.p_dc_w < 0
+        if negative.any():
+            self.diagnostics.report('P_DC_NEGATIVE', negative)
+            self.p_dc_w[negative] = 0
+
+    def determine_der_status(self):
+        """
+        Array version of OperatingStatus.determine_der_status
+        EPRI Report Reference: Section 3.5.1.4 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        status = self.der_status_code
+
+        # Enter service criteria (Section 3.5.1.1 in Report #3002030962: IEEE 1547-2018 OpenDER Model)
+        self.es_decision()
+
+        # Trip criteria (Section 3.5.1.2 in Report #3002030962: IEEE 1547-2018 OpenDER Model)
+        self.trip_decision()
+
+        # Ride-through criteria (Section 3.5.1.3 in Report #3002030962: IEEE 1547-2018 OpenDER Model)
+        self.determine_ride_through_mode()
+
+        # Eq 3.5.1-57,58, If DER is in Trip condition, and enter service criteria is met, depending on whether
+        # simulation time step is greater than the ramp time, DER goes to "Entering Service" or "Continuous Operation"
+        enter = (status == TRIP) & self.es_crit
+        status = np.where(enter, np.where(self.t_s <= s.ES_RAMP_RATE, ENTERING_SERVICE, CONTINUOUS_OPERATION),
+                          status)
+
+        # Eq 3.5.1-59~64, If DER is not Tripped, DER status depends on ride-through modes
+        on = status != TRIP
+        mode_v = self.rt_mode_v_code
+        mode_f = self.rt_mode_f_code
+        normal = ~((mode_f == NOT_DEFINED) | np.isin(mode_v, [CEASE_TO_ENERGIZE, PERMISSIVE_OPERATION,
+                                                             MOMENTARY_CESSATION])
+                   | (mode_v == MANDATORY_OPERATION) | (mode_f == MANDATORY_OPERATION))
+        rt_status = np.where(mode_f == NOT_DEFINED, NOT_DEFINED,
+                    np.where(np.isin(mode_v, [CEASE_TO_ENERGIZE, PERMISSIVE_OPERATION, MOMENTARY_CESSATION]), mode_v,
+                    np.where((mode_v == MANDATORY_OPERATION) | (mode_f == MANDATORY_OPERATION), MANDATORY_OPERATION,
+                    np.where(self.es_completed, CONTINUOUS_OPERATION, ENTERING_SERVICE))))
+        status = np.where(on, rt_status, status)
+
+        # If DER is in continuous operation, reset the flag that indicates required ride-through time has passed
+        self.rt_pass_time_req[on & normal] = False
+
+        # Eq. 3.5.1-65, if trip criteria is met, DER goes to Trip mode
+        status = np.where(self.trip_crit, TRIP, status)
+
+        self.der_status_code = status.astype(np.int8)
+
+    def es_decision(self):
+        """
+        Array version of EnterServiceCrit.es_decision
+        EPRI Report Reference: Section 3.5.1.1 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+
+        # Eq 3.5.1-1, enter service logic of voltage and frequency checks
+        es_vf_crit = (self.v_low_pu >= s.ES_V_LOW) & (self.v_high_pu <= s.ES_V_HIGH) \
+                     & (self.freq_hz >= s.ES_F_LOW) & (self.freq_hz <= s.ES_F_HIGH) & s.ES_PERMIT_SERVICE
+
+        # Eq 3.5.1-2 and -3, conditional delayed enable, no other enter service criteria for the DERs
+        es_vfto_crit = self.es_vft_delay.con_del_enable(es_vf_crit, s.ES_DELAY)
+
+        # Eq 3.5.1-4, generate the enter service randomized delay, in the order of DERs in the fleet, or from the
+        # random generator of each DER
+        tripped = self.der_status_code == TRIP
+        actual = tripped & (s.ES_RANDOMIZED_DELAY_ACTUAL > 0) & es_vfto_crit
+        randomized = tripped & ~actual & (s.ES_RAMP_RATE == 0) & (s.ES_RANDOMIZED_DELAY > 0) & (s.NP_VA_MAX < 500e3)
+        new_draw = np.flatnonzero(randomized & (self.es_randomized_delay_time == 0))
+        delay_time = np.where(actual, s.ES_RANDOMIZED_DELAY_ACTUAL,
+                              np.where(randomized, self.es_randomized_delay_time, 0))
+        for i in new_draw:
+            rng = np.random if self.rngs is None else self.rngs[i]
+            delay_time[i] = rng.random() * s.ES_RANDOMIZED_DELAY[i]
+        self.es_randomized_delay_time = delay_time
+
+        # Eq 3.5.1-5, apply the randomized delay
+        self.es_crit = self.es_rand_delay.tdelay(es_vfto_crit, self.es_randomized_delay_time).astype(bool)
+
+    def trip_decision(self):
+        """
+        Array version of TripCrit.trip_decision
+        EPRI Report Reference: Section 3.5.1.2 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        d = self.trip_delays
+
+        # Eq 3.5.1-6, under- and over-voltage, under- and over-frequency trip criterion using conditional delayed enable
+        vf_trip = d['UV1'].con_del_enable(self.v_low_pu < s.UV1_TRIP_V, s.UV1_TRIP_T) \
+            | d['OV1'].con_del_enable(self.v_high_pu > s.OV1_TRIP_V, s.OV1_TRIP_T) \
+            | d['UV2'].con_del_enable(self.v_low_pu < s.UV2_TRIP_V, s.UV2_TRIP_T) \
+            | d['OV2'].con_del_enable(self.v_high_pu > s.OV2_TRIP_V, s.OV2_TRIP_T) \
+            | d['UF1'].con_del_enable(self.freq_hz < s.UF1_TRIP_F, s.UF1_TRIP_T) \
+            | d['OF1'].con_del_enable(self.freq_hz > s.OF1_TRIP_F, s.OF1_TRIP_T) \
+            | d['UF2'].con_del_enable(self.freq_hz < s.UF2_TRIP_F, s.UF2_TRIP_T) \
+            | d['OF2'].con_del_enable(self.freq_hz > s.OF2_TRIP_F, s.OF2_TRIP_T)
+
+        # Eq 3.5.1-7 Decision depending on abnormal voltage and frequency trip settings and permit service setting
+        self.trip_crit = vf_trip | ~s.ES_PERMIT_SERVICE
+
+    def _set_rt_mode_v(self, mode, cond):
+        # Same priority as the RideThroughCrit.rt_mode_v setter: Momentary Cessation and Cease to Energize always
+        # apply, other modes only override a mode with lower or equal priority
+        allowed = cond & ((mode >= MOMENTARY_CESSATION) | (self.rt_mode_v_code <= mode))
+        self.rt_mode_v_code = np.where(allowed, mode, self.rt_mode_v_code).astype(np.int8)
+
+    def determine_ride_through_mode(self):
+        """
+        Array version of RideThroughCrit.determine_ride_through_mode
+        EPRI Report Reference: Section 3.5.1.3 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        t_s = self.t_s
+        v_high = self.v_high_pu
+        v_low = self.v_low_pu
+        freq = self.freq_hz
+        cat = s.abnormal_op_cat
+        mc_hv = s.MC_ENABLE & (v_high >= s.MC_HVRT_V1)
+        mc_lv = s.MC_ENABLE & (v_low <= s.MC_LVRT_V1)
+
+        # Eq 3.5.1-8, clear and re-determine the abnormal voltage ride-through mode
+        self.rt_mode_v_code = np.full(self.n, NO_MODE, dtype=np.int8)
+
+        # Eq 3.5.1-9, -21, -35, high voltage ride-through timer
+        hv = (cat > 0) & (1.1 < v_high)
+        self.rt_time_hv = np.where(hv, self.rt_time_hv + t_s, self.rt_time_hv)
+        t_hv = self.rt_time_hv
+
+        # Eq 3.5.1-13, -25, -39, low voltage ride-through timer
+        lv = (cat > 0) & (v_low < 0.88)
+        self.rt_time_lv = np.where(lv, self.rt_time_lv + t_s, self.rt_time_lv)
+        t_lv = self.rt_time_lv
+
+        # Category I and II, Eq 3.5.1-10~12, -22~24
+        hv12 = hv & ((cat == 1) | (cat == 2))
+        self._set_rt_mode_v(PERMISSIVE_OPERATION, hv12 & (v_high <= 1.2))
+        self._set_rt_mode_v(CEASE_TO_ENERGIZE, hv12 & (v_high > 1.2))
+        v3 = np.where(cat == 1, 1.175, 1.15)
+        self.rt_pass_time_req |= hv12 & (((t_hv <= 1) & (1.1 < v_high) & (v_high <= 1.15))
+                                         | ((t_hv <= 0.5) & (1.15 < v_high) & (v_high <= 1.175))
+                                         | ((t_hv <= 0.2) & (v3 < v_high) & (v_high <= 1.2)))
+
+        # Category I, Eq 3.5.1-14~18
+        lv1 = lv & (cat == 1)
+        c = lv1 & (0.7 <= v_low) & (v_low < 0.88)
+        self._set_rt_mode_v(MANDATORY_OPERATION, c)
+        self.rt_pass_time_req |= c & (t_lv > 0.7 + 4 * (v_low - 0.7))
+        c = lv1 & (0.5 <= v_low) & (v_low < 0.7)
+        self._set_rt_mode_v(PERMISSIVE_OPERATION, c)
+        self.rt_pass_time_req |= c & (t_lv > 0.16)
+        self._set_rt_mode_v(CEASE_TO_ENERGIZE, lv1 & (v_low < 0.5))
+
+        # Category II, Eq 3.5.1-26~32
+        lv2 = lv & (cat == 2)
+        c = lv2 & (0.65 <= v_low) & (v_low < 0.88)
+        self._set_rt_mode_v(MANDATORY_OPERATION, c)
+        self.rt_pass_time_req |= c & (t_lv > 3 + 8.7 * (v_low - 0.65))
+        c = lv2 & (0.45 <= v_low) & (v_low < 0.65)
+        self._set_rt_mode_v(PERMISSIVE_OPERATION, c)
+        self.rt_pass_time_req |= c & (t_lv > 0.32)
+        c = lv2 & (0.3 <= v_low) & (v_low < 0.45)
+        self._set_rt_mode_v(PERMISSIVE_OPERATION, c)
+        self.rt_pass_time_req |= c & (t_lv > 0.16)
+        self._set_rt_mode_v(CEASE_TO_ENERGIZE, lv2 & (v_low < 0.3))
+
+        # Category I and II, Eq 3.5.1-19,20, -33,34, momentary cessation region
+        cat12 = (cat == 1) | (cat == 2)
+        self._set_rt_mode_v(MOMENTARY_CESSATION, cat12 & mc_hv)
+        self._set_rt_mode_v(MOMENTARY_CESSATION, cat12 & mc_lv)
+
+        # Category III, Eq 3.5.1-36~38
+        hv3 = hv & (cat == 3)
+        self._set_rt_mode_v(MOMENTARY_CESSATION, hv3 & mc_hv)
+        self._set_rt_mode_v(MANDATORY_OPERATION, hv3 & ~mc_hv)
+        self.rt_pass_time_req |= hv3 & (t_hv <= 12)
+
+        # Category III, Eq 3.5.1-40~46
+        lv3 = lv & (cat == 3)
+        c = lv3 & (0.7 <= v_low) & (v_low < 0.88)
+        self._set_rt_mode_v(MANDATORY_OPERATION, c)
+        self.rt_pass_time_req |= c & (t_lv > 20)
+        self.rt_pass_time_req |= lv3 & (v_low < 0.7) & (t_lv > 10)
+        self._set_rt_mode_v(MOMENTARY_CESSATION, lv3 & mc_lv)
+        self._set_rt_mode_v(MANDATORY_OPERATION, lv3 & ~mc_lv)
+        self.rt_pass_time_req |= lv3 & (v_low <= 0.5) & (t_lv > 1)
+
+        # Eq 3.5.1-47, Continuous operation if voltage is between 0.88-1.1, reset timers
+        c = (v_low >= 0.88) & (v_high <= 1.1)
+        self._set_rt_mode_v(CONTINUOUS_OPERATION, c)
+        self.rt_time_lv = np.where(c, 0, self.rt_time_lv)
+        self.rt_time_hv = np.where(c, 0, self.rt_time_hv)
+
+        # Eq 3.5.1-48, Continuous operation if frequency is between 58.5 and 61.2, reset timers
+        c = (58.5 <= freq) & (freq <= 61.2)
+        self.rt_mode_f_code = np.where(c, CONTINUOUS_OPERATION, self.rt_mode_f_code)
+        self.rt_time_hf = np.where(c, 0, self.rt_time_hf)
+        self.rt_time_lf = np.where(c, 0, self.rt_time_lf)
+
+        # Eq 3.5.1-49~52, high frequency ride-through
+        c = 61.2 <= freq
+        self.rt_time_hf = np.where(c, self.rt_time_hf + t_s, self.rt_time_hf)
+        self.rt_mode_f_code = np.where(c, np.where(freq <= 61.8, MANDATORY_OPERATION, NOT_DEFINED),
+                                       self.rt_mode_f_code)
+        self.rt_pass_time_req |= c & (self.rt_time_hf > 299)
+
+        # Eq 3.5.1-53~56, low frequency ride-through
+        c = freq <= 58.8
+        self.rt_time_lf = np.where(c, self.rt_time_lf + t_s, self.rt_time_lf)
+        self.rt_mode_f_code = np.where(c, np.where(57.0 <= freq, MANDATORY_OPERATION, NOT_DEFINED),
+                                       self.rt_mode_f_code).astype(np.int8)
+        self.rt_pass_time_req |= c & (self.rt_time_lf > 299)
+
+    def bess_specific(self):
+        """
+        Array version of BESSspecific.run
+        EPRI Report Reference: Section 3.6 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        t_s = self.t_s
+        bess = self.is_bess
+
+        if t_s <= 7200:
+            soc = bess & ~np.isnan(s.NP_BESS_CAPACITY)
+        else:
+            soc = np.zeros(self.n, dtype=bool)
+
+        if soc.any():
+            # Eq. 3.6.1-1~3, charging and discharging power from output power in previous time step
+            p_out_w = np.where(np.isnan(self.p_out_w), 0, self.p_out_w)
+            p_discharge_w = np.where(p_out_w > 0, p_out_w, 0)
+            p_charge_w = np.where(p_out_w > 0, 0, -p_out_w)
+
+            # Eq. 3.6.1-4, Calculate SOC based on energy capacity, efficiency, discharge rate, and simulation time step
+            bess_soc = self.bess_soc + (((s.NP_EFFICIENCY * p_charge_w - p_discharge_w) / s.NP_BESS_CAPACITY)
+                                        - s.NP_BESS_SELF_DISCHARGE - s.NP_BESS_SELF_DISCHARGE_SOC * self.bess_soc) \
+                * t_s / 3600
+
+            # Report diagnostics if max or min SOC is reached
+            self.diagnostics.report('SOC_MAX', soc & (bess_soc >= s.NP_BESS_SOC_MAX))
+            self.diagnostics.report('SOC_MIN', soc & (bess_soc <= s.NP_BESS_SOC_MIN))
+
+            # Eq. 3.6.1-5, Set SOC to 0 if lower than 0
+            bess_soc = np.where(bess_soc <= 0, 0, bess_soc)
+            self.bess_soc = np.where(soc, bess_soc, self.bess_soc)
+
+            # Eq. 3.6.2-1~4, maximum discharge and charge active power at current SOC and for the current time step
+            with np.errstate(divide='ignore', invalid='ignore'):
+                p_max_charge_pu_soc = interp_rows(self.bess_soc, s.SOC_P_CHARGE_MAX, s.P_CHARGE_MAX_PU)
+                p_max_discharge_pu_soc = interp_rows(self.bess_soc, s.SOC_P_DISCHARGE_MAX, s.P_DISCHARGE_MAX_PU)
+                p_max_charge_pu_ts = np.minimum(((s.NP_BESS_SOC_MAX - self.bess_soc) / t_s * 3600
+                                                 + s.NP_BESS_SELF_DISCHARGE_SOC * self.bess_soc
+                                                 + s.NP_BESS_SELF_DISCHARGE) * s.NP_BESS_CAPACITY
+                                                / s.NP_EFFICIENCY / s.NP_P_MAX_CHARGE, 1)
+                p_max_discharge_pu_ts = np.maximum(0, np.minimum(((self.bess_soc - s.NP_BESS_SOC_MIN) / t_s * 3600
+                                                                  - s.NP_BESS_SELF_DISCHARGE_SOC * self.bess_soc
+                                                                  - s.NP_BESS_SELF_DISCHARGE) * s.NP_BESS_CAPACITY
+                                                                 / s.NP_P_MAX, 1))
+            self.p_max_discharge_pu = np.where(soc, np.minimum(p_max_discharge_pu_soc, p_max_discharge_pu_ts), 1)
+            self.p_max_charge_pu = np.where(soc, np.minimum(p_max_charge_pu_soc, p_max_charge_pu_ts), 1)
+        else:
+            # Eq. 3.6.2-5, For snapshot analysis, the operational active power limits are set to 1
+            self.p_max_discharge_pu = np.ones(self.n)
+            self.p_max_charge_pu = np.ones(self.n)
+
+        # 3.6.2-6, ramp rate limits considering battery operational constraints, reset when DER is tripped
+        on = self.der_status_code != TRIP
+        self.p_dem_ramp_pu = self.p_dem_ramp.ramp(np.where(on, self.p_dem_pu, 0),
+                                                  np.where(on, s.NP_BESS_P_RAMP_TIME, 0),
+                                                  np.where(on, s.NP_BESS_P_RAMP_TIME, 0), mask=bess)
+
+    def calculate_p_funcs(self):
+        """
+        Array version of DesiredActivePower.calculate_p_funcs
+        EPRI Report Reference: Section 3.7 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        on = self.der_status_code != TRIP
+        react = s.NP_REACT_TIME
+
+        # Active power limit function, Eq. 3.7.1-6~8
+        ap_limit_pu = np.where(s.AP_LIMIT > 0, s.AP_LIMIT, s.AP_LIMIT * s.NP_P_MAX_CHARGE / s.NP_P_MAX)
+        en = on & s.AP_LIMIT_ENABLE
+        ap_limit_ramp = self.ap_limit_ramping.ramp(np.where(en, ap_limit_pu, 1), np.where(en, s.AP_RT - react, 0),
+                                                   np.where(en, s.AP_RT - react, 0))
+        self.ap_limit_rt = self.ap_limit_delay.tdelay(np.where(en, ap_limit_ramp, 1), np.where(en, react, 0))
+
+        # Volt-watt function, Eq. 3.7.1-1~5
+        pv_curve_p1_w = s.PV_CURVE_P1 * s.NP_P_MAX
+        pv_curve_p2_w = s.PV_CURVE_P2 * np.where(s.PV_CURVE_P2 > 0, s.NP_P_MAX, s.NP_P_MAX_CHARGE)
+        v = self.v_meas_pu
+        ref_w = self.p_pv_limit_ref_w
+        ref_w = np.where(on & (v <= s.PV_CURVE_V1), pv_curve_p1_w, ref_w)
+        ref_w = np.where(on & (v >= s.PV_CURVE_V2), pv_curve_p2_w, ref_w)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ref_w = np.where(on & (s.PV_CURVE_V1 < v) & (v < s.PV_CURVE_V2),
+                             pv_curve_p1_w - (v - s.PV_CURVE_V1) / (s.PV_CURVE_V2 - s.PV_CURVE_V1)
+                             * (pv_curve_p1_w - pv_curve_p2_w), ref_w)
+        self.p_pv_limit_ref_w = ref_w
+        en = on & s.PV_MODE_ENABLE
+        p_pv_limit_lpf_pu = self.pv_lpf.low_pass_filter(np.where(en, ref_w / s.NP_P_MAX, 1),
+                                                        np.where(en, s.PV_OLRT - react, 0))
+        self.p_pv_limit_pu = self.pv_delay.tdelay(np.where(en, p_pv_limit_lpf_pu, 1), np.where(en, react, 0))
+
+        # Frequency-droop function
+        self.calculate_p_pf_pu(on)
+
+        # Enter service ramp performance, Eq 3.7.1-9,10
+        self.p_es_pu = self.es_rrl.ramp(np.where(on, 1.1, 0), np.where(on, s.ES_RAMP_RATE, 0), 0)
+
+        # Calculate final desired active power based on other functions
+        p_desired_pu = np.where(self.is_bess, self.calculate_p_desired_pu_bess(), self.calculate_p_desired_pu())
+
+        # Eq 3.7.1-19,20, enter service completed, or DER not in service
+        self.p_desired_pu = np.where(on, p_desired_pu, 0)
+        self.es_completed = np.where(on, self.es_completed | (self.p_es_pu > 1), False)
+
+    def calculate_p_pf_pu(self, on):
+        """
+        Array version of FreqDroop.calculate_p_pf_pu
+        EPRI Report Reference: Section 3.7.1.4 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        freq = self.freq_hz
+        react = s.NP_REACT_TIME
+        p_get_pu = np.where(self.is_bess, self.p_dem_pu, self.p_avl_pu)
+
+        # Eq. 3.7.1-11, detect if in under-frequency or over-frequency condition
+        pf_uf = (freq < (60 - s.PF_DBUF)) & s.PF_MODE_ENABLE
+        pf_of = (freq > (60 + s.PF_DBOF)) & s.PF_MODE_ENABLE
+
+        # Initialize internal state variables
+        first = on & ~self.pf_initialized
+        p_init_pu = np.minimum(np.minimum(p_get_pu, self.ap_limit_rt), self.p_pv_limit_pu)
+        self.pf_uf_prev = np.where(first, pf_uf, self.pf_uf_prev)
+        self.pf_of_prev = np.where(first, pf_of, self.pf_of_prev)
+        self.p_pf_pre_pu_prev = np.where(first, p_init_pu, self.p_pf_pre_pu_prev)
+        p_out_w_prev = np.where(first, np.minimum(np.minimum(p_get_pu * s.NP_P_MAX, self.ap_limit_rt * s.NP_P_MAX),
+                                                  self.p_pv_limit_pu * s.NP_P_MAX), self.p_out_w)
+        self.pf_initialized |= on
+
+        # Eq. 3.7.1-12, calculate pre-disturbance active power output
+        p_pf_pre_pu = np.where((pf_uf & self.pf_uf_prev) | (pf_of & self.pf_of_prev), self.p_pf_pre_pu_prev,
+                               p_out_w_prev / s.NP_P_MAX)
+
+        # Eq. 3.7.1-13 and -14, active power reference according to frequency-droop
+        p_pf_of_pu = np.maximum(p_pf_pre_pu - ((freq - (60 + s.PF_DBOF)) / (60 * s.PF_KOF)), s.NP_P_MIN_PU)
+        p_pf_uf_pu = np.minimum(p_pf_pre_pu + (((60 - s.PF_DBUF) - freq) / (60 * s.PF_KUF)), self.p_avl_pu)
+
+        # Eq. 3.7.1-15,16, calculate active power reference according to frequency-droop
+        p_pf_normal_pu = np.where(self.der_status_code == ENTERING_SERVICE, self.p_out_w / s.NP_P_MAX, p_get_pu)
+        p_pf_ref_pu = np.where(pf_of, p_pf_of_pu, np.where(pf_uf, p_pf_uf_pu, np.minimum(
+            np.minimum(p_pf_normal_pu, self.ap_limit_rt), self.p_pv_limit_pu)))
+
+        # Eq. 3.7.1-17, apply the low pass filter and reaction time delay
+        pf_olrt_appl = np.where(pf_uf | pf_of | self.pf_uf_active | self.pf_of_active, s.PF_OLRT, 0)
+        p_pf_lpf_pu = self.pf_lpf.low_pass_filter(p_pf_ref_pu, pf_olrt_appl - react, mask=on)
+        p_pf_pu = self.pf_delay.tdelay(p_pf_lpf_pu, react, mask=on)
+
+        # Eq. 3.7.1-18, decide if frequency droop function is active
+        settled = np.abs(p_pf_pu - p_pf_ref_pu) < 1.e-3
+        self.pf_uf_active = self.pf_uf_active_ff.flipflop(pf_uf, ~pf_uf & settled, mask=on)
+        self.pf_of_active = self.pf_of_active_ff.flipflop(pf_of, ~pf_of & settled, mask=on)
+
+        # Save the values for calculations in next time step
+        self.pf_uf_prev = np.where(on, pf_uf, self.pf_uf_prev)
+        self.pf_of_prev = np.where(on, pf_of, self.pf_of_prev)
+        self.p_pf_pre_pu_prev = np.where(on, p_pf_pre_pu, self.p_pf_pre_pu_prev)
+
+        # Eq. 3.7.1-19, reset if DER is tripped or function is disabled
+        reset = ~on | ~s.PF_MODE_ENABLE
+        p_pf_pu = self.pf_delay.tdelay(0, 0, mask=reset)
+        self.pf_lpf.low_pass_filter(0, 0, mask=reset)
+        self.p_pf_pu = np.where(on, p_pf_pu, self.p_pf_pu)
+
+    def calculate_p_desired_pu(self):
+        """
+        Array version of DesiredActivePower.calculate_p_desired_pu
+        EPRI Report Reference: Section 3.7.1.5 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        ap, pv = s.AP_LIMIT_ENABLE, s.PV_MODE_ENABLE
+        uf, of = self.pf_uf_active, self.pf_of_active
+        p_avl, p_es, p_pf = self.p_avl_pu, self.p_es_pu, self.p_pf_pu
+        ap_rt, pv_lim = self.ap_limit_rt, self.p_pv_limit_pu
+        mn = np.minimum
+
+        # Eq 3.7.1-18, calculate desired active power in per unit based on the enabling signals
+        no_pf = ~uf & ~of
+        p = np.full(self.n, np.nan)
+        p = np.where(~ap & ~pv & no_pf, mn(mn(p_avl, p_es), 1), p)
+        p = np.where(ap & ~pv & no_pf, mn(mn(mn(p_avl, p_es), ap_rt), 1), p)
+        p = np.where(~ap & pv & no_pf, mn(mn(mn(p_avl, p_es), pv_lim), 1), p)
+        p = np.where(ap & pv & no_pf, mn(mn(mn(p_avl, ap_rt), pv_lim), 1), p)
+        p = np.where(~pv & of, mn(mn(p_avl, p_pf), 1), p)
+        p = np.where(pv & of, mn(mn(mn(p_avl, pv_lim), p_pf), 1), p)
+        p = np.where(~pv & uf, mn(mn(p_avl, p_pf), 1), p)
+        p = np.where(pv & uf, mn(mn(mn(p_avl, pv_lim), p_pf), 1), p)
+        return p
+
+    def calculate_p_desired_pu_bess(self):
+        """
+        Array version of DesiredActivePowerBESS.calculate_p_desired_pu
+        EPRI Report Reference: Section 3.7.3.3 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        ap, pv = s.AP_LIMIT_ENABLE, s.PV_MODE_ENABLE
+        uf, of = self.pf_uf_active, self.pf_of_active
+        p_es, p_pf = self.p_es_pu, self.p_pf_pu
+        ap_rt, pv_lim = self.ap_limit_rt, self.p_pv_limit_pu
+        mn = np.minimum
+
+        # Eq 3.7.3-6, calculate active power demand considering enter service ramp
+        p_es_dem = np.maximum(mn(self.p_dem_ramp_pu, p_es), -p_es)
+
+        # Eq 3.7.3-7, calculate desired active power without considering BESS SoC related constraints
+        no_pf = ~uf & ~of
+        p = np.full(self.n, np.nan)
+        p = np.where(~ap & ~pv & no_pf, mn(p_es_dem, 1), p)
+        p = np.where(ap & ~pv & no_pf, mn(mn(p_es_dem, ap_rt), 1), p)
+        p = np.where(~ap & pv & no_pf, mn(mn(p_es_dem, pv_lim), 1), p)
+        p = np.where(ap & pv & no_pf, mn(mn(ap_rt, pv_lim), 1), p)
+        p = np.where(~pv & of, mn(p_pf, 1), p)
+        p = np.where(pv & of, mn(mn(mn(self.p_dem_pu, pv_lim), p_pf), 1), p)
+        p = np.where(~pv & uf, mn(p_pf, 1), p)
+        p = np.where(pv & uf, mn(mn(pv_lim, p_pf), 1), p)
+
+        # Eq. 3.7.3-8, calculate desired active power, considering maximum limits by SOC and nameplate ratings
+        return np.maximum(np.maximum(-self.p_max_charge_pu, -s.NP_P_MAX_CHARGE / s.NP_P_MAX),
+                          mn(p, self.p_max_discharge_pu))
+
+    def calculate_reactive_funcs(self):
+        """
+        Array version of DesiredReactivePower.calculate_reactive_funcs
+        EPRI Report Reference: Section 3.8 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        on = self.der_status_code != TRIP
+        react = s.NP_REACT_TIME
+        p = self.p_desired_pu
+
+        # Constant power factor function, Eq 3.8.1-1~3
+        with np.errstate(invalid='ignore', divide='ignore'):
+            q_pf = p * s.NP_P_MAX * (np.sqrt(1 - (s.CONST_PF ** 2)) / s.CONST_PF) / s.NP_VA_MAX
+            q_pf_abs = -p * s.NP_P_MAX * (np.sqrt(1 - (s.CONST_PF ** 2)) / s.CONST_PF) / s.NP_VA_MAX
+        ref = self.q_const_pf_desired_ref_pu
+        ref = np.where(on & s.pf_inj, q_pf, np.where(on & s.pf_abs, q_pf_abs, ref))
+        self.q_const_pf_desired_ref_pu = ref
+        lpf = self.const_pf_lpf.low_pass_filter(np.where(on, ref, 0), np.where(on, s.CONST_PF_RT - react, 0))
+        self.q_const_pf_desired_pu = self.const_pf_delay.tdelay(np.where(on, lpf, 0), np.where(on, react, 0))
+
+        # Constant reactive power function, Eq. 3.8.1-13,14
+        lpf = self.const_q_lpf.low_pass_filter(s.CONST_Q, s.CONST_Q_RT - react)
+        self.q_const_q_desired_pu = self.const_q_delay.tdelay(lpf, react)
+
+        # Volt-var function
+        self.calculate_q_qv_desired_var(on)
+
+        # Watt-var function
+        self.calculate_q_qp_desired_var(on)
+
+        # Calculate reactive power based on grid-support functions
+        self.calculate_q_desired_pu(on)
+
+    def calculate_q_qv_desired_var(self, on):
+        """
+        Array version of VoltVAR.calculate_q_qv_desired_var
+        EPRI Report Reference: Section 3.8.1.2 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        react = s.NP_REACT_TIME
+        v = self.v_meas_pu
+
+        # Eq 3.8.1-4, The applied VRef is determined by either the VRef control setpoint or low pass filtered voltage
+        qv_vref_lpf = self.qv_vref_lpf.low_pass_filter(v, np.where(on, s.QV_VREF_TIME * 2.3, 0))
+        qv_vref_lpf = np.maximum(s.QV_VREF_MIN, np.minimum(qv_vref_lpf, s.QV_VREF_MAX))
+        qv_vref_eff = np.where(s.QV_VREF_AUTO_MODE == 0, s.QV_VREF, qv_vref_lpf)
+
+        # Eq 3.8.1-5, The applied volt-var curve voltage settings shift according to the applied VRef.
+        v1 = s.QV_CURVE_V1 + qv_vref_eff - 1
+        v2 = s.QV_CURVE_V2 + qv_vref_eff - 1
+        v3 = s.QV_CURVE_V3 + qv_vref_eff - 1
+        v4 = s.QV_CURVE_V4 + qv_vref_eff - 1
+        q1, q2, q3, q4 = s.QV_CURVE_Q1, s.QV_CURVE_Q2, s.QV_CURVE_Q3, s.QV_CURVE_Q4
+
+        # Eq. 3.8.1-6, Volt-VAR Reactive power reference calculation in p.u
+        ref = self.q_qv_desired_ref_pu
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ref = np.where(on & (v < v1), q1, ref)
+            ref = np.where(on & (v2 > v) & (v >= v1), q1 - ((v - v1) / (v2 - v1)) * (q1 - q2), ref)
+            ref = np.where(on & (v3 > v) & (v >= v2), q2 - ((v - v2) / (v3 - v2)) * (q2 - q3), ref)
+            ref = np.where(on & (v4 > v) & (v >= v3), q3 - ((v - v3) / (v4 - v3)) * (q3 - q4), ref)
+            ref = np.where(on & (v >= v4), q4, ref)
+        self.q_qv_desired_ref_pu = ref
+
+        # Eq. 3.8.1-7, 8, OLRT using LPF followed by a time delay, reset to 0 if DER is tripped
+        lpf = self.qv_lpf.low_pass_filter(np.where(on, ref, 0), np.where(on, s.QV_OLRT - react, 0))
+        self.q_qv_desired_pu = self.qv_delay.tdelay(np.where(on, lpf, 0), np.where(on, react, 0))
+
+    def calculate_q_qp_desired_var(self, on):
+        """
+        Array version of WattVAR.calculate_q_qp_desired_var
+        EPRI Report Reference: Section 3.8.1.3 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        react = s.NP_REACT_TIME
+
+        # Eq. 3.8.1-9, Calculate desired active power in per unit
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p = self.p_desired_pu * np.where(self.p_desired_pu >= 0, 1, s.NP_P_MAX / s.NP_P_MAX_CHARGE)
+
+        p3l, p2l, p1l = s.QP_CURVE_P3_LOAD, s.QP_CURVE_P2_LOAD, s.QP_CURVE_P1_LOAD
+        q3l, q2l, q1l = s.QP_CURVE_Q3_LOAD, s.QP_CURVE_Q2_LOAD, s.QP_CURVE_Q1_LOAD
+        p1g, p2g, p3g = s.QP_CURVE_P1_GEN, s.QP_CURVE_P2_GEN, s.QP_CURVE_P3_GEN
+        q1g, q2g, q3g = s.QP_CURVE_Q1_GEN, s.QP_CURVE_Q2_GEN, s.QP_CURVE_Q3_GEN
+
+        # Eq. 3.8.1-10, calculate reactive power reference in per unit according to watt-var curve
+        ref = self.q_qp_desired_ref_pu
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ref = np.where(on & (p <= p3l), q3l, ref)
+            ref = np.where(on & (p <= p2l) & (p > p3l), q3l - ((p - p3l) / (p2l - p3l)) * (q3l - q2l), ref)
+            ref = np.where(on & (p <= p1l) & (p > p2l), q2l - ((p - p2l) / (p1l - p2l)) * (q2l - q1l), ref)
+            ref = np.where(on & (p <= p1g) & (p > p1l), q1l - ((p - p1l) / (p1g - p1l)) * (q1l - q1g), ref)
+            ref = np.where(on & (p <= p2g) & (p > p1g), q1g - ((p - p1g) / (p2g - p1g)) * (q1g - q2g), ref)
+            ref = np.where(on & (p <= p3g) & (p > p2g), q2g - ((p - p2g) / (p3g - p2g)) * (q2g - q3g), ref)
+            ref = np.where(on & (p > p3g), q3g, ref)
+        self.q_qp_desired_ref_pu = ref
+
+        # Eq. 3.8.1-11,12, apply a low pass filter and time delay, reset to 0 if DER is tripped
+        lpf = self.qp_lpf.low_pass_filter(np.where(on, ref, 0), np.where(on, s.QP_RT - react, 0))
+        self.q_qp_desired_pu = self.qp_delay.tdelay(np.where(on, lpf, 0), np.where(on, react, 0))
+
+    def calculate_q_desired_pu(self, on):
+        """
+        Array version of DesiredReactivePower.calculate_q_desired_pu
+        EPRI Report Reference: Section 3.8 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+
+        # Eq. 3.8.1-15, calculate desired reactive power reference, without smooth mode transition
+        q_desired_ref_pu = np.where(s.CONST_PF_MODE_ENABLE, self.q_const_pf_desired_pu,
+                           np.where(s.QV_MODE_ENABLE, self.q_qv_desired_pu,
+                           np.where(s.QP_MODE_ENABLE, self.q_qp_desired_pu,
+                           np.where(s.CONST_Q_MODE_ENABLE, self.q_const_q_desired_pu, 0))))
+
+        # Eq. 3.8.1-16, the ramp rate limit only applies when there is a mode change.
+        enables = np.stack([s.CONST_PF_MODE_ENABLE, s.QV_MODE_ENABLE, s.QP_MODE_ENABLE, s.CONST_Q_MODE_ENABLE],
+                           axis=1).astype(np.int8)
+        flag_set = (enables != self.q_mode_enable_prev).any(axis=1)
+        transition = on & (flag_set | self.q_mode_ramp_flag)
+
+        # Eq. 3.8.1-17 and -18, apply the ramp rate limit during mode transition, reset when DER is tripped
+        t_ramp = np.where(transition, s.NP_MODE_TRANSITION_TIME, 0)
+        q_desired_ramp_pu = self.desired_var_ramp.ramp(
+            np.where(on, np.where(transition, q_desired_ref_pu, q_desired_ref_pu / s.NP_VA_MAX), 0), t_ramp, t_ramp)
+
+        # Eq. 3.8.1-19 and -20, apply the flipflop logic to decide if in mode transition
+        flag_reset = q_desired_ref_pu == q_desired_ramp_pu
+        self.q_mode_ramp_flag = self.desired_var_ff.flipflop(on & flag_set, ~on | flag_reset)
+
+        # Eq. 3.8.1-21, if in mode transition, pass ramp rate limited value as output. If not, pass original value.
+        self.q_desired_pu = np.where(on, np.where(self.q_mode_ramp_flag, q_desired_ramp_pu, q_desired_ref_pu), 0)
+
+        # Save the values in for calculation in next time step
+        self.q_mode_enable_prev[on] = enables[on]
+
+    def calculate_limited_pq(self):
+        """
+        Array version of CapabilityPriority.calculate_limited_pq
+        EPRI Report Reference: Section 3.9 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        n = self.n
+
+        # Eq. 3.9.1-1 and -3, Calculate desired P and Q in watts and vars, and applicable apparent power rating
+        p_desired_w = self.p_desired_pu * s.NP_P_MAX
+        q_desired_var = self.q_desired_pu * s.NP_VA_MAX
+        va = np.where(p_desired_w >= 0, s.NP_VA_MAX, s.NP_APPARENT_POWER_CHARGE_MAX)
+        sign_p = np.sign(p_desired_w)
+
+        def q_limits(p_pu):
+            q_max_inj = s.NP_VA_MAX * interp_rows(p_pu, s.P_Q_INJ_PU, s.Q_MAX_INJ_PU)
+            q_max_abs = s.NP_VA_MAX * interp_rows(p_pu, s.P_Q_ABS_PU, s.Q_MAX_ABS_PU)
+            return q_max_inj, q_max_abs
+
+        mode_q = s.CONST_Q_MODE_ENABLE | s.QV_MODE_ENABLE
+        mode_pf = ~mode_q & s.CONST_PF_MODE_ENABLE
+        mode_qp = ~mode_q & ~mode_pf & s.QP_MODE_ENABLE
+
+        # Undefined Q control mode
+        p_limited_w = p_desired_w.copy()
+        q_limited_var = np.zeros(n)
+
+        with np.errstate(invalid='ignore'):
+            # Constant-Q or Volt-Var, Eq. 3.9.1-4~8
+            q_max_inj, q_max_abs = q_limits(self.p_desired_pu)
+            q_limited_by_p_var = np.minimum(q_max_inj, np.maximum(-q_max_abs, q_desired_var))
+            within = p_desired_w ** 2 + q_limited_by_p_var ** 2 < va ** 2
+            q_active = np.minimum(s.q_requirement_inj, np.maximum(-s.q_requirement_abs, q_limited_by_p_var))
+            q_a = np.where(within | ~s.prio_active, q_limited_by_p_var, q_active)
+            p_a = np.where(within, p_desired_w, np.sqrt(va ** 2 - q_a ** 2) * sign_p)
+            p_limited_w = np.where(mode_q, p_a, p_limited_w)
+            q_limited_var = np.where(mode_q, q_a, q_limited_var)
+
+        # Constant-PF, Eq. 3.9.1-9~11
+        if mode_pf.any():
+            i = np.flatnonzero(mode_pf)
+            p_w, q_var, va_i = p_desired_w[i], q_desired_var[i], va[i]
+            within = p_w ** 2 + q_var ** 2 < va_i ** 2
+            k = np.minimum(1., va_i / np.maximum(1.e-9, np.sqrt(p_w ** 2 + q_var ** 2)))
+            p_pf_w = np.where(within, p_w, p_w * k)
+            q_pf_var = np.where(within, q_var, q_var * k)
+
+            inj = q_pf_var > 0
+            xp = np.where(inj[:, None], s.P_Q_INJ_PU[i], s.P_Q_ABS_PU[i])
+            yp = np.where(inj[:, None], s.Q_MAX_INJ_PU[i], s.Q_MAX_ABS_PU[i])
+            p_itcp_w, q_itcp_var = intercep_piecewise_circle_array(np.where(p_w > 0, va_i, -va_i),
+                                                                   xp * s.NP_P_MAX[i, None],
+                                                                   yp * s.NP_VA_MAX[i, None])
+            p_lim = np.where(np.abs(q_pf_var) > q_itcp_var, np.minimum(np.abs(p_itcp_w), np.abs(p_w)) * np.sign(p_w),
+                             p_pf_w)
+            p_limited_w[i] = p_lim
+            q_max_inj, q_max_abs = q_limits(p_limited_w / s.NP_P_MAX)
+            q_limited_var[i] = np.minimum(q_max_inj[i], np.maximum(-q_max_abs[i], q_pf_var))
+
+        # Watt-Var, Eq. 3.9.1-12~13
+        if mode_qp.any():
+            q_qp_var = q_desired_var.copy()
+            outside = mode_qp & ~(p_desired_w ** 2 + q_desired_var ** 2 < va ** 2)
+            p_limited_w = np.where(mode_qp, p_desired_w, p_limited_w)
+            if outside.any():
+                i = np.flatnonzero(outside)
+                pch, pmax, vamax = s.NP_P_MAX_CHARGE[i], s.NP_P_MAX[i], s.NP_VA_MAX[i]
+                qp_curve_p = np.stack([-pch, s.QP_CURVE_P3_LOAD[i] * pch, s.QP_CURVE_P2_LOAD[i] * pch,
+                                       s.QP_CURVE_P1_LOAD[i] * pch, s.QP_CURVE_P1_GEN[i] * pmax,
+                                       s.QP_CURVE_P2_GEN[i] * pmax, s.QP_CURVE_P3_GEN[i] * pmax, pmax], axis=1)
+                qp_curve_q = np.stack([s.QP_CURVE_Q3_LOAD[i], s.QP_CURVE_Q3_LOAD[i], s.QP_CURVE_Q2_LOAD[i],
+                                       s.QP_CURVE_Q1_LOAD[i], s.QP_CURVE_Q1_GEN[i], s.QP_CURVE_Q2_GEN[i],
+                                       s.QP_CURVE_Q3_GEN[i], s.QP_CURVE_Q3_GEN[i]], axis=1) * vamax[:, None]
+                p_w = p_desired_w[i]
+                gen = p_w > 0
+                p_itcp_w, q_itcp_var = intercep_piecewise_circle_array(np.where(gen, va[i], -va[i]),
+                                                                       qp_curve_p, qp_curve_q)
+                p_limited_w[i] = np.where(gen, np.minimum(p_itcp_w, p_w), np.maximum(p_itcp_w, p_w))
+                q_qp_var[i] = np.minimum(np.abs(q_itcp_var), np.abs(q_desired_var[i])) * np.sign(q_desired_var[i])
+            q_max_inj, q_max_abs = q_limits(p_desired_w / s.NP_P_MAX)
+            q_limited_var = np.where(mode_qp, np.minimum(q_max_inj, np.maximum(-q_max_abs, q_qp_var)), q_limited_var)
+
+        self.p_limited_w = p_limited_w
+        self.q_limited_var = q_limited_var
+
+    def determine_rt_ctrl(self):
+        """
+        Array version of RideThroughPerf.determine_rt_ctrl
+        EPRI Report Reference: Section 3.10 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+        status = self.der_status_code
+        ctrl = self.rt_ctrl_code
+
+        # Eq 3.10.1-1, Determine ride-through control mode depending on the DER operation status.
+        ctrl = np.where(status == TRIP, RT_CTRL_TRIP, ctrl)
+
+        ret = self.rt_return_from_mc_delay.con_del_enable(
+            ~np.isin(status, [MOMENTARY_CESSATION, CEASE_TO_ENERGIZE]), s.MC_RETURN_T)
+        ctrl = np.where(ret & np.isin(status, [CONTINUOUS_OPERATION, NOT_DEFINED, ENTERING_SERVICE]),
+                        RT_CTRL_NORMAL, ctrl)
+        ctrl = np.where(ret & np.isin(status, [MANDATORY_OPERATION, PERMISSIVE_OPERATION]),
+                        np.where(s.DVS_MODE_ENABLE, RT_CTRL_DVS, RT_CTRL_NORMAL), ctrl)
+
+        # The standard allows a maximum of 0.16 s response time to enter cease to energize, and 0.083 s to enter
+        # momentary cessation
+        cte = self.rt_cte_cond_delay.con_del_enable(status == CEASE_TO_ENERGIZE, s.NP_CTE_RESP_T)
+        mc = self.rt_mc_cond_delay.con_del_enable(status == MOMENTARY_CESSATION, s.MC_RESP_T)
+        ctrl = np.where(cte | mc, RT_CTRL_CTE, ctrl)
+
+        self.rt_ctrl_code = ctrl.astype(np.int8)
+
+    def der_rem_operation(self):
+        """
+        Array version of RideThroughPerf.der_rem_operation
+        EPRI Report Reference: Section 3.10 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+
+        # Eq 3.10.1-1 Determine ride-through control modes
+        self.determine_rt_ctrl()
+        ctrl = self.rt_ctrl_code
+
+        # Eq 3.10.1-2, calculate per-unit values based on DER nameplate apparent power rating
+        p_limited_pu = self.p_limited_w / s.NP_VA_MAX
+        q_limited_pu = self.q_limited_var / s.NP_VA_MAX
+
+        trip = ctrl == RT_CTRL_TRIP
+        cte = ctrl == RT_CTRL_CTE
+        run = ~trip & ~cte
+        v_pos_abs = np.abs(self.v_pos_pu)
+
+        # Eq 3.10.1-3, if trips, DER output no current. Eq 3.10.1-4, calculate current during cease to energize state.
+        b = s.NP_AC_V_NOM * s.NP_REACTIVE_SUSCEPTANCE / (s.NP_VA_MAX / s.NP_AC_V_NOM)
+        i_pos_q_block = - v_pos_abs * b
+        self.i_pos_d_ref_pu = np.where(cte, 0, self.i_pos_d_ref_pu)
+        self.i_pos_q_ref_pu = np.where(cte, i_pos_q_block, self.i_pos_q_ref_pu)
+        i_pos_pu = np.where(cte, (0 + i_pos_q_block * 1j) * np.exp(1j * self.v_angle), 0)
+        i_neg_pu = np.where(cte, -1j * self.v_neg_pu * s.NP_AC_V_NOM * s.NP_REACTIVE_SUSCEPTANCE
+                            / (s.NP_VA_MAX / s.NP_AC_V_NOM), 0)
+
+        # Reset state variables to 0, to better model restoration of output
+        stop = trip | cte
+        self.i_pos_lpf.reset_state(stop)
+        self.i_neg_lpf.reset_state(stop)
+        self.i_pos_d_rrl.reset_state(stop)
+
+        # Eq 3.10.1-5 and -6, calculate current based on desired P, Q terminal voltage, and dynamic voltage support
+        normal = ctrl == RT_CTRL_NORMAL
+        dvs = ctrl == RT_CTRL_DVS
+        v_pos_min = np.maximum(v_pos_abs, 0.0001)
+        self.i_pos_d_ref_pu = np.where(normal | dvs, p_limited_pu / v_pos_min, self.i_pos_d_ref_pu)
+        self.i_pos_q_ref_pu = np.where(normal, - q_limited_pu / v_pos_min,
+                                       np.where(dvs, - q_limited_pu / v_pos_min + (v_pos_abs - 1) * s.DVS_K,
+                                                self.i_pos_q_ref_pu))
+        self.i_neg_ref_pu = np.where(normal, 0, np.where(dvs, self.v_neg_pu * 1j * s.DVS_K, self.i_neg_ref_pu))
+
+        if run.any():
+            # Eq 3.10.1-7~9, Current limitation to the nameplate current rating
+            i_d, i_q, i_neg = self.i_limit(run)
+
+            # Eq 3.10.1-10, ramp rate limit of the active current, only applied for ramp up
+            up = self.i_pos_d_rrl_ref_pu >= 0
+            rrl = self.i_pos_d_rrl.ramp(i_d, np.where(up, s.NP_RT_RAMP_UP_TIME, 0),
+                                        np.where(up, 0, s.NP_RT_RAMP_UP_TIME), mask=run)
+            self.i_pos_d_rrl_ref_pu = np.where(run, rrl, self.i_pos_d_rrl_ref_pu)
+
+            # Eq 3.10.1-11, first order lag low pass filters applied to the DER output current references
+            i_pos_limited_ref_pu = (self.i_pos_d_rrl_ref_pu + i_q * 1j) * np.exp(1j * self.v_angle)
+            i_pos_pu = np.where(run, self.i_pos_lpf.low_pass_filter(i_pos_limited_ref_pu, s.NP_INV_DELAY, mask=run),
+                                i_pos_pu)
+            i_neg_pu = np.where(run, self.i_neg_lpf.low_pass_filter(i_neg, s.NP_INV_DELAY, mask=run), i_neg_pu)
+
+        self.i_pos_pu = i_pos_pu
+        self.i_neg_pu = i_neg_pu
+
+    def i_limit(self, mask):
+        """
+        Array version of RideThroughPerf.i_limit
+        """
+        s = self.settings
+        i_current = s.NP_CURRENT_PU
+        rot = np.exp(1j * np.angle(self.v_pos_pu))
+        d_ref, q_ref, neg_ref = self.i_pos_d_ref_pu, self.i_pos_q_ref_pu, self.i_neg_ref_pu
+
+        def i_max_pu(d, q, neg, rows=slice(None)):
+            i_pos = (d + 1j * q) * rot[rows]
+            return np.maximum(np.maximum(np.abs(i_pos + neg), np.abs(alpha2 * i_pos + alpha * neg)),
+                              np.abs(alpha * i_pos + alpha2 * neg))
+
+        # Eq 3.10.1-7 calculate maximum current if output current follows reference
+        i_max = i_max_pu(d_ref, q_ref, neg_ref)
+        d_out, q_out, neg_out = d_ref.copy(), q_ref.copy(), neg_ref.copy()
+
+        # Recalculate i_max_pu assuming active current is 0.
+        over = mask & (i_max > i_current)
+        i_max_0 = i_max_pu(0, q_ref, neg_ref)
+
+        # Eq 3.10.1-9, active current is 0, and reactive currents reduces proportionally
+        block = over & (i_max_0 > i_current)
+        d_out[block] = 0
+        q_out[block] = q_ref[block] / i_max_0[block] * i_current[block]
+        neg_out[block] = neg_ref[block] / i_max_0[block] * i_current[block]
+
+        # Find the maximum active current to maximize the current output to the nameplate current capability, as the
+        # smallest positive root of |scale * a + b| = i_current among the three phases
+        rows = np.flatnonzero(over & ~block)
+        if len(rows):
+            d, q, neg, limit = d_ref[rows], q_ref[rows], neg_ref[rows], i_current[rows]
+            i_d = d * rot[rows]
+            i_q = 1j * q * rot[rows]
+            scale = np.ones(len(rows))
+            for a, b in [(i_d, i_q + neg), (alpha2 * i_d, alpha2 * i_q + alpha * neg),
+                         (alpha * i_d, alpha * i_q + alpha2 * neg)]:
+                qa = a.real * a.real + a.imag * a.imag
+                qb = a.real * b.real + a.imag * b.imag
+                qc = b.real * b.real + b.imag * b.imag - limit * limit
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    root = (-qb + np.sqrt(np.maximum(0., qb * qb - qa * qc))) / qa
+                scale = np.where(qa > 0, np.minimum(scale, root), scale)
+            d_out[rows] = d * np.maximum(0., scale)
+
+        return d_out, q_out, neg_out
+
+    def calculate_p_q_output(self):
+        """
+        Array version of DEROutputs.calculate_p_q_output
+        EPRI Report Reference: Section 3.11 in Report #3002030962: IEEE 1547-2018 OpenDER Model
+        """
+        s = self.settings
+
+        # Eq 3.11.1-1 Calculate DER output active and reactive power based on current and voltage
+        s_out = self.i_pos_pu * self.v_pos_pu.conjugate()
+        self.p_out_pu = s_out.real
+        self.q_out_pu = -s_out.imag
+
+        # Eq 3.11.1-2 and -3, Calculate DER output P and Q in watts, vars, kW and kvar
+        self.p_out_w = self.p_out_pu * s.NP_VA_MAX
+        self.q_out_var = self.q_out_pu * s.NP_VA_MAX
+        self.p_out_kw = self.p_out_w * 1e-3
+        self.q_out_kvar = self.q_out_var * 1e-3
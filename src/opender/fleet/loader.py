@@ -0,0 +1,312 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+from collections.abc import Mapping
+import csv
+import logging
+import math
+import os
+import pathlib
+from typing import List
+import numpy as np
+from opender.common_file_format import DERCommonFileFormat, DERCommonFileFormatBESS
+from opender.common_file_format.settings_cache import copy_table
+from opender.common_file_format.settings_loader import read_settings, to_numeric
+from opender.der_pv import DER_PV
+from opender.der_bess import DER_BESS
+from opender.fleet.der_fleet import DERFleet
+
+PARAMETERS_DIR = pathlib.Path(os.path.dirname(__file__)).joinpath("../Parameters")
+
+# Columns identifying the DERs in the circuit model, in addition to the settings parameters
+ID_COLUMNS = ('name', 'bus')
+
+# Parameters only defined for BESS. A row providing any of them is a BESS, unless NP_TYPE says otherwise.
+BESS_PARAMETERS = [param for param in DERCommonFileFormatBESS.parameters_list
+                   if param not in DERCommonFileFormat.parameters_list]
+
+# Checks of the parameter setters raising ValueError, evaluated for all rows at once: column and valid range
+RANGE_CHECKS = [
+    ('NP_P_MAX', lambda x: x > 0, "should be greater than 0"),
+    ('NP_VA_MAX', lambda x: x > 0, "should be greater than 0"),
+    ('NP_Q_MAX_INJ', lambda x: x > 0, "should be greater than 0"),
+    ('NP_Q_MAX_ABS', lambda x: x > 0, "should be greater than 0"),
+    ('NP_AC_V_NOM', lambda x: x >= 0, "should be greater than 0"),
+    ('CONST_PF', lambda x: (x >= 0) & (x <= 1), "should be between 0 and 1"),
+]
+
+# Parameters set to the category defaults by the NP_NORMAL_OP_CAT setter
+CATEGORY_PARAMETERS = ['QV_CURVE_V1', 'QV_CURVE_Q1', 'QV_CURVE_V2', 'QV_CURVE_V3', 'QV_CURVE_V4', 'QV_CURVE_Q4', 'QV_OLRT',
+                       'QP_CURVE_Q3_GEN']
+
+# Cross-field checks of DERCommonFileFormat.nameplate_value_validity_check() logging a warning, evaluated for all rows
+# at once on the nameplate values of the rows (or of the base settings): condition of the warning and message
+NAMEPLATE_CHECKS = [
+    (lambda x: x['NP_P_MAX'] > x['NP_VA_MAX'],
+     "Please make sure to have DER nameplate active power rating less than or equal to DER nameplate apparent "
+     "power rating."),
+    (lambda x: (x['NP_Q_MAX_INJ'] < x['NP_VA_MAX'] * 0.44) | (x['NP_Q_MAX_INJ'] > x['NP_VA_MAX']),
+     "Regardless DER’s category, its nameplate reactive power injection rating should be greater than 44%, and "
+     "less than 100% of nameplate apparent power rating."),
+    (lambda x: x['NP_P_MAX_CHARGE'] < x['NP_APPARENT_POWER_CHARGE_MAX'],
+     "Please make sure to have DER nameplate active power charge rating less than or equal to DER nameplate "
+     "apparent power charge rating."),
+    (lambda x: (x['NP_NORMAL_OP_CAT'] == 'CAT_A') & ((x['NP_Q_MAX_ABS'] < x['NP_VA_MAX'] * 0.25)
+                                                   | (x['NP_Q_MAX_ABS'] > x['NP_VA_MAX'])),
+     "For category A DER, its nameplate reactive power absorption rating should be greater than 25%, and less "
+     "than 100% of nameplate apparent power rating."),
+    (lambda x: (x['NP_NORMAL_OP_CAT'] == 'CAT_B') & ((x['NP_Q_MAX_ABS'] < x['NP_VA_MAX'] * 0.44)
+                                                   | (x['NP_Q_MAX_ABS'] > x['NP_VA_MAX'])),
+     "For category B DER, its nameplate reactive power absorption rating should be greater than 44%, and less "
+     "than 100% of nameplate apparent power rating."),
+]
+
+
+def read_table(source) -> dict:
+    """
+    Read a wide DER table, one row per DER and one column per parameter, as a dictionary of column arrays
+
+    :param source: CSV, Parquet (requires pandas) or NPZ file path, pandas DataFrame, or dictionary of columns
+    """
+    if hasattr(source, 'columns'):
+        columns = {name: source[name].to_numpy() for name in source.columns}
+    elif isinstance(source, Mapping):
+        columns = {name: np.asarray(values) for name, values in source.items()}
+    else:
+        suffix = pathlib.Path(source).suffix.lower()
+        if suffix == '.npz':
+            with np.load(source, allow_pickle=False) as data:
+                columns = {name: data[name] for name in data.files}
+        elif suffix == '.parquet':
+            import pandas
+            df = pandas.read_parquet(source)
+            columns = {name: df[name].to_numpy() for name in df.columns}
+        else:
+            with open(source, newline='', encoding='utf-8-sig') as file:
+                reader = csv.reader(file)
+                header = next(reader, [])
+                rows = [row + [''] * (len(header) - len(row)) for row in reader if row]
+            columns = {name: np.array([row[i] for row in rows], dtype=object) for i, name in enumerate(header)}
+
+    # Parameter names of applied settings files are accepted with their suffix
+    columns = {name.strip().replace("-AS", '').replace("-SS", ''): values for name, values in columns.items()}
+
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("ValueError: All columns of the DER table should have the same number of rows")
+    return columns
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _cell(value):
+    # Table value as read from a settings file: NumPy strings and booleans are converted to Python types, and strings
+    # to numbers where possible
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, np.str_):
+        value = str(value)
+    return to_numeric(value)
+
+
+def _bus(value):
+    # Bus names are kept as in the table (not converted to numbers), with None for missing values
+    if isinstance(value, np.generic):
+        value = value.item()
+    return None if value == '' or _is_missing(value) else value
+
+
+def _as_float_array(values):
+    # Column converted to float, with NaN for missing values, and a mask of values which are not numeric
+    if values.dtype.kind in 'iuf':
+        return values.astype(float), np.zeros(len(values), dtype=bool)
+    cells = [_cell(value) for value in values]
+    numeric = np.array([isinstance(value, (int, float, np.number)) and not isinstance(value, (bool, np.bool_))
+                        for value in cells], dtype=bool)
+    missing = np.array([_is_missing(value) for value in cells], dtype=bool)
+    floats = np.array([float(value) if is_numeric else math.nan for value, is_numeric in zip(cells, numeric)])
+    return floats, ~numeric & ~missing
+
+
+def _listed(names, mask):
+    # Number and names of the DERs of the rows in mask, listing the first 10
+    rows = np.flatnonzero(mask)
+    return f"{len(rows)} DERs: " + ', '.join(str(names[i]) for i in rows[:10]) + (', ...' if len(rows) > 10 else '')
+
+
+def validate_table(columns: dict, names: list):
+    """
+    Validity check of a DER table, for all rows at once. Unknown columns are reported with a warning, and invalid
+    nameplate and power factor values raise a single ValueError listing the DERs of all invalid rows.
+
+    :param columns: Dictionary of column arrays from read_table()
+    :param names: DER names of the rows, used in the error message
+    """
+    known = set(DERCommonFileFormatBESS.parameters_list).union(ID_COLUMNS)
+    unknown = [name for name in columns if name not in known]
+    if unknown:
+        logging.warning(f"Warning: Columns {unknown} of the DER table are not in the parameter list, and are ignored")
+
+    errors = []
+    for param, check, message in RANGE_CHECKS:
+        if param not in columns:
+            continue
+        values, not_numeric = _as_float_array(columns[param])
+        with np.errstate(invalid='ignore'):
+            invalid = not_numeric | (~np.isnan(values) & ~check(values))
+        if invalid.any():
+            errors.append(f"{param} {message} ({_listed(names, invalid)})")
+
+    if 'NP_TYPE' in columns:
+        types = np.array([str(_cell(value)).upper() if not _is_missing(_cell(value)) else 'PV'
+                          for value in columns['NP_TYPE']])
+        invalid = ~np.isin(types, ['PV', 'BESS'])
+        if invalid.any():
+            errors.append(f"NP_TYPE should be either 'PV' or 'BESS' ({_listed(names, invalid)})")
+
+    if errors:
+        raise ValueError("ValueError: Invalid DER table. " + "; ".join(errors))
+
+
+def check_nameplate(columns: dict, names: list, is_bess: np.ndarray, templates: dict):
+    """
+    Cross-field checks of the nameplate parameters of a DER table (as in
+    DERCommonFileFormat.nameplate_value_validity_check()), for all rows at once. Each failed check is logged with a
+    single warning listing the DERs of all rows failing it.
+
+    :param columns: Dictionary of column arrays from read_table()
+    :param names: DER names of the rows, used in the warnings
+    :param is_bess: True for the rows of BESS DERs
+    :param templates: Base settings objects of PV (key False) and BESS (key True) DERs, providing the values of the
+                      empty cells
+    """
+    nameplate = {}
+    for param in DERCommonFileFormat.nameplate_check_list:
+        default = {bess: getattr(settings, param) for bess, settings in templates.items()}
+        if param == 'NP_NORMAL_OP_CAT':
+            values = np.where(is_bess, default.get(True), default.get(False))
+            if param in columns:
+                # Invalid categories are replaced by CAT_B by the setter
+                cells = [_cell(value) for value in columns[param]]
+                values = np.array([default_value if _is_missing(cell) or cell == '' else
+                                   str(cell).upper() if str(cell).upper() in ('CAT_A', 'CAT_B') else 'CAT_B'
+                                   for cell, default_value in zip(cells, values)], dtype=object)
+        else:
+            default = {bess: math.nan if value is None else value for bess, value in default.items()}
+            values = np.where(is_bess, default.get(True, math.nan), default.get(False, math.nan))
+            if param in columns:
+                # Negative charge ratings are converted to positive by the setters
+                column = _as_float_array(columns[param])[0]
+                values = np.where(np.isnan(column), values, np.abs(column))
+        nameplate[param] = values
+
+    with np.errstate(invalid='ignore'):
+        for check, message in NAMEPLATE_CHECKS:
+            failed = check(nameplate)
+            if failed.any():
+                logging.warning(f"Warning: {message} ({_listed(names, failed)})")
+
+
+def _derive(template, row, base):
+    # Settings of a row derived from the base settings of its DER type, with the side effects of the nameplate setters
+    # as in the settings files: the DC voltage follows the nominal AC voltage unless it is provided, and the volt-var
+    # defaults set by the category are replaced by the values of the settings files.
+    overrides = dict(row)
+    if 'NP_AC_V_NOM' in overrides and 'NP_V_DC' not in overrides and _is_missing(to_numeric(base.get('NP_V_DC'))):
+        overrides = {'NP_V_DC': overrides['NP_AC_V_NOM'] * 1.5, **overrides}
+    der_file = template.derive(**overrides)
+    if 'NP_NORMAL_OP_CAT' in overrides:
+        der_file.update(**{name: base[name] for name in CATEGORY_PARAMETERS
+                           if name not in overrides and not _is_missing(to_numeric(base.get(name)))})
+    return der_file
+
+
+def load_ders(source, as_file_path=None, model_file_path=None, t_s: float = None) -> List:
+    """
+    Create DER objects from one wide table, with one row per DER and one column per parameter of
+    DERCommonFileFormat.parameters_list (and DERCommonFileFormatBESS.parameters_list for BESS), and optional 'name'
+    and 'bus' columns mapping the DERs to the circuit model.
+
+    Each row is used as a settings file overriding the base settings files: empty cells keep the base value. Rows with
+    NP_TYPE 'BESS', or providing any BESS parameter if NP_TYPE is not provided, are created as DER_BESS, others as
+    DER_PV. The table is validated for all rows before any DER is created, including the nameplate cross-field checks
+    (check_nameplate()). The base settings files are read and validated once per DER type, and should provide the
+    nameplate ratings NP_VA_MAX and NP_AC_V_NOM. The settings of each distinct row are derived from them, running only
+    the setters of the parameters of the row, and copied for the other DERs with the same settings.
+
+    :param source: CSV, Parquet (requires pandas) or NPZ file path, pandas DataFrame, or dictionary of columns
+    :param as_file_path: Applied settings file used as base settings. Default is the file of the standard values.
+    :param model_file_path: Model parameter file used as base settings. Default is the default model parameter file.
+    :param t_s: Simulation time step of the DER objects. If not provided, the global time step DER.t_s is used.
+    """
+    columns = read_table(source)
+    n = len(next(iter(columns.values()))) if columns else 0
+
+    names = [str(name) for name in columns['name']] if 'name' in columns else [f'DER{i + 1}' for i in range(n)]
+    buses = [_bus(bus) for bus in columns['bus']] if 'bus' in columns else [None] * n
+    validate_table(columns, names)
+
+    # Base settings, overridden by the parameters of each row
+    base = read_settings(as_file_path or PARAMETERS_DIR.joinpath("AS-with std-values.csv"), strip_suffix=True)
+    base.update(read_settings(model_file_path or PARAMETERS_DIR.joinpath("Model-parameters.csv")))
+
+    # Parameters of the rows, in the order of the parameter list (nameplate first, as in the settings files)
+    params = [name for name in DERCommonFileFormatBESS.parameters_list if name in columns]
+    cells = {name: [_cell(value) for value in columns[name]] for name in params}
+    rows = [tuple((name, cells[name][i]) for name in params if not _is_missing(cells[name][i])) for i in range(n)]
+
+    is_bess = np.zeros(n, dtype=bool)
+    for i, row in enumerate(rows):
+        np_type = dict(row).get('NP_TYPE')
+        if np_type is not None:
+            is_bess[i] = np_type.upper() == 'BESS'
+        else:
+            is_bess[i] = any(name in BESS_PARAMETERS for name, value in row)
+
+    # One settings object of the base settings per DER type, from which the settings of each distinct row are derived,
+    # validating only the parameters of the row. The nameplate cross-field checks are run for all rows at once.
+    templates = {bess: (DERCommonFileFormatBESS if bess else DERCommonFileFormat)(as_file_path=base, model_file_path={})
+                 for bess in sorted(set(is_bess.tolist()))}
+    check_nameplate(columns, names, is_bess, templates)
+
+    tables = {}
+    der_list = []
+    for i in range(n):
+        key = (bool(is_bess[i]), rows[i])
+        if key not in tables:
+            tables[key] = _derive(templates[key[0]], rows[i], base)._settings_table()
+        file_cls = DERCommonFileFormatBESS if key[0] else DERCommonFileFormat
+        der_file = file_cls.__new__(file_cls)
+        der_file._load_settings_table(copy_table(tables[key]))
+        object.__setattr__(der_file, '_checked_version', der_file.version)
+
+        der_obj = (DER_BESS if is_bess[i] else DER_PV)(der_file, t_s=t_s)
+        der_obj.name = names[i]
+        der_obj.bus = buses[i]
+        der_list.append(der_obj)
+    return der_list
+
+
+def load_fleet(source, as_file_path=None, model_file_path=None, t_s: float = None, seeds: list = None) -> DERFleet:
+    """
+    Create a DER fleet from one wide table, with one row per DER. See load_ders() for the table format.
+
+    :param source: CSV, Parquet (requires pandas) or NPZ file path, pandas DataFrame, or dictionary of columns
+    :param as_file_path: Applied settings file used as base settings. Default is the file of the standard values.
+    :param model_file_path: Model parameter file used as base settings. Default is the default model parameter file.
+    :param t_s: Simulation time step of the fleet. If not provided, the global time step DER.t_s is used.
+    :param seeds: Random seeds of the DERs, one per DER (see DERFleet)
+    """
+    return DERFleet(load_ders(source, as_file_path, model_file_path, t_s), t_s=t_s, seeds=seeds)
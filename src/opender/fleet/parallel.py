@@ -0,0 +1,258 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Callable, Union
+import numpy as np
+from opender import der
+from opender.fleet.der_fleet import DERFleet, FleetSettings, der_input_arrays
+from opender.fleet.shared_arrays import SharedFleetArrays
+from opender.operation_status.status_codes import STATUS_NAMES
+
+# DER fleet shard resident in a worker process, and the shared memory arrays it is bound to
+_shard_fleet = None
+_shard_arrays = None
+
+
+def _init_shard(der_list, t_s, seeds):
+    global _shard_fleet
+    _shard_fleet = DERFleet(der_list, t_s, seeds)
+
+
+def _bind_shard(shm_name, n, layout, rows):
+    global _shard_arrays
+    _shard_arrays = SharedFleetArrays(n, shm_name, layout)
+    _bind(_shard_fleet, _shard_arrays, rows)
+
+
+def _bind(fleet, arrays, rows):
+    # Bind all fleet arrays to the rows of the shard in the shared arrays, which are views of the block
+    fleet.bind_arrays({path: arrays[path][rows] for path, dtype, row_shape in arrays.layout})
+
+
+def _run_shard(inputs):
+    _shard_fleet.update_der_input(**inputs)
+    p_out_w, q_out_var = _shard_fleet.run()
+    return p_out_w, q_out_var, _shard_fleet.der_status_code
+
+
+def _run_shard_shared():
+    # Inputs, states and outputs are read and written in the shared arrays
+    _shard_fleet.run()
+
+
+class ShardedFleetRunner:
+    """
+    Run a fleet of DERs split into shards, each shard being a DERFleet resident in its own worker process.
+
+    DERs are grouped into shards by bus (or by a user defined key), each shard is created once in a single-worker
+    ProcessPoolExecutor, and only the input and output arrays of the shard are exchanged in each time step. Outputs are
+    merged back in the order of the DER list. Each DER draws its enter service randomized delay from its own random
+    generator, seeded from the runner seed and the position of the DER in the list, so the results are bit-identical
+    to the serial execution (n_workers=0) with the same seed, regardless of the number of workers.
+
+    With shared_memory=True, the input, state and output arrays of the whole fleet are stored in one
+    multiprocessing.shared_memory block (SharedFleetArrays), with the DERs ordered by shard. The fleet of each shard is
+    bound to a row slice of the arrays, so the inputs written by update_der_input() are read in place by the workers,
+    which keep their states and write their outputs in the block. No array is pickled or copied in a time step, and
+    the states of all DERs can be read in the main process, e.g. arrays['v_lpf.lpf_out_prev'][runner.rows(i)].
+    """
+
+    def __init__(self, der_list: List[der.DER], n_workers: int = None, shard_by: Union[str, Callable] = 'bus',
+                 t_s: float = None, seed: int = None, shared_memory: bool = False):
+        """
+        :param der_list: List of DER objects (DER_PV or DER_BESS)
+        :param n_workers: Number of worker processes (one per shard). Default is the number of CPUs. If 0, the fleet is
+                          run serially in the current process.
+        :param shard_by: 'bus' to keep DERs on the same bus in the same shard, a function of the DER object returning
+                         the grouping key (e.g. feeder), or None to split the DER list into contiguous shards
+        :param t_s: Simulation time step of the fleet. If not provided, the time step assigned to the DER objects is
+                    used, or the global time step DER.t_s when the runner is created.
+        :param seed: Seed of the random generators of the DERs
+        :param shared_memory: Exchange the fleet arrays through shared memory instead of pickling them
+        """
+        self.ders = list(der_list)
+        self.n = len(self.ders)
+        self.n_workers = os.cpu_count() if n_workers is None else n_workers
+        self.time = 0
+
+        # The time step is fixed when the runner is created, since the worker processes do not share DER.t_s
+        if t_s is None:
+            t_s_der = {d.t_s for d in self.ders if 't_s' in vars(d)}
+            if len(t_s_der) > 1:
+                raise ValueError("ValueError: DERs in a fleet should have the same simulation time step t_s")
+            t_s = t_s_der.pop() if t_s_der else der.DER.t_s
+        self.t_s = t_s
+
+        # Independent random streams per DER, depending only on the seed and the position of the DER
+        self.seed_sequence = np.random.SeedSequence(seed)
+        seeds = self.seed_sequence.spawn(self.n)
+
+        self.inputs = {}
+        self.p_out_w = np.full(self.n, np.nan)
+        self.q_out_var = np.full(self.n, np.nan)
+        self.der_status_code = np.array([d.der_status_code for d in self.ders], dtype=np.int8)
+
+        self.shards = self._assign_shards(shard_by)
+        self.executors = []
+        self._fleet = None
+        if self.n_workers == 0:
+            self._fleet = DERFleet(self.ders, t_s, seeds)
+        else:
+            for idx in self.shards:
+                initargs = ([self.ders[i] for i in idx], t_s, [seeds[i] for i in idx])
+                executor = ProcessPoolExecutor(max_workers=1, initializer=_init_shard, initargs=initargs)
+                self.executors.append(executor)
+
+        self.arrays = None
+        if shared_memory:
+            self._create_shared_arrays()
+
+    def _create_shared_arrays(self):
+        # Rows of the shared arrays in shard order, so that each shard is a row slice. The outputs are in the order
+        # of the DER list, as views of the arrays if the order is the same.
+        self.order = np.concatenate(self.shards)
+        self.inverse = None if (self.order == np.arange(self.n)).all() else np.argsort(self.order)
+        bounds = np.cumsum([0] + [len(idx) for idx in self.shards])
+        self.slices = [slice(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+        self.settings = FleetSettings([d.der_file for d in self.ders])
+        layout = SharedFleetArrays.fleet_layout(DERFleet(self.ders[:1], self.t_s))
+        self.arrays = SharedFleetArrays(self.n, layout=layout)
+        if self._fleet is not None:
+            _bind(self._fleet, self.arrays, slice(None))
+        else:
+            # Fleets are bound before any input is written in the arrays
+            futures = [executor.submit(_bind_shard, self.arrays.name, self.n, layout, rows)
+                       for executor, rows in zip(self.executors, self.slices)]
+            for future in futures:
+                future.result()
+        self._read_shared_outputs()
+
+    def _read_shared_outputs(self):
+        arrays = self.arrays
+        if self.inverse is None:
+            self.p_out_w, self.q_out_var = arrays.p_out_w, arrays.q_out_var
+            self.der_status_code = arrays.der_status_code
+        else:
+            self.p_out_w, self.q_out_var = arrays.p_out_w[self.inverse], arrays.q_out_var[self.inverse]
+            self.der_status_code = arrays.der_status_code[self.inverse]
+
+    def rows(self, i: int) -> int:
+        """
+        Row of the i-th DER of the list in the shared arrays (shared_memory=True)
+        """
+        return int(self.inverse[i]) if self.inverse is not None else i
+
+    def _assign_shards(self, shard_by) -> List[np.ndarray]:
+        """
+        Split the DER indices into at most n_workers shards, keeping the DERs with the same key together. Groups are
+        assigned, largest first, to the shard with the fewest DERs, so the assignment is deterministic.
+        """
+        n_shards = max(1, min(self.n_workers, self.n))
+        if shard_by is None:
+            return [idx for idx in np.array_split(np.arange(self.n), n_shards) if len(idx)]
+
+        key = (lambda d: d.bus) if shard_by == 'bus' else shard_by
+        groups = {}
+        for i, d in enumerate(self.ders):
+            groups.setdefault(key(d), []).append(i)
+
+        shards = [[] for _ in range(n_shards)]
+        for group in sorted(groups.values(), key=lambda g: (-len(g), g[0])):
+            min(shards, key=len).extend(group)
+        return [np.array(sorted(shard)) for shard in shards if shard]
+
+    def update_der_input(self, **kwargs) -> None:
+        """
+        Update DER inputs. Accepts the same arguments as DERFleet.update_der_input(), as scalars or arrays in the order
+        of the DER list.
+        """
+        if self.arrays is not None:
+            for name, value in der_input_arrays(self.settings, **kwargs).items():
+                getattr(self.arrays, name)[...] = value if self.inverse is None else value[self.order]
+            return
+        self.inputs.update({key: value for key, value in kwargs.items() if value is not None})
+
+    def run(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Step all DERs by one simulation time step, and return the active and reactive power outputs
+        """
+        self.time = self.time + self.t_s
+
+        if self.arrays is not None:
+            if self._fleet is not None:
+                self._fleet.run()
+            else:
+                for future in [executor.submit(_run_shard_shared) for executor in self.executors]:
+                    future.result()
+            if self.inverse is not None:
+                self._read_shared_outputs()
+            return self.p_out_w, self.q_out_var
+
+        if self._fleet is not None:
+            self._fleet.update_der_input(**self.inputs)
+            self.p_out_w, self.q_out_var = self._fleet.run()
+            self.der_status_code = self._fleet.der_status_code.copy()
+            return self.p_out_w, self.q_out_var
+
+        futures = [executor.submit(_run_shard, self._shard_inputs(idx))
+                   for executor, idx in zip(self.executors, self.shards)]
+        p_out_w = np.empty(self.n)
+        q_out_var = np.empty(self.n)
+        der_status_code = np.empty(self.n, dtype=np.int8)
+        for idx, future in zip(self.shards, futures):
+            p_out_w[idx], q_out_var[idx], der_status_code[idx] = future.result()
+        self.p_out_w, self.q_out_var, self.der_status_code = p_out_w, q_out_var, der_status_code
+        return self.p_out_w, self.q_out_var
+
+    def _shard_inputs(self, idx) -> dict:
+        # Inputs of the DERs in a shard. Scalars and three phase values of shape (3,) apply to all DERs, as in DERFleet.
+        inputs = {}
+        for key, value in self.inputs.items():
+            value = np.asarray(value)
+            if key in ('v', 'v_pu', 'theta') and value.ndim == 1:
+                if value.shape[0] != self.n or self.n == 3:
+                    inputs[key] = value
+                else:
+                    # Per DER values as a column, so that they are not taken as three phase values in a shard of 3 DERs
+                    inputs[key] = value[idx, None]
+            else:
+                inputs[key] = value if value.ndim == 0 else value[idx]
+        return inputs
+
+    @property
+    def der_status(self) -> np.ndarray:
+        return np.array([STATUS_NAMES[c] for c in self.der_status_code], dtype=object)
+
+    def close(self) -> None:
+        """
+        Shut down the worker processes
+        """
+        for executor in self.executors:
+            executor.shutdown()
+        self.executors = []
+        if self.arrays is not None:
+            self.p_out_w, self.q_out_var = self.p_out_w.copy(), self.q_out_var.copy()
+            self.der_status_code = self.der_status_code.copy()
+            if self._fleet is not None:
+                self._fleet.unbind_arrays()
+            self.arrays.close()
+            self.arrays = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
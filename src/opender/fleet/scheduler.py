@@ -0,0 +1,147 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+import math
+from fractions import Fraction
+from typing import List, Callable
+
+
+def _to_fraction(t_s):
+    """
+    Convert a time step in seconds to an exact fraction, e.g. 0.01 to 1/100
+    """
+    if t_s <= 0:
+        raise ValueError(f"ValueError: Simulation time step t_s should be positive, but {t_s} is given")
+    return Fraction(t_s).limit_denominator(10 ** 9)
+
+
+class SchedulerGroup:
+    """
+    Group of DER objects (or DERFleet objects) stepped together at the same simulation time step
+    """
+
+    def __init__(self, members, t_s, on_step=None, name=None):
+        """
+        :param members: DER object, DERFleet object, or list of them
+        :param t_s: Simulation time step of the group in seconds
+        :param on_step: Function on_step(time, members) called before each step of the group, e.g. to update inputs
+        :param name: Identification of the group
+        """
+        self.members = list(members) if isinstance(members, (list, tuple)) else [members]
+        self.t_s = float(t_s)
+        self.on_step = on_step
+        self.name = name
+
+        self.step_ticks = None  # Group time step in number of scheduler ticks
+        self.next_tick = None   # Scheduler tick at which the group is stepped next
+        self.n_steps = 0        # Number of steps executed
+
+        for member in self.members:
+            member.t_s = self.t_s
+
+    def __repr__(self):
+        return f"SchedulerGroup({self.name}, t_s={self.t_s}, {len(self.members)} members)"
+
+
+class MultiRateScheduler:
+    """
+    Step groups of DERs at different simulation time steps on a common integer tick clock.
+
+    The scheduler time is the number of elapsed ticks multiplied by the tick size, so it does not accumulate floating
+    point error over long simulations. Each group is only stepped when its own time step is due, and groups are
+    synchronized at the common boundaries of their time steps. The tick size is the greatest common divisor of the
+    group time steps, e.g. a PV group at 1s and a BESS group at 10ms are scheduled on a 10ms tick, and the PV group is
+    stepped every 100 ticks.
+    """
+
+    def __init__(self):
+        self.groups = []    # type: List[SchedulerGroup]
+        self.tick = 0       # Elapsed number of ticks
+        self._tick_s = None  # Tick size in seconds, as an exact fraction
+
+    @property
+    def tick_s(self) -> float:
+        # Tick size in seconds
+        return None if self._tick_s is None else float(self._tick_s)
+
+    @property
+    def time(self) -> float:
+        # Elapsed time from start of simulation
+        return 0 if self._tick_s is None else float(self.tick * self._tick_s)
+
+    def add_group(self, members, t_s: float, on_step: Callable = None, name: str = None) -> SchedulerGroup:
+        """
+        Add a group of DERs stepped at time step t_s. The time step of the group members is set to t_s.
+
+        :param members: DER object, DERFleet object, or list of them
+        :param t_s: Simulation time step of the group in seconds
+        :param on_step: Function on_step(time, members) called before each step of the group, e.g. to update inputs
+        :param name: Identification of the group
+        """
+        t_s_frac = _to_fraction(t_s)
+        group = SchedulerGroup(members, float(t_s_frac), on_step, name)
+
+        # Refine the tick to the greatest common divisor of all group time steps, and rescale the existing clock
+        if self._tick_s is None:
+            tick_s = t_s_frac
+        else:
+            tick_s = Fraction(math.gcd(self._tick_s.numerator * t_s_frac.denominator,
+                                       t_s_frac.numerator * self._tick_s.denominator),
+                              self._tick_s.denominator * t_s_frac.denominator)
+            scale = int(self._tick_s / tick_s)
+            self.tick *= scale
+            for g in self.groups:
+                g.step_ticks *= scale
+                g.next_tick *= scale
+        self._tick_s = tick_s
+
+        # A group added after start is first stepped at the next boundary of its own time step
+        group.step_ticks = int(t_s_frac / tick_s)
+        group.next_tick = (self.tick // group.step_ticks + 1) * group.step_ticks
+        self.groups.append(group)
+        return group
+
+    def step(self) -> List[SchedulerGroup]:
+        """
+        Advance the clock to the next tick at which any group is due, and step all due groups in the order they were
+        added. Returns the list of groups stepped.
+        """
+        if not self.groups:
+            raise ValueError("ValueError: No DER group is added to the scheduler")
+
+        self.tick = min(g.next_tick for g in self.groups)
+        time = self.time
+
+        due = [g for g in self.groups if g.next_tick == self.tick]
+        for group in due:
+            if group.on_step is not None:
+                group.on_step(time, group.members)
+            for member in group.members:
+                member.run()
+                member.time = time
+            group.n_steps += 1
+            group.next_tick += group.step_ticks
+        return due
+
+    def run(self, t_end: float) -> None:
+        """
+        Step all groups until the time t_end (inclusive) is reached
+
+        :param t_end: End time of the simulation in seconds
+        """
+        if not self.groups:
+            raise ValueError("ValueError: No DER group is added to the scheduler")
+
+        tick_end = round(Fraction(t_end) / self._tick_s)
+        while min(g.next_tick for g in self.groups) <= tick_end:
+            self.step()
@@ -0,0 +1,99 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+
+
+class SharedFleetArrays:
+    """
+    Input, state and output arrays of a DER fleet (one row per DER), stored in one multiprocessing.shared_memory
+    block. Each array is a NumPy view of the block, so processes attached to the same block read and write the arrays
+    in place, without copying or pickling. A DERFleet bound to row slices of the arrays (DERFleet.bind_arrays) keeps
+    its inputs, the states of its filters, ramps, delays and timers, its statuses and its outputs in the block.
+
+    Arrays are accessed by attribute path, e.g. arrays['v_lpf.lpf_out_prev'], and the arrays of the fleet itself also
+    as attributes, e.g. arrays.p_out_w.
+    """
+
+    # Name, data type and number of columns (None for 1-D arrays) of the input and output arrays
+    input_list = [('v_abc', float, 3), ('theta_abc', float, 3), ('freq_hz', float, None), ('p_dc_w', float, None),
+                  ('p_dem_w', float, None)]
+    output_list = [('p_desired_pu', float, None), ('q_desired_pu', float, None), ('i_pos_pu', complex, None),
+                   ('i_neg_pu', complex, None), ('p_out_w', float, None), ('q_out_var', float, None),
+                   ('der_status_code', np.int8, None)]
+
+    def __init__(self, n: int, name: str = None, layout: list = None):
+        """
+        :param n: Number of DERs in the fleet
+        :param name: Name of an existing block to attach to. If not provided, a new block is created.
+        :param layout: Arrays in the block, as (attribute path, data type, shape of one row), e.g. from
+                       fleet_layout(). Processes attaching to a block use the layout it was created with. Default is
+                       the input and output arrays (input_list and output_list).
+        """
+        self.n = n
+        self.owner = name is None
+        if layout is None:
+            layout = [(field, dtype, () if ncol is None else (ncol,))
+                      for field, dtype, ncol in self.input_list + self.output_list]
+        self.layout = [(path, np.dtype(dtype).str, tuple(row_shape)) for path, dtype, row_shape in layout]
+
+        offsets = []
+        size = 0
+        for path, dtype, row_shape in self.layout:
+            offsets.append(size)
+            # Align every array to 16 bytes
+            size += -(-n * int(np.prod(row_shape)) * np.dtype(dtype).itemsize // 16) * 16
+
+        self.shm = SharedMemory(name=name, create=self.owner, size=max(size, 1))
+        self.views = {}
+        for (path, dtype, row_shape), offset in zip(self.layout, offsets):
+            array = np.ndarray((n,) + row_shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            if self.owner:
+                array[...] = np.nan if array.dtype.kind in 'fc' else 0
+            self.views[path] = array
+            if '.' not in path:
+                setattr(self, path, array)
+
+    @staticmethod
+    def fleet_layout(fleet) -> list:
+        """
+        Layout of all input, state and output arrays of a DER fleet (see DERFleet.fleet_arrays), which depends on the
+        model only, so a fleet of one DER can be used
+
+        :param fleet: DERFleet object
+        """
+        return [(path, array.dtype.str, array.shape[1:]) for path, array in sorted(fleet.fleet_arrays().items())]
+
+    def __getitem__(self, path: str) -> np.ndarray:
+        return self.views[path]
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self) -> None:
+        """
+        Release the array views and detach from the block. The creator of the block also frees it. Fleets bound to the
+        arrays should be unbound first (DERFleet.unbind_arrays).
+        """
+        if self.shm is None:
+            return
+        for path in self.views:
+            if '.' not in path:
+                setattr(self, path, None)
+        self.views = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
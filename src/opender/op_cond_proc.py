@@ -19,8 +19,9 @@ Created on Thu March 24 00:45:28 2022
 
 import math
 import cmath
-import logging
 from opender import DERCommonFileFormat
+from opender.diagnostics import report
+from opender.common_file_format.setting_codes import SINGLE, THREE, AVG, POS
 from opender import auxiliary_funcs
 
 
@@ -31,9 +32,10 @@ class DERInputs:
     EPRI Report Reference: Section 3.3 in Report #3002030962: IEEE 1547-2018 OpenDER Model
     """
 
-    def __init__(self, der_file: DERCommonFileFormat):
+    def __init__(self, der_file: DERCommonFileFormat, der_obj=None):
 
         self.der_file = der_file
+        self.der_obj = der_obj  # DER object collecting the diagnostics
         # Operating condition inputs to the DER model
         self.freq_hz = None     # Frequency at DER RPA in Hz
         self.v_a = None         # Phase a to ground voltage magnitude in volts
@@ -66,7 +68,10 @@ class DERInputs:
         self.p_avl_pu = None    # Available power in pu considering efficiency (same value as p_dc_w for PV, 1 for BESS)
         self.p_dem_pu = None    # Active power demand for BESS
 
-        self.v_lpf = auxiliary_funcs.low_pass_filter.LowPassFilter()    #
+        self.v_lpf = auxiliary_funcs.low_pass_filter.LowPassFilter(der_obj)    #
+
+        self.trusted_inputs = False     # Validity check only when the input types change, see DER trusted_inputs
+        self.checked_types = None       # Input types at the last validity check with trusted inputs
 
     def operating_condition_input_processing(self):
         """
@@ -96,10 +101,14 @@ class DERInputs:
         :param v_neg_pu:    Negative sequence voltage phasor as complex number at RPA
         """
 
-        # perform input validity check
-        self.operating_conditions_validity_check()
+        # perform input validity check, only if the input types changed since the last check for trusted inputs
+        if not self.trusted_inputs:
+            self.operating_conditions_validity_check()
+        elif self.input_types() != self.checked_types:
+            self.operating_conditions_validity_check()
+            self.checked_types = self.input_types()
 
-        if self.der_file.NP_PHASE == "THREE":
+        if self.der_file.np_phase_code == THREE:
 
             # Eq. 3.3.1-1, calculate per unit value of three phase voltage
             self.v_a_pu = (math.sqrt(3) * self.v_a) / self.der_file.NP_AC_V_NOM
@@ -118,12 +127,12 @@ class DERInputs:
             self.v_angle = cmath.phase(self.v_pos_pu)
 
             # Eq. 3.3.1-3, if DER responds to the average of three phase RMS value
-            if self.der_file.NP_V_MEAS_UNBALANCE == "AVG":
+            if self.der_file.np_v_meas_unbalance_code == AVG:
                 self.v_meas_pu = self.v_lpf.low_pass_filter((self.v_a_pu + self.v_b_pu + self.v_c_pu)/3,
                                                             self.der_file.NP_V_MEAS_DELAY)
 
             # Eq. 3.3.1-4, if DER responds to positive sequence component of voltage.
-            if self.der_file.NP_V_MEAS_UNBALANCE == "POS":
+            if self.der_file.np_v_meas_unbalance_code == POS:
                 self.v_meas_pu = self.v_lpf.low_pass_filter(abs(self.v_pos_pu), self.der_file.NP_V_MEAS_DELAY)
 
             # Eq. 3.3.1-5, calculate phase-to-phase voltages
@@ -135,7 +144,7 @@ class DERInputs:
             self.v_low_pu = min(self.v_a_pu, self.v_b_pu, self.v_c_pu, self.v_ab_pu, self.v_bc_pu, self.v_ca_pu)
             self.v_high_pu = max(self.v_a_pu, self.v_b_pu, self.v_c_pu, self.v_ab_pu, self.v_bc_pu, self.v_ca_pu)
 
-        elif self.der_file.NP_PHASE == "SINGLE":
+        elif self.der_file.np_phase_code == SINGLE:
 
             # Eq. 3.3.1-7, single phase applicable voltages
             self.v_pos_pu = (self.v / self.der_file.NP_AC_V_NOM) * cmath.exp(1j * self.theta)
@@ -156,6 +165,12 @@ class DERInputs:
             # Eq. 3.3.3-2, DER available power is max
             self.p_avl_pu = 1
 
+    def input_types(self) -> tuple:
+        # Types of the operating condition inputs, e.g. NoneType if not defined
+        return (type(self.v_a), type(self.v_b), type(self.v_c), type(self.theta_a), type(self.theta_b),
+                type(self.theta_c), type(self.v), type(self.theta), type(self.freq_hz), type(self.p_dc_w),
+                type(self.p_dem_w))
+
     def operating_conditions_validity_check(self):
         """
         Validity Check for DER Model operating conditions
@@ -163,18 +178,18 @@ class DERInputs:
         Should be executed every timestep
         """
 
-        if self.der_file.NP_PHASE == "SINGLE":
+        if self.der_file.np_phase_code == SINGLE:
             if self.v is None:
                 raise ValueError("ValueError: V is not defined!")
             if self.v < 0:
-                logging.error("Error: V should be greater than 0, converting it to postive")
+                report(self.der_obj, 'V_NEGATIVE')
                 self.v = -self.v
             if self.theta is None:
-                logging.warning("Error: Theta is not defined. Default to 0")
+                report(self.der_obj, 'THETA_UNDEFINED')
                 self.theta = 0
 
 
-        if self.der_file.NP_PHASE == "THREE":
+        if self.der_file.np_phase_code == THREE:
             if self.v_a is None or self.v_b is None or self.v_c is None:
                 raise ValueError("ValueError: V is not defined!")
 
@@ -190,16 +205,16 @@ class DERInputs:
                 self.theta_c = 2 * math.pi / 3
 
         if self.freq_hz is None:
-            logging.error("Error: F is not defined! Assuming 60Hz")
+            report(self.der_obj, 'F_UNDEFINED')
             self.freq_hz = 60
 
         if self.p_dc_w is None:
             if self.der_file.NP_TYPE == 'PV':
-                logging.error("ValueError: p_dc_w is not defined! Assuming 0")
+                report(self.der_obj, 'P_DC_UNDEFINED')
             self.p_dc_w = 0
 
         if self.p_dc_w < 0:
-            logging.warning("ValueError: p_dc_w is negative. By definition, available DC power should be positive")
+            report(self.der_obj, 'P_DC_NEGATIVE')
             self.p_dc_w = 0
 
     def __str__(self):
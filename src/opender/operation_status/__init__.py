@@ -15,4 +15,5 @@
 # -*- coding: utf-8 -*-
 
 from .operating_status import OperatingStatus
+from .status_codes import DERStatus, RTControl
 # from .operating_status_pv import OperatingStatusPV
\ No newline at end of file
@@ -17,6 +17,7 @@
 from opender.auxiliary_funcs.time_delay import TimeDelay
 from opender.auxiliary_funcs.cond_delay import ConditionalDelay
 import numpy as np
+from opender.operation_status.status_codes import TRIP
 
 
 # %%
@@ -40,8 +41,8 @@ class EnterServiceCrit:
 
         self.es_randomized_delay_time = 0  # Enter service randomized delay time (initialized by 0)
 
-        self.rand_delay = TimeDelay()
-        self.vft_delay = ConditionalDelay()
+        self.rand_delay = TimeDelay(der_obj)
+        self.vft_delay = ConditionalDelay(der_obj)
 
     def es_decision(self):
         """
@@ -82,7 +83,7 @@ class EnterServiceCrit:
         self.es_vfto_crit = self.es_vft_crit and self.es_other_crit()
 
         # Eq 3.5.1-4, generate the enter service randomized delay. The value is 0 if enter service ramp is used.
-        if self.der_obj.der_status != "Trip":
+        if self.der_obj.der_status_code != TRIP:
             # if DER is on, reset randomized delay to 0 for next time use.
             self.es_randomized_delay_time = 0
         else:
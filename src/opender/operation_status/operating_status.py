@@ -15,6 +15,8 @@ import opender
 from opender.operation_status.rt_crit import RideThroughCrit
 from opender.operation_status.enter_service_crit.es_crit import EnterServiceCrit
 from opender.operation_status.trip_crit.trip_crit import TripCrit
+from opender.operation_status.status_codes import DERStatus, TRIP, ENTERING_SERVICE, CONTINUOUS_OPERATION, \
+    MANDATORY_OPERATION, PERMISSIVE_OPERATION, MOMENTARY_CESSATION, CEASE_TO_ENERGIZE, NOT_DEFINED, STATUS_NAMES
 
 
 class OperatingStatus:
@@ -35,10 +37,11 @@ class OperatingStatus:
         # and Not Defined (for frequency ride-through)
         # For value initiation, it is assumed to be either in service (continuous operation) or not in service (trip)
         # Ride-through status may be determined after running through the voltage and frequency ride-through criteria.
+        # The status is kept as a code (DERStatus), with the status name available as der_status.
         if der_obj.der_file.STATUS_INIT:
-            self.der_status = 'Continuous Operation'
+            self.der_status_code = CONTINUOUS_OPERATION
         else:
-            self.der_status = 'Trip'
+            self.der_status_code = TRIP
 
         self.ridethroughcrit = RideThroughCrit(der_obj)
         self.enterservicecrit = EnterServiceCrit(der_obj)
@@ -65,38 +68,51 @@ class OperatingStatus:
         trip_crit = self.tripcrit.trip_decision()
 
         # Ride-through criteria (Section 3.5.1.3 in Report #3002030962: IEEE 1547-2018 OpenDER Model)
-        self.ridethroughcrit.determine_ride_through_mode()
+        ridethroughcrit = self.ridethroughcrit
+        ridethroughcrit.determine_ride_through_mode()
 
         # Eq 3.5.1-57,58, If DER is in Trip condition, and enter service criteria is met, depending on whether
         # simulation time step is greater than the ramp time, DER goes to "Entering Service" or "Continuous Operation"
-        if self.der_status == 'Trip':
+        if self.der_status_code == TRIP:
             if es_crit:
-                if opender.der.DER.t_s <= self.exec_delay.es_ramp_rate_exec:
-                    self.der_status = 'Entering Service'
+                if self.der_obj.t_s <= self.exec_delay.es_ramp_rate_exec:
+                    self.der_status_code = ENTERING_SERVICE
                 else:
-                    self.der_status = 'Continuous Operation'
+                    self.der_status_code = CONTINUOUS_OPERATION
 
         # Eq 3.5.1-59~64, If DER is not Tripped (Entering Service, Continuous Operation, or all other Ride-through
         # modes), DER status depends on ride-through modes, in the priority of: Not Defined (frequency ride-through),
         # Other ride-through modes, and Continuous Operation.
-        if self.der_status != 'Trip':
-            if self.ridethroughcrit.rt_mode_f == 'Not Defined':
-                self.der_status = 'Not Defined'
-            elif self.ridethroughcrit.rt_mode_v in ['Cease to Energize', 'Permissive Operation', 'Momentary Cessation']:
-                self.der_status = self.ridethroughcrit.rt_mode_v
-            elif self.ridethroughcrit.rt_mode_v == 'Mandatory Operation' or self.ridethroughcrit.rt_mode_f == 'Mandatory Operation':
-                self.der_status = 'Mandatory Operation'
+        if self.der_status_code != TRIP:
+            rt_mode_v = ridethroughcrit.rt_mode_v_code
+            if ridethroughcrit.rt_mode_f_code == NOT_DEFINED:
+                self.der_status_code = NOT_DEFINED
+            elif rt_mode_v == CEASE_TO_ENERGIZE or rt_mode_v == PERMISSIVE_OPERATION or rt_mode_v == MOMENTARY_CESSATION:
+                self.der_status_code = rt_mode_v
+            elif rt_mode_v == MANDATORY_OPERATION or ridethroughcrit.rt_mode_f_code == MANDATORY_OPERATION:
+                self.der_status_code = MANDATORY_OPERATION
             else:
                 if self.der_obj.activepowerfunc.es_completed:
-                    self.der_status = 'Continuous Operation'
+                    self.der_status_code = CONTINUOUS_OPERATION
                 else:
-                    self.der_status = 'Entering Service'
+                    self.der_status_code = ENTERING_SERVICE
                 # If DER is in continuous operation, reset the flag that indicates required ride-through time has passed
-                self.ridethroughcrit.reset_rt_pass_time_req()
+                ridethroughcrit.reset_rt_pass_time_req()
 
         # Eq. 3.5.1-65, if trip criteria is met, DER goes to Trip mode
         if trip_crit:
-            self.der_status = 'Trip'
+            self.der_status_code = TRIP
 
-        return self.der_status
+        return self.der_status_code
+
+    @property
+    def der_status(self) -> str:
+        """
+        DER operating status name, e.g. 'Trip'
+        """
+        return STATUS_NAMES[self.der_status_code]
+
+    @der_status.setter
+    def der_status(self, der_status):
+        self.der_status_code = DERStatus.from_label(der_status)
 
@@ -11,8 +11,9 @@
 #   to endorse or promote products derived from this software without specific
 #   prior written permission.
 
-
-import opender
+from opender.common_file_format.setting_codes import CAT_I, CAT_II, CAT_III
+from opender.operation_status.status_codes import DERStatus, CONTINUOUS_OPERATION, MANDATORY_OPERATION, \
+    PERMISSIVE_OPERATION, MOMENTARY_CESSATION, CEASE_TO_ENERGIZE, NOT_DEFINED, NO_MODE, status_name
 
 
 class RideThroughCrit:
@@ -23,14 +24,15 @@ class RideThroughCrit:
 
     def __init__(self, der_obj):
 
+        self.der_obj = der_obj
         self.der_file = der_obj.der_file
         self.exec_delay = der_obj.exec_delay
         self.der_input = der_obj.der_input
 
         self.der_status = der_obj.der_file.STATUS_INIT
 
-        self._rt_mode_v = None          # DER voltage ride-through performance mode.
-        self.rt_mode_f = None           # DER frequency ride-through performance mode.
+        self.rt_mode_v_code = NO_MODE   # DER voltage ride-through performance mode code (DERStatus).
+        self.rt_mode_f_code = NO_MODE   # DER frequency ride-through performance mode code (DERStatus).
         self.rt_pass_time_req = False   # Flag indicating the minimum ride-through time has passed, and the DER is in the “may ride-through and may trip” region
 
         self.rt_time_lv = 0     # Low voltage ride through timer
@@ -53,18 +55,20 @@ class RideThroughCrit:
         """
 
         # Eq 3.5.1-8, clear and re-determine the abnormal voltage ride-through mode 
-        self._rt_mode_v = None
+        self.rt_mode_v_code = NO_MODE
+
+        abnormal_op_cat = self.der_file.np_abnormal_op_cat_code
 
-        if self.der_file.NP_ABNORMAL_OP_CAT == 'CAT_I':
+        if abnormal_op_cat == CAT_I:
             if 1.1 < self.der_input.v_high_pu:
                 # Eq 3.5.1-9, if voltage is higher than 1.1pu, high voltage ride-through timer starts to count
-                self.rt_time_hv = self.rt_time_hv + opender.DER.t_s
+                self.rt_time_hv = self.rt_time_hv + self.der_obj.t_s
 
                 # Eq 3.5.1-10,11, depending on voltage level, voltage ride-through mode is determined.
                 if self.der_input.v_high_pu <= 1.2:
-                    self.rt_mode_v = 'Permissive Operation'
+                    self.set_rt_mode_v(PERMISSIVE_OPERATION)
                 else:
-                    self.rt_mode_v = 'Cease to Energize'
+                    self.set_rt_mode_v(CEASE_TO_ENERGIZE)
 
                 # Eq 3.5.1-12, a flag is used to indicate if any ride-through timer is greater than
                 # the standard defined minimum ride through time.
@@ -75,41 +79,41 @@ class RideThroughCrit:
 
             if self.der_input.v_low_pu < 0.88:
                 # Eq 3.5.1-13, if voltage is lower than 0.88pu, low voltage ride-through timer starts to count
-                self.rt_time_lv = self.rt_time_lv + opender.DER.t_s
+                self.rt_time_lv = self.rt_time_lv + self.der_obj.t_s
 
                 # Eq 3.5.1-14,15, determine if in mandatory operation and if passed the minimum required time
                 if 0.7 <= self.der_input.v_low_pu < 0.88:
-                    self.rt_mode_v = 'Mandatory Operation'
+                    self.set_rt_mode_v(MANDATORY_OPERATION)
                     if self.rt_time_lv > 0.7 + 4 * (self.der_input.v_low_pu - 0.7):
                         self.rt_pass_time_req = True
 
                 # Eq 3.5.1-16,17, determine if in permissive operation and if passed the minimum required time
                 if 0.5 <= self.der_input.v_low_pu < 0.7:
-                    self.rt_mode_v = 'Permissive Operation'
+                    self.set_rt_mode_v(PERMISSIVE_OPERATION)
                     if self.rt_time_lv > 0.16:
                         self.rt_pass_time_req = True
 
                 # Eq 3.5.1-18, determine if in cease to energize region
                 if self.der_input.v_low_pu < 0.5:
-                    self.rt_mode_v = 'Cease to Energize'
+                    self.set_rt_mode_v(CEASE_TO_ENERGIZE)
 
             # Eq 3.5.1-19,20, determine if in momentary cessation region
             if self.der_file.MC_ENABLE and self.der_input.v_high_pu >= self.der_file.MC_HVRT_V1:
-                self.rt_mode_v = 'Momentary Cessation'
+                self.set_rt_mode_v(MOMENTARY_CESSATION)
             if self.der_file.MC_ENABLE and self.der_input.v_low_pu <= self.der_file.MC_LVRT_V1:
-                self.rt_mode_v = 'Momentary Cessation'
+                self.set_rt_mode_v(MOMENTARY_CESSATION)
 
-        if self.der_file.NP_ABNORMAL_OP_CAT == 'CAT_II':
+        if abnormal_op_cat == CAT_II:
 
             if 1.1 < self.der_input.v_high_pu:
                 # Eq 3.5.1-21, if voltage is higher than 1.1pu, high voltage ride-through timer starts to count
-                self.rt_time_hv = self.rt_time_hv + opender.DER.t_s
+                self.rt_time_hv = self.rt_time_hv + self.der_obj.t_s
 
                 # Eq 3.5.1-22,23, depending on voltage level, voltage ride-through mode is determined.
                 if self.der_input.v_high_pu <= 1.2:
-                    self.rt_mode_v = 'Permissive Operation'
+                    self.set_rt_mode_v(PERMISSIVE_OPERATION)
                 else:
-                    self.rt_mode_v = 'Cease to Energize'
+                    self.set_rt_mode_v(CEASE_TO_ENERGIZE)
 
                 # Eq 3.5.1-24, determine if ride-through time passed the minimum required time
                 if (self.rt_time_hv <= 1) and (1.1 < self.der_input.v_high_pu <= 1.15) or \
@@ -119,48 +123,48 @@ class RideThroughCrit:
 
             if self.der_input.v_low_pu < 0.88:
                 # Eq 3.5.1-25, if voltage is lower than 0.88pu, low voltage ride-through timer starts to count
-                self.rt_time_lv = self.rt_time_lv + opender.DER.t_s
+                self.rt_time_lv = self.rt_time_lv + self.der_obj.t_s
 
                 # Eq 3.5.1-26,27, determine if in mandatory operation and if passed the minimum required time
                 if 0.65 <= self.der_input.v_low_pu < 0.88:
-                    self.rt_mode_v = 'Mandatory Operation'
+                    self.set_rt_mode_v(MANDATORY_OPERATION)
                     if self.rt_time_lv > 3 + 8.7 * (self.der_input.v_low_pu - 0.65):
                         self.rt_pass_time_req = True
 
                 # Eq 3.5.1-28,29, determine if in permissive operation block 1 and if passed the minimum required time
                 if 0.45 <= self.der_input.v_low_pu < 0.65:
-                    self.rt_mode_v = 'Permissive Operation'
+                    self.set_rt_mode_v(PERMISSIVE_OPERATION)
                     if self.rt_time_lv > 0.32:
                         self.rt_pass_time_req = True
 
                 # Eq 3.5.1-30,31, determine if in permissive operation block 2 and if passed the minimum required time
                 if 0.3 <= self.der_input.v_low_pu < 0.45:
-                    self.rt_mode_v = 'Permissive Operation'
+                    self.set_rt_mode_v(PERMISSIVE_OPERATION)
                     if self.rt_time_lv > 0.16:
                         self.rt_pass_time_req = True
 
                 # Eq 3.5.1-32, determine if in cease to energize region
                 if self.der_input.v_low_pu < 0.3:
-                    self.rt_mode_v = 'Cease to Energize'
+                    self.set_rt_mode_v(CEASE_TO_ENERGIZE)
 
             # Eq 3.5.1-33,34, determine if in momentary cessation region
             if self.der_file.MC_ENABLE and self.der_input.v_high_pu >= self.der_file.MC_HVRT_V1:
-                self.rt_mode_v = 'Momentary Cessation'
+                self.set_rt_mode_v(MOMENTARY_CESSATION)
             if self.der_file.MC_ENABLE and self.der_input.v_low_pu <= self.der_file.MC_LVRT_V1:
-                self.rt_mode_v = 'Momentary Cessation'
+                self.set_rt_mode_v(MOMENTARY_CESSATION)
 
-        if self.der_file.NP_ABNORMAL_OP_CAT == 'CAT_III':
+        if abnormal_op_cat == CAT_III:
             if 1.1 < self.der_input.v_high_pu:
                 # Eq 3.5.1-35, if voltage is higher than 1.1pu, high voltage ride-through timer starts to count
-                self.rt_time_hv = self.rt_time_hv + opender.DER.t_s
+                self.rt_time_hv = self.rt_time_hv + self.der_obj.t_s
 
                 # Eq 3.5.1-36,37, depending on voltage level, voltage ride-through mode is determined.
                 if self.der_file.MC_ENABLE and self.der_input.v_high_pu >= self.der_file.MC_HVRT_V1:
-                    self.rt_mode_v = 'Momentary Cessation'
+                    self.set_rt_mode_v(MOMENTARY_CESSATION)
                 else:
-                    self.rt_mode_v = 'Mandatory Operation'
+                    self.set_rt_mode_v(MANDATORY_OPERATION)
                 # else:
-                #     self.rt_mode_v = 'Cease to Energize'
+                #     self.set_rt_mode_v(CEASE_TO_ENERGIZE)
 
                 # Eq 3.5.1-38, determine if passed the minimum required time
                 if self.rt_time_hv <= 12:
@@ -168,25 +172,25 @@ class RideThroughCrit:
 
             if self.der_input.v_low_pu < 0.88:
                 # Eq 3.5.1-39, if voltage is lower than 0.88pu, low voltage ride-through timer starts to count
-                self.rt_time_lv = self.rt_time_lv + opender.DER.t_s
+                self.rt_time_lv = self.rt_time_lv + self.der_obj.t_s
 
                 # Eq 3.5.1-40,41, determine if in mandatory operation block 1 and if passed the minimum required time
                 if 0.7 <= self.der_input.v_low_pu < 0.88:
-                    self.rt_mode_v = 'Mandatory Operation'
+                    self.set_rt_mode_v(MANDATORY_OPERATION)
                     if self.rt_time_lv > 20:
                         self.rt_pass_time_req = True
 
                 # Eq 3.5.1-42,43, determine if in mandatory operation block 2 and if passed the minimum required time
                 if self.der_input.v_low_pu < 0.7:
-                    # self.rt_mode_v = 'Mandatory Operation'
+                    # self.set_rt_mode_v(MANDATORY_OPERATION)
                     if self.rt_time_lv > 10:
                         self.rt_pass_time_req = True
 
                 # Eq 3.5.1-44,45, determine if in momentary cessation mode and if passed the minimum required time
                 if self.der_file.MC_ENABLE and self.der_input.v_low_pu <= self.der_file.MC_LVRT_V1:
-                    self.rt_mode_v = 'Momentary Cessation'
+                    self.set_rt_mode_v(MOMENTARY_CESSATION)
                 else:
-                    self.rt_mode_v = 'Mandatory Operation'
+                    self.set_rt_mode_v(MANDATORY_OPERATION)
                 
                 # Eq 3.5.1-46, Mark the ride-through time passed flag as true, to indicate actual DER may not decide to continue riding-through
                 if self.der_input.v_low_pu <= 0.5 and self.rt_time_lv > 1:
@@ -194,25 +198,25 @@ class RideThroughCrit:
 
         # Eq 3.5.1-47, Continuous operation if voltage is between 0.88-1.1, reset timers
         if self.der_input.v_low_pu >= 0.88 and self.der_input.v_high_pu <= 1.1:
-            self.rt_mode_v = 'Continuous Operation'
+            self.set_rt_mode_v(CONTINUOUS_OPERATION)
             self.rt_time_lv = 0
             self.rt_time_hv = 0
 
         # Eq 3.5.1-48, Continuous operation if frequency is between 58.5 and 61.2, reset timers
         if 58.5 <= self.der_input.freq_hz <= 61.2:
-            self.rt_mode_f = 'Continuous Operation'
+            self.rt_mode_f_code = CONTINUOUS_OPERATION
             self.rt_time_hf = 0
             self.rt_time_lf = 0
 
         if 61.2 <= self.der_input.freq_hz:
             # Eq 3.5.1-49, if frequency is higher than 61.2 Hz, high frequency ride-through timer starts to count
-            self.rt_time_hf = self.rt_time_hf + opender.DER.t_s
+            self.rt_time_hf = self.rt_time_hf + self.der_obj.t_s
 
             # Eq 3.5.1-50,51, depending on system frequency, frequency ride-through mode is determined.
             if self.der_input.freq_hz <= 61.8:
-                self.rt_mode_f = 'Mandatory Operation'
+                self.rt_mode_f_code = MANDATORY_OPERATION
             else:
-                self.rt_mode_f = 'Not Defined'
+                self.rt_mode_f_code = NOT_DEFINED
 
             # Eq 3.5.1-52, determine if passed the minimum required ride-through time
             if self.rt_time_hf > 299:
@@ -220,13 +224,13 @@ class RideThroughCrit:
 
         if self.der_input.freq_hz <= 58.8:
             # Eq 3.5.1-53, if frequency is lower than  58.8 Hz, low frequency ride-through timer starts to count
-            self.rt_time_lf = self.rt_time_lf + opender.DER.t_s
+            self.rt_time_lf = self.rt_time_lf + self.der_obj.t_s
 
             # Eq 3.5.1-54,55, depending on system frequency, frequency ride-through mode is determined.
             if 57.0 <= self.der_input.freq_hz:
-                self.rt_mode_f = 'Mandatory Operation'
+                self.rt_mode_f_code = MANDATORY_OPERATION
             else:
-                self.rt_mode_f = 'Not Defined'
+                self.rt_mode_f_code = NOT_DEFINED
 
             # Eq 3.5.1-56, determine if passed the minimum required ride-through time
             if self.rt_time_lf > 299:
@@ -238,20 +242,31 @@ class RideThroughCrit:
         """
         self.rt_pass_time_req = False
 
+    def set_rt_mode_v(self, rt_mode_v_code):
+        """
+        Update the voltage ride-through mode, unless a mode of higher priority was already determined in this time
+        step. Momentary Cessation and Cease to Energize always apply, other modes only if the current mode code is
+        not greater, i.e. in the priority of Permissive Operation, Mandatory Operation, and Continuous Operation.
+
+        :param rt_mode_v_code: Voltage ride-through mode code (DERStatus)
+        """
+        if rt_mode_v_code >= MOMENTARY_CESSATION or self.rt_mode_v_code <= rt_mode_v_code:
+            self.rt_mode_v_code = rt_mode_v_code
+
     @property
     def rt_mode_v(self) -> str:
-        return self._rt_mode_v
+        """
+        Voltage ride-through mode name, e.g. 'Mandatory Operation', or None if not determined
+        """
+        return status_name(self.rt_mode_v_code)
 
     @rt_mode_v.setter
     def rt_mode_v(self, rt_mode_v):
-        if (rt_mode_v == 'Continuous Operation' and self._rt_mode_v not in ['Mandatory Operation', 'Permissive Operation', 'Momentary Cessation', 'Cease to Energize']) or\
-           (rt_mode_v == 'Mandatory Operation' and self._rt_mode_v not in ['Permissive Operation', 'Momentary Cessation', 'Cease to Energize']) or \
-           (rt_mode_v == 'Permissive Operation' and self._rt_mode_v not in ['Momentary Cessation', 'Cease to Energize']) or \
-           (rt_mode_v == 'Momentary Cessation') or (rt_mode_v == 'Cease to Energize'):
-            self._rt_mode_v = rt_mode_v
-        # else:
-        #     print('ERROR! Mode was ', self._rt_mode_v, ' and is ', rt_mode_v)  # TODO delete this after debug
-
-
-
+        self.set_rt_mode_v(DERStatus.from_label(rt_mode_v))
 
+    @property
+    def rt_mode_f(self) -> str:
+        """
+        Frequency ride-through mode name, e.g. 'Not Defined', or None if not determined
+        """
+        return status_name(self.rt_mode_f_code)
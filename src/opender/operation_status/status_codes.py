@@ -0,0 +1,84 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+from enum import IntEnum
+
+
+class DERStatus(IntEnum):
+    """
+    DER operating status codes, also used for the voltage and frequency ride-through modes. Codes fit in int8 arrays,
+    and the status names used in the EPRI report are available as the label of each code.
+    """
+    TRIP = 0
+    ENTERING_SERVICE = 1
+    CONTINUOUS_OPERATION = 2
+    MANDATORY_OPERATION = 3
+    PERMISSIVE_OPERATION = 4
+    MOMENTARY_CESSATION = 5
+    CEASE_TO_ENERGIZE = 6
+    NOT_DEFINED = 7
+
+    @property
+    def label(self) -> str:
+        return STATUS_NAMES[self]
+
+    @classmethod
+    def from_label(cls, label):
+        """
+        Status code of a status name, e.g. 'Trip'. Codes and None (for ride-through modes) are returned unchanged.
+        """
+        if label is None or isinstance(label, int):
+            return label
+        return cls(STATUS_CODES[label])
+
+
+class RTControl(IntEnum):
+    """
+    DER ride-through control mode codes
+    """
+    TRIP = 0
+    NORMAL_OPERATION = 1
+    DYNAMIC_VOLTAGE_SUPPORT = 2
+    CEASE_TO_ENERGIZE = 3
+
+    @property
+    def label(self) -> str:
+        return RT_CTRL_NAMES[self]
+
+
+# Module constants of the codes, for fast comparisons in the model blocks
+TRIP = DERStatus.TRIP
+ENTERING_SERVICE = DERStatus.ENTERING_SERVICE
+CONTINUOUS_OPERATION = DERStatus.CONTINUOUS_OPERATION
+MANDATORY_OPERATION = DERStatus.MANDATORY_OPERATION
+PERMISSIVE_OPERATION = DERStatus.PERMISSIVE_OPERATION
+MOMENTARY_CESSATION = DERStatus.MOMENTARY_CESSATION
+CEASE_TO_ENERGIZE = DERStatus.CEASE_TO_ENERGIZE
+NOT_DEFINED = DERStatus.NOT_DEFINED
+NO_MODE = -1        # Ride-through mode not determined, None as a name
+STATUS_NAMES = ('Trip', 'Entering Service', 'Continuous Operation', 'Mandatory Operation', 'Permissive Operation',
+                'Momentary Cessation', 'Cease to Energize', 'Not Defined')
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+RT_CTRL_TRIP = RTControl.TRIP
+RT_CTRL_NORMAL = RTControl.NORMAL_OPERATION
+RT_CTRL_DVS = RTControl.DYNAMIC_VOLTAGE_SUPPORT
+RT_CTRL_CTE = RTControl.CEASE_TO_ENERGIZE
+RT_CTRL_NAMES = ('Trip', 'Normal Operation', 'Dynamic Voltage Support', 'Cease to Energize')
+
+
+def status_name(code):
+    """
+    Status name of a status or ride-through mode code, None for NO_MODE or None
+    """
+    return None if code is None or code < 0 else STATUS_NAMES[code]
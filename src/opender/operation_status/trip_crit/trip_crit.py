@@ -38,14 +38,14 @@ class TripCrit:
         self.of1_trip = None    # DER trip criteria met due to over frequency must trip setting 1 (OF1)
         self.of2_trip = None    # DER trip criteria met due to over frequency must trip setting 1 (OF2)
 
-        self.uv1_delay = ConditionalDelay()
-        self.uv2_delay = ConditionalDelay()
-        self.ov1_delay = ConditionalDelay()
-        self.ov2_delay = ConditionalDelay()
-        self.uf1_delay = ConditionalDelay()
-        self.uf2_delay = ConditionalDelay()
-        self.of1_delay = ConditionalDelay()
-        self.of2_delay = ConditionalDelay()
+        self.uv1_delay = ConditionalDelay(der_obj)
+        self.uv2_delay = ConditionalDelay(der_obj)
+        self.ov1_delay = ConditionalDelay(der_obj)
+        self.ov2_delay = ConditionalDelay(der_obj)
+        self.uf1_delay = ConditionalDelay(der_obj)
+        self.uf2_delay = ConditionalDelay(der_obj)
+        self.of1_delay = ConditionalDelay(der_obj)
+        self.of2_delay = ConditionalDelay(der_obj)
 
     def trip_decision(self):
         """
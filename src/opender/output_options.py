@@ -13,6 +13,7 @@
 
 import cmath
 from opender.auxiliary_funcs import sym_component
+from opender.common_file_format.setting_codes import THREE
 
 
 class DEROutputs:
@@ -91,7 +92,7 @@ class DEROutputs:
         :param NP_PHASE:	Single- or Three-phase DER
         """
 
-        if self.der_file.NP_PHASE == "THREE":
+        if self.der_file.np_phase_code == THREE:
             # Eq 3.11.2-1, calculate three phase current
             self.i_a_pu, self.i_b_pu, self.i_c_pu = sym_component.convert_symm_to_abc(i_pos_pu, i_neg_pu)
 
@@ -133,7 +134,7 @@ class DEROutputs:
         # Limit output voltage based on DER inverter DC voltage
         self.v_pos_out_pu, self.v_neg_out_pu = self.v_limit(self.v_pos_out_cmd_pu, self.v_neg_out_cmd_pu)
 
-        if self.der_file.NP_PHASE == "THREE":
+        if self.der_file.np_phase_code == THREE:
             # Eq 3.11.3-4, Calculate three phase voltages in per unit based on limited positive and negative voltage
             self.v_a_out_pu, self.v_b_out_pu, self.v_c_out_pu = sym_component.convert_symm_to_abc(self.v_pos_out_pu, self.v_neg_out_pu, self.der_input.v_zero_pu)
             self.v_out_mag_pu = [abs(self.v_a_out_pu), abs(self.v_b_out_pu), abs(self.v_c_out_pu)]
@@ -0,0 +1,351 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+from collections import deque
+from enum import Enum
+import math
+import operator
+import numpy as np
+from opender.auxiliary_funcs.accumulation import repeated_sum
+from opender.auxiliary_funcs.cond_delay import ConditionalDelay
+from opender.auxiliary_funcs.time_delay import TimeDelay
+from opender.common_file_format import DERCommonFileFormat
+from opender.diagnostics import Diagnostics
+
+# Attributes counting time steps, which change in every time step even if the DER is settled. They are not compared,
+# and are moved forward when fast-forwarding: DER.time and TimeDelay.step.
+COUNTERS = ('time', 'step')
+
+
+def _attribute_names(obj):
+    names = list(vars(obj)) if hasattr(obj, '__dict__') else []
+    for cls in type(obj).__mro__:
+        names.extend(name for name in getattr(cls, '__slots__', ()) if hasattr(obj, name))
+    return [name for name in names if name not in COUNTERS]
+
+
+def _is_block(value):
+    # Model blocks are the objects of the opender package, except settings, diagnostics, status codes and Quiescence
+    return type(value).__module__.startswith('opender') and \
+        not isinstance(value, (DERCommonFileFormat, Diagnostics, Quiescence, Enum))
+
+
+def _state_value(value):
+    # Containers are copied, so that later changes in place are detected
+    if isinstance(value, (list, deque)):
+        return tuple(value)
+    return value
+
+
+def _equal(a, b, tol):
+    if a is b:
+        return True
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    if tol > 0 and isinstance(a, (float, np.floating)) and isinstance(b, (float, np.floating)):
+        return abs(a - b) <= tol
+    return type(a) is type(b) and a == b
+
+
+class Quiescence:
+    """
+    Settled-state detection and fast-forward of a DER object with constant inputs.
+
+    A DER is settled if one time step leaves its whole state unchanged, apart from the time step counters: all low
+    pass filters and ramp rate limits at their targets, no pending TimeDelay changes, and no ride-through, trip or
+    enter service timers counting. Any further time step then gives the same outputs and state, so time steps can be
+    skipped by moving the counters forward. While only conditional delay timers count (e.g. the enter service delay
+    ES_DELAY after a trip), time steps are skipped up to the time step before the next timed transition, moving the
+    timers forward by their repeated additions in closed form.
+
+    The same state is captured by checkpoint() and written back by restore(), to evaluate the DER and roll it back.
+    """
+
+    def __init__(self, der_obj, tol: float = 0.0, max_backoff: int = 64):
+        """
+        :param der_obj: DER object
+        :param tol: Tolerance of the change of float state variables in one time step. Default 0 detects the exact
+                    fixed point, so fast-forwarding gives the same results as running every time step.
+        :param max_backoff: Maximum number of time steps between two state comparisons, while the outputs are constant
+                            but the DER is not settled (e.g. a trip timer counting)
+        """
+        self.der_obj = der_obj
+        self.tol = tol
+        self.max_backoff = max_backoff
+        self.blocks = []            # Model blocks of the DER object, with their attribute names and getter
+        self.attributes = []        # State attributes of the model blocks, as (block, attribute name), in state order
+        self.containers = []        # Positions of the list and queue attributes (e.g. TimeDelay queues) in the state
+        self.timers = set()         # Positions of the conditional delay timers in the state
+        self.counter_blocks = []    # Model blocks with a time step counter (TimeDelay)
+        self.event_blocks = []      # Model blocks with timed transitions (see steps_to_next_event)
+        self.prev_state = None      # State and counters after the previous time step
+        self.compared_state = None  # State and counters the last check() compared with
+        self.increments = None      # Counter increments in the last time step, if settled
+
+    def _find_blocks(self):
+        blocks = []
+        attributes = []
+        seen = {id(self.der_obj)}
+        stack = [self.der_obj]
+        while stack:
+            obj = stack.pop()
+            names = _attribute_names(obj)
+            if names:
+                blocks.append((obj, len(names) == 1, operator.attrgetter(*names)))
+                attributes.extend((obj, name) for name in names)
+            for name in names:
+                value = getattr(obj, name)
+                if _is_block(value) and id(value) not in seen:
+                    seen.add(id(value))
+                    stack.append(value)
+        self.blocks = blocks
+        self.attributes = attributes
+        # Lists and queues are created with the model blocks and keep their type, so they are found once
+        self.containers = [i for i, (obj, name) in enumerate(attributes) if isinstance(getattr(obj, name), (list, deque))]
+        self.timers = {i for i, (obj, name) in enumerate(attributes)
+                       if isinstance(obj, ConditionalDelay) and name == 'con_del_enable_int'}
+        self.counter_blocks = [obj for obj, single, getter in blocks if isinstance(getattr(obj, 'step', None), int)]
+        self.event_blocks = [obj for obj, single, getter in blocks if hasattr(obj, 'steps_to_event')]
+
+    def _state(self):
+        state = []
+        for obj, single, getter in self.blocks:
+            values = getter(obj)
+            if single:
+                values = (values,)
+            state.extend(_state_value(value) for value in values)
+        return state, [obj.step for obj in self.counter_blocks]
+
+    def check(self) -> bool:
+        """
+        Compare the state with the state of the previous call, to be called after each time step
+
+        :return: True if the DER is settled, i.e. the state did not change in the last time step
+        """
+        if not self.blocks:
+            self._find_blocks()
+        try:
+            state, counters = self._state()
+        except AttributeError:
+            # Model blocks were replaced, e.g. by DER.reinitialize()
+            self._find_blocks()
+            state, counters = self._state()
+        prev = self.prev_state
+        self.prev_state = (state, counters)
+        self.compared_state = prev
+        self.increments = None
+        if prev is None or len(prev[0]) != len(state):
+            return False
+        tol = self.tol
+        if not all(_equal(a, b, tol) for a, b in zip(prev[0], state)):
+            return False
+        self.increments = [counter - prev_counter for counter, prev_counter in zip(counters, prev[1])]
+        return True
+
+    def reset(self):
+        """
+        Forget the previous state and the model blocks, e.g. after the inputs or settings changed
+        """
+        self.blocks = []
+        self.attributes = []
+        self.containers = []
+        self.timers = set()
+        self.counter_blocks = []
+        self.event_blocks = []
+        self.prev_state = None
+        self.compared_state = None
+        self.increments = None
+
+    def fast_forward(self, n_steps: int):
+        """
+        Skip time steps of a settled DER (after check() returned True), moving the time step counters forward
+
+        :param n_steps: Number of time steps to skip
+        """
+        der_obj = self.der_obj
+        der_obj.time = der_obj.time + n_steps * der_obj.t_s
+        for obj, increment in zip(self.counter_blocks, self.increments):
+            obj.step = obj.step + n_steps * increment
+        der_obj.diagnostics.fast_forward(n_steps)
+        self.prev_state = None
+
+    def checkpoint(self) -> tuple:
+        """
+        Capture the state of the DER object: the state attributes of all model blocks as a flat list (filter, ramp
+        rate limit, flip-flop and conditional delay states, TimeDelay queues, ride-through timers, SoC, inputs and
+        outputs), the time step counters, the simulation time and the diagnostics. Lists and queues are copied, other
+        values are immutable. The settings (DERCommonFileFormat) are only included if setting changes are scheduled.
+
+        :return: Checkpoint to be passed to restore()
+        """
+        if not self.blocks:
+            self._find_blocks()
+        values = []
+        for obj, single, getter in self.blocks:
+            if single:
+                values.append(getter(obj))
+            else:
+                values.extend(getter(obj))
+        containers = self.containers
+        for i in containers:
+            values[i] = values[i].copy()
+        der_obj = self.der_obj
+        # Scheduled setting changes are applied to the settings during the simulation, so the settings are captured
+        # to roll back the changes applied after the checkpoint
+        settings = der_obj.der_file._settings_table() if der_obj.exec_delay.schedule else None
+        return (self.attributes, values, containers, self.counter_blocks, [obj.step for obj in self.counter_blocks],
+                der_obj.time, der_obj.diagnostics.checkpoint(), settings)
+
+    def restore(self, checkpoint: tuple):
+        """
+        Write the state captured by checkpoint() back to the model blocks, without creating model blocks. The same
+        checkpoint can be restored any number of times.
+
+        :param checkpoint: Checkpoint returned by checkpoint() of the same DER object
+        """
+        attributes, values, containers, counter_blocks, counters, time, diagnostics, settings = checkpoint
+        if containers:
+            values = values.copy()
+            for i in containers:
+                values[i] = values[i].copy()
+        for (obj, name), value in zip(attributes, values):
+            setattr(obj, name, value)
+        for obj, counter in zip(counter_blocks, counters):
+            obj.step = counter
+        der_obj = self.der_obj
+        der_obj.time = time
+        der_obj.diagnostics.restore(diagnostics)
+        if settings is not None:
+            der_obj.der_file._load_settings_table(settings)
+
+        if attributes is not self.attributes:
+            # Model blocks were found again since the checkpoint, find them in the restored DER object when needed
+            self.reset()
+        self.prev_state = None
+        self.compared_state = None
+        self.increments = None
+
+    def _steps_to_skip(self, n_steps: int) -> int:
+        # Number of time steps which can be skipped, stopping before the time step applying scheduled setting changes
+        der_obj = self.der_obj
+        schedule = der_obj.exec_delay.schedule
+        if not schedule:
+            return n_steps
+        t_apply = schedule[0][0] + der_obj.der_file.NP_SET_EXE_TIME
+        # One time step less than the exact number, so that rounding of the time cannot skip the time step
+        return max(0, min(n_steps, math.ceil((t_apply - der_obj.time) / der_obj.t_s) - 2))
+
+    def _skip_timers(self, n_steps: int) -> int:
+        # Skip time steps if only conditional delay timers changed in the last time step (compared by check()), by
+        # adding the time step, up to the time step before the next timed transition. Returns the number of time steps
+        # skipped.
+        prev_state, prev_counters = self.compared_state
+        state, counters = self.prev_state
+        timers = self.timers
+        tol = self.tol
+        changed = []
+        for i, (a, b) in enumerate(zip(prev_state, state)):
+            if not _equal(a, b, tol):
+                if i not in timers:
+                    return 0
+                obj, name = self.attributes[i]
+                if b != a + obj.t_s:
+                    # Not counting, e.g. reaching the delay time
+                    return 0
+                changed.append((obj, name))
+        if not changed:
+            return 0
+
+        n_skip = min(self._steps_to_skip(n_steps), self.steps_to_next_event() - 1)
+        if n_skip <= 0:
+            return 0
+        for obj, name in changed:
+            setattr(obj, name, repeated_sum(getattr(obj, name), obj.t_s, n_skip))
+        self.increments = [counter - prev_counter for counter, prev_counter in zip(counters, prev_counters)]
+        self.fast_forward(n_skip)
+        # Timers are still counting, so the DER is not settled
+        self.increments = None
+        return n_skip
+
+    def steps_to_next_event(self, assuming_constant_inputs: bool = True):
+        """
+        Number of time steps until the next timed transition: pending TimeDelay changes (e.g. settings after
+        NP_SET_EXE_TIME, the randomized enter service delay), scheduled setting changes, and, if the inputs stay
+        constant, conditional delays (trip, enter service delay ES_DELAY, return from momentary cessation MC_RETURN_T),
+        ramp rate limits reaching their targets and enter service ramp completion.
+
+        :param assuming_constant_inputs: If False, only the transitions which happen whatever the inputs are included
+        :return: Number of time steps, or math.inf if no transition is pending
+        """
+        der_obj = self.der_obj
+        self._find_blocks()
+        steps = math.inf
+        for obj in self.event_blocks:
+            if assuming_constant_inputs or isinstance(obj, TimeDelay):
+                steps = min(steps, obj.steps_to_event())
+
+        schedule = der_obj.exec_delay.schedule
+        if schedule:
+            t_apply = schedule[0][0] + der_obj.der_file.NP_SET_EXE_TIME
+            steps = min(steps, max(math.ceil((t_apply - der_obj.time) / der_obj.t_s - 1e-6), 1))
+        return steps
+
+    def advance(self, n_steps: int) -> int:
+        """
+        Run n_steps time steps with the current inputs, running the model until the DER is settled and skipping the
+        remaining time steps. Time steps applying scheduled setting changes are run, and the DER settles again after.
+
+        :param n_steps: Number of time steps
+        :return: Number of time steps skipped
+        """
+        der_obj = self.der_obj
+        self.prev_state = None
+        self.increments = None
+        prev_outputs = None
+        wait = 0
+        backoff = 1
+        skipped = 0
+        k = 0
+        while k < n_steps:
+            der_obj.run()
+            k = k + 1
+            outputs = (der_obj.p_out_w, der_obj.q_out_var, der_obj.der_status_code)
+            if outputs != prev_outputs:
+                # Not settled as long as the outputs change, no need to compare the state
+                prev_outputs = outputs
+                self.prev_state = None
+                self.increments = None
+                wait = 0
+                backoff = 1
+                continue
+            if wait > 0:
+                wait = wait - 1
+                continue
+            compared = self.prev_state is not None
+            if self.check():
+                n_skip = self._steps_to_skip(n_steps - k)
+                self.fast_forward(n_skip)
+                k = k + n_skip
+                skipped = skipped + n_skip
+            elif compared:
+                n_skip = self._skip_timers(n_steps - k)
+                if n_skip:
+                    k = k + n_skip
+                    skipped = skipped + n_skip
+                    continue
+                # Not settled with constant outputs (e.g. a trip timer counting during a transient): compare again after
+                # a growing interval
+                wait = backoff
+                backoff = min(2 * backoff, self.max_backoff)
+                self.prev_state = None
+        return skipped
@@ -18,6 +18,7 @@
 import math
 from opender.auxiliary_funcs.low_pass_filter import LowPassFilter
 from opender.auxiliary_funcs.time_delay import TimeDelay
+from opender.common_file_format.setting_codes import INJ, ABS
 
 
 class ConstantPowerFactor:
@@ -31,8 +32,8 @@ class ConstantPowerFactor:
         self.der_obj = der_obj
         self.der_file = der_obj.der_file
         self.exec_delay = der_obj.exec_delay
-        self.pf_lpf = LowPassFilter()
-        self.pf_delay = TimeDelay()
+        self.pf_lpf = LowPassFilter(der_obj)
+        self.pf_delay = TimeDelay(der_obj)
 
         self.q_const_pf_desired_ref_pu = 0  # Constant power factor reactive power reference before response time
         self.q_const_pf_lpf_pu = 0          # Constant power factor reactive power reference after first order lag
@@ -45,7 +46,7 @@ class ConstantPowerFactor:
         Variable used in this function:
         :param p_desired_pu:  Desired output active power considering DER enter service performance
         :param const_pf_exec:  Constant Power Factor Setting (CONST_PF) after execution delay
-        :param const_pf_excitation_exec:  Constant Power Factor Excitation (CONST_PF_EXCITATION) after execution delay
+        :param const_pf_excitation_exec:  Constant Power Factor Excitation (CONST_PF_EXCITATION) code after execution delay
         :param CONST_PF_RT:   Constant Power Factor Mode Response Time
         :param NP_REACT_TIME:   DER grid support function reaction time
 
@@ -54,11 +55,11 @@ class ConstantPowerFactor:
         """
 
         # Eq 3.8.1-1, calculate reactive power reference according to active power and constant power factor setting
-        if self.exec_delay.const_pf_excitation_exec == "INJ":
+        if self.exec_delay.const_pf_excitation_exec == INJ:
             self.q_const_pf_desired_ref_pu = p_desired_pu * self.der_file.NP_P_MAX \
                                  * (math.sqrt(1 - (self.exec_delay.const_pf_exec ** 2))/self.exec_delay.const_pf_exec) \
                                  / self.der_file.NP_VA_MAX
-        elif self.exec_delay.const_pf_excitation_exec == "ABS":
+        elif self.exec_delay.const_pf_excitation_exec == ABS:
             self.q_const_pf_desired_ref_pu = -p_desired_pu * self.der_file.NP_P_MAX \
                                  * (math.sqrt(1 - (self.exec_delay.const_pf_exec ** 2))/self.exec_delay.const_pf_exec) \
                                  / self.der_file.NP_VA_MAX
@@ -26,8 +26,8 @@ class ConstantVARs:
         self.der_file = der_obj.der_file
         self.exec_delay = der_obj.exec_delay
 
-        self.const_q_lpf = LowPassFilter()
-        self.const_q_delay = TimeDelay()
+        self.const_q_lpf = LowPassFilter(der_obj)
+        self.const_q_delay = TimeDelay(der_obj)
         self.q_const_q_lpf_pu = None
         self.q_const_q_desired_pu = None
 
@@ -17,6 +17,7 @@
 from opender.auxiliary_funcs.ramping import Ramping
 from opender.auxiliary_funcs.flipflop import FlipFlop
 from opender.reactive_power_support_funcs import volt_var, watt_var, constant_vars, constant_pf
+from opender.operation_status.status_codes import TRIP
 
 
 class DesiredReactivePower:
@@ -56,14 +57,14 @@ class DesiredReactivePower:
         self.constq = constant_vars.ConstantVARs(self.der_obj)
         self.voltvar = volt_var.VoltVAR(self.der_obj)
         self.wattvar = watt_var.WattVAR(self.der_obj)
-        self.desired_var_ramp = Ramping()
+        self.desired_var_ramp = Ramping(der_obj)
         self.desired_var_ff = FlipFlop(0)
 
     def calculate_reactive_funcs(self, p_desired_pu, der_status):
         """
         Calculate desired reactive power for all 4 reactive power control modes defined in IEEE 1547-2018
         """
-        if der_status != 'Trip':
+        if der_status != TRIP:
             # Constant power factor function
             self.q_const_pf_desired_pu = self.constpf.calculate_q_const_pf_desired_var(p_desired_pu)
 
@@ -101,7 +102,7 @@ class DesiredReactivePower:
         :param qv_mode_enable_exec:	Voltage-Reactive Power Mode Enable (QV_MODE_ENABLE) after execution delay
         :param qp_mode_enable_exec:	Active Power Reactive Power Mode Enable (QP_MODE_ENABLE) after execution delay
         :param const_q_mode_enable_exec:	Constant Reactive Power Mode Enable (CONST_Q_MODE_ENABLE) after execution delay
-        :param der_status:	Status of DER (Trip, Entering Service, Continuous Operation, etc)
+        :param der_status:	Status code of DER (DERStatus: Trip, Entering Service, Continuous Operation, etc)
         :param NP_VA_MAX:	Apparent power maximum rating
         :param P_MODE_TRANSITION_TIME:	Time for DER to smoothly transition between reactive power support modes
 
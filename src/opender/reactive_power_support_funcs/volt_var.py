@@ -27,8 +27,8 @@ class VoltVAR:
         self.exec_delay = der_obj.exec_delay
         self.der_input = der_obj.der_input
 
-        self.qv_lpf = LowPassFilter()
-        self.qv_delay = TimeDelay()
+        self.qv_lpf = LowPassFilter(der_obj)
+        self.qv_delay = TimeDelay(der_obj)
         self.qv_curve_v1_eff = None        # Effective V1 setting with volt-var curve shifting when VRef changes
         self.qv_curve_v2_eff = None        # Effective V2 setting with volt-var curve shifting when VRef changes
         self.qv_curve_v3_eff = None        # Effective V3 setting with volt-var curve shifting when VRef changes
@@ -41,7 +41,7 @@ class VoltVAR:
         self.q_qv_lpf_pu = None            # Volt-var function reactive power reference after first order lag
         self.q_qv_desired_pu = None        # Output reactive power from volt-var function
 
-        self.v_meas_qv_vref_lpf_pu = LowPassFilter()
+        self.v_meas_qv_vref_lpf_pu = LowPassFilter(der_obj)
         
     def calculate_q_qv_desired_var(self):
         
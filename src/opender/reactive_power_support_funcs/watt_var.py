@@ -24,8 +24,8 @@ class WattVAR:
     def __init__(self, der_obj):
         self.der_file = der_obj.der_file
         self.exec_delay = der_obj.exec_delay
-        self.qp_lpf = LowPassFilter()
-        self.qp_delay = TimeDelay()
+        self.qp_lpf = LowPassFilter(der_obj)
+        self.qp_delay = TimeDelay(der_obj)
 
         self.p_desired_qp_pu = None     # Desired output active power in per unit for BESS considering the different
                                         # nameplate ratings for charging and discharging
@@ -12,11 +12,15 @@
 #   prior written permission.
 
 
+import math
 import numpy as np
 from opender.auxiliary_funcs.low_pass_filter import LowPassFilter
 from opender.auxiliary_funcs.ramping import Ramping
 from opender.auxiliary_funcs.cond_delay import ConditionalDelay
 from opender.auxiliary_funcs import sym_component
+from opender.operation_status.status_codes import TRIP, ENTERING_SERVICE, CONTINUOUS_OPERATION, \
+    MANDATORY_OPERATION, PERMISSIVE_OPERATION, MOMENTARY_CESSATION, CEASE_TO_ENERGIZE, NOT_DEFINED, NO_MODE, \
+    RT_CTRL_TRIP, RT_CTRL_NORMAL, RT_CTRL_DVS, RT_CTRL_CTE, RT_CTRL_NAMES
 
 
 class RideThroughPerf:
@@ -31,14 +35,14 @@ class RideThroughPerf:
         self.exec_delay = der_obj.exec_delay
         self.der_input = der_obj.der_input
 
-        self.rt_ctrl = None     # DER ride-through control modes
+        self.rt_ctrl_code = NO_MODE     # DER ride-through control mode code (RTControl)
 
         self.i_pos_pu = 0       # DER output positive sequence current phasor as complex number in per unit
         self.i_neg_pu = 0       # DER output negative sequence current phasor as complex number in per unit
 
-        self.i_pos_lpf = LowPassFilter()
-        self.i_neg_lpf = LowPassFilter()
-        self.i_pos_d_rrl = Ramping()
+        self.i_pos_lpf = LowPassFilter(der_obj)
+        self.i_neg_lpf = LowPassFilter(der_obj)
+        self.i_pos_d_rrl = Ramping(der_obj)
 
 
         self.i_pos_d_ref_pu = 0     # Active current magnitude in positive sequence
@@ -55,9 +59,9 @@ class RideThroughPerf:
         self.q_limited_pu = 0       # DER output reactive power in per unit after considering DER apparent power limits (per unit based on NP_VA_MAX)
 
 
-        self.rt_mc_cond_delay = ConditionalDelay()
-        self.rt_cte_cond_delay = ConditionalDelay()
-        self.rt_return_from_mc_delay = ConditionalDelay()
+        self.rt_mc_cond_delay = ConditionalDelay(der_obj)
+        self.rt_cte_cond_delay = ConditionalDelay(der_obj)
+        self.rt_return_from_mc_delay = ConditionalDelay(der_obj)
 
     def determine_rt_ctrl(self, der_status):
         """
@@ -65,43 +69,50 @@ class RideThroughPerf:
         Energize. More modes may be identified through lab and field experience.
 
         Variables used in this function:
-        :param der_status:	Status of DER (Trip, Entering Service, Continuous Operation, etc)
+        :param der_status:	Status code of DER (DERStatus: Trip, Entering Service, Continuous Operation, etc)
         :param NP_CTE_RESP_T:   Cease to Energize response time
         :param MC_RESP_T:       Momentary cessation response time
         :param DVS_MODE_ENABLE: Dynamic Voltage Support enable
 
         Outputs:
-        :param rt_ctrl: DER ride-through control mode
+        :param rt_ctrl_code: DER ride-through control mode code (RTControl)
         """
 
         # Eq 3.10.1-1, Determine ride-through control mode depending on the DER operation status.
-        if der_status == 'Trip':
-            self.rt_ctrl = 'Trip'
+        if der_status == TRIP:
+            self.rt_ctrl_code = RT_CTRL_TRIP
 
-        if self.rt_return_from_mc_delay.con_del_enable(not (der_status in ['Momentary Cessation', 'Cease to Energize']), self.der_file.MC_RETURN_T):
-            if der_status in ['Continuous Operation', 'Not Defined', 'Entering Service']:
-                self.rt_ctrl = 'Normal Operation'
+        if self.rt_return_from_mc_delay.con_del_enable(not (der_status == MOMENTARY_CESSATION or der_status == CEASE_TO_ENERGIZE), self.der_file.MC_RETURN_T):
+            if der_status == CONTINUOUS_OPERATION or der_status == NOT_DEFINED or der_status == ENTERING_SERVICE:
+                self.rt_ctrl_code = RT_CTRL_NORMAL
 
-            if der_status == 'Mandatory Operation':
+            if der_status == MANDATORY_OPERATION:
                 if self.der_file.DVS_MODE_ENABLE:
-                    self.rt_ctrl = 'Dynamic Voltage Support'
+                    self.rt_ctrl_code = RT_CTRL_DVS
                 else:
-                    self.rt_ctrl = 'Normal Operation'
+                    self.rt_ctrl_code = RT_CTRL_NORMAL
 
-            if der_status== 'Permissive Operation':
+            if der_status == PERMISSIVE_OPERATION:
                 if self.der_file.DVS_MODE_ENABLE:
-                    self.rt_ctrl = 'Dynamic Voltage Support'
+                    self.rt_ctrl_code = RT_CTRL_DVS
                 else:
-                    self.rt_ctrl = 'Normal Operation'
+                    self.rt_ctrl_code = RT_CTRL_NORMAL
 
 
         # The standard allows a maximum of 0.16 s response time to enter cease to energize.
-        if self.rt_cte_cond_delay.con_del_enable(der_status == 'Cease to Energize', self.der_file.NP_CTE_RESP_T):
-            self.rt_ctrl = 'Cease to Energize'
+        if self.rt_cte_cond_delay.con_del_enable(der_status == CEASE_TO_ENERGIZE, self.der_file.NP_CTE_RESP_T):
+            self.rt_ctrl_code = RT_CTRL_CTE
 
         # The standard allows a maximum of 0.083 s response time to enter momentary cessation
-        if self.rt_mc_cond_delay.con_del_enable(der_status == 'Momentary Cessation', self.der_file.MC_RESP_T):
-            self.rt_ctrl = 'Cease to Energize'
+        if self.rt_mc_cond_delay.con_del_enable(der_status == MOMENTARY_CESSATION, self.der_file.MC_RESP_T):
+            self.rt_ctrl_code = RT_CTRL_CTE
+
+    @property
+    def rt_ctrl(self) -> str:
+        """
+        DER ride-through control mode name, e.g. 'Normal Operation', or None if not determined
+        """
+        return None if self.rt_ctrl_code < 0 else RT_CTRL_NAMES[self.rt_ctrl_code]
 
     def der_rem_operation(self, p_limited_w, q_limited_var, der_status):
         """
@@ -110,7 +121,7 @@ class RideThroughPerf:
         Variables used in this function:
         :param p_limited_w:	DER output active power after considering DER apparent power limits
         :param q_limited_var:	DER output reactive power after considering DER apparent power limits
-        :param der_status:	Status of DER (Trip, Entering Service, Continuous Operation, etc)
+        :param der_status:	Status code of DER (DERStatus: Trip, Entering Service, Continuous Operation, etc)
         :param NP_VA_MAX:	Apparent power maximum rating
         :param v_pos_pu:    Positive sequence voltage phasor as complex number at RPA
         :param v_neg_pu:    Negative sequence voltage phasor as complex number at RPA
@@ -146,7 +157,7 @@ class RideThroughPerf:
         :param DVS_K: Dynamic Voltage Support K factor (Per unit current increase in respond to per unit voltage change during ride-through)
         """
 
-        if self.rt_ctrl == 'Trip':
+        if self.rt_ctrl_code == RT_CTRL_TRIP:
             # Eq 3.10.1-3, if trips, DER output no current.
             self.i_pos_pu = 0
             self.i_neg_pu = 0
@@ -155,7 +166,7 @@ class RideThroughPerf:
             self.i_neg_lpf.lpf_out_prev = self.i_neg_lpf.lpf_in_prev = 0
             self.i_pos_d_rrl.ramp_out_prev = 0
 
-        elif self.rt_ctrl == 'Cease to Energize':
+        elif self.rt_ctrl_code == RT_CTRL_CTE:
             # Eq 3.10.1-4, calculate current during cease to energize state.
             self.calculate_i_block()
             # Reset state variables to 0, to better model restoration of output
@@ -165,11 +176,11 @@ class RideThroughPerf:
 
         else:
 
-            if self.rt_ctrl == 'Normal Operation':
+            if self.rt_ctrl_code == RT_CTRL_NORMAL:
                 # Eq 3.10.1-5, calculate current based on desired P, Q and terminal voltage.
                 self.calculate_i_continuous_op(p_limited_pu, q_limited_pu)
 
-            if self.rt_ctrl == 'Dynamic Voltage Support':
+            if self.rt_ctrl_code == RT_CTRL_DVS:
                 # Eq 3.10.1-6,calcualte current based on desired P, Q terminal voltage, and dynamic voltage support settings
                 self.calculate_i_DVS(p_limited_pu, q_limited_pu)
 
@@ -220,8 +231,11 @@ class RideThroughPerf:
         self.i_neg_ref_pu = self.der_input.v_neg_pu * 1j * self.der_file.DVS_K
 
     def i_limit(self):
+        # Rotation of the dq reference frame to the positive sequence voltage angle
+        rot = np.exp(1j * np.angle(self.der_input.v_pos_pu))
+
         # Eq 3.10.1-7 calculate maximum current if output current follows reference
-        i_pos_pu = (self.i_pos_d_ref_pu + 1j * self.i_pos_q_ref_pu) * np.exp(1j * np.angle(self.der_input.v_pos_pu))
+        i_pos_pu = (self.i_pos_d_ref_pu + 1j * self.i_pos_q_ref_pu) * rot
         i_max_pu = max([abs(x) for x in sym_component.convert_symm_to_abc(i_pos_pu, self.i_neg_ref_pu)])
 
         if i_max_pu <= self.der_file.NP_CURRENT_PU:
@@ -231,7 +245,7 @@ class RideThroughPerf:
             i_neg_out_pu = self.i_neg_ref_pu
         else:
             # Recalculate i_max_pu assuming active current is 0.
-            i_pos_pu = (1j * self.i_pos_q_ref_pu) * np.exp(1j * np.angle(self.der_input.v_pos_pu))
+            i_pos_pu = (1j * self.i_pos_q_ref_pu) * rot
             i_max_pu = max([abs(x) for x in sym_component.convert_symm_to_abc(i_pos_pu, self.i_neg_ref_pu)])
             if i_max_pu > self.der_file.NP_CURRENT_PU:
                 # Eq 3.10.1-9, if i_max_pu is still greater than nameplate current capability, active current should be
@@ -240,23 +254,9 @@ class RideThroughPerf:
                 i_pos_out_q_pu = self.i_pos_q_ref_pu / i_max_pu * self.der_file.NP_CURRENT_PU
                 i_neg_out_pu = self.i_neg_ref_pu / i_max_pu * self.der_file.NP_CURRENT_PU
             else:
-                # Search the maximum active current to maximize the current output to the nameplate current capability
-                tolerance = 1e-5
-                step = 0.1
-                scale = 0
-                while step > tolerance:
-                    while i_max_pu < self.der_file.NP_CURRENT_PU:
-                        scale = scale + step
-                        i_pos_pu = (self.i_pos_d_ref_pu * scale + 1j * self.i_pos_q_ref_pu) \
-                                   * np.exp(1j * np.angle(self.der_input.v_pos_pu))
-                        i_max_pu = max([abs(x) for x in sym_component.convert_symm_to_abc(i_pos_pu, self.i_neg_ref_pu)])
-                        if scale > 1:
-                            break
-                    scale = scale - step
-                    step = step * step
-                    i_pos_pu = (self.i_pos_d_ref_pu * scale + 1j * self.i_pos_q_ref_pu) \
-                               * np.exp(1j * np.angle(self.der_input.v_pos_pu))
-                    i_max_pu = max([abs(x) for x in sym_component.convert_symm_to_abc(i_pos_pu, self.i_neg_ref_pu)])
+                # Find the maximum active current to maximize the current output to the nameplate current capability
+                scale = self.active_current_scale(self.i_pos_d_ref_pu * rot, i_pos_pu, self.i_neg_ref_pu,
+                                                  self.der_file.NP_CURRENT_PU)
 
                 # Keep reactive currents and scale down active current
                 i_pos_out_d_pu = self.i_pos_d_ref_pu * scale
@@ -276,5 +276,30 @@ class RideThroughPerf:
 
         return i_pos_out_d_pu, i_pos_out_q_pu, i_neg_out_pu
 
+    @staticmethod
+    def active_current_scale(i_d_pu, i_q_pu, i_neg_pu, i_max_pu):
+        """
+        Maximum scale (between 0 and 1) of the positive sequence active current, so that no phase current exceeds
+        i_max_pu. The phase currents with active current scale s are s * a + b, where a and b are the phase components
+        of the positive sequence active current and of the remaining currents. The scale is the smallest positive
+        root of |s * a + b| = i_max_pu among the three phases.
+
+        :param i_d_pu: Positive sequence active current, as a phasor
+        :param i_q_pu: Positive sequence reactive current, as a phasor
+        :param i_neg_pu: Negative sequence current, as a phasor
+        :param i_max_pu: Maximum phase current
+        """
+        scale = 1.
+        for a, b in zip(sym_component.convert_symm_to_abc(i_d_pu, 0),
+                        sym_component.convert_symm_to_abc(i_q_pu, i_neg_pu)):
+            # |s * a + b|^2 = i_max_pu^2, as a quadratic equation in s
+            qa = a.real * a.real + a.imag * a.imag
+            if qa == 0:
+                continue
+            qb = a.real * b.real + a.imag * b.imag
+            qc = b.real * b.real + b.imag * b.imag - i_max_pu * i_max_pu
+            scale = min(scale, (-qb + math.sqrt(max(0., qb * qb - qa * qc))) / qa)
+        return max(0., scale)
+
     def __str__(self):
         return f"i_pos_pu = {self.i_pos_pu:.2f}, i_neg_pu = {self.i_neg_pu:.2f}"
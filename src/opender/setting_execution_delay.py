@@ -12,6 +12,8 @@
 #   prior written permission.
 
 
+import copy
+import heapq
 from .auxiliary_funcs import time_delay as td
 
 
@@ -37,15 +39,20 @@ class SettingExecutionDelay:
                        'QV_VREF_MIN', 'QV_VREF_MAX',
                        ]
 
-    __slots__ = tuple([param.lower()+'_exec' for param in parameters_list]+['tdelay', 'der_file_exec', 'der_file'])
+    __slots__ = tuple([param.lower()+'_exec' for param in parameters_list]+['tdelay', 'der_file_exec', 'der_file',
+                                                                           'version_exec', 'schedule', 'schedule_count'])
 
-    def __init__(self, der_file):
+    def __init__(self, der_file, der_obj=None):
 
         self.der_file = der_file
 
-        self.tdelay = td.TimeDelay()
+        self.tdelay = td.TimeDelay(der_obj)
 
         self.der_file_exec = None
+        self.version_exec = None    # Settings version of der_file_exec when the settings were last extracted
+
+        self.schedule = []          # Scheduled setting changes, as a heap of (commanded time, order, changes)
+        self.schedule_count = 0     # Number of scheduled setting changes, to keep the order of simultaneous changes
 
         # Define variables indicating the DER control settings after execution delay
         self.es_permit_service_exec = None
@@ -130,10 +137,45 @@ class SettingExecutionDelay:
         self.es_randomized_delay_exec = None
         self.es_ramp_rate_exec = None
 
+    def schedule_settings(self, t, changes):
+        """
+        Record setting changes commanded at time t, applied to the DER common file format object once the execution
+        delay NP_SET_EXE_TIME has passed. The changes are stored as a tuple of (parameter, value) pairs, with the values
+        copied deeply, so later modifications of the provided values (e.g. curves given as lists or dictionaries) do
+        not affect them.
+
+        :param t: Time when the setting changes are commanded
+        :param changes: Dictionary of parameter names and values
+        """
+        parameters = self.der_file._get_parameter_list()
+        for name in changes:
+            if name not in parameters:
+                raise ValueError(f"ValueError: '{name}' is not in the parameter list, please double check")
+        heapq.heappush(self.schedule, (t, self.schedule_count, tuple((name, copy.deepcopy(value))
+                                                                       for name, value in changes.items())))
+        self.schedule_count = self.schedule_count + 1
+
+    def apply_scheduled_settings(self, time, t_s):
+        """
+        Apply the scheduled setting changes whose execution delay has passed at the given time. Only the earliest
+        scheduled change is checked when nothing is due.
+
+        :param time: Simulation time
+        :param t_s: Simulation time step, used for the tolerance of the accumulated simulation time
+        """
+        while self.schedule and self.schedule[0][0] + self.der_file.NP_SET_EXE_TIME <= time + 1e-6 * t_s:
+            self.der_file.update(**dict(heapq.heappop(self.schedule)[2]))
+
     def mode_and_execution_delay(self):
 
         # Eq. 3.4.1, For each time step, execute time delay function to all settings by NP_SET_EXE_TIME
-        self.der_file_exec = self.tdelay.tdelay(self.der_file, self.der_file.NP_SET_EXE_TIME)
+        der_file_exec = self.tdelay.tdelay(self.der_file, self.der_file.NP_SET_EXE_TIME)
+
+        # Settings are extracted again only if they changed since the last extraction
+        if der_file_exec is self.der_file_exec and der_file_exec.version == self.version_exec:
+            return
+        self.der_file_exec = der_file_exec
+        self.version_exec = der_file_exec.version
 
         # Extract only the control settings from the DER common file format object
         self.ap_limit_enable_exec = self.der_file_exec.AP_LIMIT_ENABLE
@@ -148,7 +190,7 @@ class SettingExecutionDelay:
         self.es_ramp_rate_exec = self.der_file_exec.ES_RAMP_RATE
         self.const_pf_mode_enable_exec = self.der_file_exec.CONST_PF_MODE_ENABLE
         self.const_pf_exec = self.der_file_exec.CONST_PF
-        self.const_pf_excitation_exec = self.der_file_exec.CONST_PF_EXCITATION
+        self.const_pf_excitation_exec = self.der_file_exec.const_pf_excitation_code
         self.qv_mode_enable_exec = self.der_file_exec.QV_MODE_ENABLE
         self.qv_vref_auto_mode_exec = self.der_file_exec.QV_VREF_AUTO_MODE
         self.qv_vref_time_exec = self.der_file_exec.QV_VREF_TIME
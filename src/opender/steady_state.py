@@ -0,0 +1,394 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+"""
+Steady-state solution of a DER for snapshot power flow, computed directly from the settings and the curves of the
+grid support functions, without the low pass filters, ramp rate limits, time delays and timers of the dynamic model.
+The functions only read the DER settings (DERCommonFileFormat), so they can be called any number of times without
+changing the DER object.
+
+The solution is the one of DER.run() with a snapshot time step (e.g. t_s = 100000) for a DER in service, with balanced
+voltage: the settings are used after their execution delay, the BESS state of charge does not limit the active power,
+and the trip, ride-through and enter service delays have passed.
+"""
+
+import math
+from opender.capability_and_priority import _intercep_piecewise_circle
+from opender.common_file_format import DERCommonFileFormatBESS
+from opender.common_file_format.capability_curves import interp_scalar
+from opender.common_file_format.setting_codes import INJ, ABS, CAT_I, CAT_II, CAT_III, PRIO_ACTIVE
+from opender.operation_status.status_codes import TRIP, CONTINUOUS_OPERATION, MANDATORY_OPERATION, \
+    PERMISSIVE_OPERATION, MOMENTARY_CESSATION, CEASE_TO_ENERGIZE, NOT_DEFINED, NO_MODE
+
+
+def _sign(x):
+    # Same as np.sign for a float
+    return math.copysign(1., x) if x else 0.
+
+
+def trip_decision(der_file, v_pu, f, p_avl_pu):
+    """
+    Trip criteria, after the trip delays have passed (Section 3.5.1.2 in Report #3002030962)
+
+    :param der_file: DER settings
+    :param v_pu: Voltage in per unit
+    :param f: Frequency in Hertz
+    :param p_avl_pu: Available active power in per unit considering efficiency (PV DER), None for BESS DER
+    :return: True if the DER trips
+    """
+    return v_pu < der_file.UV1_TRIP_V or v_pu > der_file.OV1_TRIP_V or \
+        v_pu < der_file.UV2_TRIP_V or v_pu > der_file.OV2_TRIP_V or \
+        f < der_file.UF1_TRIP_F or f > der_file.OF1_TRIP_F or \
+        f < der_file.UF2_TRIP_F or f > der_file.OF2_TRIP_F or \
+        (p_avl_pu is not None and p_avl_pu < der_file.NP_P_MIN_PU)
+
+
+def rt_mode_v(der_file, v_pu):
+    """
+    Voltage ride-through mode, as RideThroughCrit.determine_ride_through_mode() with balanced voltage
+
+    :param der_file: DER settings
+    :param v_pu: Voltage in per unit
+    :return: Voltage ride-through mode code (DERStatus)
+    """
+    abnormal_op_cat = der_file.np_abnormal_op_cat_code
+    mc = der_file.MC_ENABLE
+
+    if abnormal_op_cat == CAT_III:
+        if v_pu > 1.1:
+            return MOMENTARY_CESSATION if mc and v_pu >= der_file.MC_HVRT_V1 else MANDATORY_OPERATION
+        if v_pu < 0.88:
+            return MOMENTARY_CESSATION if mc and v_pu <= der_file.MC_LVRT_V1 else MANDATORY_OPERATION
+        return CONTINUOUS_OPERATION
+
+    if abnormal_op_cat != CAT_I and abnormal_op_cat != CAT_II:
+        return CONTINUOUS_OPERATION if 0.88 <= v_pu <= 1.1 else NO_MODE
+
+    # Momentary cessation and cease to energize apply over any other mode
+    if mc and (v_pu >= der_file.MC_HVRT_V1 or v_pu <= der_file.MC_LVRT_V1):
+        return MOMENTARY_CESSATION
+    if v_pu > 1.1:
+        return PERMISSIVE_OPERATION if v_pu <= 1.2 else CEASE_TO_ENERGIZE
+    if v_pu < 0.88:
+        if abnormal_op_cat == CAT_I:
+            if v_pu >= 0.7:
+                return MANDATORY_OPERATION
+            return PERMISSIVE_OPERATION if v_pu >= 0.5 else CEASE_TO_ENERGIZE
+        if v_pu >= 0.65:
+            return MANDATORY_OPERATION
+        return PERMISSIVE_OPERATION if v_pu >= 0.3 else CEASE_TO_ENERGIZE
+    return CONTINUOUS_OPERATION
+
+
+def rt_mode_f(f):
+    """
+    Frequency ride-through mode, as RideThroughCrit.determine_ride_through_mode()
+
+    :param f: Frequency in Hertz
+    :return: Frequency ride-through mode code (DERStatus)
+    """
+    if f >= 61.2:
+        return MANDATORY_OPERATION if f <= 61.8 else NOT_DEFINED
+    if f <= 58.8:
+        return MANDATORY_OPERATION if f >= 57.0 else NOT_DEFINED
+    return CONTINUOUS_OPERATION
+
+
+def der_status(der_file, v_pu, f, p_avl_pu=None):
+    """
+    Operating status of a DER in service (OperatingStatus.determine_der_status())
+
+    :param der_file: DER settings
+    :param v_pu: Voltage in per unit
+    :param f: Frequency in Hertz
+    :param p_avl_pu: Available active power in per unit considering efficiency (PV DER), None for BESS DER
+    :return: DER status code (DERStatus)
+    """
+    if trip_decision(der_file, v_pu, f, p_avl_pu):
+        return TRIP
+    mode_v = rt_mode_v(der_file, v_pu)
+    mode_f = rt_mode_f(f)
+    if mode_f == NOT_DEFINED:
+        return NOT_DEFINED
+    if mode_v == CEASE_TO_ENERGIZE or mode_v == PERMISSIVE_OPERATION or mode_v == MOMENTARY_CESSATION:
+        return mode_v
+    if mode_v == MANDATORY_OPERATION or mode_f == MANDATORY_OPERATION:
+        return MANDATORY_OPERATION
+    return CONTINUOUS_OPERATION
+
+
+def p_desired(der_file, v_pu, f, p_avl_pu, p_dem_pu=None):
+    """
+    Desired active power from the active power limit, volt-watt and frequency-droop functions (Section 3.7)
+
+    :param der_file: DER settings
+    :param v_pu: Voltage in per unit
+    :param f: Frequency in Hertz
+    :param p_avl_pu: Available active power in per unit considering efficiency (1 for BESS DER)
+    :param p_dem_pu: Active power demand in per unit for BESS DER, None for PV DER
+    :return: Desired active power in per unit of NP_P_MAX
+    """
+
+    # Active power limit function, Eq. 3.7.1-6
+    ap_enable = der_file.AP_LIMIT_ENABLE
+    if ap_enable:
+        ap_limit = der_file.AP_LIMIT
+        ap_limit_pu = ap_limit if ap_limit > 0 else ap_limit * der_file.NP_P_MAX_CHARGE / der_file.NP_P_MAX
+    else:
+        ap_limit_pu = 1
+
+    # Volt-watt function, Eq. 3.7.1-1~3
+    pv_enable = der_file.PV_MODE_ENABLE
+    if pv_enable:
+        pv_curve_v1 = der_file.PV_CURVE_V1
+        pv_curve_v2 = der_file.PV_CURVE_V2
+        pv_curve_p1 = der_file.PV_CURVE_P1
+        pv_curve_p2 = der_file.PV_CURVE_P2
+        pv_curve_p2_pu = pv_curve_p2 if pv_curve_p2 > 0 else pv_curve_p2 * der_file.NP_P_MAX_CHARGE / der_file.NP_P_MAX
+        if v_pu <= pv_curve_v1:
+            p_pv_limit_pu = pv_curve_p1
+        elif v_pu >= pv_curve_v2:
+            p_pv_limit_pu = pv_curve_p2_pu
+        else:
+            p_pv_limit_pu = pv_curve_p1 - (v_pu - pv_curve_v1) / (pv_curve_v2 - pv_curve_v1) \
+                            * (pv_curve_p1 - pv_curve_p2_pu)
+    else:
+        p_pv_limit_pu = 1
+
+    # Frequency-droop function, Eq. 3.7.1-11~14, with the pre-disturbance active power of the snapshot analysis
+    pf_enable = der_file.PF_MODE_ENABLE
+    pf_uf = pf_enable and f < 60 - der_file.PF_DBUF
+    pf_of = pf_enable and f > 60 + der_file.PF_DBOF
+    p_pf_pu = None
+    if pf_uf or pf_of:
+        p_pf_pre_pu = min(p_avl_pu if p_dem_pu is None else p_dem_pu, ap_limit_pu, p_pv_limit_pu)
+        if pf_of:
+            p_pf_pu = max(p_pf_pre_pu - (f - (60 + der_file.PF_DBOF)) / (60 * der_file.PF_KOF), der_file.NP_P_MIN_PU)
+        else:
+            p_pf_pu = min(p_pf_pre_pu + ((60 - der_file.PF_DBUF) - f) / (60 * der_file.PF_KUF), p_avl_pu)
+
+    if p_dem_pu is None:
+        # Eq 3.7.1-18
+        if p_pf_pu is not None:
+            return min(p_avl_pu, p_pv_limit_pu, p_pf_pu, 1)
+        return min(p_avl_pu, ap_limit_pu, p_pv_limit_pu, 1)
+
+    # Eq 3.7.3-6,7,8, BESS DER, with the enter service ramp completed
+    p_es_dem_pu = max(min(p_dem_pu, 1), -1)
+    if p_pf_pu is not None:
+        if not pv_enable:
+            p_act_supp_bess_pu = min(p_pf_pu, 1)
+        elif pf_of:
+            p_act_supp_bess_pu = min(p_dem_pu, p_pv_limit_pu, p_pf_pu, 1)
+        else:
+            p_act_supp_bess_pu = min(p_pv_limit_pu, p_pf_pu, 1)
+    elif ap_enable and pv_enable:
+        p_act_supp_bess_pu = min(ap_limit_pu, p_pv_limit_pu, 1)
+    else:
+        p_act_supp_bess_pu = min(p_es_dem_pu, ap_limit_pu, p_pv_limit_pu, 1)
+    return max(-1, -der_file.NP_P_MAX_CHARGE / der_file.NP_P_MAX, min(p_act_supp_bess_pu, 1))
+
+
+def q_desired(der_file, v_pu, p_desired_pu):
+    """
+    Desired reactive power from the enabled reactive power support function (Section 3.8), with the mode transition
+    completed
+
+    :param der_file: DER settings
+    :param v_pu: Voltage in per unit
+    :param p_desired_pu: Desired active power in per unit of NP_P_MAX
+    :return: Desired reactive power in per unit of NP_VA_MAX
+    """
+    if der_file.CONST_PF_MODE_ENABLE:
+        # Eq 3.8.1-1
+        const_pf = der_file.CONST_PF
+        q_pu = p_desired_pu * der_file.NP_P_MAX * (math.sqrt(1 - const_pf ** 2) / const_pf) / der_file.NP_VA_MAX
+        excitation = der_file.const_pf_excitation_code
+        if excitation == INJ:
+            return q_pu
+        if excitation == ABS:
+            return -q_pu
+        return 0
+
+    if der_file.QV_MODE_ENABLE:
+        # Eq 3.8.1-4,5,6, the low pass filtered voltage of the autonomous VRef adjustment is the voltage
+        if der_file.QV_VREF_AUTO_MODE == 0:
+            vref = der_file.QV_VREF
+        else:
+            vref = max(der_file.QV_VREF_MIN, min(v_pu, der_file.QV_VREF_MAX))
+        return interp_scalar(v_pu - (vref - 1),
+                             (der_file.QV_CURVE_V1, der_file.QV_CURVE_V2, der_file.QV_CURVE_V3, der_file.QV_CURVE_V4),
+                             (der_file.QV_CURVE_Q1, der_file.QV_CURVE_Q2, der_file.QV_CURVE_Q3, der_file.QV_CURVE_Q4))
+
+    if der_file.QP_MODE_ENABLE:
+        # Eq. 3.8.1-9,10
+        p_qp_pu = p_desired_pu * (1 if p_desired_pu >= 0 else der_file.NP_P_MAX / der_file.NP_P_MAX_CHARGE)
+        return interp_scalar(p_qp_pu,
+                             (der_file.QP_CURVE_P3_LOAD, der_file.QP_CURVE_P2_LOAD, der_file.QP_CURVE_P1_LOAD,
+                              der_file.QP_CURVE_P1_GEN, der_file.QP_CURVE_P2_GEN, der_file.QP_CURVE_P3_GEN),
+                             (der_file.QP_CURVE_Q3_LOAD, der_file.QP_CURVE_Q2_LOAD, der_file.QP_CURVE_Q1_LOAD,
+                              der_file.QP_CURVE_Q1_GEN, der_file.QP_CURVE_Q2_GEN, der_file.QP_CURVE_Q3_GEN))
+
+    if der_file.CONST_Q_MODE_ENABLE:
+        return der_file.CONST_Q
+
+    return 0
+
+
+def limited_pq(der_file, p_desired_pu, q_desired_pu):
+    """
+    Active and reactive power limited by DER ratings according to the priority of responses, as
+    CapabilityPriority.calculate_limited_pq() (Section 3.9)
+
+    :param der_file: DER settings
+    :param p_desired_pu: Desired active power in per unit of NP_P_MAX
+    :param q_desired_pu: Desired reactive power in per unit of NP_VA_MAX
+    :return: p_limited_w, q_limited_var
+    """
+    p_desired_w = p_desired_pu * der_file.NP_P_MAX
+    q_desired_var = q_desired_pu * der_file.NP_VA_MAX
+    np_va_max_appl = der_file.NP_VA_MAX if p_desired_w >= 0 else der_file.NP_APPARENT_POWER_CHARGE_MAX
+    curves = der_file.capability_curves
+
+    if der_file.CONST_Q_MODE_ENABLE or der_file.QV_MODE_ENABLE:
+        # Eq. 3.9.1-4~8
+        q_limited_by_p_var = min(curves.q_max_inj(p_desired_w), max(-curves.q_max_abs(p_desired_w), q_desired_var))
+        if p_desired_w ** 2 + q_limited_by_p_var ** 2 < np_va_max_appl ** 2:
+            return p_desired_w, q_limited_by_p_var
+        if der_file.np_prio_outside_min_q_req_code == PRIO_ACTIVE:
+            q_requirement_abs = (0.25 if der_file.NP_NORMAL_OP_CAT == 'CAT_A' else 0.44) * der_file.NP_VA_MAX
+            q_limited_var = min(0.44 * der_file.NP_VA_MAX, max(-q_requirement_abs, q_limited_by_p_var))
+        else:
+            q_limited_var = q_limited_by_p_var
+        return math.sqrt(np_va_max_appl ** 2 - q_limited_var ** 2) * _sign(p_desired_w), q_limited_var
+
+    if der_file.CONST_PF_MODE_ENABLE:
+        # Eq. 3.9.1-9~11
+        if p_desired_w ** 2 + q_desired_var ** 2 < np_va_max_appl ** 2:
+            p_limited_pf_w = p_desired_w
+            q_limited_pf_var = q_desired_var
+        else:
+            k = min(1., np_va_max_appl / max(1.e-9, math.sqrt(p_desired_w ** 2 + q_desired_var ** 2)))
+            p_limited_pf_w = p_desired_w * k
+            q_limited_pf_var = q_desired_var * k
+
+        p_itcp_w, q_itcp_var = _intercep_piecewise_circle(np_va_max_appl if p_desired_w > 0 else -np_va_max_appl,
+                                                          *(curves.inj if q_limited_pf_var > 0 else curves.abs))
+        if abs(q_limited_pf_var) > q_itcp_var:
+            p_limited_w = min(abs(p_itcp_w), abs(p_desired_w)) * _sign(p_desired_w)
+        else:
+            p_limited_w = p_limited_pf_w
+        return p_limited_w, min(curves.q_max_inj(p_limited_w), max(-curves.q_max_abs(p_limited_w), q_limited_pf_var))
+
+    if der_file.QP_MODE_ENABLE:
+        # Eq. 3.9.1-12,13
+        if p_desired_w ** 2 + q_desired_var ** 2 < np_va_max_appl ** 2:
+            p_limited_w = p_desired_w
+            q_limited_qp_var = q_desired_var
+        else:
+            qp_curve_p, qp_curve_q = _qp_curve(der_file)
+            if p_desired_w > 0:
+                p_itcp_w, q_itcp_var = _intercep_piecewise_circle(np_va_max_appl, qp_curve_p, qp_curve_q)
+                p_limited_w = min(p_itcp_w, p_desired_w)
+            else:
+                p_itcp_w, q_itcp_var = _intercep_piecewise_circle(-np_va_max_appl, qp_curve_p, qp_curve_q)
+                p_limited_w = max(p_itcp_w, p_desired_w)
+            q_limited_qp_var = min(abs(q_itcp_var), abs(q_desired_var)) * _sign(q_desired_var)
+        return p_limited_w, min(curves.q_max_inj(p_desired_w), max(-curves.q_max_abs(p_desired_w), q_limited_qp_var))
+
+    return p_desired_w, 0
+
+
+def _qp_curve(der_file):
+    # Watt-var curve in W and var, as CapabilityPriority.get_qp_curve()
+    np_p_max = der_file.NP_P_MAX
+    np_p_max_charge = der_file.NP_P_MAX_CHARGE
+    np_va_max = der_file.NP_VA_MAX
+    qp_curve_p = (float(-np_p_max_charge), float(der_file.QP_CURVE_P3_LOAD * np_p_max_charge),
+                  float(der_file.QP_CURVE_P2_LOAD * np_p_max_charge), float(der_file.QP_CURVE_P1_LOAD * np_p_max_charge),
+                  float(der_file.QP_CURVE_P1_GEN * np_p_max), float(der_file.QP_CURVE_P2_GEN * np_p_max),
+                  float(der_file.QP_CURVE_P3_GEN * np_p_max), float(np_p_max))
+    qp_curve_q = tuple(float(q * np_va_max) for q in (
+        der_file.QP_CURVE_Q3_LOAD, der_file.QP_CURVE_Q3_LOAD, der_file.QP_CURVE_Q2_LOAD, der_file.QP_CURVE_Q1_LOAD,
+        der_file.QP_CURVE_Q1_GEN, der_file.QP_CURVE_Q2_GEN, der_file.QP_CURVE_Q3_GEN, der_file.QP_CURVE_Q3_GEN))
+    return qp_curve_p, qp_curve_q
+
+
+def i_output(der_file, v_pu, p_limited_w, q_limited_var, status):
+    """
+    Positive sequence output current as RideThroughPerf.der_rem_operation() (Section 3.10), with balanced voltage at
+    angle 0, and the ride-through response and return times passed
+
+    :param der_file: DER settings
+    :param v_pu: Voltage in per unit
+    :param p_limited_w: Active power after considering DER apparent power limits
+    :param q_limited_var: Reactive power after considering DER apparent power limits
+    :param status: DER status code (DERStatus)
+    :return: Positive sequence current as complex number in per unit
+    """
+    if status == TRIP:
+        return 0j
+
+    if status == MOMENTARY_CESSATION or status == CEASE_TO_ENERGIZE:
+        # Eq 3.10.1-4, current of the DER filter susceptance
+        return complex(0, -v_pu * der_file.NP_AC_V_NOM * der_file.NP_REACTIVE_SUSCEPTANCE
+                       / (der_file.NP_VA_MAX / der_file.NP_AC_V_NOM))
+
+    # Eq 3.10.1-5,6
+    v_appl = max(v_pu, 0.0001)
+    i_d_pu = p_limited_w / der_file.NP_VA_MAX / v_appl
+    i_q_pu = -q_limited_var / der_file.NP_VA_MAX / v_appl
+    if (status == MANDATORY_OPERATION or status == PERMISSIVE_OPERATION) and der_file.DVS_MODE_ENABLE:
+        i_q_pu = i_q_pu + (v_pu - 1) * der_file.DVS_K
+
+    # Eq 3.10.1-7~9, with no negative sequence current all phase currents have the magnitude of the positive sequence
+    np_current_pu = der_file.NP_CURRENT_PU
+    if math.hypot(i_d_pu, i_q_pu) > np_current_pu:
+        if abs(i_q_pu) > np_current_pu:
+            i_d_pu = 0
+            i_q_pu = i_q_pu / abs(i_q_pu) * np_current_pu
+        else:
+            i_d_pu = math.sqrt(np_current_pu ** 2 - i_q_pu ** 2) * _sign(i_d_pu)
+    return complex(i_d_pu, i_q_pu)
+
+
+def solve_steady_state(der_file, v_pu, f, p_avail_pu):
+    """
+    Steady-state output of a DER in service
+
+    :param der_file: DER settings
+    :param v_pu: Voltage in per unit (balanced for a three phase DER)
+    :param f: Frequency in Hertz
+    :param p_avail_pu: Available DC power in per unit for PV DER, active power demand in per unit for BESS DER
+    :return: p_out_w, q_out_var, positive sequence current i_pos_pu as complex number in per unit, and DER status code
+    """
+    if isinstance(der_file, DERCommonFileFormatBESS):
+        p_avl_pu = 1
+        p_dem_pu = p_avail_pu
+        status = der_status(der_file, v_pu, f)
+    else:
+        p_avl_pu = p_avail_pu * der_file.NP_EFFICIENCY
+        p_dem_pu = None
+        status = der_status(der_file, v_pu, f, p_avl_pu)
+
+    if status == TRIP or status == MOMENTARY_CESSATION or status == CEASE_TO_ENERGIZE:
+        p_limited_w = q_limited_var = 0
+    else:
+        p_desired_pu = p_desired(der_file, v_pu, f, p_avl_pu, p_dem_pu)
+        p_limited_w, q_limited_var = limited_pq(der_file, p_desired_pu, q_desired(der_file, v_pu, p_desired_pu))
+
+    i_pos_pu = i_output(der_file, v_pu, p_limited_w, q_limited_var, status)
+
+    # Eq 3.11.1-1,2
+    np_va_max = der_file.NP_VA_MAX
+    return v_pu * i_pos_pu.real * np_va_max, -v_pu * i_pos_pu.imag * np_va_max, i_pos_pu, status
@@ -0,0 +1,88 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+from opender import DER_PV, DER_BESS
+
+
+def create_der(case, t_s):
+    if case == 'pv':
+        der_obj = DER_PV(t_s=t_s)
+        der_obj.update_der_input(p_dc_pu=0.7, v_pu=1, f=60)
+    elif case == 'volt_var':
+        der_obj = DER_PV(t_s=t_s, QV_MODE_ENABLE=True)
+        der_obj.update_der_input(p_dc_pu=0.7, v_pu=1.03, f=60)
+    elif case == 'ride_through':
+        der_obj = DER_PV(t_s=t_s)
+        der_obj.update_der_input(p_dc_pu=0.7, v_pu=1, f=60)
+        for _ in range(10):
+            der_obj.run()
+        der_obj.update_der_input(v_pu=0.8)
+    elif case == 'bess_idle':
+        der_obj = DER_BESS(t_s=t_s)
+        der_obj.update_der_input(p_dem_pu=0, v_pu=1, f=60)
+    else:
+        der_obj = DER_BESS(t_s=t_s, BESS_SOC_MAX=0.9)
+        der_obj.update_der_input(p_dem_pu=-1, v_pu=1, f=60)
+    return der_obj
+
+
+def outputs(der_obj):
+    return der_obj.p_out_w, der_obj.q_out_var, der_obj.der_status, der_obj.diagnostics.counts
+
+
+class TestAdvance:
+
+    @pytest.mark.parametrize("t_s", [0.01, 1])
+    @pytest.mark.parametrize("case", ['pv', 'volt_var', 'ride_through', 'bess_idle', 'bess_charging'])
+    def test_same_as_run(self, case, t_s):
+        der_ref = create_der(case, t_s)
+        der_obj = create_der(case, t_s)
+        for n_steps in [5, 50, 3000]:
+            for _ in range(n_steps):
+                der_ref.run()
+            der_obj.advance(n_steps)
+            assert outputs(der_obj) == outputs(der_ref)
+            assert der_obj.time == pytest.approx(der_ref.time)
+
+    @pytest.mark.parametrize("case", ['pv', 'volt_var', 'bess_idle'])
+    def test_settled(self, case):
+        der_obj = create_der(case, 0.1)
+        der_obj.advance(10000)
+        assert der_obj.settled
+        assert der_obj.steps_skipped > 5000
+
+    def test_timer_counting(self):
+        # Constant output in mandatory operation, with the undervoltage trip timer counting until the DER trips
+        der_obj = create_der('ride_through', 0.1)
+        der_obj.advance(150)
+        assert not der_obj.settled
+        assert der_obj.steps_skipped == 0
+        assert der_obj.der_status == 'Mandatory Operation'
+        der_obj.advance(100)
+        assert der_obj.der_status == 'Trip'
+
+    def test_scheduled_settings(self):
+        der_ref = create_der('pv', 1)
+        der_obj = create_der('pv', 1)
+        for d in (der_ref, der_obj):
+            d.schedule_settings(5000, AP_LIMIT=0.5, AP_LIMIT_ENABLE=True)
+        for _ in range(10000):
+            der_ref.run()
+        der_obj.advance(4000)
+        assert der_obj.settled
+        der_obj.advance(6000)
+        assert outputs(der_obj) == outputs(der_ref)
+        assert der_obj.p_out_w == pytest.approx(0.5 * der_obj.der_file.NP_P_MAX)
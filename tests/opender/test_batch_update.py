@@ -0,0 +1,116 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import logging
+import pytest
+import numpy as np
+from opender import DERCommonFileFormat, DERCommonFileFormatBESS, DER_PV, DERFleet
+
+
+@pytest.fixture
+def warnings(monkeypatch):
+    messages = []
+    monkeypatch.setattr(logging, 'warning', messages.append)
+    return messages
+
+
+class TestBatchUpdate:
+
+    def test_point_by_point_warning(self, warnings):
+        der_file = DERCommonFileFormat()
+        der_file.QV_CURVE_V1 = 0.97
+        der_file.QV_CURVE_V2 = 1
+        assert len(warnings) == 1
+
+    def test_no_false_warning(self, warnings):
+        der_file = DERCommonFileFormat()
+        with der_file.batch_update():
+            der_file.QV_CURVE_V1 = 0.97
+            der_file.QV_CURVE_V2 = 1
+            assert der_file.QV_CURVE_V1 == 0.92
+        assert (der_file.QV_CURVE_V1, der_file.QV_CURVE_V2) == (0.97, 1)
+        assert warnings == []
+
+    def test_warning_with_final_values(self, warnings):
+        der_file = DERCommonFileFormat()
+        der_file.update(QV_CURVE_V1=0.99, QV_CURVE_V2=1)
+        assert len(warnings) == 1
+        assert 'QV_CURVE_V1' in warnings[0]
+
+    def test_version_and_curve_once(self, monkeypatch):
+        calls = []
+        initialize = DERCommonFileFormat.initialize_NP_Q_CAPABILTY_BY_P_CURVE
+        monkeypatch.setattr(DERCommonFileFormat, 'initialize_NP_Q_CAPABILTY_BY_P_CURVE',
+                            lambda self: calls.append(self._deferred is None) or initialize(self))
+        der_file = DERCommonFileFormat()
+        version = der_file.version
+        calls.clear()
+        der_file.update(NP_VA_MAX=80e3, NP_P_MAX=80e3, NP_Q_MAX_INJ=40e3, NP_Q_MAX_ABS=40e3)
+        assert der_file.version == version + 1
+        # Curve initialization deferred by each setter, and run once at the end
+        assert calls.count(True) == 1
+
+    def test_same_as_individual_setters(self):
+        values = {'NP_VA_MAX': 80e3, 'NP_P_MAX': 80e3, 'NP_Q_MAX_INJ': 40e3, 'QV_MODE_ENABLE': 'ENABLED'}
+        batch = DERCommonFileFormatBESS()
+        batch.update(**values)
+        single = DERCommonFileFormatBESS()
+        for name, value in values.items():
+            setattr(single, name, value)
+        for name in DERCommonFileFormatBESS.parameters_list:
+            value = getattr(single, name)
+            assert getattr(batch, name) == value or value != value, name
+
+    def test_exception_discards(self):
+        der_file = DERCommonFileFormat()
+        with pytest.raises(RuntimeError):
+            with der_file.batch_update():
+                der_file.AP_LIMIT = 0.5
+                raise RuntimeError
+        assert der_file.AP_LIMIT == 1
+        der_file.AP_LIMIT = 0.5
+        assert der_file.AP_LIMIT == 0.5
+
+    @pytest.mark.parametrize("values", [{'CONST_PF': 0.8, 'NP_P_MAX': -5, 'NP_VA_MAX': 1234},
+                                        {'NP_VA_MAX': 1234, 'QV_CURVE_Q1': 0.3, 'NP_Q_MAX_INJ': -1}])
+    def test_failed_update_discarded(self, values):
+        # If a check fails, no parameter of the batch is applied
+        der_file = DERCommonFileFormat()
+        before = {name: getattr(der_file, name) for name in DERCommonFileFormat.parameters_list}
+        version = der_file.version
+        curves = der_file.capability_curves
+        with pytest.raises(ValueError):
+            der_file.update(**values)
+        assert {name: getattr(der_file, name) for name in DERCommonFileFormat.parameters_list} == before
+        assert der_file.version == version
+        assert der_file.capability_curves is curves
+        der_file.update(NP_VA_MAX=1234, NP_P_MAX=1234)
+        assert (der_file.NP_VA_MAX, der_file.version) == (1234, version + 1)
+
+    def test_nested(self):
+        der_file = DERCommonFileFormat()
+        with der_file.batch_update():
+            with der_file.batch_update():
+                der_file.AP_LIMIT = 0.5
+            assert der_file.AP_LIMIT == 1
+        assert der_file.AP_LIMIT == 0.5
+
+    def test_fleet_update_settings(self):
+        fleet = DERFleet([DER_PV() for _ in range(3)])
+        fleet.update_settings(QV_CURVE_V1=0.97, QV_CURVE_V2=[1, 0.99, 0.98])
+        assert [d.der_file.QV_CURVE_V2 for d in fleet.ders] == [1, 0.99, 0.98]
+        assert all(d.der_file.QV_CURVE_V1 == 0.97 for d in fleet.ders)
+        with pytest.raises(ValueError):
+            fleet.update_settings(AP_LIMIT=[0.5, 0.5])
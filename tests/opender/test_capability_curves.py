@@ -0,0 +1,70 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender.common_file_format.capability_curves import interp_scalar
+
+xp = [-1, -0.5, 0, 0.2, 0.2, 1]
+yp = [0.3, 0.44, 0.44, 0.44, 0.3, 0.2]
+
+
+class TestCapabilityCurves:
+
+    @pytest.mark.parametrize("x", [-2, -1, -0.7, -0.5, 0, 0.1, 0.2, 0.5, 1, 3])
+    def test_interp_scalar(self, x):
+        assert interp_scalar(x, xp, yp) == np.interp(x, xp, yp)
+
+    def test_interp_scalar_nan(self):
+        assert np.isnan(interp_scalar(np.nan, xp, yp))
+
+    def test_prescaled(self, si_obj_creation):
+        der_file = si_obj_creation.der_file
+        curves = der_file.capability_curves
+        curve = der_file.NP_Q_CAPABILITY_BY_P_CURVE
+        assert np.allclose(curves.p_inj_w, np.array(curve['P_Q_INJ_PU']) * der_file.NP_P_MAX)
+        assert np.allclose(curves.q_max_abs_var, np.array(curve['Q_MAX_ABS_PU']) * der_file.NP_VA_MAX)
+        for p_pu in [-1, -0.3, 0, 0.05, 0.5, 1]:
+            assert curves.q_max_inj(p_pu * der_file.NP_P_MAX) == pytest.approx(
+                der_file.NP_VA_MAX * np.interp(p_pu, curve['P_Q_INJ_PU'], curve['Q_MAX_INJ_PU']))
+
+    def test_reused_across_steps(self, si_obj_creation):
+        si_obj_creation.der_file.QV_MODE_ENABLE = True
+        si_obj_creation.update_der_input(v_pu=1.05, p_dc_pu=1)
+        si_obj_creation.run()
+        curves = si_obj_creation.der_file.capability_curves
+        for _ in range(3):
+            si_obj_creation.run()
+        assert si_obj_creation.der_file.capability_curves is curves
+
+    @pytest.mark.parametrize("param, value", [("NP_P_MAX", 50e3), ("NP_VA_MAX", 80e3)])
+    def test_invalidate_on_rating_change(self, si_obj_creation, param, value):
+        der_file = si_obj_creation.der_file
+        curves = der_file.capability_curves
+        setattr(der_file, param, value)
+        assert der_file.capability_curves is not curves
+        assert der_file.capability_curves.p_inj_w[-1] == pytest.approx(der_file.NP_P_MAX)
+
+    def test_invalidate_on_curve_change(self, si_obj_creation):
+        der_file = si_obj_creation.der_file
+        curves = der_file.capability_curves
+        der_file.NP_Q_CAPABILITY_BY_P_CURVE = {
+            'P_Q_INJ_PU': [-1, 1],
+            'Q_MAX_INJ_PU': [0.2, 0.2],
+            'P_Q_ABS_PU': [-1, 1],
+            'Q_MAX_ABS_PU': [0.2, 0.2],
+        }
+        assert der_file.capability_curves is not curves
+        assert der_file.capability_curves.q_max_inj(0) == pytest.approx(0.2 * der_file.NP_VA_MAX)
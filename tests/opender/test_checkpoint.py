@@ -0,0 +1,121 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import copy
+import pytest
+from opender import DER_PV, DER_BESS
+
+
+def create_der(der_class, **settings):
+    if der_class is DER_BESS:
+        der_obj = DER_BESS(t_s=0.1, NP_BESS_CAPACITY=1000, **settings)
+    else:
+        der_obj = DER_PV(t_s=0.1, **settings)
+    update(der_obj, v_pu=1.02, f=60, p_pu=0.6)
+    for _ in range(50):
+        der_obj.run()
+    return der_obj
+
+
+def update(der_obj, v_pu, f, p_pu):
+    if isinstance(der_obj, DER_BESS):
+        der_obj.update_der_input(v_pu=v_pu, f=f, p_dem_pu=p_pu)
+    else:
+        der_obj.update_der_input(v_pu=v_pu, f=f, p_dc_pu=p_pu)
+
+
+def trajectory(der_obj, v_pu, f, p_pu, n_steps):
+    update(der_obj, v_pu, f, p_pu)
+    result = []
+    for _ in range(n_steps):
+        der_obj.run()
+        result.append((der_obj.time, der_obj.p_out_w, der_obj.q_out_var, der_obj.der_status))
+    return result
+
+
+class TestCheckpoint:
+
+    @pytest.mark.parametrize("der_class", [DER_PV, DER_BESS])
+    @pytest.mark.parametrize("settings", [{}, {'QV_MODE_ENABLE': True, 'PF_MODE_ENABLE': True},
+                                          {'NP_PHASE': 'THREE', 'CONST_PF_MODE_ENABLE': True, 'MC_ENABLE': True}])
+    @pytest.mark.parametrize("v_pu, f", [(0.8, 60), (1.12, 60), (1.02, 59.4), (0.4, 60)])
+    def test_restore(self, der_class, settings, v_pu, f):
+        # After restoring, the DER follows the same trajectory as a copy of the DER at the checkpoint
+        der_obj = create_der(der_class, **settings)
+        der_ref = copy.deepcopy(der_obj)
+        checkpoint = der_obj.checkpoint()
+        for trial_v_pu in (v_pu, 0.95, 1.3):
+            trajectory(der_obj, trial_v_pu, f, 0.9, 200)
+            der_obj.restore(checkpoint)
+        assert trajectory(der_obj, v_pu, f, 0.3, 500) == trajectory(der_ref, v_pu, f, 0.3, 500)
+
+    @pytest.mark.parametrize("der_class", [DER_PV, DER_BESS])
+    def test_pending_changes(self, der_class):
+        # Checkpoint with pending TimeDelay changes, a trip timer counting and a scheduled setting change
+        der_obj = create_der(der_class, NP_SET_EXE_TIME=2)
+        der_obj.schedule_settings(der_obj.time + 1, AP_LIMIT_ENABLE=True, AP_LIMIT=0.5)
+        update(der_obj, v_pu=0.85, f=60, p_pu=0.6)
+        for _ in range(15):
+            der_obj.run()
+        der_ref = copy.deepcopy(der_obj)
+        checkpoint = der_obj.checkpoint()
+        trajectory(der_obj, 1.0, 60, 0.2, 300)
+        der_obj.restore(checkpoint)
+        assert trajectory(der_obj, 0.85, 60, 0.6, 300) == trajectory(der_ref, 0.85, 60, 0.6, 300)
+
+    def test_objects_kept(self):
+        der_obj = create_der(DER_PV)
+        blocks = (der_obj.der_input, der_obj.exec_delay, der_obj.activepowerfunc, der_obj.ridethroughperf,
+                  der_obj.ridethroughperf.i_pos_lpf, der_obj.opstatus.tripcrit.uv1_delay)
+        checkpoint = der_obj.checkpoint()
+        trajectory(der_obj, 0.6, 60, 0.9, 100)
+        der_obj.restore(checkpoint)
+        assert (der_obj.der_input, der_obj.exec_delay, der_obj.activepowerfunc, der_obj.ridethroughperf,
+                der_obj.ridethroughperf.i_pos_lpf, der_obj.opstatus.tripcrit.uv1_delay) == blocks
+
+    def test_diagnostics(self):
+        der_obj = create_der(DER_PV)
+        checkpoint = der_obj.checkpoint()
+        trajectory(der_obj, 1.0, 60, -0.1, 10)
+        assert 'P_DC_NEGATIVE' in der_obj.diagnostics.counts
+        der_obj.restore(checkpoint)
+        assert der_obj.diagnostics.counts == {}
+        assert der_obj.diagnostics.step == 50
+
+    def test_advance(self):
+        # Fast-forward with settled-state detection gives the same result after restoring
+        der_obj = create_der(DER_PV)
+        der_ref = copy.deepcopy(der_obj)
+        checkpoint = der_obj.checkpoint()
+        trajectory(der_obj, 0.9, 60, 0.8, 100)
+        der_obj.restore(checkpoint)
+        for d in (der_obj, der_ref):
+            update(d, 1.02, 60, 0.6)
+            d.advance(5000)
+        assert der_obj.settled
+        assert (der_obj.time, der_obj.p_out_w, der_obj.q_out_var, der_obj.steps_skipped) == \
+               (der_ref.time, der_ref.p_out_w, der_ref.q_out_var, der_ref.steps_skipped)
+
+    def test_reinitialize(self):
+        der_obj = create_der(DER_PV)
+        der_obj.checkpoint()
+        der_obj.reinitialize()
+        update(der_obj, 1.0, 60, 0.5)
+        der_obj.run()
+        der_ref = copy.deepcopy(der_obj)
+        checkpoint = der_obj.checkpoint()
+        trajectory(der_obj, 0.5, 60, 0.5, 100)
+        der_obj.restore(checkpoint)
+        assert trajectory(der_obj, 0.8, 60, 0.5, 300) == trajectory(der_ref, 0.8, 60, 0.5, 300)
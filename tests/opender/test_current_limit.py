@@ -0,0 +1,46 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender.auxiliary_funcs import sym_component
+from opender.rt_perf import RideThroughPerf
+
+
+def i_max_pu(i_d_pu, i_q_pu, i_neg_pu, scale):
+    return max([abs(x) for x in sym_component.convert_symm_to_abc(i_d_pu * scale + i_q_pu, i_neg_pu)])
+
+
+class TestCurrentLimit:
+
+    @pytest.mark.parametrize("d, q, neg, angle, limit", [
+        (1.2, 0.2, 0, 0, 1.1),
+        (1, -0.3, 0.2j, 0.3, 1.1),
+        (0.9, 0.4, 0.1 - 0.3j, -2, 1),
+        (-1, 0.5, -0.2, 1, 1.05),
+    ])
+    def test_active_current_scale(self, d, q, neg, angle, limit):
+        rot = np.exp(1j * angle)
+        scale = RideThroughPerf.active_current_scale(d * rot, 1j * q * rot, neg, limit)
+        assert 0 <= scale < 1
+
+        # The highest phase current reaches the limit, and is below the limit with any lower scale
+        assert i_max_pu(d * rot, 1j * q * rot, neg, scale) == pytest.approx(limit)
+        for s in np.linspace(0, scale, 50)[:-1]:
+            assert i_max_pu(d * rot, 1j * q * rot, neg, s) < limit
+
+    def test_no_limit(self):
+        assert RideThroughPerf.active_current_scale(0.5, 0.2j, 0, 1.1) == 1
+        assert RideThroughPerf.active_current_scale(0, 0.2j, 0, 1.1) == 1
@@ -0,0 +1,83 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+from opender import DERCommonFileFormat, DERCommonFileFormatBESS, DER_PV, DER_BESS
+
+
+class TestDerive:
+
+    @pytest.mark.parametrize("cls", [DERCommonFileFormat, DERCommonFileFormatBESS])
+    def test_same_as_kwargs(self, cls):
+        overrides = {'NP_VA_MAX': 80e3, 'NP_P_MAX': 80e3, 'QV_CURVE_Q1': 0.3}
+        derived = cls().derive(**overrides)
+        reference = cls(**overrides)
+        assert type(derived) is cls
+        for name in cls.parameters_list:
+            value = getattr(reference, name)
+            assert getattr(derived, name) == value or value != value, name
+
+    def test_shared_values(self):
+        template = DERCommonFileFormat()
+        derived = template.derive(AP_LIMIT=0.5)
+        assert derived.NP_Q_CAPABILITY_BY_P_CURVE is template.NP_Q_CAPABILITY_BY_P_CURVE
+        assert derived.capability_curves is template.capability_curves
+        assert template.AP_LIMIT == 1
+
+    def test_curves_rebuilt_after_override(self):
+        template = DERCommonFileFormat()
+        derived = template.derive(NP_P_MAX=50e3)
+        assert derived.capability_curves is not template.capability_curves
+        assert derived.capability_curves.p_inj_w[-1] == 50e3
+        assert template.capability_curves.p_inj_w[-1] == 100e3
+
+    def test_nameplate_check(self):
+        template = DERCommonFileFormat()
+        template.nameplate_value_validity_check()
+        assert template.derive(AP_LIMIT=0.5).nameplate_checked
+        assert not template.derive(NP_VA_MAX=90e3).nameplate_checked
+        assert not DERCommonFileFormat().derive(AP_LIMIT=0.5).nameplate_checked
+
+    def test_setter_validation(self):
+        with pytest.raises(ValueError):
+            DERCommonFileFormat().derive(NP_P_MAX=-1)
+
+
+class TestClone:
+
+    @pytest.mark.parametrize("der_cls", [DER_PV, DER_BESS])
+    def test_clone(self, der_cls):
+        der_obj = der_cls(t_s=0.5)
+        der_obj.name = 'DER_A'
+        der_obj.bus = '650'
+        clone = der_obj.clone(NP_VA_MAX=50e3, NP_P_MAX=50e3)
+        assert type(clone) is der_cls
+        assert (clone.name, clone.bus, clone.t_s) == ('DER_A', '650', 0.5)
+        assert clone.der_file.NP_VA_MAX == 50e3
+        assert der_obj.der_file.NP_VA_MAX == 100e3
+
+    def test_clone_skips_nameplate_check(self):
+        der_obj = DER_PV()
+        assert der_obj.clone(AP_LIMIT=0.5).der_file.nameplate_checked
+
+    def test_same_output(self):
+        clone = DER_PV().clone(NP_VA_MAX=50e3, NP_P_MAX=50e3)
+        reference = DER_PV(NP_VA_MAX=50e3, NP_P_MAX=50e3)
+        for der_obj in (clone, reference):
+            der_obj.update_der_input(p_dc_pu=1, v_pu=1.08, f=60)
+            for _ in range(5):
+                der_obj.run()
+        assert clone.p_out_w == reference.p_out_w
+        assert clone.q_out_var == reference.q_out_var
@@ -0,0 +1,133 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender import der, DER_PV, DER_BESS, DERFleet, DERCommonFileFormat, DERCommonFileFormatBESS
+
+n_der = 16
+t_s_list = [0.01, 1, 10]
+seed_list = [0, 1]
+
+
+def create_ders(seed):
+    # DERs with randomly selected settings, covering all reactive power modes, ride-through categories and types
+    rng = np.random.RandomState(seed)
+    ders = []
+    for i in range(n_der):
+        bess = rng.rand() < 0.4
+        der_file = DERCommonFileFormatBESS() if bess else DERCommonFileFormat()
+        der_file.NP_PHASE = 'THREE' if rng.rand() < 0.5 else 'SINGLE'
+        der_file.NP_V_MEAS_UNBALANCE = 'AVG' if rng.rand() < 0.5 else 'POS'
+        mode = rng.randint(5)
+        der_file.CONST_PF_MODE_ENABLE = mode == 1
+        der_file.QV_MODE_ENABLE = mode == 2
+        der_file.QP_MODE_ENABLE = mode == 3
+        der_file.CONST_Q_MODE_ENABLE = mode == 4
+        der_file.CONST_PF = 0.85
+        der_file.CONST_PF_EXCITATION = 'ABS' if rng.rand() < 0.5 else 'INJ'
+        der_file.CONST_Q = 0.4 if rng.rand() < 0.5 else -0.4
+        der_file.PV_MODE_ENABLE = rng.rand() < 0.5
+        der_file.AP_LIMIT_ENABLE = rng.rand() < 0.3
+        der_file.AP_LIMIT = 0.6 if rng.rand() < 0.5 else -0.3
+        der_file.PF_MODE_ENABLE = rng.rand() < 0.6
+        der_file.QV_VREF_AUTO_MODE = rng.rand() < 0.3
+        der_file.NP_ABNORMAL_OP_CAT = ['CAT_I', 'CAT_II', 'CAT_III'][rng.randint(3)]
+        der_file.DVS_MODE_ENABLE = rng.rand() < 0.3
+        der_file.MC_ENABLE = rng.rand() < 0.3
+        der_file.NP_VA_MAX = der_file.NP_P_MAX * (1 + 0.2 * rng.rand())
+        der_file.NP_PRIO_OUTSIDE_MIN_Q_REQ = 'ACTIVE' if rng.rand() < 0.5 else 'REACTIVE'
+        der_file.STATUS_INIT = rng.rand() < 0.5
+        der_file.ES_DELAY = rng.choice([0, 2, 5])
+        der_file.ES_RAMP_RATE = rng.choice([0, 5, 30])
+        der_file.ES_RANDOMIZED_DELAY = rng.choice([0, 10])
+        der_file.NP_CURRENT_PU = rng.choice([1.0, 1.1, 1.2])
+        if bess:
+            der_file.NP_BESS_CAPACITY = 2000 * (1 + rng.rand())
+        ders.append(DER_BESS(der_file) if bess else DER_PV(der_file))
+    return ders
+
+
+def create_inputs(seed, steps):
+    # Unbalanced voltages and frequency deviations, including a voltage sag, a voltage swell and a frequency excursion
+    rng = np.random.RandomState(seed + 100)
+    phase = np.arange(n_der)
+    inputs = []
+    for k in range(steps):
+        v = 1 + 0.12 * np.sin(k / 7.0 + phase) - (0.5 if 40 < k < 46 else 0) + (0.3 if 90 < k < 93 else 0)
+        v_abc = np.stack([v, v * (1 + 0.05 * np.sin(k / 3.0 + phase)), v * (1 - 0.03 * np.cos(k / 5.0 + phase))],
+                         axis=1)
+        f = 60 + 1.5 * np.sin(k / 11.0 + phase) + (3 if 150 < k < 160 else 0)
+        if k < 3:
+            # Out of enter service range, so that the scalar model does not enter service before any output exists
+            f = np.full(n_der, 60.5)
+        p_dc_pu = 0.2 + 0.9 * rng.rand(n_der)
+        p_dem_pu = np.sin(k / 5.0 + phase)
+        inputs.append((v_abc, f, p_dc_pu, p_dem_pu))
+    return inputs
+
+
+class TestDERFleet:
+
+    @pytest.mark.parametrize("t_s", t_s_list)
+    @pytest.mark.parametrize("seed", seed_list)
+    def test_fleet_matches_scalar_model(self, t_s, seed):
+        der.DER.t_s = t_s
+        steps = 200
+        inputs = create_inputs(seed, steps)
+
+        ders = create_ders(seed)
+        fleet = DERFleet(ders)
+        fleet_results = []
+        np.random.seed(seed)
+        for v_abc, f, p_dc_pu, p_dem_pu in inputs:
+            v_pu = np.where(fleet.settings.three_phase[:, None], v_abc, v_abc[:, :1])
+            fleet.update_der_input(v_pu=v_pu, f=f, p_dc_pu=p_dc_pu, p_dem_pu=np.where(fleet.is_bess, p_dem_pu, np.nan))
+            p, q = fleet.run()
+            fleet_results.append((p.copy(), q.copy(), fleet.der_status))
+
+        np.random.seed(seed)
+        for k, (v_abc, f, p_dc_pu, p_dem_pu) in enumerate(inputs):
+            p_fleet, q_fleet, status_fleet = fleet_results[k]
+            for i, der_obj in enumerate(ders):
+                v_pu = list(v_abc[i]) if der_obj.der_file.NP_PHASE == 'THREE' else v_abc[i, 0]
+                if fleet.is_bess[i]:
+                    der_obj.update_der_input(v_pu=v_pu, f=f[i], p_dem_pu=p_dem_pu[i])
+                else:
+                    der_obj.update_der_input(v_pu=v_pu, f=f[i], p_dc_pu=p_dc_pu[i])
+                p, q = der_obj.run()
+
+                assert der_obj.der_status == status_fleet[i], f'step {k}, DER {i}: status mismatch'
+                assert p == pytest.approx(p_fleet[i], abs=1e-6 * der_obj.der_file.NP_VA_MAX), \
+                    f'step {k}, DER {i}: active power mismatch'
+                assert q == pytest.approx(q_fleet[i], abs=1e-6 * der_obj.der_file.NP_VA_MAX), \
+                    f'step {k}, DER {i}: reactive power mismatch'
+
+    def test_fleet_outputs(self, si_obj_creation, bess_obj_creation):
+        fleet = DERFleet([si_obj_creation, bess_obj_creation])
+        fleet.update_der_input(v_pu=1, f=60, p_dc_pu=[0.5, np.nan], p_dem_pu=[np.nan, -0.5])
+        fleet.run()
+
+        assert list(fleet.der_status) == ['Continuous Operation', 'Continuous Operation']
+        p_pu, q_pu = fleet.get_der_output('PQ_pu')
+        p_kw, q_kvar = fleet.get_der_output('PQ_kVA')
+        assert p_kw == pytest.approx(p_pu * fleet.settings.NP_VA_MAX * 1e-3)
+        assert fleet.get_der_output('I_A') == (None, None)
+
+    def test_bess_without_p_dem(self, bess_obj_creation):
+        fleet = DERFleet([bess_obj_creation])
+        fleet.update_der_input(v_pu=1, f=60)
+        with pytest.raises(ValueError):
+            fleet.run()
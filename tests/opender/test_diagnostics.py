@@ -0,0 +1,88 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import logging
+import pytest
+import numpy as np
+from opender import DER_BESS, DER_PV, DERFleet
+
+
+@pytest.fixture
+def log_records(monkeypatch):
+    messages = []
+    monkeypatch.setattr(logging, 'log', lambda level, message: messages.append(message))
+    return messages
+
+
+def full_bess(**kwargs):
+    return DER_BESS(t_s=10, SOC_INIT=0.99, NP_BESS_CAPACITY=10000, **kwargs)
+
+
+class TestDiagnostics:
+
+    def test_soc_max_logged_once(self, log_records):
+        der_obj = full_bess()
+        for _ in range(50):
+            der_obj.update_der_input(p_dem_pu=-1, v_pu=1, f=60)
+            der_obj.run()
+
+        record = der_obj.diagnostics.records['SOC_MAX']
+        assert len(log_records) == 1
+        assert 'BESS SoC reached max' in log_records[0]
+        assert record.transitions == 1
+        assert record.count == der_obj.diagnostics.counts['SOC_MAX']
+        assert record.last_time == pytest.approx(500)
+        assert record.first_time + (record.count - 1) * 10 == pytest.approx(500)
+        assert der_obj.diagnostics.active('SOC_MAX')
+
+    def test_transitions(self, log_records):
+        der_obj = DER_PV(t_s=1)
+        for p_dc_pu in [0.5, -0.1, -0.1, 0.5, -0.1, 0.5]:
+            der_obj.update_der_input(p_dc_pu=p_dc_pu, v_pu=1, f=60)
+            der_obj.run()
+
+        record = der_obj.diagnostics.records['P_DC_NEGATIVE']
+        assert (record.count, record.transitions) == (3, 2)
+        assert (record.first_time, record.last_time) == (2, 5)
+        assert len(log_records) == 2
+        assert not der_obj.diagnostics.active('P_DC_NEGATIVE')
+
+    def test_reset(self):
+        der_obj = DER_PV()
+        der_obj.update_der_input(p_dc_pu=-0.1, v_pu=1, f=60)
+        der_obj.run()
+        assert der_obj.diagnostics.counts == {'P_DC_NEGATIVE': 1}
+        der_obj.diagnostics.reset()
+        assert der_obj.diagnostics.counts == {}
+
+    def test_fleet(self, log_records):
+        ders = [full_bess(), DER_BESS(t_s=10, NP_BESS_CAPACITY=1e9), full_bess()]
+        fleet = DERFleet(ders)
+        for _ in range(50):
+            fleet.update_der_input(p_dem_pu=-1, v_pu=1, f=60)
+            fleet.run()
+
+        count = fleet.diagnostics.counts['SOC_MAX']
+        assert count[0] == count[2] > 0
+        assert count[1] == 0
+        assert list(fleet.diagnostics.records['SOC_MAX']['transitions']) == [1, 0, 1]
+        assert len(log_records) == 1
+
+        # Same counts as the DER objects run on their own
+        der_obj = full_bess()
+        for _ in range(50):
+            der_obj.update_der_input(p_dem_pu=-1, v_pu=1, f=60)
+            der_obj.run()
+        assert count[0] == der_obj.diagnostics.counts['SOC_MAX']
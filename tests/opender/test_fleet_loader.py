@@ -0,0 +1,149 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import csv
+import logging
+import pytest
+import numpy as np
+from opender import DERCommonFileFormat, DER_PV, DER_BESS, DERFleet, load_ders, load_fleet
+from opender.common_file_format.settings_loader import read_settings
+from opender.fleet.loader import PARAMETERS_DIR
+
+
+def wide_table():
+    return {
+        'name': np.array(['pv1', 'pv2', 'pv3', 'bess1']),
+        'bus': np.array(['650', '650', '671', '675']),
+        'NP_VA_MAX': np.array([100e3, 50e3, 100e3, 40e3]),
+        'NP_P_MAX': np.array([100e3, 50e3, 100e3, 40e3]),
+        'QV_MODE_ENABLE': np.array(['ENABLED', 'DISABLED', 'ENABLED', 'DISABLED']),
+        'NP_BESS_CAPACITY': np.array([np.nan, np.nan, np.nan, 100e3]),
+    }
+
+
+def write_csv(path, columns):
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(columns.keys())
+        for row in zip(*columns.values()):
+            writer.writerow(['' if isinstance(v, float) and np.isnan(v) else v for v in row])
+
+
+class TestFleetLoader:
+
+    @pytest.mark.parametrize("fmt", ['dict', 'csv', 'npz'])
+    def test_load_ders(self, fmt, tmp_path):
+        source = wide_table()
+        if fmt == 'csv':
+            write_csv(tmp_path.joinpath('ders.csv'), source)
+            source = tmp_path.joinpath('ders.csv')
+        elif fmt == 'npz':
+            np.savez(tmp_path.joinpath('ders.npz'), **source)
+            source = tmp_path.joinpath('ders.npz')
+
+        ders = load_ders(source)
+        assert [d.name for d in ders] == ['pv1', 'pv2', 'pv3', 'bess1']
+        assert [d.bus for d in ders] == ['650', '650', '671', '675']
+        assert [type(d) for d in ders] == [DER_PV, DER_PV, DER_PV, DER_BESS]
+        assert ders[1].der_file.NP_VA_MAX == 50e3
+        assert ders[0].der_file.QV_MODE_ENABLE and not ders[1].der_file.QV_MODE_ENABLE
+        assert ders[3].der_file.NP_BESS_CAPACITY == 100e3
+
+    def test_same_as_der_file(self):
+        der_ref = DER_PV(DERCommonFileFormat(NP_VA_MAX=50e3, NP_P_MAX=50e3, QV_MODE_ENABLE='DISABLED'))
+        der_obj = load_ders(wide_table())[1]
+        for d in (der_ref, der_obj):
+            d.update_der_input(p_dc_pu=1, v_pu=1.08, f=60)
+            d.run()
+        assert der_obj.p_out_w == der_ref.p_out_w
+        assert der_obj.q_out_var == der_ref.q_out_var
+
+    def test_copies_are_independent(self):
+        table = {'NP_VA_MAX': np.array([100e3] * 3)}
+        ders = load_ders(table)
+        assert ders[0].der_file is not ders[1].der_file
+        ders[0].der_file.AP_LIMIT = 0.5
+        ders[0].der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_INJ_PU'][0] = 0.1
+        assert ders[1].der_file.AP_LIMIT == 1
+        assert ders[2].der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_INJ_PU'][0] != 0.1
+        assert [d.name for d in ders] == ['DER1', 'DER2', 'DER3']
+
+    def test_np_type(self):
+        ders = load_ders({'NP_TYPE': np.array(['PV', 'BESS'])})
+        assert [type(d) for d in ders] == [DER_PV, DER_BESS]
+        assert ders[0].der_file.NP_TYPE == 'PV'
+        assert ders[0].der_file.NP_PHASE == 'THREE'
+
+    def test_invalid_rows(self):
+        table = {'name': np.array(['a', 'b', 'c', 'd']),
+                 'NP_P_MAX': np.array([100e3, -1, 0, 100e3]),
+                 'CONST_PF': np.array(['0.9', '1.2', '', 'x'], dtype=object)}
+        with pytest.raises(ValueError) as e:
+            load_ders(table)
+        assert "NP_P_MAX should be greater than 0 (2 DERs: b, c)" in str(e.value)
+        assert "CONST_PF should be between 0 and 1 (2 DERs: b, d)" in str(e.value)
+
+    def test_same_as_settings_files(self, monkeypatch):
+        # Settings derived from one template per DER type are the same as settings read from the files of each row
+        table = {'NP_VA_MAX': np.array([50e3, 200e3, np.nan, 100e3]),
+                 'NP_AC_V_NOM': np.array([120, 480, np.nan, 600]),
+                 'NP_NORMAL_OP_CAT': np.array(['CAT_A', '', 'cat_b', 'CAT_A'], dtype=object),
+                 'QV_CURVE_Q1': np.array([0.3, np.nan, 0.44, np.nan]),
+                 'NP_BESS_CAPACITY': np.array([np.nan, np.nan, 100e3, np.nan])}
+        created = []
+        init = DERCommonFileFormat.__init__
+        monkeypatch.setattr(DERCommonFileFormat, '__init__', lambda obj, *args, **kwargs:
+                            created.append(type(obj)) or init(obj, *args, **kwargs))
+        ders = load_ders(table)
+        assert len(created) == 2
+        monkeypatch.undo()
+
+        base = read_settings(PARAMETERS_DIR.joinpath("AS-with std-values.csv"), strip_suffix=True)
+        base.update(read_settings(PARAMETERS_DIR.joinpath("Model-parameters.csv")))
+        for i, d in enumerate(ders):
+            row = {name: values[i] for name, values in table.items() if values[i] == values[i] and values[i] != ''}
+            der_file = type(d.der_file)(as_file_path={**base, **row}, model_file_path={})
+            reference = type(d)(der_file).der_file._settings_table()
+            derived = d.der_file._settings_table()
+            assert {name: value for name, value in derived.items() if name != 'param_inputs'} == \
+                   {name: value for name, value in reference.items() if name != 'param_inputs'}
+
+    def test_nameplate_checks(self, monkeypatch):
+        messages = []
+        monkeypatch.setattr(logging, 'warning', messages.append)
+        table = {'name': np.array(['a', 'b', 'c', 'd']),
+                 'NP_VA_MAX': np.array([100e3, 50e3, 100e3, 50e3]),
+                 'NP_P_MAX': np.array([100e3, 100e3, 100e3, 100e3]),
+                 'NP_Q_MAX_INJ': np.array([44e3, 44e3, 20e3, 44e3])}
+        ders = load_ders(table)
+        checked = [message for message in messages if message.startswith("Warning: Please make sure to have DER "
+                                                                          "nameplate active power rating")]
+        assert checked == ["Warning: Please make sure to have DER nameplate active power rating less than or equal to "
+                           "DER nameplate apparent power rating. (2 DERs: b, d)"]
+        assert any("injection rating should be greater than 44%" in message and message.endswith("(1 DERs: c)")
+                   for message in messages)
+        assert all(d.der_file.nameplate_checked for d in ders)
+
+    def test_unknown_column(self, monkeypatch):
+        messages = []
+        monkeypatch.setattr(logging, 'warning', messages.append)
+        load_ders({'NP_VA_MAX': np.array([100e3]), 'FEEDER': np.array(['f1'])})
+        assert any("['FEEDER']" in message for message in messages)
+
+    def test_load_fleet(self):
+        fleet = load_fleet(wide_table(), t_s=0.1)
+        assert isinstance(fleet, DERFleet)
+        assert fleet.names == ['pv1', 'pv2', 'pv3', 'bess1']
+        assert list(fleet.is_bess) == [False, False, False, True]
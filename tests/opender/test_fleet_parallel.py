@@ -0,0 +1,139 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender import DER_PV, DER_BESS, DERFleet, ShardedFleetRunner, DERCommonFileFormat, DERCommonFileFormatBESS
+from opender.fleet.shared_arrays import SharedFleetArrays
+
+n_der = 12
+n_steps = 60
+
+
+def create_ders():
+    # DERs on four buses, tripped at start and entering service with randomized delay
+    rng = np.random.RandomState(0)
+    ders = []
+    for i in range(n_der):
+        bess = i % 3 == 0
+        der_file = DERCommonFileFormatBESS() if bess else DERCommonFileFormat()
+        der_file.NP_PHASE = 'THREE' if i % 2 else 'SINGLE'
+        der_file.QV_MODE_ENABLE = rng.rand() < 0.5
+        der_file.STATUS_INIT = False
+        der_file.ES_DELAY = 2
+        der_file.ES_RAMP_RATE = 0
+        der_file.ES_RANDOMIZED_DELAY = 20
+        if bess:
+            der_file.NP_BESS_CAPACITY = 2000
+        der_obj = DER_BESS(der_file) if bess else DER_PV(der_file)
+        der_obj.bus = f'bus{i % 4}'
+        ders.append(der_obj)
+    return ders
+
+
+def run(runner, is_bess):
+    results = []
+    for k in range(n_steps):
+        v = 1 + 0.05 * np.sin(k / 5 + np.arange(n_der))
+        # Trip at step 30 by overvoltage, and enter service again with new randomized delays
+        v = v + (0.3 if 30 <= k < 32 else 0)
+        runner.update_der_input(v_pu=v, f=60, p_dc_pu=np.where(is_bess, np.nan, 0.8),
+                                p_dem_pu=np.where(is_bess, 0.5, np.nan))
+        p, q = runner.run()
+        results.append((p.copy(), q.copy(), runner.der_status_code.copy()))
+    return results
+
+
+class TestShardedFleetRunner:
+
+    @pytest.mark.parametrize("n_workers, shard_by", [(2, 'bus'), (3, None), (4, lambda d: d.bus[-1] == '0')])
+    def test_bit_identical_to_serial(self, n_workers, shard_by):
+        ders = create_ders()
+        is_bess = np.array([isinstance(d, DER_BESS) for d in ders])
+
+        with ShardedFleetRunner(ders, n_workers=0, t_s=1, seed=5) as serial:
+            expected = run(serial, is_bess)
+
+        with ShardedFleetRunner(ders, n_workers=n_workers, shard_by=shard_by, t_s=1, seed=5) as runner:
+            assert 1 < len(runner.shards) <= n_workers
+            assert sorted(np.concatenate(runner.shards)) == list(range(n_der))
+            result = run(runner, is_bess)
+
+        for (p, q, status), (p_ref, q_ref, status_ref) in zip(result, expected):
+            assert np.array_equal(p, p_ref)
+            assert np.array_equal(q, q_ref)
+            assert np.array_equal(status, status_ref)
+
+        # Randomized delays differ between DERs, and DERs have entered service
+        assert len({tuple(r[2]) for r in expected}) > 3
+        assert (expected[-1][2] != 0).all()
+
+    @pytest.mark.parametrize("n_workers, shard_by", [(0, None), (3, None), (2, 'bus')])
+    def test_shared_memory(self, n_workers, shard_by):
+        ders = create_ders()
+        is_bess = np.array([isinstance(d, DER_BESS) for d in ders])
+
+        with ShardedFleetRunner(ders, n_workers=0, t_s=1, seed=5) as serial:
+            expected = run(serial, is_bess)
+        serial_arrays = serial._fleet.fleet_arrays()
+
+        with ShardedFleetRunner(ders, n_workers=n_workers, shard_by=shard_by, t_s=1, seed=5,
+                                shared_memory=True) as runner:
+            result = run(runner, is_bess)
+            rows = [runner.rows(i) for i in range(n_der)]
+            assert np.array_equal(runner.arrays.p_out_w[rows], runner.p_out_w)
+            if runner.inverse is None:
+                # Outputs are views of the shared memory block
+                assert runner.p_out_w.base is not None
+            # Inputs, states and outputs of all DERs are kept in the shared memory block
+            assert {path for path, dtype, row_shape in runner.arrays.layout} == set(serial_arrays)
+            for path in ('v_abc', 'v_lpf.lpf_out_prev', 'es_rand_delay.tdelay_in_time', 'rt_time_lv',
+                         'trip_delays.OV2.con_del_enable_int', 'i_pos_d_rrl.ramp_out_prev', 'bess_soc'):
+                assert np.array_equal(runner.arrays[path][rows], serial_arrays[path], equal_nan=True), path
+
+        for (p, q, status), (p_ref, q_ref, status_ref) in zip(result, expected):
+            assert np.array_equal(p, p_ref)
+            assert np.array_equal(q, q_ref)
+            assert np.array_equal(status, status_ref)
+        assert runner.arrays is None
+
+    def test_shared_fleet_arrays(self):
+        arrays = SharedFleetArrays(5)
+        attached = SharedFleetArrays(5, arrays.name)
+        assert np.isnan(attached.v_abc).all()
+        arrays.v_abc[2] = [1, 2, 3]
+        attached.p_out_w[:] = 7
+        assert list(attached.v_abc[2]) == [1, 2, 3]
+        assert (arrays.p_out_w == 7).all()
+        attached.close()
+        arrays.close()
+
+    def test_shard_by_bus(self):
+        ders = create_ders()
+        runner = ShardedFleetRunner(ders, n_workers=0, shard_by='bus')
+        runner.n_workers = 4
+        shards = runner._assign_shards('bus')
+        assert len(shards) == 4
+        assert all(len({ders[i].bus for i in idx}) == 1 for idx in shards)
+
+        runner.n_workers = 3
+        shards = runner._assign_shards('bus')
+        assert len(shards) == 3
+        assert all(len({ders[i].bus for i in idx}) == len(idx) // 3 for idx in shards)
+
+    def test_fleet_seeds(self):
+        ders = create_ders()
+        with pytest.raises(ValueError):
+            DERFleet(ders, seeds=[0])
@@ -0,0 +1,66 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender.capability_and_priority import intercep_piecewise_circle, _intercep_piecewise_circle
+from opender.fleet.der_fleet import intercep_piecewise_circle_array
+
+# Capability curves and watt-var curves in W and var
+curves = [
+    ([0, 20e3, 100e3], [44e3, 44e3, 20e3]),
+    ([0, 100e3], [44e3, 44e3]),
+    ([-100e3, -50e3, -20e3, 0, 20e3, 50e3, 100e3, 100e3], [44e3, 44e3, 0, 0, 0, 0, -44e3, -44e3]),
+    ([-100e3, -90e3, -50e3, -20e3, 20e3, 50e3, 90e3, 100e3], [30e3, 30e3, 10e3, 0, 0, -10e3, -30e3, -30e3]),
+]
+
+
+class TestInterceptCircle:
+
+    @pytest.mark.parametrize("xp, yp", curves)
+    @pytest.mark.parametrize("mag", [100e3, 110e3, -100e3, -120e3, 50e3])
+    def test_exact_intercept(self, mag, xp, yp):
+        x, y = intercep_piecewise_circle(mag, xp, yp)
+
+        # On the circle, on the curve, and on the requested side
+        assert np.hypot(x, y) == pytest.approx(abs(mag), abs=1e-6)
+        assert y == pytest.approx(np.interp(x, xp, yp), abs=1e-6)
+        assert x * mag >= 0
+
+        # No interception farther from the y axis
+        x_out = np.linspace(x, mag, 1001)[1:]
+        assert (np.hypot(x_out, np.interp(x_out, xp, yp)) > abs(mag) - 1e-6).all()
+
+    def test_no_intercept(self):
+        # Curve outside of the circle at the y axis
+        x, y = intercep_piecewise_circle(30e3, [0, 100e3], [44e3, 44e3])
+        assert (x, y) == (0, 44e3)
+
+    def test_cache(self):
+        _intercep_piecewise_circle.cache_clear()
+        for _ in range(5):
+            intercep_piecewise_circle(110e3, np.array(curves[0][0]), np.array(curves[0][1]))
+        info = _intercep_piecewise_circle.cache_info()
+        assert info.misses == 1
+        assert info.hits == 4
+
+    def test_array_version(self):
+        k = max(len(xp) for xp, yp in curves)
+        xp = np.array([list(c[0]) + [c[0][-1]] * (k - len(c[0])) for c in curves])
+        yp = np.array([list(c[1]) + [c[1][-1]] * (k - len(c[1])) for c in curves])
+        mag = np.array([110e3, -100e3, 100e3, -120e3])
+        x, y = intercep_piecewise_circle_array(mag, xp, yp)
+        for i, (xp_i, yp_i) in enumerate(curves):
+            assert (x[i], y[i]) == pytest.approx(intercep_piecewise_circle(mag[i], xp_i, yp_i))
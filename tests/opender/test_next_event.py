@@ -0,0 +1,207 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import math
+import warnings
+import numpy as np
+import pytest
+from opender import DER_PV
+from opender.auxiliary_funcs.accumulation import repeated_sum, steps_to_reach
+
+
+def steps_until_change(der_obj, observe, max_steps=100000):
+    # Number of time steps run until the observed value changes
+    value = observe(der_obj)
+    for k in range(1, max_steps + 1):
+        der_obj.run()
+        if observe(der_obj) != value:
+            return k
+    return math.inf
+
+
+def predicted_steps(der_obj, assuming_constant_inputs=True):
+    return round(der_obj.time_to_next_event(assuming_constant_inputs) / der_obj.t_s)
+
+
+def status_changes(der_obj, max_events=20):
+    # Jump from event to event, checking that the status does not change before the predicted time step. Returns the
+    # time steps of the status changes, and the number of time steps run.
+    changes = []
+    steps = 0
+    for _ in range(max_events):
+        if der_obj.time_to_next_event() == math.inf:
+            break
+        n_steps = predicted_steps(der_obj)
+        status = der_obj.der_status
+        for k in range(1, n_steps + 1):
+            der_obj.run()
+            assert k == n_steps or der_obj.der_status == status
+        steps = steps + n_steps
+        if der_obj.der_status != status:
+            changes.append((steps, der_obj.der_status))
+    return changes, steps
+
+
+def reference_changes(der_obj, n_steps):
+    # Time steps of the status changes, running every time step
+    changes = []
+    for k in range(1, n_steps + 1):
+        status = der_obj.der_status
+        der_obj.run()
+        if der_obj.der_status != status:
+            changes.append((k, der_obj.der_status))
+    return changes
+
+
+def create_tripped_der(t_s, **settings):
+    der_obj = DER_PV(t_s=t_s, STATUS_INIT=False, ES_PERMIT_SERVICE=False, **settings)
+    der_obj.update_der_input(p_dc_pu=0.7, v_pu=1, f=60)
+    der_obj.run()
+    der_obj.der_file.ES_PERMIT_SERVICE = True
+    der_obj.run()
+    return der_obj
+
+
+def create_der(t_s):
+    der_obj = DER_PV(t_s=t_s)
+    der_obj.update_der_input(p_dc_pu=0.7, v_pu=1, f=60)
+    der_obj.advance(100)
+    return der_obj
+
+
+class TestTimeToNextEvent:
+
+    @pytest.mark.parametrize("t_s", [0.01, 0.1, 1])
+    def test_settled(self, t_s):
+        der_obj = create_der(t_s)
+        der_obj.advance(3000)
+        assert der_obj.time_to_next_event() == math.inf
+        assert der_obj.time_to_next_event(assuming_constant_inputs=False) == math.inf
+
+    @pytest.mark.parametrize("t_s", [0.1, 1])
+    @pytest.mark.parametrize("v_pu, f", [(0.8, 60), (0.6, 60), (1.12, 60), (1, 58.2), (1, 61.5)])
+    def test_trip(self, v_pu, f, t_s):
+        der_obj = create_der(t_s)
+        der_ref = create_der(t_s)
+        for d in (der_obj, der_ref):
+            d.update_der_input(v_pu=v_pu, f=f)
+            d.run()
+        changes, steps = status_changes(der_obj)
+        assert changes == reference_changes(der_ref, steps)
+        assert changes[-1][1] == 'Trip'
+
+    @pytest.mark.parametrize("t_s", [0.01, 0.1, 1])
+    def test_uv1_trip_time(self, t_s):
+        der_obj = create_der(t_s)
+        der_obj.update_der_input(v_pu=0.8)
+        der_obj.run()
+        assert der_obj.time_to_next_event() == pytest.approx(der_obj.der_file.UV1_TRIP_T - t_s, abs=t_s)
+        assert der_obj.time_to_next_event(assuming_constant_inputs=False) == math.inf
+
+    @pytest.mark.parametrize("t_s", [0.1, 0.5, 1])
+    @pytest.mark.parametrize("es_delay, es_ramp_rate", [(0, 300), (30, 10), (300, 300), (300, 0)])
+    def test_enter_service(self, es_delay, es_ramp_rate, t_s):
+        der_obj = create_tripped_der(t_s, ES_DELAY=es_delay, ES_RAMP_RATE=es_ramp_rate)
+        der_ref = create_tripped_der(t_s, ES_DELAY=es_delay, ES_RAMP_RATE=es_ramp_rate)
+        changes, steps = status_changes(der_obj)
+        assert changes == reference_changes(der_ref, steps)
+        assert changes[-1][1] == 'Continuous Operation'
+
+    @pytest.mark.parametrize("t_s", [0.01, 0.1, 1])
+    def test_scheduled_settings(self, t_s):
+        der_obj = DER_PV(t_s=t_s, NP_SET_EXE_TIME=2)
+        der_obj.update_der_input(p_dc_pu=0.7, v_pu=1, f=60)
+        der_obj.advance(100)
+        der_obj.schedule_settings(der_obj.time + 30, AP_LIMIT_ENABLE=True, AP_LIMIT=0.5)
+        steps = predicted_steps(der_obj, assuming_constant_inputs=False)
+        assert steps_until_change(der_obj, lambda d: d.exec_delay.ap_limit_enable_exec) == steps
+        assert der_obj.time_to_next_event(assuming_constant_inputs=False) == math.inf
+
+    @pytest.mark.parametrize("t_s", [0.1, 1])
+    def test_event_driven(self, t_s):
+        # Jumping from event to event with advance() gives the same result as running every time step
+        der_ref = create_tripped_der(t_s)
+        der_obj = create_tripped_der(t_s)
+        events = 0
+        skipped = 0
+        while der_obj.time_to_next_event() < math.inf:
+            n_steps = predicted_steps(der_obj)
+            der_obj.advance(n_steps)
+            skipped = skipped + der_obj.steps_skipped
+            for _ in range(n_steps):
+                der_ref.run()
+            assert der_obj.der_status == der_ref.der_status
+            assert der_obj.p_out_w == der_ref.p_out_w
+            events = events + 1
+        assert der_obj.der_status == 'Continuous Operation'
+        assert events < 10
+        # The enter service delay is skipped
+        assert skipped > 0.9 * der_obj.der_file.ES_DELAY / t_s
+
+    @pytest.mark.parametrize("t_s", [0.001, 0.01, 0.1])
+    def test_enter_service_delay_skipped(self, t_s):
+        # The enter service delay timer is moved forward in closed form, identical to running every time step
+        der_obj = create_tripped_der(t_s, ES_DELAY=60)
+        der_ref = create_tripped_der(t_s, ES_DELAY=60)
+        n_steps = predicted_steps(der_obj)
+        der_obj.advance(n_steps - 1)
+        assert der_obj.steps_skipped > n_steps - 10
+        for _ in range(n_steps - 1):
+            der_ref.run()
+        assert der_obj.opstatus.enterservicecrit.vft_delay.con_del_enable_int == \
+               der_ref.opstatus.enterservicecrit.vft_delay.con_del_enable_int
+        assert der_obj.der_status == der_ref.der_status == 'Trip'
+        der_obj.run()
+        der_ref.run()
+        assert der_obj.der_status == der_ref.der_status == 'Entering Service'
+
+
+class TestAccumulation:
+
+    @pytest.mark.parametrize("x, c", [(0., 0.001), (0.001, 0.001), (0., 0.1), (0.3, 1 / 3), (-0.8, 0.002), (0.8, -0.002),
+                                      (1., 1.5 * 2 ** -20), (-0.5, 3 * 2 ** -45), (0.25, 0.1 / 7)])
+    def test_repeated_sum(self, x, c):
+        value = x
+        for k in range(1, 20001):
+            value = value + c
+            if k % 997 == 0:
+                assert repeated_sum(x, c, k) == value
+
+    @pytest.mark.parametrize("x, c, target", [(0., 0.001, 300.), (0.001, 0.001, 2.), (0.5, -0.001, 0.), (0., 0.1, 0.3),
+                                              (0.2, 1 / 30, 1 + 2 ** -52), (-0.8, 0.002, 0.4), (0.3, 0.01, 0.25)])
+    def test_steps_to_reach(self, x, c, target):
+        value = x + c
+        steps = 1
+        while not (value >= target if c > 0 else value <= target):
+            value = value + c
+            steps = steps + 1
+        assert steps_to_reach(x, c, target) == steps
+
+    @pytest.mark.parametrize("x, c, target", [(np.int64(0), 0.001, np.int64(300)), (0., np.float64(0.001), np.int64(60)),
+                                              (np.float64(0.5), -0.001, np.int64(0))])
+    def test_numpy_numbers(self, x, c, target):
+        # Settings loaded from files are NumPy numbers, e.g. ES_DELAY=300 as np.int64
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            assert steps_to_reach(x, c, target) == steps_to_reach(float(x), float(c), float(target))
+            assert repeated_sum(x, c, 1000) == repeated_sum(float(x), float(c), 1000)
+
+    def test_settings_from_file(self):
+        # Enter service delay of the default settings file, read as np.int64
+        der_obj = create_tripped_der(0.001)
+        assert isinstance(der_obj.der_file.ES_DELAY, np.integer)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            assert der_obj.time_to_next_event() == pytest.approx(der_obj.der_file.ES_DELAY, abs=0.002)
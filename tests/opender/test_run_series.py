@@ -0,0 +1,129 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from opender import DER_PV, DER_BESS, DERCommonFileFormat, DERCommonFileFormatBESS
+from opender.operation_status.status_codes import STATUS_NAMES
+
+n_steps = 300
+
+
+def create_der(bess, phase):
+    der_file = DERCommonFileFormatBESS() if bess else DERCommonFileFormat()
+    der_file.NP_PHASE = phase
+    der_file.QV_MODE_ENABLE = True
+    der_file.PV_MODE_ENABLE = True
+    if bess:
+        der_file.NP_BESS_CAPACITY = 2000
+        return DER_BESS(der_file, t_s=1)
+    return DER_PV(der_file, t_s=1)
+
+
+def create_inputs(phase):
+    k = np.arange(n_steps)
+    v_pu = 1 + 0.12 * np.sin(k / 20) - np.where((100 < k) & (k < 103), 0.5, 0)
+    if phase == 'THREE':
+        v_pu = np.stack([v_pu, v_pu * 1.02, v_pu * 0.97], axis=1)
+    f = 60 + 0.5 * np.sin(k / 30)
+    p_pu = 0.5 + 0.5 * np.cos(k / 10)
+    return v_pu, f, p_pu
+
+
+class TestRunSeries:
+
+    @pytest.mark.parametrize("bess", [False, True])
+    @pytest.mark.parametrize("phase", ['SINGLE', 'THREE'])
+    def test_run_series(self, bess, phase):
+        v_pu, f, p_pu = create_inputs(phase)
+        p_key = 'p_dem_pu' if bess else 'p_dc_pu'
+
+        der_obj = create_der(bess, phase)
+        result = der_obj.run_series(v_pu=v_pu, f=f, **{p_key: p_pu})
+
+        der_ref = create_der(bess, phase)
+        for k in range(n_steps):
+            v = list(v_pu[k]) if phase == 'THREE' else v_pu[k]
+            der_ref.update_der_input(v_pu=v, f=f[k], **{p_key: p_pu[k]})
+            der_ref.run()
+            assert result['time'][k] == der_ref.time
+            assert result['p_out_w'][k] == der_ref.p_out_w
+            assert result['q_out_var'][k] == der_ref.q_out_var
+            assert result['p_out_pu'][k] == der_ref.p_out_pu
+            assert result['q_out_pu'][k] == der_ref.q_out_pu
+            assert result['v_meas_pu'][k] == der_ref.der_input.v_meas_pu
+            assert STATUS_NAMES[result['der_status'][k]] == der_ref.der_status
+            if bess:
+                assert result['bess_soc'][k] == der_ref.bess_soc
+
+    def test_run_series_dataframe(self):
+        v_pu, f, p_pu = create_inputs('THREE')
+        inputs = pd.DataFrame({'v_pu_a': v_pu[:, 0], 'v_pu_b': v_pu[:, 1], 'v_pu_c': v_pu[:, 2], 'f': f,
+                               'p_dc_pu': p_pu}, index=pd.RangeIndex(1, n_steps + 1, name='t'))
+
+        result = create_der(False, 'THREE').run_series(inputs)
+        reference = create_der(False, 'THREE').run_series(v_pu=v_pu, f=f, p_dc_pu=p_pu)
+
+        assert isinstance(result, pd.DataFrame)
+        assert (result.index == inputs.index).all()
+        assert np.array_equal(result['p_out_w'].to_numpy(), reference['p_out_w'])
+        assert np.array_equal(result['der_status'].to_numpy(), reference['der_status'])
+
+    def test_run_series_constant_input(self):
+        v_pu, f, p_pu = create_inputs('SINGLE')
+        result = create_der(False, 'SINGLE').run_series(v_pu=v_pu, f=60, p_dc_pu=1)
+        reference = create_der(False, 'SINGLE').run_series(v_pu=v_pu, f=np.full(n_steps, 60), p_dc_pu=np.ones(n_steps))
+        assert np.array_equal(result, reference)
+
+    def test_run_series_invalid_length(self):
+        with pytest.raises(ValueError):
+            create_der(False, 'SINGLE').run_series(v_pu=np.ones(10), f=np.full(9, 60), p_dc_pu=1)
+        with pytest.raises(ValueError):
+            create_der(False, 'SINGLE').run_series(v_pu=1, f=60, p_dc_pu=1)
+
+    @pytest.mark.parametrize("chunk", [1, 64, 1000])
+    def test_stream(self, chunk):
+        v_pu, f, p_pu = create_inputs('THREE')
+        reference = create_der(False, 'THREE').run_series(v_pu=v_pu, f=f, p_dc_pu=p_pu)
+
+        # Single time step inputs as tuples, from a generator
+        steps = ((list(v_pu[k]), f[k], p_pu[k]) for k in range(n_steps))
+        chunks = list(create_der(False, 'THREE').stream(steps, chunk=chunk, names=('v_pu', 'f', 'p_dc_pu')))
+        assert len(chunks) == -(-n_steps // chunk)
+        assert all(len(c) <= chunk for c in chunks)
+        assert np.array_equal(np.concatenate(chunks), reference)
+
+        # Single time step inputs as dicts
+        steps = ({'v_pu': list(v_pu[k]), 'f': f[k], 'p_dc_pu': p_pu[k]} for k in range(n_steps))
+        assert np.array_equal(np.concatenate(list(create_der(False, 'THREE').stream(steps, chunk=chunk))), reference)
+
+    def test_stream_file(self, tmp_path):
+        v_pu, f, p_pu = create_inputs('SINGLE')
+        reference = create_der(True, 'SINGLE').run_series(v_pu=v_pu, f=f, p_dem_pu=p_pu)
+
+        file = tmp_path / 'inputs.csv'
+        pd.DataFrame({'v_pu': v_pu, 'f': f, 'p_dem_pu': p_pu}).to_csv(file, index=False)
+        der_obj = create_der(True, 'SINGLE')
+        chunks = list(der_obj.stream(pd.read_csv(file, chunksize=70)))
+        assert [len(c) for c in chunks] == [70, 70, 70, 70, 20]
+        result = pd.concat(chunks)
+        # CSV round trip of the inputs is not bit exact
+        assert result['p_out_w'].to_numpy() == pytest.approx(reference['p_out_w'])
+        assert result['bess_soc'].to_numpy() == pytest.approx(reference['bess_soc'])
+
+    def test_stream_tuples_without_names(self):
+        with pytest.raises(ValueError):
+            list(create_der(False, 'SINGLE').stream([(1, 60, 1)]))
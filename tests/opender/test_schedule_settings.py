@@ -0,0 +1,109 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender import DER_PV, DERFleet, DERCommonFileFormat
+
+
+def create_der(t_s=1):
+    der_file = DERCommonFileFormat()
+    der_file.NP_SET_EXE_TIME = 2
+    der_obj = DER_PV(der_file, t_s=t_s)
+    der_obj.update_der_input(v_pu=1, f=60, p_dc_pu=1)
+    return der_obj
+
+
+class TestScheduleSettings:
+
+    def test_applied_after_execution_delay(self):
+        der_obj = create_der()
+        der_obj.schedule_settings(10, AP_LIMIT_ENABLE=True, AP_LIMIT=0.5)
+        der_obj.schedule_settings(5, AP_LIMIT_ENABLE=True, AP_LIMIT=0.8)
+
+        p = [der_obj.run()[0] / der_obj.der_file.NP_P_MAX for _ in range(20)]
+        # Changes commanded at 5 s and 10 s are applied at 7 s and 12 s (steps 7 and 12)
+        assert der_obj.der_file.AP_LIMIT == 0.5
+        assert der_obj.exec_delay.ap_limit_exec == 0.5
+        assert der_obj.exec_delay.schedule == []
+        assert p[5] == pytest.approx(1)
+        assert p[6] < 1
+        assert p[-1] == pytest.approx(0.5, abs=1e-3)
+
+    def test_snapshot_of_values(self):
+        der_obj = create_der(t_s=0.1)
+        curve = {'P_Q_INJ_PU': [0, 1], 'Q_MAX_INJ_PU': [0.44, 0.44], 'P_Q_ABS_PU': [0, 1], 'Q_MAX_ABS_PU': [0.44, 0.44]}
+        der_obj.schedule_settings(0.3, AP_LIMIT=0.7, NP_Q_CAPABILITY_BY_P_CURVE=curve)
+        # Changes recorded when commanded are not affected by later modification of the live settings, or of the
+        # provided values
+        der_obj.der_file.AP_LIMIT = 0.9
+        curve['Q_MAX_INJ_PU'][1] = 0.1
+        for _ in range(4):
+            der_obj.run()
+        assert der_obj.der_file.AP_LIMIT == 0.9
+        # Applied at 2.3 s, in spite of the accumulated time step error
+        for _ in range(19):
+            der_obj.run()
+        assert der_obj.der_file.AP_LIMIT == 0.7
+        assert der_obj.der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_INJ_PU'] == [0.44, 0.44]
+        assert der_obj.der_file.NP_Q_CAPABILITY_BY_P_CURVE is not curve
+
+    def test_same_time_in_order(self):
+        der_obj = create_der()
+        der_obj.schedule_settings(1, AP_LIMIT=0.5)
+        der_obj.schedule_settings(1, AP_LIMIT=0.6)
+        for _ in range(3):
+            der_obj.run()
+        assert der_obj.der_file.AP_LIMIT == 0.6
+
+    def test_unknown_parameter(self):
+        der_obj = create_der()
+        with pytest.raises(ValueError):
+            der_obj.schedule_settings(1, AP_LIMT=0.5)
+
+    def test_fleet(self):
+        ders = [create_der() for _ in range(3)]
+        ders[1].schedule_settings(3, AP_LIMIT_ENABLE=True, AP_LIMIT=0.5)
+        fleet = DERFleet(ders)
+        fleet.update_der_input(v_pu=1, f=60, p_dc_pu=1)
+        for _ in range(20):
+            p, q = fleet.run()
+        assert fleet.settings.AP_LIMIT[1] == 0.5
+        assert p[1] / ders[1].der_file.NP_P_MAX == pytest.approx(0.5, abs=1e-3)
+        assert p[0] / ders[0].der_file.NP_P_MAX == pytest.approx(1)
+
+    def test_fleet_updates_changed_rows(self):
+        ders = [create_der() for _ in range(3)]
+        curve = {'P_Q_INJ_PU': [-1, 0, 0.2, 0.4, 0.6, 0.8, 1], 'Q_MAX_INJ_PU': [0.44] * 7,
+                 'P_Q_ABS_PU': [-1, 0, 0.2, 0.4, 0.6, 0.8, 1], 'Q_MAX_ABS_PU': [0.44] * 7}
+        ders[2].schedule_settings(1, AP_LIMIT_ENABLE=True, AP_LIMIT=0.5, NP_Q_CAPABILITY_BY_P_CURVE=curve)
+        fleet = DERFleet(ders)
+        settings = fleet.settings
+        fleet.update_der_input(v_pu=1, f=60, p_dc_pu=1)
+
+        # Modified without refresh_settings(), so not extracted when only the scheduled DER is updated
+        ders[0].der_file.AP_LIMIT = 0.8
+        for _ in range(5):
+            fleet.run()
+        assert fleet.settings is settings
+        assert fleet._scheduled == []
+        assert list(fleet.settings.AP_LIMIT) == [1, 1, 0.5]
+        assert fleet.settings.P_Q_INJ_PU.shape == (3, 7)
+
+        # Same settings as extracted for the whole fleet, with the curves padded to the longest one
+        ders[0].der_file.AP_LIMIT = 1
+        reference = DERFleet(ders).settings
+        for name, value in vars(reference).items():
+            np.testing.assert_array_equal(getattr(fleet.settings, name), value, err_msg=name)
@@ -0,0 +1,97 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+from opender import DER_PV, DER_BESS, DERFleet, MultiRateScheduler, DERCommonFileFormat, DERCommonFileFormatBESS
+
+
+def create_pv():
+    der_file = DERCommonFileFormat()
+    der_file.QV_MODE_ENABLE = True
+    return DER_PV(der_file)
+
+
+def create_bess():
+    der_file = DERCommonFileFormatBESS()
+    der_file.NP_BESS_CAPACITY = 2000
+    der_file.PF_MODE_ENABLE = True
+    return DER_BESS(der_file)
+
+
+def pv_inputs(time, members):
+    for der_obj in members:
+        der_obj.update_der_input(v_pu=1.05 if time > 2 else 1, f=60, p_dc_pu=1)
+
+
+def bess_inputs(time, members):
+    for der_obj in members:
+        der_obj.update_der_input(v_pu=1, f=60.2 if time > 0.5 else 60, p_dem_pu=0)
+
+
+class TestMultiRateScheduler:
+
+    @pytest.mark.parametrize("t_s_pv, t_s_bess", [(1, 0.01), (0.5, 0.2), (0.3, 0.02)])
+    def test_multi_rate(self, t_s_pv, t_s_bess):
+        t_end = 6
+        pv = create_pv()
+        bess = create_bess()
+        scheduler = MultiRateScheduler()
+        group_pv = scheduler.add_group([pv], t_s_pv, on_step=pv_inputs)
+        group_bess = scheduler.add_group([bess], t_s_bess, on_step=bess_inputs)
+        scheduler.run(t_end)
+
+        # Each group is stepped only at its own rate, and the clock does not drift
+        assert group_pv.n_steps == round(t_end / t_s_pv)
+        assert group_bess.n_steps == round(t_end / t_s_bess)
+        assert scheduler.time == t_end
+        assert pv.time == bess.time == t_end
+
+        # Same results as stepping each DER on its own
+        pv_ref = create_pv()
+        pv_ref.t_s = t_s_pv
+        bess_ref = create_bess()
+        bess_ref.t_s = t_s_bess
+        for der_obj, inputs, t_s in [(pv_ref, pv_inputs, t_s_pv), (bess_ref, bess_inputs, t_s_bess)]:
+            for k in range(1, round(t_end / t_s) + 1):
+                inputs(k * t_s, [der_obj])
+                der_obj.run()
+
+        assert pv.p_out_w == pytest.approx(pv_ref.p_out_w)
+        assert pv.q_out_var == pytest.approx(pv_ref.q_out_var)
+        assert bess.p_out_w == pytest.approx(bess_ref.p_out_w)
+        assert bess.bessspecific.soc_calc.bess_soc == pytest.approx(bess_ref.bessspecific.soc_calc.bess_soc)
+
+    def test_synchronization(self):
+        scheduler = MultiRateScheduler()
+        fleet = DERFleet([create_pv(), create_pv()])
+        fleet.update_der_input(v_pu=1, f=60, p_dc_pu=1)
+        group_fleet = scheduler.add_group(fleet, 1)
+        group_bess = scheduler.add_group(create_bess(), 0.25, on_step=bess_inputs)
+        assert scheduler.tick_s == 0.25
+
+        stepped = [scheduler.step() for _ in range(4)]
+        assert stepped[:3] == [[group_bess]] * 3
+        assert stepped[3] == [group_fleet, group_bess]
+        assert scheduler.time == fleet.time == 1
+
+        # Adding a faster group refines the tick without changing the elapsed time
+        group_fast = scheduler.add_group(create_bess(), 0.1, on_step=bess_inputs)
+        assert scheduler.tick_s == pytest.approx(0.05)
+        assert scheduler.time == 1
+        assert group_fast.next_tick * scheduler.tick_s == pytest.approx(1.1)
+
+    def test_no_group(self):
+        with pytest.raises(ValueError):
+            MultiRateScheduler().step()
@@ -0,0 +1,94 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pathlib
+import os
+import pytest
+from opender import DERCommonFileFormat, DERCommonFileFormatBESS
+from opender.common_file_format.settings_cache import settings_cache, SettingsCache
+
+parameters_path = pathlib.Path(os.path.dirname(__file__)).parent.parent.joinpath("src", "opender", "Parameters")
+as_file_path = parameters_path.joinpath("AS-with std-values.csv")
+model_file_path = parameters_path.joinpath("Model-parameters.csv")
+
+
+def same_table(a, b):
+    assert a.keys() == b.keys()
+    for name in a:
+        if a[name] != a[name]:
+            assert b[name] != b[name]
+        elif name == 'param_inputs':
+            assert all(v == b[name][k] or v != v for k, v in a[name].items())
+        else:
+            assert a[name] == b[name], name
+    return True
+
+
+@pytest.fixture
+def no_cache():
+    maxsize = settings_cache.maxsize
+    settings_cache.maxsize = 0
+    yield
+    settings_cache.maxsize = maxsize
+
+
+class TestSettingsCache:
+
+    @pytest.mark.parametrize("cls", [DERCommonFileFormat, DERCommonFileFormatBESS])
+    def test_same_as_uncached(self, cls, no_cache):
+        uncached = cls(as_file_path, model_file_path)
+        settings_cache.maxsize = 64
+        settings_cache.clear()
+        cls(as_file_path, model_file_path)
+        cached = cls(as_file_path, model_file_path)
+        assert settings_cache.hits == 1
+        assert settings_cache.misses == 1
+        assert same_table(uncached._settings_table(), cached._settings_table())
+
+    def test_copies_are_independent(self):
+        der_file_1 = DERCommonFileFormat(as_file_path, model_file_path)
+        der_file_2 = DERCommonFileFormat(as_file_path, model_file_path)
+        der_file_1.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_INJ_PU'][0] = 0.1
+        der_file_1.AP_LIMIT = 0.5
+        assert der_file_2.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_INJ_PU'][0] != 0.1
+        assert der_file_2.AP_LIMIT == 1
+        assert DERCommonFileFormat(as_file_path, model_file_path).AP_LIMIT == 1
+
+    def test_kwargs_after_cache(self):
+        DERCommonFileFormat(as_file_path, model_file_path)
+        der_file = DERCommonFileFormat(as_file_path, model_file_path, NP_P_MAX=50e3)
+        assert der_file.NP_P_MAX == 50e3
+        assert DERCommonFileFormat(as_file_path, model_file_path).NP_P_MAX == 100e3
+
+    def test_content_hash(self, tmp_path):
+        new_as_file_path = tmp_path.joinpath("AS.csv")
+        as_file = as_file_path.read_text(encoding='utf-8')
+        new_as_file_path.write_text(as_file.replace("NP_P_MAX,100000", "NP_P_MAX,80000"), encoding='utf-8')
+        assert settings_cache.key(DERCommonFileFormat, new_as_file_path, model_file_path) != \
+            settings_cache.key(DERCommonFileFormat, as_file_path, model_file_path)
+        assert DERCommonFileFormat(new_as_file_path, model_file_path).NP_P_MAX == 80e3
+
+    def test_disk_cache(self, tmp_path):
+        cache = SettingsCache(cache_dir=tmp_path)
+        key = cache.key(DERCommonFileFormat, as_file_path, model_file_path)
+        cache.put(key, DERCommonFileFormat(as_file_path, model_file_path)._settings_table())
+        assert len(list(tmp_path.glob("*.pkl"))) == 1
+
+        # Another process, with an empty in-memory cache
+        cache = SettingsCache(cache_dir=tmp_path)
+        table = cache.get(key)
+        assert cache.hits == 1
+        assert table['_NP_P_MAX'] == 100e3
+        assert cache.get('0' * 64) is None
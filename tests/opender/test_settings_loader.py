@@ -0,0 +1,75 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pathlib
+import os
+import subprocess
+import sys
+import pytest
+import numpy as np
+import pandas as pd
+from opender import DERCommonFileFormat
+from opender.common_file_format.settings_loader import to_numeric, read_settings
+
+parameters_path = pathlib.Path(os.path.dirname(__file__)).parent.parent.joinpath("src", "opender", "Parameters")
+as_file_path = parameters_path.joinpath("AS-with std-values.csv")
+model_file_path = parameters_path.joinpath("Model-parameters.csv")
+
+
+def same(a, b):
+    return a == b or (a != a and b != b)
+
+
+class TestSettingsLoader:
+
+    @pytest.mark.parametrize("value, expected", [("1", 1), ("-0.5", -0.5), ("1e3", 1000.), ("CAT_B", "CAT_B"),
+                                                 ("", np.nan), ("NaN", np.nan), (2.5, 2.5)])
+    def test_to_numeric(self, value, expected):
+        assert same(to_numeric(value), expected)
+
+    @pytest.mark.parametrize("value", ["1", "-0.5", "1e3"])
+    def test_numeric_type(self, value):
+        # Same NumPy types as pandas, since settings are used in NumPy array operations
+        assert type(to_numeric(value)) is type(pd.to_numeric(value))
+
+    @pytest.mark.parametrize("file_path, strip_suffix", [(as_file_path, True), (model_file_path, False)])
+    def test_same_as_pandas(self, file_path, strip_suffix):
+        df = pd.read_csv(file_path, index_col=0)
+        settings = read_settings(file_path, strip_suffix)
+        if strip_suffix:
+            df.index = df.index.map(lambda s: s.replace("-AS", '').replace("-SS", ''))
+        assert list(settings) == list(df.index)
+        for name, value in df["VALUE"].items():
+            try:
+                value = pd.to_numeric(value)
+            except ValueError:
+                pass
+            assert same(settings[name], value)
+
+    def test_dataframe_input(self):
+        der_file = DERCommonFileFormat()
+        der_file_df = DERCommonFileFormat(pd.read_csv(as_file_path, index_col=0),
+                                          pd.read_csv(model_file_path, index_col=0))
+        for name, value in der_file.param_inputs.items():
+            assert same(der_file_df.param_inputs[name], value)
+            assert same(getattr(der_file_df.param_inputs, name), value)
+        with pytest.raises(AttributeError):
+            der_file.param_inputs.NOT_A_PARAMETER
+
+    def test_import_without_pandas(self):
+        code = "import sys, opender; opender.DERCommonFileFormat(); print('pandas' in sys.modules)"
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+        assert result.stdout.strip() == "False"
@@ -0,0 +1,53 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+from opender import DERCommonFileFormatBESS
+
+
+class TestSettingsVersion:
+
+    @pytest.mark.parametrize("param, value", [("QV_MODE_ENABLE", True), ("AP_LIMIT", 0.5), ("NP_P_MAX", 50e3)])
+    def test_version_incremented(self, si_obj_creation, param, value):
+        der_file = si_obj_creation.der_file
+        version = der_file.version
+        setattr(der_file, param, value)
+        assert der_file.version > version
+
+    def test_version_bess(self):
+        der_file = DERCommonFileFormatBESS()
+        version = der_file.version
+        der_file.NP_BESS_CAPACITY = 1000
+        assert der_file.version > version
+
+    def test_extract_on_change(self, si_obj_creation):
+        exec_delay = si_obj_creation.exec_delay
+        si_obj_creation.update_der_input(v_pu=1, p_dc_pu=0.5)
+        si_obj_creation.run()
+        si_obj_creation.run()
+        version = exec_delay.version_exec
+        assert version == si_obj_creation.der_file.version
+
+        # Extracted values are kept while the settings do not change
+        exec_delay.es_v_high_exec = 2
+        si_obj_creation.run()
+        assert exec_delay.version_exec == version
+        assert exec_delay.es_v_high_exec == 2
+
+        si_obj_creation.der_file.AP_LIMIT = 0.5
+        si_obj_creation.run()
+        assert exec_delay.version_exec > version
+        assert exec_delay.ap_limit_exec == 0.5
+        assert exec_delay.es_v_high_exec == si_obj_creation.der_file.ES_V_HIGH
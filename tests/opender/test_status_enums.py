@@ -0,0 +1,89 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender import DER_PV, DERFleet, DERCommonFileFormat, DERStatus, RTControl
+from opender.common_file_format import Phase, PFExcitation, VMeasUnbalance
+from opender.operation_status.status_codes import STATUS_NAMES, RT_CTRL_NAMES
+
+
+class TestStatusEnums:
+
+    def test_labels(self):
+        assert [code.label for code in DERStatus] == list(STATUS_NAMES)
+        assert [code.label for code in RTControl] == list(RT_CTRL_NAMES)
+        assert DERStatus.from_label('Momentary Cessation') is DERStatus.MOMENTARY_CESSATION
+        assert DERStatus.from_label(None) is None
+
+    @pytest.mark.parametrize("v_pu", [1, 1.15, 0.8, 0.4])
+    def test_string_views(self, v_pu):
+        der_obj = DER_PV(t_s=0.01, MC_ENABLE=True)
+        for k in range(100):
+            der_obj.update_der_input(p_dc_pu=1, v_pu=1 if k < 50 else v_pu, f=60)
+            der_obj.run()
+            assert isinstance(der_obj.der_status_code, DERStatus)
+            assert der_obj.der_status == STATUS_NAMES[der_obj.der_status_code]
+            assert der_obj.der_status == der_obj.opstatus.der_status
+            rtc = der_obj.opstatus.ridethroughcrit
+            assert rtc.rt_mode_v == STATUS_NAMES[rtc.rt_mode_v_code]
+            assert der_obj.ridethroughperf.rt_ctrl == RT_CTRL_NAMES[der_obj.ridethroughperf.rt_ctrl_code]
+
+    def test_rt_mode_v_priority(self):
+        rtc = DER_PV(t_s=0.01).opstatus.ridethroughcrit
+        rtc.rt_mode_v = 'Permissive Operation'
+        rtc.rt_mode_v = 'Continuous Operation'
+        assert rtc.rt_mode_v == 'Permissive Operation'
+        rtc.rt_mode_v = 'Cease to Energize'
+        assert rtc.rt_mode_v_code == DERStatus.CEASE_TO_ENERGIZE
+
+    @pytest.mark.parametrize("status, code", [(False, DERStatus.TRIP), (True, DERStatus.CONTINUOUS_OPERATION),
+                                              ('Entering Service', DERStatus.ENTERING_SERVICE)])
+    def test_der_status_setter(self, status, code):
+        der_obj = DER_PV(t_s=0.01)
+        der_obj.der_status = status
+        assert der_obj.der_status_code == code
+
+    def test_fleet_codes(self):
+        ders = [DER_PV(t_s=0.01, STATUS_INIT=status_init) for status_init in (True, False)]
+        fleet = DERFleet(ders, t_s=0.01)
+        assert fleet.der_status_code.dtype == np.int8
+        assert list(fleet.der_status_code) == [DERStatus.CONTINUOUS_OPERATION, DERStatus.TRIP]
+        assert list(fleet.der_status) == [d.der_status for d in ders]
+
+
+class TestSettingCodes:
+
+    @pytest.mark.parametrize("value, code", [('single', Phase.SINGLE), ('THREE', Phase.THREE), (1, Phase.SINGLE),
+                                             (3, Phase.THREE)])
+    def test_np_phase(self, value, code):
+        der_file = DERCommonFileFormat(NP_PHASE=value)
+        assert der_file.np_phase_code == code
+        assert der_file.NP_PHASE == code.name
+
+    def test_invalid_value_keeps_code(self):
+        der_file = DERCommonFileFormat(CONST_PF_EXCITATION='INJ')
+        der_file.CONST_PF_EXCITATION = 'LEAD'
+        assert der_file.CONST_PF_EXCITATION == 'INJ'
+        assert der_file.const_pf_excitation_code == PFExcitation.INJ
+
+    def test_update_and_derive(self):
+        der_file = DERCommonFileFormat()
+        der_file.update(NP_V_MEAS_UNBALANCE='POS', CONST_PF_EXCITATION='INJ')
+        assert der_file.np_v_meas_unbalance_code == VMeasUnbalance.POS
+        derived = der_file.derive(CONST_PF_EXCITATION='ABS')
+        assert derived.np_v_meas_unbalance_code == VMeasUnbalance.POS
+        assert derived.const_pf_excitation_code == PFExcitation.ABS
+        assert der_file.const_pf_excitation_code == PFExcitation.INJ
@@ -0,0 +1,104 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+from opender import DER_PV, DER_BESS
+
+
+SETTINGS = [
+    {},
+    {'QV_MODE_ENABLE': True},
+    {'QV_MODE_ENABLE': True, 'QV_VREF_AUTO_MODE': True, 'QV_VREF': 1.02},
+    {'CONST_PF_MODE_ENABLE': True, 'CONST_PF': 0.9, 'CONST_PF_EXCITATION': 'INJ'},
+    {'CONST_PF_MODE_ENABLE': True, 'CONST_PF': 0.85, 'CONST_PF_EXCITATION': 'ABS'},
+    {'CONST_Q_MODE_ENABLE': True, 'CONST_Q': 0.44},
+    {'CONST_Q_MODE_ENABLE': True, 'CONST_Q': -0.44, 'NP_PRIO_OUTSIDE_MIN_Q_REQ': 'ACTIVE'},
+    {'QP_MODE_ENABLE': True},
+    {'AP_LIMIT_ENABLE': True, 'AP_LIMIT': 0.5},
+    {'PV_MODE_ENABLE': True, 'QV_MODE_ENABLE': True},
+    {'PF_MODE_ENABLE': True},
+    {'PF_MODE_ENABLE': True, 'PV_MODE_ENABLE': True, 'AP_LIMIT_ENABLE': True, 'AP_LIMIT': 0.6},
+    {'NP_ABNORMAL_OP_CAT': 'CAT_II', 'MC_ENABLE': True, 'QV_MODE_ENABLE': True},
+    {'NP_ABNORMAL_OP_CAT': 'CAT_I', 'DVS_MODE_ENABLE': True},
+    {'NP_PHASE': 'THREE', 'QV_MODE_ENABLE': True},
+]
+
+CONDITIONS = [(1, 60), (1.04, 60), (0.95, 60), (1.08, 60), (1.09, 60), (0.9, 60), (1, 59.7), (1, 60.4), (1, 61.5),
+              (1.15, 60), (0.8, 60), (0.6, 60), (0.4, 60), (1.25, 60), (1, 56)]
+
+
+def snapshot(der_obj, v_pu, f, p_avail_pu):
+    # Output of a snapshot simulation, running the model once with a large time step
+    if isinstance(der_obj, DER_BESS):
+        der_obj.update_der_input(v_pu=v_pu, f=f, p_dem_pu=p_avail_pu)
+    else:
+        der_obj.update_der_input(v_pu=v_pu, f=f, p_dc_pu=p_avail_pu)
+    der_obj.run()
+    return der_obj.p_out_w, der_obj.q_out_var, der_obj.der_status_code
+
+
+def check_snapshot(der_class, settings, v_pu, f, p_avail_pu, **ratings):
+    der_obj = der_class(t_s=100000, **ratings, **settings)
+    p_out_w, q_out_var, i_pos_pu, status = der_obj.solve_steady_state(v_pu, f, p_avail_pu)
+    p_ref, q_ref, status_ref = snapshot(der_obj, v_pu, f, p_avail_pu)
+    assert status == status_ref
+    assert p_out_w == pytest.approx(p_ref, abs=1e-6)
+    assert q_out_var == pytest.approx(q_ref, abs=1e-6)
+    assert i_pos_pu == pytest.approx(complex(der_obj.i_pos_pu), abs=1e-9)
+
+
+class TestSteadyState:
+
+    @pytest.mark.parametrize("settings", SETTINGS)
+    @pytest.mark.parametrize("v_pu, f", CONDITIONS)
+    @pytest.mark.parametrize("p_avail_pu", [0.3, 1])
+    def test_pv(self, settings, v_pu, f, p_avail_pu):
+        check_snapshot(DER_PV, settings, v_pu, f, p_avail_pu)
+
+    @pytest.mark.parametrize("settings", SETTINGS)
+    @pytest.mark.parametrize("v_pu, f", CONDITIONS)
+    def test_pv_va_limited(self, settings, v_pu, f):
+        # Apparent power rating equal to the active power rating, so the reactive power support is limited
+        check_snapshot(DER_PV, settings, v_pu, f, 0.95, NP_VA_MAX=100e3, NP_P_MAX=100e3, NP_Q_MAX_INJ=44e3,
+                       NP_Q_MAX_ABS=44e3)
+
+    @pytest.mark.parametrize("settings", SETTINGS)
+    @pytest.mark.parametrize("v_pu, f", CONDITIONS)
+    @pytest.mark.parametrize("p_avail_pu", [-1.2, -0.5, 0, 0.5, 1.2])
+    def test_bess(self, settings, v_pu, f, p_avail_pu):
+        check_snapshot(DER_BESS, settings, v_pu, f, p_avail_pu)
+
+    def test_state_unchanged(self):
+        der_obj = DER_PV(QV_MODE_ENABLE=True)
+        der_obj.update_der_input(v_pu=1.02, f=60, p_dc_pu=0.8)
+        der_obj.advance(1000)
+        der_obj.quiescence.check()
+        outputs = (der_obj.time, der_obj.p_out_w, der_obj.q_out_var, der_obj.der_input.v_meas_pu)
+        for v_pu in (0.5, 0.9, 1.05, 1.3):
+            der_obj.solve_steady_state(v_pu, 59, 0.5)
+        assert (der_obj.time, der_obj.p_out_w, der_obj.q_out_var, der_obj.der_input.v_meas_pu) == outputs
+        assert der_obj.quiescence.check()
+
+    @pytest.mark.parametrize("t_s", [0.1, 1])
+    def test_settled(self, t_s):
+        # Same result as a dynamic simulation once settled
+        der_obj = DER_PV(t_s=t_s, QV_MODE_ENABLE=True, PV_MODE_ENABLE=True)
+        der_obj.update_der_input(v_pu=1.07, f=60, p_dc_pu=0.9)
+        der_obj.advance(round(100 / t_s))
+        p_out_w, q_out_var, i_pos_pu, status = der_obj.solve_steady_state(1.07, 60, 0.9)
+        assert der_obj.settled
+        assert p_out_w == pytest.approx(der_obj.p_out_w, rel=1e-6)
+        assert q_out_var == pytest.approx(der_obj.q_out_var, rel=1e-6)
+        assert status == der_obj.der_status_code
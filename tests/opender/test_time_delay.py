@@ -0,0 +1,78 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender.auxiliary_funcs.time_delay import TimeDelay
+
+
+class TimeStep:
+    t_s = 0.1
+
+
+def reference_tdelay(delay, tdelay_in, tdelay_time):
+    # Remaining time countdown of each pending change, as described in the report
+    if delay.get('hold') is None:
+        delay.update(hold=tdelay_in, prev=tdelay_in, value=[], time=[])
+    if tdelay_time < TimeStep.t_s:
+        delay.update(hold=tdelay_in, value=[], time=[])
+    else:
+        delay['time'] = [x - TimeStep.t_s for x in delay['time']]
+        for x in delay['time']:
+            if x <= 0:
+                index = delay['time'].index(x)
+                delay['hold'] = delay['value'][index]
+                del delay['time'][index]
+                del delay['value'][index]
+    if tdelay_in != delay['prev']:
+        delay['value'].append(tdelay_in)
+        delay['time'].append(tdelay_time)
+        delay['prev'] = tdelay_in
+    return delay['hold']
+
+
+class TestTimeDelay:
+
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize("delay_times", [[1], [0.3], [2, 0.5, 1, 0.05, 0]])
+    def test_same_as_countdown(self, seed, delay_times):
+        rng = np.random.default_rng(seed)
+        td = TimeDelay(TimeStep())
+        reference = {}
+        tdelay_time = delay_times[0]
+        for k in range(500):
+            if rng.random() < 0.02:
+                tdelay_time = rng.choice(delay_times)
+            tdelay_in = rng.integers(5) if rng.random() < 0.5 else 1.
+            assert td.tdelay(tdelay_in, tdelay_time) == reference_tdelay(reference, tdelay_in, tdelay_time)
+
+    def test_pending_queue(self):
+        # Input changing at every time step, pending changes are bounded by the delay (11 time steps, since the
+        # countdown of 1 s by steps of 0.1 s is slightly above 0 after 10 steps)
+        td = TimeDelay(TimeStep())
+        out = [td.tdelay(k, 1) for k in range(100)]
+        assert out[:12] == [0] * 12
+        assert out[12:] == list(range(1, 89))
+        assert len(td.pending) == 11
+        assert td.tdelay_in_time == []
+
+    def test_max_pending(self):
+        td = TimeDelay(TimeStep(), max_pending=4)
+        out = [td.tdelay(k, 1) for k in range(100)]
+        assert len(td.pending) <= 4
+        # Output updated less often, but with the same delay
+        assert out[-1] <= 88
+        assert all(out[k] <= k - 11 for k in range(12, 100))
+        assert len(set(out)) > 10
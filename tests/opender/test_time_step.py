@@ -0,0 +1,123 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender import der, DER_PV, DER_BESS, DERFleet, DERCommonFileFormat, DERCommonFileFormatBESS
+from opender.auxiliary_funcs.time_step import TimeStep
+from opender.auxiliary_funcs.low_pass_filter import LowPassFilter
+from opender.auxiliary_funcs.cond_delay import ConditionalDelay
+from opender.auxiliary_funcs.ramping import Ramping
+from opender.auxiliary_funcs.time_delay import TimeDelay
+from opender.bess_specifc.soc import StateOfCharge
+from opender.fleet import array_funcs
+
+t_s_list = [0.001, 0.1, 1]
+
+
+def create_der(bess, t_s=None):
+    der_file = DERCommonFileFormatBESS() if bess else DERCommonFileFormat()
+    der_file.QV_MODE_ENABLE = True
+    der_file.PV_MODE_ENABLE = True
+    if bess:
+        der_file.NP_BESS_CAPACITY = 2000
+        return DER_BESS(der_file, t_s=t_s)
+    return DER_PV(der_file, t_s=t_s)
+
+
+def run_der(der_obj, duration):
+    # Voltage sag, followed by a high voltage and a frequency excursion
+    result = []
+    for k in range(int(round(duration / der_obj.t_s))):
+        t = k * der_obj.t_s
+        v_pu = 0.6 if 1 <= t < 1.5 else 1.08 if 3 <= t < 6 else 1
+        f = 60.4 if t >= 8 else 60
+        if hasattr(der_obj, 'bessspecific'):
+            der_obj.update_der_input(v_pu=v_pu, f=f, p_dem_pu=0.8)
+        else:
+            der_obj.update_der_input(v_pu=v_pu, f=f, p_dc_pu=1)
+        der_obj.run()
+        result.append((der_obj.p_out_w, der_obj.q_out_var, der_obj.der_status))
+    return result
+
+
+class TestTimeStep:
+
+    @pytest.mark.parametrize("bess", [False, True])
+    @pytest.mark.parametrize("t_s", t_s_list)
+    def test_instance_time_step(self, t_s, bess):
+        duration = 10
+
+        # Reference result using the global time step
+        der.DER.t_s = t_s
+        reference = run_der(create_der(bess), duration)
+
+        # Same DER with its own time step, while the global time step and another DER use a different one
+        der.DER.t_s = 10000
+        der_obj = create_der(bess, t_s=t_s)
+        der_other = create_der(bess, t_s=0.5)
+        result = run_der(der_obj, duration)
+        run_der(der_other, duration)
+
+        assert der_obj.time == pytest.approx(duration)
+        assert der_other.time == pytest.approx(duration)
+        assert len(result) == len(reference)
+        for (p, q, status), (p_ref, q_ref, status_ref) in zip(result, reference):
+            assert status == status_ref
+            assert p == pytest.approx(p_ref)
+            assert q == pytest.approx(q_ref)
+
+    def test_global_time_step(self, si_obj_creation):
+        # DER objects without their own time step follow the global time step
+        der.DER.t_s = 0.5
+        si_obj_creation.update_der_input(v_pu=1, f=60, p_dc_pu=1)
+        si_obj_creation.run()
+        assert si_obj_creation.time == 0.5
+        assert si_obj_creation.t_s == 0.5
+
+    @pytest.mark.parametrize("create_block", [
+        lambda der_obj: LowPassFilter(der_obj),
+        lambda der_obj: ConditionalDelay(der_obj),
+        lambda der_obj: Ramping(der_obj),
+        lambda der_obj: TimeDelay(der_obj),
+        lambda der_obj: StateOfCharge(DERCommonFileFormatBESS(NP_BESS_CAPACITY=2000), der_obj),
+    ])
+    def test_block_time_step(self, create_block):
+        # Functions take the time step of the DER object they belong to, or the global time step
+        der.DER.t_s = 0.5
+        assert isinstance(create_block(None), TimeStep)
+        assert create_block(None).t_s == 0.5
+        assert create_block(create_der(False, t_s=0.1)).t_s == 0.1
+
+    @pytest.mark.parametrize("cls", [array_funcs.LowPassFilterArray, array_funcs.RampingArray,
+                                     array_funcs.ConditionalDelayArray, array_funcs.TimeDelayArray])
+    def test_array_block_time_step(self, cls):
+        der.DER.t_s = 0.5
+        assert cls(3).t_s == 0.5
+        assert cls(3, der_obj=create_der(False, t_s=0.1)).t_s == 0.1
+
+    def test_fleet_time_step(self):
+        ders = [create_der(False, t_s=0.1), create_der(True, t_s=0.1)]
+        der.DER.t_s = 10000
+        fleet = DERFleet(ders)
+        assert fleet.t_s == 0.1
+
+        fleet.update_der_input(v_pu=1, f=60, p_dc_pu=1, p_dem_pu=[np.nan, 0.8])
+        for _ in range(10):
+            fleet.run()
+        assert fleet.time == pytest.approx(1)
+
+        with pytest.raises(ValueError):
+            DERFleet([create_der(False, t_s=0.1), create_der(False, t_s=1)])
@@ -0,0 +1,109 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender import DER_PV, DER_BESS
+from opender.op_cond_proc import DERInputs
+
+
+@pytest.fixture
+def check_calls(monkeypatch):
+    calls = []
+    check = DERInputs.operating_conditions_validity_check
+    monkeypatch.setattr(DERInputs, 'operating_conditions_validity_check', lambda self: calls.append(1) or check(self))
+    return calls
+
+
+class TestTrustedInputs:
+
+    @pytest.mark.parametrize("der_cls, power", [(DER_PV, 'p_dc_pu'), (DER_BESS, 'p_dem_pu')])
+    def test_same_results(self, der_cls, power):
+        der_ref = der_cls(t_s=0.1)
+        der_obj = der_cls(t_s=0.1, trusted_inputs=True)
+        for k in range(100):
+            v_pu = 1.12 if 20 <= k < 40 else 1
+            for d in (der_ref, der_obj):
+                d.update_der_input(v_pu=v_pu, f=60, **{power: 0.5})
+                d.run()
+            assert (der_obj.p_out_w, der_obj.q_out_var) == (der_ref.p_out_w, der_ref.q_out_var)
+
+    def test_check_once(self, check_calls):
+        der_obj = DER_PV(t_s=0.1, trusted_inputs=True)
+        for _ in range(10):
+            der_obj.update_der_input(p_dc_pu=0.5, v_pu=1, f=60)
+            der_obj.run()
+        assert len(check_calls) == 1
+
+    def test_check_after_type_change(self, check_calls):
+        der_obj = DER_PV(t_s=0.1)
+        der_obj.trusted_inputs = True
+        der_obj.update_der_input(p_dc_pu=0.5, v_pu=1, f=60)
+        der_obj.run()
+        der_obj.run()
+        der_obj.der_input.freq_hz = None
+        der_obj.run()
+        assert len(check_calls) == 2
+        assert der_obj.der_input.freq_hz == 60
+
+    def test_not_trusted(self, check_calls):
+        der_obj = DER_PV(t_s=0.1)
+        for _ in range(10):
+            der_obj.update_der_input(p_dc_pu=0.5, v_pu=1, f=60)
+            der_obj.run()
+        assert len(check_calls) == 10
+
+    def test_clone(self):
+        assert DER_PV(trusted_inputs=True).clone().trusted_inputs
+
+
+class TestSeriesValidation:
+
+    def test_valid_series(self, check_calls):
+        der_obj = DER_PV(t_s=0.1)
+        der_obj.run_series(v_pu=np.ones(50), p_dc_pu=0.5, f=60)
+        assert len(check_calls) == 1
+        assert not der_obj.trusted_inputs
+
+    def test_corrected_series(self, check_calls):
+        p_dc_pu = np.full(50, 0.5)
+        p_dc_pu[10] = -0.1
+        der_ref = DER_PV(t_s=0.1)
+        result = DER_PV(t_s=0.1).run_series(v_pu=np.ones(50), p_dc_pu=p_dc_pu, f=60)
+        assert len(check_calls) == 50
+        for k in range(50):
+            der_ref.update_der_input(v_pu=1, p_dc_pu=p_dc_pu[k], f=60)
+            der_ref.run()
+            assert result['p_out_w'][k] == der_ref.p_out_w
+
+    def test_undefined_voltage(self):
+        v_pu = np.ones((20, 3))
+        v_pu[[3, 7], 1] = np.nan
+        der_obj = DER_PV(t_s=0.1)
+        with pytest.raises(ValueError, match=r"\[3, 7\]"):
+            der_obj.run_series(v_pu=v_pu, p_dc_pu=0.5, f=60)
+        assert der_obj.time == 0
+
+    @pytest.mark.parametrize("constants", [{'v_pu': -1.0, 'p_dc_pu': 0.5}, {'v_pu': 1.0, 'p_dc_pu': -0.5}])
+    def test_invalid_constant(self, check_calls, constants):
+        # Constant inputs are validated with the time series, so invalid constants are corrected in each time step
+        der_ref = DER_PV(t_s=1, NP_PHASE='SINGLE')
+        result = DER_PV(t_s=1, NP_PHASE='SINGLE').run_series(f=np.full(5, 60.0), **constants)
+        assert len(check_calls) == 5
+        for k in range(5):
+            der_ref.update_der_input(f=60, **constants)
+            der_ref.run()
+            assert (result['v_meas_pu'][k], result['p_out_w'][k], result['der_status'][k]) == \
+                   (der_ref.der_input.v_meas_pu, der_ref.p_out_w, der_ref.der_status_code)